@@ -0,0 +1,373 @@
+from ysrig.cmds_proxy import cmds, mel
+import maya.api.OpenMaya as om2
+
+# addAttrでdtの引数で設定されるアトリビュート型
+DT_TYPES = {
+    "string", "matrix", "double3", "float3", "double2", "float2",
+    "vectorArray", "pointArray", "nurbsCurve", "nurbsSurface",
+    "reflectanceRGB", "spectrumRGB", "floatArray", "doubleArray",
+    "Int32Array", "compound"
+}
+
+# 値の比較に使う許容誤差
+TOLERANCE = 1e-10
+
+
+def mel_str(value: str) -> str:
+    """
+    文字列をMELの文字列リテラルに変換する
+    """
+    value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+    return f"\"{value}\""
+
+
+def mel_num(value) -> str:
+    """
+    数値をMELの数値リテラルに変換する
+    """
+    if isinstance(value, bool):
+        return "1" if value else "0"
+
+    if isinstance(value, int):
+        return str(value)
+
+    return f"{float(value):.17g}"
+
+
+class AttrPlan:
+    """
+    1つのノードに対するアトリビュート操作の計画
+    planで作成し、executeでまとめて実行する
+
+    ops = [(操作の種類, 引数...), ...]
+    """
+    def __init__(self, node):
+        self.node = node
+        self.ops = []
+
+    def __bool__(self):
+        return bool(self.ops)
+
+    def __len__(self):
+        return len(self.ops)
+
+    def add_attr(self, key, attr_type, multi=False, parent=None, enum=None):
+        self.ops.append(("addAttr", key, attr_type, multi, parent, enum))
+
+    def set_value(self, plug, value, value_type, lock=True):
+        self.ops.append(("setAttr", plug, value, value_type, lock))
+
+    def connect(self, src, plug):
+        self.ops.append(("connectAttr", src, plug))
+
+    def lock(self, plug, lock=True):
+        self.ops.append(("lock", plug, lock))
+
+    def to_mel(self) -> str:
+        """
+        計画をMELスクリプトに変換する
+
+        Returns:
+            str: MELスクリプト
+        """
+        lines = []
+        # 子を追加するdouble2, double3などはdtではなくコンパウンドとしてatで追加する
+        compounds = {op[4] for op in self.ops if op[0] == "addAttr" and op[4]}
+        for op in self.ops:
+            kind = op[0]
+            if kind == "addAttr":
+                _, key, attr_type, multi, parent, enum = op
+                flag = "-dt" if attr_type in DT_TYPES and key not in compounds else "-at"
+                cmd = f"addAttr -ln {mel_str(key)} {flag} {mel_str(attr_type)}"
+                if enum is not None:
+                    cmd += f" -en {mel_str(enum)}"
+
+                if multi:
+                    cmd += " -m"
+
+                if parent:
+                    cmd += f" -p {mel_str(parent)}"
+
+                lines.append(f"{cmd} {mel_str(self.node)};")
+
+            elif kind == "setAttr":
+                _, plug, value, value_type, lock = op
+                cmd = "setAttr"
+                if lock:
+                    cmd += " -l true"
+
+                if value_type == "string":
+                    cmd += f" -type \"string\" {mel_str(f'{self.node}.{plug}')} {mel_str(value)}"
+
+                elif value_type == "matrix":
+                    cmd += f" -type \"matrix\" {mel_str(f'{self.node}.{plug}')} {' '.join(mel_num(v) for v in value)}"
+
+                elif value_type in ("double2", "double3"):
+                    cmd += f" {mel_str(f'{self.node}.{plug}')} {' '.join(mel_num(v) for v in value)}"
+
+                else:
+                    cmd += f" {mel_str(f'{self.node}.{plug}')} {mel_num(value)}"
+
+                lines.append(f"{cmd};")
+
+            elif kind == "connectAttr":
+                _, src, plug = op
+                lines.append(f"connectAttr -f {mel_str(src)} {mel_str(f'{self.node}.{plug}')};")
+
+            elif kind == "lock":
+                _, plug, lock = op
+                lines.append(f"setAttr -l {'true' if lock else 'false'} {mel_str(f'{self.node}.{plug}')};")
+
+        return "\n".join(lines)
+
+
+def _get_dependency_node(node: str) -> om2.MFnDependencyNode:
+    sel = om2.MSelectionList()
+    sel.add(node)
+    return om2.MFnDependencyNode(sel.getDependNode(0))
+
+
+def _read_plug(plug: om2.MPlug, value_type: str):
+    """
+    プラグの値を読み込む 読めなかった場合はNoneを返す
+    """
+    try:
+        if value_type == "string":
+            return plug.asString()
+
+        if value_type == "double":
+            return plug.asDouble()
+
+        if value_type == "long":
+            return plug.asInt()
+
+        if value_type == "bool":
+            return plug.asBool()
+
+        if value_type == "matrix":
+            return tuple(om2.MFnMatrixData(plug.asMObject()).matrix())
+
+        if value_type in ("double2", "double3"):
+            return tuple(plug.child(i).asDouble() for i in range(plug.numChildren()))
+
+    except RuntimeError:
+        return None
+
+    return None
+
+
+def _is_same_value(current, data, value_type: str) -> bool:
+    if current is None:
+        return False
+
+    if value_type in ("string", "bool", "long"):
+        return current == data
+
+    if value_type == "double":
+        return abs(current - data) <= TOLERANCE
+
+    if len(current) != len(data):
+        return False
+
+    return all(abs(c - d) <= TOLERANCE for c, d in zip(current, data))
+
+
+def _get_value_type(data) -> str:
+    """
+    Pythonの値からアトリビュートの型を判定する
+    """
+    if isinstance(data, str):
+        return "string"
+
+    if isinstance(data, tuple):
+        if len(data) == 2:
+            return "double2"
+
+        if len(data) == 3:
+            return "double3"
+
+        return "matrix"
+
+    if isinstance(data, float):
+        return "double"
+
+    if isinstance(data, bool):
+        return "bool"
+
+    if isinstance(data, int):
+        return "long"
+
+    return None
+
+
+class _Planner:
+    """
+    ノードの現在の状態と書き込みたい値を比較し、必要な操作だけをAttrPlanに積む
+    """
+    def __init__(self, node):
+        self.node = node
+        self.plan = AttrPlan(node)
+        self.fn = _get_dependency_node(node)
+
+    def _find_plug(self, key):
+        if not self.fn.hasAttribute(key):
+            return None
+
+        return self.fn.findPlug(key, False)
+
+    def _add_attr(self, key, value_type, multi=False):
+        if value_type in ("double2", "double3"):
+            self.plan.add_attr(key, value_type, multi=multi)
+            for axis in "XYZ"[:int(value_type[-1])]:
+                self.plan.add_attr(f"{key}{axis}", "double", parent=key)
+
+        else:
+            self.plan.add_attr(key, value_type, multi=multi)
+
+    def _static_element(self, attr, plug, data, value_type):
+        if plug is not None:
+            if plug.isLocked and _is_same_value(_read_plug(plug, value_type), data, value_type):
+                return
+
+            if plug.isLocked:
+                self.plan.lock(attr, False)
+
+        self.plan.set_value(attr, data, value_type)
+
+    def _connect_element(self, attr, plug, data):
+        if plug is not None:
+            if plug.isDestination and plug.source().name() == data:
+                if not plug.isLocked:
+                    self.plan.lock(attr)
+
+                return
+
+            if plug.isLocked:
+                self.plan.lock(attr, False)
+
+        self.plan.connect(data, attr)
+        self.plan.lock(attr)
+
+    def _add_connect_attr(self, key, data, multi=False):
+        attr_type = cmds.getAttr(data, type=True)
+        enum = None
+        if attr_type == "enum" and not multi:
+            n, a = data.split(".")
+            enum = cmds.attributeQuery(a, node=n, listEnum=True)[0]
+
+        self.plan.add_attr(key, attr_type, multi=multi, enum=enum)
+
+    def _unlock_rest(self, key, plug, num):
+        """
+        既存の要素のうち、書き込まない要素のロックを外す
+        """
+        for i in plug.getExistingArrayAttributeIndices():
+            if i < num:
+                continue
+
+            if plug.elementByLogicalIndex(i).isLocked:
+                self.plan.lock(f"{key}[{i}]", False)
+
+    def singular(self, key, data):
+        plug = self._find_plug(key)
+        if isinstance(data, str) and "." in data:
+            if plug is None:
+                self._add_connect_attr(key, data)
+
+            self._connect_element(key, plug, data)
+            return
+
+        value_type = _get_value_type(data)
+        if value_type is None:
+            return
+
+        if plug is None:
+            self._add_attr(key, value_type)
+
+        self._static_element(key, plug, data, value_type)
+
+    def multi(self, key, data):
+        plug = self._find_plug(key)
+        d = data[0]
+        connect = isinstance(d, str) and "." in d
+        value_type = None if connect else _get_value_type(d)
+        if not connect and value_type is None:
+            return
+
+        if plug is None:
+            if connect:
+                self._add_connect_attr(key, d, multi=True)
+
+            else:
+                self._add_attr(key, value_type, multi=True)
+
+        else:
+            self._unlock_rest(key, plug, len(data))
+
+        for i, d in enumerate(data):
+            attr = f"{key}[{i}]"
+            element = None if plug is None else plug.elementByLogicalIndex(i)
+            if connect:
+                self._connect_element(attr, element, d)
+
+            else:
+                self._static_element(attr, element, d, value_type)
+
+
+def plan(node: str, data: dict) -> AttrPlan:
+    """
+    辞書の内容をノードに書き込むための計画を作成する
+    既に同じ値が設定されているアトリビュートや、既に接続されているアトリビュートは計画に含めない
+
+    Args:
+        node (str): 書き込み先のノード
+        data (dict): {アトリビュート名: 値}
+
+    Returns:
+        AttrPlan: 操作の計画
+    """
+    planner = _Planner(node)
+    for key, value in data.items():
+        if isinstance(value, list):
+            if value:
+                planner.multi(key, value)
+
+        else:
+            planner.singular(key, value)
+
+    return planner.plan
+
+
+def execute(attr_plan: AttrPlan) -> None:
+    """
+    計画を1つのMELスクリプトにまとめ、1回のアンドゥで戻せるように実行する
+
+    Args:
+        attr_plan (AttrPlan): 操作の計画
+    """
+    if not attr_plan:
+        return
+
+    cmds.undoInfo(ock=True)
+    try:
+        mel.eval(attr_plan.to_mel())
+
+    finally:
+        cmds.undoInfo(cck=True)
+
+
+def write(node: str, data: dict) -> AttrPlan:
+    """
+    辞書の内容をノードのアトリビュートに書き込み、ロックする
+
+    Args:
+        node (str): 書き込み先のノード
+        data (dict): {アトリビュート名: 値}
+
+    Returns:
+        AttrPlan: 実行した操作の計画
+    """
+    attr_plan = plan(node, data)
+    execute(attr_plan)
+
+    return attr_plan
@@ -0,0 +1,219 @@
+"""
+export_meta_nodeで書き出したJSONから、ガイド、スケルトン、コントローラー、リグを作成してシーンに保存する
+
+    mayapy -m ysrig.batch_build chara_a.json chara_b.json -o D:/rigs -j 4
+
+キャラクターごとにシーンを新規作成し、ワーカープロセスに振り分けて並列に作成する
+シーンの初期化、新規作成、保存はバックエンドを通して行う 既定はmaya.standalone
+--backend "パッケージ.モジュール:クラス名" で差し替えられる
+
+ワーカープロセスではバックエンドの初期化前にmayaを読み込めないため、
+このモジュールの先頭ではmayaとmayaに依存するysrigのモジュールをimportしない
+"""
+import os
+import sys
+import time
+import argparse
+import importlib
+from multiprocessing import Pool
+from traceback import format_exc
+from dataclasses import dataclass
+from ysrig import build_state
+
+DEFAULT_BACKEND = "ysrig.batch_build:StandaloneBackend"
+SCENE_FORMATS = {"ma": "mayaAscii", "mb": "mayaBinary"}
+
+# ワーカープロセスごとのバックエンド
+_backend = None
+
+
+class StandaloneBackend:
+    """
+    maya.standaloneでシーンを操作するバックエンド
+
+    バックエンドは initialize, new_scene, save_scene, uninitialize を持つクラス
+    """
+    def initialize(self) -> None:
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+
+    def new_scene(self) -> None:
+        from maya import cmds
+        cmds.file(new=True, force=True)
+
+    def save_scene(self, path: str) -> None:
+        from maya import cmds
+        cmds.file(rename=path)
+        cmds.file(save=True, force=True, type=SCENE_FORMATS[path.rsplit(".", 1)[-1]])
+
+    def uninitialize(self) -> None:
+        import maya.standalone
+        maya.standalone.uninitialize()
+
+
+@dataclass
+class CharacterResult:
+    """
+    キャラクターごとの作成結果
+    """
+    json_path: str
+    scene_path: str = ""
+    success: bool = False
+    seconds: float = 0.0
+    summary: str = ""      # build_pipeline.BuildResult.summary
+    error: str = ""
+
+
+def load_backend(spec: str):
+    """
+    "パッケージ.モジュール:クラス名" からバックエンドのインスタンスを作成する
+    """
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"バックエンドは \"モジュール:クラス名\" の形式で指定してください: {spec}")
+
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)()
+
+
+def _init_worker(backend_spec: str) -> None:
+    global _backend
+    _backend = load_backend(backend_spec)
+    _backend.initialize()
+
+
+def get_scene_path(json_path: str, output_dir: str=None, scene_format: str="ma") -> str:
+    """
+    JSONと同じ名前のシーンのパスを返す output_dirがNoneの場合はJSONと同じフォルダ
+    """
+    name = os.path.splitext(os.path.basename(json_path))[0]
+    return os.path.join(output_dir or os.path.dirname(os.path.abspath(json_path)), f"{name}.{scene_format}")
+
+
+def build_character(json_path: str, scene_path: str, connect_mode: str=None) -> CharacterResult:
+    """
+    シーンを新規作成し、JSONから全てのフェーズを作成して保存する
+    バックエンドが初期化されたプロセスで呼び出す
+
+    Args:
+        json_path (str): export_meta_nodeで書き出したJSON
+        scene_path (str): 保存先のシーン
+        connect_mode (str): build_state.CONNECT_MODES のいずれか
+
+    Returns:
+        CharacterResult: 作成結果
+    """
+    from ysrig import import_meta_node, build_pipeline
+
+    result = CharacterResult(json_path)
+    start = time.perf_counter()
+    try:
+        _backend.new_scene()
+        if not import_meta_node.build_from_data(import_meta_node.load(json_path), os.path.basename(json_path)):
+            result.error = "YSRigのメタデータではありません"
+            return result
+
+        build = build_pipeline.build_all(connect_mode=connect_mode, progress=False, fast=True)
+        result.summary = build.summary()
+        if not build.success:
+            result.error = build.error
+            return result
+
+        _backend.save_scene(scene_path)
+        result.scene_path = scene_path
+        result.success = True
+
+    except:
+        result.error = format_exc()
+
+    finally:
+        result.seconds = time.perf_counter() - start
+
+    return result
+
+
+def _build_character(args: tuple) -> CharacterResult:
+    return build_character(*args)
+
+
+def build_many(json_paths: list[str], output_dir: str=None, jobs: int=None, backend: str=DEFAULT_BACKEND,
+               connect_mode: str=None, scene_format: str="ma", callback=None) -> list[CharacterResult]:
+    """
+    複数のJSONからシーンを作成する
+
+    Args:
+        json_paths (list): export_meta_nodeで書き出したJSON
+        output_dir (str): シーンの保存先 Noneの場合はJSONと同じフォルダ
+        jobs (int): ワーカープロセスの数 1の場合は現在のプロセスで作成する Noneの場合はCPU数
+        backend (str): バックエンドのクラス "パッケージ.モジュール:クラス名"
+        connect_mode (str): build_state.CONNECT_MODES のいずれか
+        scene_format (str): "ma" もしくは "mb"
+        callback (function): キャラクターごとに作成結果を受け取る関数
+
+    Returns:
+        list: json_pathsの順のCharacterResult
+    """
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    tasks = [(os.path.abspath(p), get_scene_path(p, output_dir, scene_format), connect_mode) for p in json_paths]
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+    results = []
+
+    if jobs <= 1:
+        _init_worker(backend)
+        try:
+            for task in tasks:
+                results.append(_build_character(task))
+                if callback:
+                    callback(results[-1])
+
+        finally:
+            _backend.uninitialize()
+
+        return results
+
+    with Pool(jobs, initializer=_init_worker, initargs=(backend,)) as pool:
+        for result in pool.imap(_build_character, tasks):
+            results.append(result)
+            if callback:
+                callback(result)
+
+    return results
+
+
+def print_result(result: CharacterResult) -> None:
+    status = "OK" if result.success else "FAILED"
+    print(f"[{status}] {result.json_path} ({result.seconds:.2f} sec)")
+    if result.success:
+        print(f"    -> {result.scene_path}")
+
+    else:
+        print(result.summary)
+        print(result.error)
+
+
+def parse_args(argv: list[str]=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="ysrig.batch_build", description="JSONからリグを作成してシーンに保存する")
+    parser.add_argument("json_paths", nargs="+", metavar="JSON", help="export_meta_nodeで書き出したJSON")
+    parser.add_argument("-o", "--output-dir", help="シーンの保存先 省略した場合はJSONと同じフォルダ")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="ワーカープロセスの数 省略した場合はCPU数")
+    parser.add_argument("-f", "--format", dest="scene_format", choices=list(SCENE_FORMATS), default="ma", help="シーンの形式")
+    parser.add_argument("--connect-mode", choices=build_state.CONNECT_MODES, default=None, help="connect_matrixの接続モード")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, help="バックエンドのクラス \"パッケージ.モジュール:クラス名\"")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]=None) -> int:
+    args = parse_args(argv)
+    start = time.perf_counter()
+    results = build_many(args.json_paths, args.output_dir, args.jobs, args.backend, args.connect_mode, args.scene_format, callback=print_result)
+
+    failed = [r for r in results if not r.success]
+    print(f"{len(results) - len(failed)} / {len(results)} built in {time.perf_counter() - start:.2f} sec")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
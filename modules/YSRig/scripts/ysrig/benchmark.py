@@ -0,0 +1,330 @@
+"""
+代替シーンでbipedテンプレートと各モジュールをビルドし、フェーズごとの時間、コマンド数、ノード数を計測する
+
+    python -m ysrig.benchmark
+    python -m ysrig.benchmark biped chain_basic -r 3 -o result.json
+
+    from ysrig import benchmark
+    results = benchmark.run(["biped"])
+    print(benchmark.format_report(results))
+
+Mayaを使わずに実行するため、mayaとmayaに依存するysrigのモジュールは
+standin.install() の後、関数の中でimportする
+代替シーンの計測値はMayaでの実行時間ではなく、コマンド数とノード数の変化を追うためのもの
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from dataclasses import dataclass, field, asdict
+from ysrig import standin
+
+PHASES = ["Guide", "Skeleton", "Ctrl", "Rig"]
+
+
+### ガイドの作成 ###
+
+def _root():
+    from ysrig.modules import root
+    root.guide.main()
+
+
+def _biped():
+    from ysrig import connect_mode_report
+    from ysrig.modules.biped import guide
+
+    with open(connect_mode_report.BIPED_SETTINGS_PATH, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+
+    guide.Guide(
+        settings["SpineJointCount"],
+        settings["NeckJointCount"],
+        settings["ArmTwistJointCount"],
+        settings["LegTwistJointCount"],
+        settings["UseFinger"],
+        [f"L_{d[0]}" for d in settings["FingerNames"]],
+        [d[1] for d in settings["FingerNames"]],
+        settings["UseToeSub"],
+        settings["UseJaw"],
+        settings["UseEyes"],
+        settings["UseEyelid"],
+        settings["ConnectType"]
+    )
+
+
+def _spine_basic():
+    from ysrig.modules import spine_basic
+    _root()
+    guide = spine_basic.guide.Guide("Spine", 3, "Root", "", ["Hip"])
+    guide.apply_settings(root_matrix=[0, 100, 0, 0, 0, 0, 1], guide_positions=[[5, 0, 0], [30, 0, 0]])
+
+
+def _neck_and_head_basic():
+    from ysrig.modules import neck_and_head_basic
+    _root()
+    guide = neck_and_head_basic.guide.Guide("Neck", 3, "Root", "", ["Head"])
+    guide.apply_settings(root_matrix=[0, 150, 0, 0, 0, 0, 1], guide_positions=[[10, 0, 0], [15, 0, 0], [30, 0, 0]])
+
+
+def _shoulder_and_arm_ikfk():
+    from ysrig.modules import shoulder_and_arm_ikfk
+    _root()
+    guide = shoulder_and_arm_ikfk.guide.Guide("L_Arm", -1, "Root", "L_", ["L_Shoulder", "L_UpperArm", "L_ForeArm", "L_Hand"],
+                                              ":".join(shoulder_and_arm_ikfk.gui.IK_CTRL_SHAPE_TYPE), ":".join(shoulder_and_arm_ikfk.gui.PV_CTRL_SHAPE_TYPE))
+    guide.apply_settings(root_matrix=[5, 145, 0, 0, 0, 0, 1], guide_positions=[[10, 0, 0], [50, 0, 0], [75, 0, 0]])
+
+
+def _leg_and_foot_ikfk():
+    from ysrig.modules import leg_and_foot_ikfk
+    _root()
+    guide = leg_and_foot_ikfk.guide.Guide("L_Leg", -1, "Root", "L_", ["L_UpperLeg", "L_ForeLeg", "L_Foot", "L_Toe", "L_ToeSub"], True,
+                                          ":".join(leg_and_foot_ikfk.gui.PV_CTRL_SHAPE_TYPE))
+    guide.apply_settings(root_matrix=[15, 100, 0, 0, 0, 0, 1], guide_positions=[[90, 0, 0], [5, 0, 20]], pv_ctrl_shape_type=3)
+
+
+def _finger_fk():
+    from ysrig.modules import finger_fk
+    _root()
+    names = ["Thumb", "Index", "Middle", "Ring", "Pinky"]
+    guide = finger_fk.guide.Guide("L_Finger", -1, "Root", "L_", [f"L_{name}" for name in names], [False, True, True, True, True],
+                                  ":".join(finger_fk.gui.CTRL_SHAPE_TYPE))
+    guide.apply_settings(root_matrix=[55, 155, 0, 0, 0, 0, 1], guide_positions=[[10, -10, 0], [10, 0, 0]])
+
+
+def _chain(module_name: str):
+    """
+    chain_basic, chain_spline_ik, ribbon のようにジョイント数を指定するチェーン
+    """
+    from importlib import import_module
+    module = import_module(f"ysrig.modules.{module_name}")
+    _root()
+    guide = module.guide.Guide("L_Chain", 5, "Root", "L_", ":".join(module.gui.CTRL_SHAPE_TYPE))
+    guide.apply_settings(root_matrix=[10, 100, 0, 0, 0, 0, 1], guide_positions=[[50, 0, 0]])
+
+
+def _eye_basic():
+    from ysrig import core
+    from ysrig.modules import eye_basic
+    _root()
+    guide = eye_basic.guide.Guide("Eyes", 2, core.FACIALS_ROOT_NAME, "", ["L_Eye", "L_Eye_GB"])
+    guide.apply_settings(root_matrix=[5, 170, 10, 0, 0, 0, 1], guide_positions=[[0, 0, 1], [0, 0, 40]])
+
+
+def _eye_and_simple_eyelid():
+    from ysrig import core
+    from ysrig.modules import eye_and_simple_eyelid
+    _root()
+    guide = eye_and_simple_eyelid.guide.Guide("Eyes", 4, core.FACIALS_ROOT_NAME, "", ["L_Eye", "L_Pupil", "L_Eyelid_Top", "L_Eyelid_Bottom"])
+    guide.apply_settings(root_matrix=[5, 170, 10, 0, 0, 0, 1], guide_positions=[[0, 0, 1], [0, 0, 40]])
+
+
+def _jaw_basic():
+    from ysrig import core
+    from ysrig.modules import jaw_basic
+    _root()
+    guide = jaw_basic.guide.Guide("Jaw", 2, core.FACIALS_ROOT_NAME, "")
+    guide.apply_settings(root_matrix=[0, 165, 5, 0, 0, 0, 1], guide_positions=[[0, 165, 10]])
+
+
+# {ケース名: ガイドを作成する関数} bipedテンプレートとモジュール単体
+CASES = {
+    "biped": _biped,
+    "root": _root,
+    "spine_basic": _spine_basic,
+    "neck_and_head_basic": _neck_and_head_basic,
+    "shoulder_and_arm_ikfk": _shoulder_and_arm_ikfk,
+    "leg_and_foot_ikfk": _leg_and_foot_ikfk,
+    "finger_fk": _finger_fk,
+    "chain_basic": lambda: _chain("chain_basic"),
+    "chain_spline_ik": lambda: _chain("chain_spline_ik"),
+    "ribbon": lambda: _chain("ribbon"),
+    "eye_basic": _eye_basic,
+    "eye_and_simple_eyelid": _eye_and_simple_eyelid,
+    "jaw_basic": _jaw_basic,
+}
+
+
+### 計測 ###
+
+@dataclass
+class PhaseResult:
+    """
+    フェーズごとの計測結果
+    """
+    phase: str
+    seconds: float = 0.0
+    commands: int = 0
+    nodes: int = 0              # フェーズ中に作成されたノード数
+    scene_nodes: int = 0        # フェーズ終了時のシーンのノード数
+    command_counts: dict = field(default_factory=dict)
+    error: str = ""
+
+
+@dataclass
+class CaseResult:
+    """
+    ケースごとの計測結果 繰り返した場合は時間が最短の回
+    """
+    name: str
+    phases: list = field(default_factory=list)
+
+    @property
+    def seconds(self) -> float:
+        return sum(p.seconds for p in self.phases)
+
+    @property
+    def ok(self) -> bool:
+        return not any(p.error for p in self.phases)
+
+
+class NodeCounter:
+    """
+    作成されたノードを数えるコールバック
+    """
+    def __init__(self):
+        import maya.api.OpenMaya as om2
+        self.count = 0
+        self.callback_id = om2.MDGMessage.addNodeAddedCallback(self.node_added, "dependNode")
+
+    def node_added(self, *args):
+        self.count += 1
+
+    def remove(self):
+        import maya.api.OpenMaya as om2
+        om2.MMessage.removeCallback(self.callback_id)
+
+
+def _phase_functions(name: str, fast: bool=False) -> list:
+    from ysrig import skeleton_base, ctrl_base, rig_base
+    return [CASES[name], lambda: skeleton_base.main(fast=fast), lambda: ctrl_base.main(fast=fast), lambda: rig_base.main(fast=fast)]
+
+
+def measure_case(name: str, fast: bool=False) -> CaseResult:
+    """
+    シーンを新規作成し、ケースをGuide→Skeleton→Ctrl→Rigの順にビルドして計測する
+    途中のフェーズでエラーが出た場合は、以降のフェーズを計測しない
+
+    Args:
+        name (str): CASESのキー
+        fast (bool): スケルトン、コントローラー、リグをfastモードでビルドするか
+
+    Returns:
+        CaseResult: 計測結果
+    """
+    from maya import cmds as maya_cmds
+    from ysrig import cmds_proxy
+
+    scene = standin.current_scene()
+    maya_cmds.file(new=True, force=True)
+
+    result = CaseResult(name)
+    for phase, func in zip(PHASES, _phase_functions(name, fast)):
+        counter = NodeCounter()
+        error = ""
+        try:
+            with cmds_proxy.record() as rec:
+                start = time.perf_counter()
+                func()
+                seconds = time.perf_counter() - start
+
+        except Exception as e:
+            seconds = time.perf_counter() - start
+            error = f"{type(e).__name__}: {e}"
+
+        finally:
+            counter.remove()
+
+        # 各フェーズのmainは例外を握りつぶしてエラーを表示する
+        if not error and scene.errors:
+            error = scene.errors[-1]
+
+        counts = {r["command"]: r["count"] for r in rec.report()}
+        result.phases.append(PhaseResult(
+            phase,
+            seconds=seconds,
+            commands=sum(counts.values()),
+            nodes=counter.count,
+            scene_nodes=len(scene.nodes),
+            command_counts=dict(sorted(counts.items(), key=lambda item: item[1], reverse=True)),
+            error=error
+        ))
+
+        if error:
+            break
+
+    return result
+
+
+def run(names: list[str]=None, repeat: int=1, fast: bool=False) -> list[CaseResult]:
+    """
+    ケースを計測する
+
+    Args:
+        names (list): 計測するケース名 Noneの場合は全て
+        repeat (int): 繰り返す回数 合計時間が最短の回の結果を使う
+        fast (bool): fast_buildのfastモードでビルドするか
+
+    Returns:
+        list: CaseResultのリスト
+    """
+    standin.install()
+
+    results = []
+    for name in names or list(CASES):
+        if name not in CASES:
+            raise ValueError(f"ケースが存在しません: {name}")
+
+        runs = [measure_case(name, fast) for _ in range(max(repeat, 1))]
+        results.append(min(runs, key=lambda r: r.seconds))
+
+    return results
+
+
+def format_report(results: list[CaseResult]) -> str:
+    """
+    runの結果を表形式の文字列にする
+    """
+    rows = [["case", "phase", "ms", "commands", "nodes", "scene nodes"]]
+    for result in results:
+        for p in result.phases:
+            rows.append([result.name, p.phase, f"{p.seconds * 1000:.1f}", str(p.commands), str(p.nodes), str(p.scene_nodes)])
+
+        rows.append([result.name, "Total", f"{result.seconds * 1000:.1f}",
+                     str(sum(p.commands for p in result.phases)), str(sum(p.nodes for p in result.phases)), ""])
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = ["  ".join(cell.ljust(w) if i < 2 else cell.rjust(w) for i, (cell, w) in enumerate(zip(row, widths))) for row in rows]
+
+    for result in results:
+        for p in result.phases:
+            if p.error:
+                lines.append(f"{result.name} {p.phase}: {p.error}")
+
+    return "\n".join(lines)
+
+
+def write_json(results: list[CaseResult], path: str) -> None:
+    data = [{"name": r.name, "seconds": r.seconds, "ok": r.ok, "phases": [asdict(p) for p in r.phases]} for r in results]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+
+def main(argv: list[str]=None) -> int:
+    parser = argparse.ArgumentParser(prog="ysrig.benchmark", description="代替シーンでビルドを計測する")
+    parser.add_argument("cases", nargs="*", help=f"計測するケース 省略時は全て ({', '.join(CASES)})")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="繰り返す回数 最短の回を使う")
+    parser.add_argument("-o", "--output", help="結果を書き出すJSONのパス")
+    parser.add_argument("--fast", action="store_true", help="アンドゥの記録を止めるfastモードでビルドする")
+    args = parser.parse_args(argv)
+
+    results = run(args.cases, args.repeat, args.fast)
+    print(format_report(results))
+    if args.output:
+        write_json(results, os.path.abspath(args.output))
+
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+モジュールのリグのビルドに使われる入力をハッシュ値にまとめる
+
+ハッシュ値の入力
+    メタノードの全ユーザーアトリビュート
+    モジュールの最初のジョイントの親のワールド行列
+    YSRigのバージョンとモジュールのrig.pyの内容
+    connect_matrixの接続モードと、動かないノードの行列をまとめるか(有効な場合のみ)
+
+リグのビルド後にController_{グループ名}_Groupに書き込み、次のビルドで比較する
+"""
+import os
+import hashlib
+from ysrig.cmds_proxy import cmds
+from ysrig import meta_snapshot, build_state, node_ledger, name_registry
+
+HASH_ATTR = "YSBuildHash"
+
+# ハッシュ値に含めないメタノードのアトリビュート
+IGNORED_ATTRS = set(node_ledger.LEDGER_ATTRS.values())
+
+MODULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules")
+
+# 浮動小数点の誤差でハッシュ値が変わらないように丸める桁数
+PRECISION = 6
+
+# {ファイルパス: (更新日時, ハッシュ値)}
+_source_cache = {}
+
+
+def _normalize(value):
+    if isinstance(value, float):
+        value = round(value, PRECISION)
+        return 0.0 if value == 0 else value
+
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+
+    return value
+
+
+def get_source_hash(module: str, file_name: str="rig.py") -> str:
+    """
+    モジュールのrig.pyなどの内容のハッシュ値を返す ファイルが更新されるまでは再計算しない
+    """
+    path = os.path.join(MODULES_PATH, module, file_name)
+    if not os.path.exists(path):
+        return ""
+
+    mtime = os.path.getmtime(path)
+    cached = _source_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+
+    _source_cache[path] = (mtime, digest)
+    return digest
+
+
+def get_parent_matrix(meta: meta_snapshot.MetaSnapshot) -> list:
+    """
+    モジュールの最初のジョイントの親のワールド行列を返す 親が無い場合は空のリスト
+    """
+    joint_names = meta.get_list("JointName", [])
+    if not joint_names or not name_registry.exists(f"JT_{joint_names[0]}"):
+        return []
+
+    parent = name_registry.get_parent(f"JT_{joint_names[0]}")
+    if not parent:
+        return []
+
+    return cmds.getAttr(f"{parent}.worldMatrix[0]")
+
+
+def compute(meta_node: str, version: str="", file_name: str="rig.py") -> str:
+    """
+    モジュールのビルドの入力のハッシュ値を返す
+
+    Args:
+        meta_node (str): メタノード名
+        version (str): YSRigのバージョン
+        file_name (str): ハッシュ値に含めるモジュールのファイル コントローラーはctrl.py
+
+    Returns:
+        str: ハッシュ値
+    """
+    meta = meta_snapshot.get(meta_node)
+    h = hashlib.sha1()
+
+    for key in sorted(meta.keys()):
+        # ビルドで作成したノードの記録は入力ではない
+        if key in IGNORED_ATTRS:
+            continue
+
+        h.update(repr((key, _normalize(meta[key]))).encode("utf-8"))
+
+    h.update(repr(_normalize(get_parent_matrix(meta))).encode("utf-8"))
+    h.update(version.encode("utf-8"))
+    h.update(get_source_hash(meta.get("Module", ""), file_name).encode("utf-8"))
+    h.update(build_state.get_connect_mode().encode("utf-8"))
+    if build_state.get_bake_static():
+        h.update(b"bake_static")
+
+    return h.hexdigest()
+
+
+def read(node: str) -> str:
+    """
+    ノードに書き込まれたハッシュ値を返す 無い場合はNone
+    """
+    if not cmds.objExists(node) or not cmds.attributeQuery(HASH_ATTR, node=node, exists=True):
+        return None
+
+    return cmds.getAttr(f"{node}.{HASH_ATTR}")
+
+
+def write(node: str, value: str) -> None:
+    """
+    ノードにハッシュ値を書き込み、ロックする
+    """
+    if not cmds.attributeQuery(HASH_ATTR, node=node, exists=True):
+        cmds.addAttr(node, ln=HASH_ATTR, dt="string")
+
+    cmds.setAttr(f"{node}.{HASH_ATTR}", l=False)
+    cmds.setAttr(f"{node}.{HASH_ATTR}", value, type="string", l=True)
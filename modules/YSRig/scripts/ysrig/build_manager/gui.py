@@ -4,8 +4,8 @@ import importlib
 import winsound
 from maya import cmds
 from maya.api.OpenMaya import MGlobal
-from ysrig import gui_base, core
-from ysrig import skeleton_base, ctrl_base, rig_base
+from ysrig import gui_base, core, meta_snapshot, build_state
+from ysrig import skeleton_base, ctrl_base, rig_base, build_pipeline
 importlib.reload(gui_base)
 importlib.reload(core)
 
@@ -143,7 +143,7 @@ class Gui(QtWidgets.QWidget):
         if not cmds.objExists(self.meta_node):
             return
 
-        parent = cmds.getAttr(f"{self.meta_node}.ParentName")
+        parent = meta_snapshot.get(self.meta_node).get("ParentName")
         if parent == "Facial":
             return
 
@@ -200,7 +200,7 @@ class Gui(QtWidgets.QWidget):
     def build_manager(self):
         self.build_widget["Skeleton"] = BuildManager("Skeleton", core.SKELETON_GROUP_NAME, build_skeleton, remove_skeleton)
         self.build_widget["Controller"] = BuildManager("Controller", core.CTRL_EDIT_GROUP_NAME, build_controller, remove_controller)
-        self.build_widget["Rig"] = BuildManager("Rig", core.RIG_GROUP_NAME,build_rig, remove_rig)
+        self.build_widget["Rig"] = RigBuildManager("Rig", core.RIG_GROUP_NAME, remove_rig)
 
     def add_widget(self):
         for w in self.widget:
@@ -479,6 +479,37 @@ class BuildManager(QtWidgets.QWidget):
             self.widgets["Visivility"].setText("Show")
 
 
+class RigBuildManager(BuildManager):
+    def __init__(self, label, node, remove_action):
+        super().__init__(label, node, self.build, remove_action)
+
+    def gui(self):
+        super().gui()
+        self.widgets["OffsetParentMatrix"] = gui_base.YSCheckBox("Use OffsetParentMatrix")
+
+        self.widgets["Update"] = gui_base.YSPushButton("Update")
+        self.widgets["Update"].setStyleSheet(get_style(gui_base.BUTTON_COLOR_1, gui_base.STR_COLOR_1))
+        self.widgets["Update"].clicked.connect(self.update_rig)
+        self.widgets["Update"].clicked.connect(self.set_button_color)
+
+    def add_widget(self):
+        super().add_widget()
+        self.layout.addWidget(self.widgets["OffsetParentMatrix"], 1, 0, 1, 3)
+        self.layout.addWidget(self.widgets["Update"], 1, 3, 1, 1)
+
+    def get_connect_mode(self):
+        if self.widgets["OffsetParentMatrix"].get():
+            return build_state.CONNECT_MODE_OFFSET_PARENT
+
+        return build_state.CONNECT_MODE_DECOMPOSE
+
+    def build(self):
+        build_rig(self.get_connect_mode())
+
+    def update_rig(self):
+        update_rig(self.get_connect_mode())
+
+
 class Guide_Frame(BuildManager):
     def gui(self):
         self.widgets["Label"] = gui_base.YSFrame(self.label)
@@ -516,7 +547,23 @@ def build_controller():
     ctrl_base.main()
 
 
-def build_rig():
+def build_rig(connect_mode=None):
+    if not cmds.objExists(core.GUIDE_GROUP_NAME):
+        MGlobal.displayError("ガイドが見つかりませんでした")
+        return
+
+    if not cmds.objExists(core.SKELETON_GROUP_NAME):
+        MGlobal.displayError("スケルトンが見つかりませんでした")
+        return
+
+    if not cmds.objExists(core.CTRL_EDIT_GROUP_NAME):
+        MGlobal.displayError("コントローラーが見つかりませんでした")
+        return
+
+    rig_base.main(connect_mode)
+
+
+def update_rig(connect_mode=None):
     if not cmds.objExists(core.GUIDE_GROUP_NAME):
         MGlobal.displayError("ガイドが見つかりませんでした")
         return
@@ -529,7 +576,9 @@ def build_rig():
         MGlobal.displayError("コントローラーが見つかりませんでした")
         return
 
-    rig_base.main()
+    result = build_pipeline.rebuild_rig(connect_mode)
+    if result.success:
+        MGlobal.displayInfo(f"リグを更新しました ({result.seconds:.3f} sec)")
 
 
 def remove_skeleton():
@@ -539,7 +588,7 @@ def remove_skeleton():
     winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
     dialog = gui_base.YSConfirmDialog(None, "remove skeleton", "スケルトンを削除しますか？")
     if dialog.get_result():
-        cmds.delete(core.SKELETON_GROUP_NAME)
+        skeleton_base.remove_all()
 
 
 def remove_controller():
@@ -549,7 +598,7 @@ def remove_controller():
     winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
     dialog = gui_base.YSConfirmDialog(None, "remove controller", "コントローラーを削除しますか？")
     if dialog.get_result():
-        cmds.delete(core.CTRL_EDIT_GROUP_NAME)
+        ctrl_base.remove_all()
 
 
 def remove_rig():
@@ -559,9 +608,7 @@ def remove_rig():
     winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
     dialog = gui_base.YSConfirmDialog(None, "remove rig", "リグを削除しますか？")
     if dialog.get_result():
-        proxies = cmds.ls(core.RIG_GROUP_NAME, type="joint", dag=True)
-        proxies = [proxy for proxy in proxies if "Proxy_" in proxy]
-        cmds.delete(proxies + [core.RIG_GROUP_NAME])
+        rig_base.remove_all()
 
 
 def remove_guide():
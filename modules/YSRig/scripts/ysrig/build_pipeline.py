@@ -0,0 +1,467 @@
+"""
+スケルトン、コントローラー、リグのビルドを1回の呼び出しでまとめて行う
+
+    from ysrig import build_pipeline
+    result = build_pipeline.build_all()
+    print(result.summary())
+
+メタノードのParentNameとミラーの関係からモジュールの依存関係を求め、親から順にビルドする
+3つのフェーズは1つのアンドゥチャンク、1つのプログレスウィンドウの中で実行し、
+fast=Trueの場合はアンドゥの記録を止め、失敗した場合は作成したノードを削除する
+cache=Trueの場合はコントローラーとリグのモジュールごとの操作をplan_cacheに保存し、入力が同じ次のビルドで再生する
+メタノードの読み込みや行列ノードのキャッシュはフェーズ間で共有する
+"""
+import time
+from traceback import format_exc
+from dataclasses import dataclass, field
+from maya.api.OpenMaya import MGlobal
+from ysrig.cmds_proxy import cmds
+from ysrig import core, meta_snapshot, build_hash, fast_build, plan_cache, skeleton_base, ctrl_base, rig_base
+
+### フェーズ ###
+PHASE_SKELETON = "skeleton"
+PHASE_CONTROLLER = "controller"
+PHASE_RIG = "rig"
+PHASES = (PHASE_SKELETON, PHASE_CONTROLLER, PHASE_RIG)
+
+### モジュールの状態 ###
+STATUS_PENDING = "pending"      # 未実行
+STATUS_BUILT = "built"          # 作成した
+STATUS_CACHED = "cached"        # plan_cacheのキャッシュを再生して作成した
+STATUS_SKIPPED = "skipped"      # 既に作成済みのため作成しなかった
+STATUS_FAILED = "failed"        # エラーが発生した
+STATUS_REVERTED = "reverted"    # 作成したが、他のモジュールのエラーでアンドゥした
+
+
+@dataclass
+class ModuleNode:
+    """
+    依存関係のグラフのノード
+    """
+    meta_node: str
+    group_name: str
+    module: str
+    facial: bool
+    joints: list[str]                   # 作成するジョイント名 ミラーで作成されるジョイントを含む
+    parent: str                         # 親のジョイント名
+    dependencies: list[str] = field(default_factory=list)  # 依存するモジュールのメタノード
+
+
+@dataclass
+class ModuleResult:
+    """
+    モジュールごとのビルド結果
+    """
+    meta_node: str
+    group_name: str
+    module: str
+    status: dict = field(default_factory=dict)     # {フェーズ: 状態}
+    seconds: dict = field(default_factory=dict)    # {フェーズ: 秒数}
+    error: str = ""
+
+
+@dataclass
+class BuildResult:
+    """
+    ビルド全体の結果
+    """
+    success: bool
+    phases: list[str]
+    order: list[str]                                   # ビルドしたメタノードの順番
+    modules: list[ModuleResult]
+    seconds: float = 0.0
+    phase_seconds: dict = field(default_factory=dict)  # {フェーズ: 秒数}
+    error: str = ""
+
+    def module(self, group_name: str) -> ModuleResult:
+        """
+        グループ名からモジュールの結果を返す 存在しない場合はNone
+        """
+        for m in self.modules:
+            if m.group_name == group_name:
+                return m
+
+        return None
+
+    def failed(self) -> list[ModuleResult]:
+        return [m for m in self.modules if STATUS_FAILED in m.status.values()]
+
+    def summary(self) -> str:
+        """
+        結果を表形式の文字列にする
+        """
+        rows = [["Module", *self.phases, "sec"]]
+        for m in self.modules:
+            rows.append([m.group_name, *[m.status.get(p, STATUS_PENDING) for p in self.phases], f"{sum(m.seconds.values()):.3f}"])
+
+        rows.append(["Total", *[f"{self.phase_seconds.get(p, 0.0):.3f}" for p in self.phases], f"{self.seconds:.3f}"])
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+
+        return "\n".join("  ".join(cell.ljust(w) for cell, w in zip(row, widths)) for row in rows)
+
+
+### 依存関係 ###
+
+def create_graph(meta_nodes: list[str], facial_meta_nodes: list[str]) -> list[ModuleNode]:
+    """
+    メタノードから依存関係のグラフを作成する
+    ParentNameのジョイントを作成するモジュールに依存する ミラーで作成されるジョイントはミラー元のモジュールが作成する
+
+    Args:
+        meta_nodes (list): bodyモジュールのメタノード 0番目はrootモジュール
+        facial_meta_nodes (list): facialモジュールのメタノード
+
+    Returns:
+        list: ModuleNodeのリスト meta_nodes, facial_meta_nodesの順
+    """
+    nodes = []
+    owners = {}
+    for meta_node in meta_nodes + facial_meta_nodes:
+        meta = meta_snapshot.get(meta_node)
+        group_name = meta.get("GroupName")
+        joint_names = meta.get_list("JointName", [])
+
+        joints = list(joint_names)
+        if meta.get("Mirror"):
+            joints += rig_base.get_mirror_names(meta.get("Side"), group_name, joint_names)[3]
+
+        parent = meta.get("ParentName")
+        if not parent and group_name != "Root":
+            parent = "Root"
+
+        node = ModuleNode(meta_node, group_name, meta.get("Module"), meta_node in facial_meta_nodes, joints, parent)
+        nodes.append(node)
+        for jt in joints:
+            owners.setdefault(jt, meta_node)
+
+    # facialのルートジョイントは、FacialRootNameのジョイントを作成するモジュールの子になる
+    if meta_nodes:
+        facial_root_parent = meta_snapshot.get(meta_nodes[0]).get("FacialRootName")
+        if facial_root_parent in owners:
+            owners.setdefault(core.FACIALS_ROOT_NAME, owners[facial_root_parent])
+
+    for node in nodes:
+        owner = owners.get(node.parent)
+        if owner and owner != node.meta_node:
+            node.dependencies.append(owner)
+
+    return nodes
+
+
+def sort_graph(nodes: list[ModuleNode]) -> list[ModuleNode]:
+    """
+    依存するモジュールが先になるように並べ替える
+    依存関係の無いモジュール同士は元の順番を保つ 循環している場合は元の順番で末尾に追加する
+
+    Args:
+        nodes (list): ModuleNodeのリスト
+
+    Returns:
+        list: 並べ替えたModuleNodeのリスト
+    """
+    remaining = list(nodes)
+    pending = {n.meta_node for n in nodes}
+    result = []
+    while remaining:
+        for node in remaining:
+            if not any(d in pending for d in node.dependencies):
+                break
+
+        else:
+            MGlobal.displayWarning(f"モジュールの親子関係が循環しています: {', '.join(n.group_name for n in remaining)}")
+            result += remaining
+            break
+
+        remaining.remove(node)
+        pending.discard(node.meta_node)
+        result.append(node)
+
+    return result
+
+
+### ビルド ###
+
+class BuildPipeline:
+    """
+    スケルトン、コントローラー、リグを依存関係の順にビルドするクラス
+
+    Args:
+        phases (list): 実行するフェーズ PHASESの部分集合
+        connect_mode (str): リグのconnect_matrixの接続モード
+        progress (bool): プログレスウィンドウを表示するか
+        fast (bool): アンドゥの記録とビューポートの更新を止めてビルドするか
+        cache (bool): plan_cacheでコントローラーとリグの操作を保存、再生するか
+    """
+    def __init__(self, phases: list[str]=PHASES, connect_mode: str=None, progress: bool=True, fast: bool=False, cache: bool=False):
+        self.phases = [p for p in PHASES if p in phases]
+        self.connect_mode = connect_mode
+        self.progress = progress
+        self.fast = fast
+        self.cache = cache
+        self.transaction = None
+
+        self.nodes = []
+        self.targets = None        # ビルドするメタノードの集合 Noneの場合は全てのモジュール
+        self.results = {}
+        self.phase = None
+        self.current = None
+        self.phase_seconds = {}
+
+    def collect(self) -> None:
+        """
+        メタノードを読み込み、ビルドする順番を決める
+        """
+        meta_nodes = core.get_meta_nodes()
+        facial_meta_nodes = core.get_facial_meta_nodes()
+        nodes = create_graph(meta_nodes, facial_meta_nodes)
+
+        # facialモジュールはfacialのルートジョイントを作成した後にビルドするため、bodyモジュールとは別に並べる
+        self.nodes = sort_graph([n for n in nodes if not n.facial]) + sort_graph([n for n in nodes if n.facial])
+        self.results = {n.meta_node: ModuleResult(n.meta_node, n.group_name, n.module) for n in self.nodes}
+
+    def _creator(self, phase: str, create_module):
+        def create(meta_node):
+            self.current = meta_node
+            result = self.results[meta_node]
+
+            start = time.perf_counter()
+            self.transaction.track(meta_node)
+            module = create_module(meta_node)
+            self.transaction.track()
+            result.seconds[phase] = time.perf_counter() - start
+            if not module.build:
+                result.status[phase] = STATUS_SKIPPED
+
+            else:
+                result.status[phase] = STATUS_CACHED if getattr(module, "cached", False) else STATUS_BUILT
+
+            if self.progress:
+                cmds.progressWindow(e=True, step=1, status=f"{phase.capitalize()}: {meta_node}")
+
+            return module
+
+        return create
+
+    def _check(self, phase: str) -> None:
+        if not cmds.objExists(core.GUIDE_GROUP_NAME):
+            raise RuntimeError("ガイドが見つかりませんでした")
+
+        if phase != PHASE_RIG:
+            return
+
+        if not cmds.objExists(core.SKELETON_GROUP_NAME):
+            raise RuntimeError("スケルトンが見つかりませんでした")
+
+        if not cmds.objExists(core.CTRL_EDIT_GROUP_NAME):
+            raise RuntimeError("コントローラーが見つかりませんでした")
+
+    def run_phase(self, phase: str) -> list:
+        """
+        1つのフェーズを実行する
+
+        Returns:
+            list: 作成したモジュールのインスタンス
+        """
+        self.phase = phase
+        self._check(phase)
+        nodes = [n for n in self.nodes if self.targets is None or n.meta_node in self.targets]
+        body = [n.meta_node for n in nodes if not n.facial]
+        facial = [n.meta_node for n in nodes if n.facial]
+
+        start = time.perf_counter()
+        if phase == PHASE_SKELETON:
+            modules = skeleton_base.build(body, facial, self._creator(phase, skeleton_base.create_module))
+
+        elif phase == PHASE_CONTROLLER:
+            modules = ctrl_base.build(body + facial, self._creator(phase, ctrl_base.create_module))
+
+        else:
+            modules = rig_base.build(body + facial, self._creator(phase, rig_base.create_module))
+
+        self.phase_seconds[phase] = time.perf_counter() - start
+        self.current = None
+        return modules
+
+    def _fail(self, error: str) -> None:
+        if self.current:
+            result = self.results[self.current]
+            result.status[self.phase] = STATUS_FAILED
+            result.error = error
+
+        for result in self.results.values():
+            for phase, status in result.status.items():
+                if status in (STATUS_BUILT, STATUS_CACHED):
+                    result.status[phase] = STATUS_REVERTED
+
+    def run(self) -> BuildResult:
+        """
+        全てのフェーズを実行する エラーが発生した場合は全てアンドゥする
+        fastモードでは、アンドゥの代わりに作成したノードを削除する
+
+        Returns:
+            BuildResult: ビルドの結果
+        """
+        start = time.perf_counter()
+        success = False
+        error = ""
+        previous_mode = core.set_connect_mode(self.connect_mode)
+        previous_cache = plan_cache.set_enabled(self.cache)
+
+        self.transaction = fast_build.BuildTransaction(self.fast)
+        self.transaction.begin()
+        try:
+            self.collect()
+            if self.progress:
+                if cmds.progressWindow(q=True, isCancelled=True):
+                    cmds.progressWindow(endProgress=True)
+
+                cmds.progressWindow(title="Build All",
+                                    progress=0,
+                                    max=max(len(self.nodes if self.targets is None else self.targets) * len(self.phases), 1),
+                                    status="Building...",
+                                    isInterruptable=False)
+
+            for phase in self.phases:
+                self.run_phase(phase)
+
+            cmds.select(cl=True)
+            success = True
+
+        except:
+            error = format_exc()
+            self._fail(error)
+
+        finally:
+            self.transaction.end(success)
+
+            core.set_connect_mode(previous_mode)
+            plan_cache.set_enabled(previous_cache)
+            if self.progress:
+                cmds.progressWindow(endProgress=True)
+
+        if error:
+            print(error)
+            MGlobal.displayError("予期せぬエラーが発生しました")
+
+        return BuildResult(
+            success=success,
+            phases=list(self.phases),
+            order=[n.meta_node for n in self.nodes],
+            modules=[self.results[n.meta_node] for n in self.nodes],
+            seconds=time.perf_counter() - start,
+            phase_seconds=dict(self.phase_seconds),
+            error=error,
+        )
+
+
+class RigRebuild(BuildPipeline):
+    """
+    入力のハッシュ値が変わったモジュールと、それに依存するモジュールのリグだけを作り直すクラス
+
+    Args:
+        connect_mode (str): リグのconnect_matrixの接続モード
+        progress (bool): プログレスウィンドウを表示するか
+        force (bool): ハッシュ値に関わらず全てのモジュールを作り直すか
+        fast (bool): アンドゥの記録とビューポートの更新を止めてビルドするか
+                     失敗した場合、作り直すために削除したリグは元に戻らない
+        cache (bool): plan_cacheでリグの操作を保存、再生するか
+    """
+    def __init__(self, connect_mode: str=None, progress: bool=True, force: bool=False, fast: bool=False, cache: bool=False):
+        super().__init__([PHASE_RIG], connect_mode, progress, fast, cache)
+        self.force = force
+
+    def is_changed(self, node: ModuleNode) -> bool:
+        """
+        モジュールのリグが無いか、前回のビルドから入力が変わっているかを返す
+        """
+        if self.force:
+            return True
+
+        groups = rig_base.get_module_groups(node.meta_node)
+        if not all(cmds.objExists(grp) for grp in groups):
+            return True
+
+        return build_hash.read(groups[0]) != build_hash.compute(node.meta_node, core.VERSION)
+
+    def find_targets(self) -> set:
+        """
+        作り直すモジュールのメタノードを返す 変更されたモジュールに依存するモジュールを含む
+        """
+        targets = {n.meta_node for n in self.nodes if self.is_changed(n)}
+
+        dependents = {}
+        for node in self.nodes:
+            for d in node.dependencies:
+                dependents.setdefault(d, []).append(node.meta_node)
+
+        stack = list(targets)
+        while stack:
+            for child in dependents.get(stack.pop(), []):
+                if child not in targets:
+                    targets.add(child)
+                    stack.append(child)
+
+        return targets
+
+    def collect(self) -> None:
+        super().collect()
+        self.targets = self.find_targets()
+        for meta_node, result in self.results.items():
+            if meta_node not in self.targets:
+                result.status[PHASE_RIG] = STATUS_SKIPPED
+
+    def run_phase(self, phase: str) -> list:
+        if not self.targets:
+            return []
+
+        # rootモジュールを作り直す場合は全てのモジュールのリグを作り直す
+        root = self.nodes[0].meta_node if self.nodes else None
+        if root in self.targets or not cmds.objExists(core.RIG_GROUP_NAME):
+            if cmds.objExists(core.RIG_GROUP_NAME):
+                rig_base.remove_all()
+
+            self.targets = {n.meta_node for n in self.nodes}
+            for result in self.results.values():
+                result.status.pop(PHASE_RIG, None)
+
+        else:
+            for node in reversed(self.nodes):
+                if node.meta_node in self.targets:
+                    rig_base.remove_module(node.meta_node)
+
+        return super().run_phase(phase)
+
+
+def rebuild_rig(connect_mode: str=None, progress: bool=True, force: bool=False, fast: bool=False, cache: bool=False) -> BuildResult:
+    """
+    入力が変わったモジュールのリグだけを作り直す
+
+    Args:
+        connect_mode (str): リグのconnect_matrixの接続モード
+        progress (bool): プログレスウィンドウを表示するか
+        force (bool): ハッシュ値に関わらず全てのモジュールを作り直すか
+        fast (bool): アンドゥの記録とビューポートの更新を止めてビルドするか
+        cache (bool): plan_cacheでリグの操作を保存、再生するか
+
+    Returns:
+        BuildResult: ビルドの結果 作り直さなかったモジュールはskipped
+    """
+    return RigRebuild(connect_mode, progress, force, fast, cache).run()
+
+
+def build_all(phases: list[str]=PHASES, connect_mode: str=None, progress: bool=True, fast: bool=False, cache: bool=False) -> BuildResult:
+    """
+    スケルトン、コントローラー、リグを1回の呼び出しでビルドする
+
+    Args:
+        phases (list): 実行するフェーズ PHASESの部分集合
+        connect_mode (str): リグのconnect_matrixの接続モード
+        progress (bool): プログレスウィンドウを表示するか
+        fast (bool): アンドゥの記録とビューポートの更新を止めてビルドするか
+                     失敗した場合はアンドゥの代わりに作成したノードを削除する
+        cache (bool): plan_cacheでコントローラーとリグの操作を保存、再生するか
+
+    Returns:
+        BuildResult: ビルドの結果
+    """
+    return BuildPipeline(phases, connect_mode, progress, fast, cache).run()
@@ -0,0 +1,375 @@
+"""
+ノードの作成、アトリビュートの設定、接続、親子付け、ロックを計画として記述し、まとめてシーンに適用する
+
+    from ysrig import build_plan
+    plan = build_plan.BuildPlan()
+    cd = plan.create_node("condition", "Cd_Heel", operation=3)
+    plan.connect("Foot.rotateX", f"{cd}.firstTerm", f"{cd}.colorIfFalseR")
+    names = build_plan.apply(plan)
+
+計画の作成はシーンに触れないため、計画の中身を確認したり、2つの計画の差分を取ったりできる
+適用はノードの作成、親子付け、値の設定と接続をそれぞれ1回のDG/DAGモディファイアで行う
+アンドゥの記録中はアンドゥできるようにcmdsで適用する
+
+計画の中のノード名は作成するノードの名前として扱い、
+同名のノードが既に存在して名前が変わった場合は、適用時に実際の名前に置き換える
+"""
+import difflib
+import maya.api.OpenMaya as om2
+from ysrig.cmds_proxy import cmds
+from ysrig import fast_build
+
+### 操作 ###
+CREATE_NODE = "createNode"
+ADD_ATTR = "addAttr"
+PARENT = "parent"
+SET_ATTR = "setAttr"
+CONNECT_ATTR = "connectAttr"
+LOCK = "lock"
+
+# 適用する順番
+OPERATIONS = [CREATE_NODE, ADD_ATTR, PARENT, SET_ATTR, CONNECT_ATTR, LOCK]
+
+# 整数として設定する数値アトリビュートの型
+_INT_TYPES = (
+    om2.MFnNumericData.kByte, om2.MFnNumericData.kChar, om2.MFnNumericData.kShort,
+    om2.MFnNumericData.kLong, om2.MFnNumericData.kInt64,
+)
+
+# {ノードタイプ: DAGノードか}
+_dag_types = {}
+
+# モディファイアで計画を適用した後に呼ぶ関数 func(plan, names)
+# cmdsで適用した場合はcmds_proxyのリスナーで記録できるため呼ばない
+_observers = []
+# モディファイアで適用中の計画の数
+_applying = 0
+
+
+class BuildPlan:
+    """
+    シーンへの操作を記録順に保持するクラス
+    各操作は [操作名, 引数...] のリスト
+    """
+    def __init__(self, ops: list=None):
+        self.ops = [list(op) for op in ops or []]
+
+    def __len__(self):
+        return len(self.ops)
+
+    def create_node(self, node_type: str, name: str, parent: str="", interesting: bool=False, **values) -> str:
+        """
+        ノードの作成を計画する
+
+        Args:
+            node_type (str): ノードタイプ
+            name (str): ノード名
+            parent (str): 親のノード名 DAGノードのみ シェイプは親を指定する
+            interesting (bool): Falseの場合はcore._create_nodeと同じくisHistoricallyInterestingを0にする
+            **values: {アトリビュート名: 値} 作成後に設定する値
+
+        Returns:
+            str: 計画したノード名 以降の操作はこの名前で指定する
+        """
+        self.ops.append([CREATE_NODE, node_type, name, parent])
+        if not interesting:
+            self.set_attr(f"{name}.isHistoricallyInteresting", 0)
+
+        for attr, value in values.items():
+            self.set_attr(f"{name}.{attr}", value)
+
+        return name
+
+    def add_attr(self, node: str, **kwargs) -> None:
+        """
+        cmds.addAttrと同じ引数でアトリビュートの追加を計画する
+        """
+        self.ops.append([ADD_ATTR, node, dict(kwargs)])
+
+    def parent(self, node: str, parent: str) -> None:
+        """
+        親子付けを計画する ローカルの値を保つ cmds.parent(r=True) と同じ
+        """
+        self.ops.append([PARENT, node, parent])
+
+    def set_attr(self, plug: str, value, attr_type: str="") -> None:
+        """
+        値の設定を計画する
+
+        Args:
+            plug (str): "ノード名.アトリビュート名"
+            value (float | int | bool | str | list): 値 リストはコンパウンドの子に順に設定する
+            attr_type (str): cmds.setAttrのtypeフラグ "string" 以外はcmdsで設定する
+        """
+        self.ops.append([SET_ATTR, plug, list(value) if isinstance(value, (list, tuple)) else value, attr_type])
+
+    def connect(self, src: str, *dests: str) -> None:
+        """
+        接続を計画する 接続先に既に接続がある場合は置き換える
+
+        Args:
+            src (str): 接続元 "ノード名.アトリビュート名"
+            *dests (str): 接続先 "ノード名.アトリビュート名"
+        """
+        for dest in dests:
+            self.ops.append([CONNECT_ATTR, src, dest])
+
+    def lock(self, *plugs: str) -> None:
+        for plug in plugs:
+            self.ops.append([LOCK, plug])
+
+    def extend(self, other: "BuildPlan") -> None:
+        self.ops += [list(op) for op in other.ops]
+
+    def get_ops(self, operation: str) -> list:
+        return [op for op in self.ops if op[0] == operation]
+
+    def get_nodes(self) -> list[str]:
+        """
+        作成を計画したノード名を返す
+        """
+        return [op[2] for op in self.get_ops(CREATE_NODE)]
+
+    def to_data(self) -> list:
+        """
+        json.dumpできる形で返す BuildPlan(data) で元に戻せる
+        """
+        return [list(op) for op in self.ops]
+
+    def format(self) -> list[str]:
+        """
+        各操作を1行の文字列にしたリストを返す 適用する順番に並べる
+        """
+        lines = []
+        for operation in OPERATIONS:
+            for op in self.get_ops(operation):
+                args = [str(a) for a in op[1:] if a not in ("", {})]
+                lines.append(" ".join([operation] + args))
+
+        return lines
+
+
+def diff(old: BuildPlan, new: BuildPlan) -> list[str]:
+    """
+    2つの計画の差分をunified diff形式の行のリストで返す 差分が無い場合は空のリスト
+    """
+    return list(difflib.unified_diff(old.format(), new.format(), "old", "new", lineterm=""))
+
+
+def apply(plan: BuildPlan, modifier: bool=None) -> dict:
+    """
+    計画をシーンに適用する
+
+    Args:
+        plan (BuildPlan): 適用する計画
+        modifier (bool): TrueはDG/DAGモディファイア、Falseはcmdsで適用する
+            Noneの場合はアンドゥの記録が止まっている(fastモードの)時だけモディファイアを使う
+
+    Returns:
+        dict: {計画したノード名: 作成したノード名}
+    """
+    if modifier is None:
+        modifier = not cmds.undoInfo(q=True, state=True)
+
+    if modifier:
+        global _applying
+        _applying += 1
+        try:
+            return _apply_modifier(plan)
+
+        finally:
+            _applying -= 1
+
+    return _apply_cmds(plan)
+
+
+def is_applying() -> bool:
+    """
+    モディファイアで計画を適用している間かを返す
+    この間のcmdsの呼び出しは計画の一部で、適用後にオブザーバーへ計画としてまとめて通知する
+    """
+    return _applying > 0
+
+
+def add_observer(func) -> None:
+    if func not in _observers:
+        _observers.append(func)
+
+
+def remove_observer(func) -> None:
+    if func in _observers:
+        _observers.remove(func)
+
+
+def _resolve(names: dict, path: str) -> str:
+    """
+    "ノード名.アトリビュート名" のノード名を作成したノードの名前に置き換える
+    """
+    node, sep, attr = path.partition(".")
+    return names.get(node, node) + sep + attr
+
+
+def _apply_cmds(plan: BuildPlan) -> dict:
+    names = {}
+    for _, node_type, name, parent in plan.get_ops(CREATE_NODE):
+        kwargs = {"parent": names.get(parent, parent)} if parent else {}
+        names[name] = cmds.createNode(node_type, name=name, skipSelect=True, **kwargs)
+
+    for _, node, kwargs in plan.get_ops(ADD_ATTR):
+        cmds.addAttr(names.get(node, node), **kwargs)
+
+    for _, node, parent in plan.get_ops(PARENT):
+        cmds.parent(names.get(node, node), names.get(parent, parent), r=True)
+
+    for _, plug, value, attr_type in plan.get_ops(SET_ATTR):
+        _set_attr_cmds(_resolve(names, plug), value, attr_type)
+
+    for _, src, dest in plan.get_ops(CONNECT_ATTR):
+        cmds.connectAttr(_resolve(names, src), _resolve(names, dest), f=True)
+
+    for _, plug in plan.get_ops(LOCK):
+        cmds.setAttr(_resolve(names, plug), l=True)
+
+    return names
+
+
+def _set_attr_cmds(plug: str, value, attr_type: str) -> None:
+    values = value if isinstance(value, list) else [value]
+    if attr_type:
+        cmds.setAttr(plug, *values, type=attr_type)
+
+    else:
+        cmds.setAttr(plug, *values)
+
+
+def _apply_modifier(plan: BuildPlan) -> dict:
+    # ノードの作成
+    dg_mod = om2.MDGModifier()
+    dag_mod = om2.MDagModifier()
+    objects = {}
+    for _, node_type, name, parent in plan.get_ops(CREATE_NODE):
+        if _is_dag(node_type):
+            parent_obj = _get_object(objects, parent) if parent else om2.MObject.kNullObj
+            obj = dag_mod.createNode(node_type, parent_obj)
+            dag_mod.renameNode(obj, name)
+
+        else:
+            obj = dg_mod.createNode(node_type)
+            dg_mod.renameNode(obj, name)
+
+        objects[name] = obj
+
+    dg_mod.doIt()
+    dag_mod.doIt()
+    names = {name: fast_build.get_name(om2.MObjectHandle(obj)) for name, obj in objects.items()}
+
+    for _, node, kwargs in plan.get_ops(ADD_ATTR):
+        cmds.addAttr(names.get(node, node), **kwargs)
+
+    # 親子付け
+    parents = plan.get_ops(PARENT)
+    if parents:
+        dag_mod = om2.MDagModifier()
+        for _, node, parent in parents:
+            dag_mod.reparentNode(_get_object(objects, node), _get_object(objects, parent))
+
+        dag_mod.doIt()
+
+    # 値の設定と接続
+    dg_mod = om2.MDGModifier()
+    deferred = []   # モディファイアで設定できない型の値
+    for _, plug, value, attr_type in plan.get_ops(SET_ATTR):
+        plug = _resolve(names, plug)
+        if attr_type and attr_type != "string":
+            deferred.append((plug, value, attr_type))
+
+        else:
+            _set_plug(dg_mod, _get_plug(plug), value)
+
+    for _, src, dest in plan.get_ops(CONNECT_ATTR):
+        src_plug = _get_plug(_resolve(names, src))
+        dest_plug = _get_plug(_resolve(names, dest))
+        if dest_plug.isDestination:
+            dg_mod.disconnect(dest_plug.source(), dest_plug)
+
+        dg_mod.connect(src_plug, dest_plug)
+
+    dg_mod.doIt()
+
+    for plug, value, attr_type in deferred:
+        _set_attr_cmds(plug, value, attr_type)
+
+    for _, plug in plan.get_ops(LOCK):
+        _get_plug(_resolve(names, plug)).isLocked = True
+
+    for func in _observers:
+        func(plan, names)
+
+    return names
+
+
+def _is_dag(node_type: str) -> bool:
+    if node_type not in _dag_types:
+        _dag_types[node_type] = "dagNode" in (cmds.nodeType(node_type, isTypeName=True, inherited=True) or [])
+
+    return _dag_types[node_type]
+
+
+def _get_object(objects: dict, name: str) -> om2.MObject:
+    """
+    計画で作成したノードはそのMObject、既存のノードは名前から取得したMObjectを返す
+    """
+    if name in objects:
+        return objects[name]
+
+    sel = om2.MSelectionList()
+    sel.add(name)
+    return sel.getDependNode(0)
+
+
+def _get_plug(path: str) -> om2.MPlug:
+    sel = om2.MSelectionList()
+    sel.add(path)
+    return sel.getPlug(0)
+
+
+def _set_plug(mod: om2.MDGModifier, plug: om2.MPlug, value) -> None:
+    """
+    値の設定をモディファイアに追加する 角度と距離はUIの単位として扱う
+    """
+    if isinstance(value, list):
+        for i, v in enumerate(value):
+            _set_plug(mod, plug.child(i), v)
+
+        return
+
+    if isinstance(value, str):
+        mod.newPlugValueString(plug, value)
+        return
+
+    attr = plug.attribute()
+    if attr.hasFn(om2.MFn.kUnitAttribute):
+        unit_type = om2.MFnUnitAttribute(attr).unitType()
+        if unit_type == om2.MFnUnitAttribute.kAngle:
+            mod.newPlugValueMAngle(plug, om2.MAngle(value, om2.MAngle.uiUnit()))
+            return
+
+        if unit_type == om2.MFnUnitAttribute.kDistance:
+            mod.newPlugValueMDistance(plug, om2.MDistance(value, om2.MDistance.uiUnit()))
+            return
+
+    if attr.hasFn(om2.MFn.kNumericAttribute):
+        numeric_type = om2.MFnNumericAttribute(attr).numericType()
+        if numeric_type == om2.MFnNumericData.kBoolean:
+            mod.newPlugValueBool(plug, bool(value))
+
+        elif numeric_type in _INT_TYPES:
+            mod.newPlugValueInt(plug, int(value))
+
+        else:
+            mod.newPlugValueDouble(plug, float(value))
+
+        return
+
+    # enumなど
+    mod.newPlugValueInt(plug, int(value))
@@ -0,0 +1,65 @@
+"""
+ビルド中に保持する状態
+
+各モジュールのrig.pyはビルド中にcoreをreloadするため、coreのモジュール変数はその度に初期化される
+ビルドを通して保持したい値はreloadされないこのモジュールに置く
+"""
+
+### 接続モード ###
+CONNECT_MODE_DECOMPOSE = "decompose"          # multMatrix -> decomposeMatrix -> translate, rotate, scale
+CONNECT_MODE_OFFSET_PARENT = "offset_parent"  # multMatrix -> offsetParentMatrix
+CONNECT_MODES = (CONNECT_MODE_DECOMPOSE, CONNECT_MODE_OFFSET_PARENT)
+
+_connect_mode = CONNECT_MODE_DECOMPOSE
+
+# ローカル接続で、動かないノードの行列を1つの値にまとめて設定するか
+_bake_static = False
+
+# connect_matrixで作成したノードの再利用のためのキャッシュ {キー: [mm_node, dm_node]}
+matrix_network_cache = {}
+
+
+def get_connect_mode() -> str:
+    """
+    現在の接続モードを返す
+    """
+    return _connect_mode
+
+
+def set_connect_mode(mode: str) -> str:
+    """
+    接続モードを設定する
+
+    Args:
+        mode (str): CONNECT_MODESのいずれか Noneの場合は既定値に戻す
+
+    Returns:
+        str: 設定前の接続モード
+    """
+    global _connect_mode
+    if mode is None:
+        mode = CONNECT_MODE_DECOMPOSE
+
+    if mode not in CONNECT_MODES:
+        raise ValueError(f"不明な接続モードです: {mode}")
+
+    previous = _connect_mode
+    _connect_mode = mode
+    return previous
+
+
+def get_bake_static() -> bool:
+    return _bake_static
+
+
+def set_bake_static(enabled: bool) -> bool:
+    """
+    ローカル接続で、動かないノードの行列をまとめて設定するかを設定する
+
+    Returns:
+        bool: 設定前の値
+    """
+    global _bake_static
+    previous = _bake_static
+    _bake_static = bool(enabled)
+    return previous
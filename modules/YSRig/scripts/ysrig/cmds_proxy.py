@@ -0,0 +1,205 @@
+"""
+maya.cmdsの代わりにimportする、呼び出しを記録できるラッパー
+
+    from ysrig.cmds_proxy import cmds
+
+    from ysrig import cmds_proxy
+    with cmds_proxy.record() as rec:
+        build_pipeline.build_all()
+
+    print(rec.format_report())
+
+記録していない間は、maya.cmdsの関数をそのままインスタンスの属性にキャッシュして返すため、
+呼び出しのオーバーヘッドは無い
+記録を開始するとキャッシュを破棄し、以降は時間を計る関数で包んだものを返す
+mel.evalも同じように記録できるように、melのラッパーも用意する リスナーには "mel.eval" の名前で渡る
+
+記録中の状態を保持するため、このモジュールはreloadしない
+"""
+import time
+from contextlib import contextmanager
+from maya import cmds as maya_cmds
+from maya import mel as maya_mel
+
+# コマンドがエラーで終了した場合にリスナーへ渡す戻り値
+FAILED = object()
+
+
+class CmdsProxy:
+    """
+    maya.cmdsのコマンドを、リスナーが登録されている間だけ記録しながら呼び出すクラス
+
+    リスナーは record(name, args, kwargs, seconds, result) を持つオブジェクト
+    resultはコマンドの戻り値 エラーで終了した場合はFAILED
+
+    Args:
+        module: ラップするモジュール
+        prefix (str): リスナーに渡すコマンド名の接頭辞
+    """
+    def __init__(self, module, prefix: str=""):
+        self._module = module
+        self._prefix = prefix
+        self._listeners = []
+
+    def __getattr__(self, name):
+        # インスタンスにキャッシュが無いコマンドの初回アクセス時のみ呼ばれる
+        func = getattr(self._module, name)
+        if self._listeners and callable(func) and not name.startswith("_"):
+            func = self._wrap(f"{self._prefix}{name}", func)
+
+        setattr(self, name, func)
+        return func
+
+    def __dir__(self):
+        return dir(self._module)
+
+    def add_listener(self, listener) -> None:
+        if listener in self._listeners:
+            return
+
+        self._listeners.append(listener)
+        if len(self._listeners) == 1:
+            self._clear_cache()
+
+    def remove_listener(self, listener) -> None:
+        if listener not in self._listeners:
+            return
+
+        self._listeners.remove(listener)
+        if not self._listeners:
+            self._clear_cache()
+
+    def is_recording(self) -> bool:
+        return bool(self._listeners)
+
+    def _clear_cache(self):
+        for name in [n for n in self.__dict__ if not n.startswith("_")]:
+            del self.__dict__[name]
+
+    def _wrap(self, name, func):
+        listeners = self._listeners
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = FAILED
+            try:
+                result = func(*args, **kwargs)
+                return result
+
+            finally:
+                seconds = time.perf_counter() - start
+                for listener in listeners:
+                    listener.record(name, args, kwargs, seconds, result)
+
+        wrapper.__name__ = name
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+
+
+cmds = CmdsProxy(maya_cmds)
+mel = CmdsProxy(maya_mel, prefix="mel.")
+
+
+def get_shape(value) -> str:
+    """
+    引数の値を、型と長さだけの文字列にする
+    "."を含む文字列は "plug"、リストとタプルは "list[要素数]" になる
+    """
+    if isinstance(value, str):
+        return "plug" if "." in value else "str"
+
+    if isinstance(value, (list, tuple)):
+        return f"list[{len(value)}]"
+
+    if value is None:
+        return "None"
+
+    return type(value).__name__
+
+
+def get_signature(args: tuple, kwargs: dict) -> str:
+    """
+    呼び出しの引数の形を "(plug, float, type=)" の形の文字列にする
+    """
+    items = [get_shape(a) for a in args]
+    items += [f"{k}=" for k in sorted(kwargs)]
+    return f"({', '.join(items)})"
+
+
+class CommandStats:
+    __slots__ = ("count", "seconds", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = {}   # {引数の形: 呼び出し回数}
+
+
+class Recorder:
+    """
+    コマンドごとの呼び出し回数、合計時間、引数の形を集計するリスナー
+    """
+    def __init__(self):
+        self.commands = {}
+
+    def record(self, name, args, kwargs, seconds, result=None):
+        stats = self.commands.get(name)
+        if stats is None:
+            stats = self.commands[name] = CommandStats()
+
+        stats.count += 1
+        stats.seconds += seconds
+        signature = get_signature(args, kwargs)
+        stats.shapes[signature] = stats.shapes.get(signature, 0) + 1
+
+    def reset(self) -> None:
+        self.commands = {}
+
+    def report(self) -> list[dict]:
+        """
+        合計時間が長い順に集計結果を返す
+
+        Returns:
+            list: [{"command", "count", "seconds", "shapes": {引数の形: 回数}}, ...]
+        """
+        items = sorted(self.commands.items(), key=lambda item: item[1].seconds, reverse=True)
+        return [{
+            "command": name,
+            "count": stats.count,
+            "seconds": stats.seconds,
+            "shapes": dict(sorted(stats.shapes.items(), key=lambda item: item[1], reverse=True)),
+        } for name, stats in items]
+
+    def format_report(self, count: int=20, shapes: int=3) -> str:
+        """
+        reportの上位を表形式の文字列にする
+
+        Args:
+            count (int): 表示するコマンドの数
+            shapes (int): コマンドごとに表示する引数の形の数
+        """
+        lines = [f"{'command':<24}{'count':>10}{'total ms':>12}{'us / call':>12}"]
+        for r in self.report()[:count]:
+            lines.append(f"{r['command']:<24}{r['count']:>10}{r['seconds'] * 1000:>12.2f}{r['seconds'] / r['count'] * 1e6:>12.2f}")
+            for signature, n in list(r["shapes"].items())[:shapes]:
+                lines.append(f"    {n:>8}  {signature}")
+
+        return "\n".join(lines)
+
+
+@contextmanager
+def record():
+    """
+    with文の間のコマンドの呼び出しを記録する
+
+    Yields:
+        Recorder: 集計結果
+    """
+    recorder = Recorder()
+    cmds.add_listener(recorder)
+    mel.add_listener(recorder)
+    try:
+        yield recorder
+
+    finally:
+        cmds.remove_listener(recorder)
+        mel.remove_listener(recorder)
@@ -0,0 +1,166 @@
+"""
+connect_matrixの接続モードごとに、bipedテンプレートのリグのノード数と評価時間を比較する
+
+    from ysrig import connect_mode_report
+    connect_mode_report.main()
+
+シーンを新規作成してビルドするため、実行前に作業中のシーンを保存しておくこと
+"""
+import os
+import json
+import time
+from maya import cmds
+import maya.api.OpenMaya as om2
+from ysrig import core, build_state, skeleton_base, ctrl_base, rig_base
+
+BIPED_SETTINGS_PATH = os.path.join(core.prefs_path, "prefs", "ysrig", "modules", "biped", "settings", "default.json")
+
+# 比較する際に数えるノードタイプ
+NODE_TYPES = ["multMatrix", "decomposeMatrix", "pairBlend", "parentConstraint", "scaleConstraint", "blendMatrix"]
+
+
+def build_biped_template(settings_path: str=BIPED_SETTINGS_PATH) -> None:
+    """
+    シーンを新規作成し、bipedテンプレートのガイド、スケルトン、コントローラーを作成する
+
+    Args:
+        settings_path (str): bipedのGUIの設定ファイル
+    """
+    from ysrig.modules.biped import guide
+
+    with open(settings_path, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+
+    cmds.file(new=True, force=True)
+    guide.Guide(
+        settings["SpineJointCount"],
+        settings["NeckJointCount"],
+        settings["ArmTwistJointCount"],
+        settings["LegTwistJointCount"],
+        settings["UseFinger"],
+        [f"L_{d[0]}" for d in settings["FingerNames"]],
+        [d[1] for d in settings["FingerNames"]],
+        settings["UseToeSub"],
+        settings["UseJaw"],
+        settings["UseEyes"],
+        settings["UseEyelid"],
+        settings["ConnectType"]
+    )
+    skeleton_base.main()
+    ctrl_base.main()
+
+
+def count_nodes(nodes: list[str]) -> dict:
+    """
+    ノードをタイプごとに数える
+
+    Returns:
+        dict: {ノードタイプ: 数}
+    """
+    counts = {}
+    for node in nodes:
+        node_type = cmds.nodeType(node)
+        counts[node_type] = counts.get(node_type, 0) + 1
+
+    return counts
+
+
+def measure_evaluation(joints: list[str], frames: int=100) -> float:
+    """
+    Ctrl_Rootにキーを打ってフレームを進め、ジョイントのworldMatrixを読み込む時間を計測する
+
+    Args:
+        joints (list): 結果を読み込むジョイント
+        frames (int): 計測するフレーム数
+
+    Returns:
+        float: 1フレームあたりの秒数
+    """
+    ctrl = rig_base.RigBace.ROOT_CTRL
+    cmds.setKeyframe(ctrl, at=["translateY", "rotateY"], t=0, v=0)
+    cmds.setKeyframe(ctrl, at="translateY", t=frames, v=10)
+    cmds.setKeyframe(ctrl, at="rotateY", t=frames, v=90)
+
+    sel = om2.MSelectionList()
+    for jt in joints:
+        sel.add(jt)
+
+    plugs = [om2.MFnDependencyNode(sel.getDependNode(i)).findPlug("worldMatrix", False).elementByLogicalIndex(0) for i in range(sel.length())]
+
+    cmds.currentTime(0, update=True)
+    start = time.perf_counter()
+    for frame in range(1, frames + 1):
+        cmds.currentTime(frame, update=True)
+        for plug in plugs:
+            plug.asMObject()
+
+    elapsed = time.perf_counter() - start
+    cmds.cutKey(ctrl, at=["translateY", "rotateY"])
+
+    return elapsed / frames
+
+
+def report(connect_mode: str, frames: int=100) -> dict:
+    """
+    bipedテンプレートを指定した接続モードでビルドし、ノード数と評価時間を返す
+
+    Args:
+        connect_mode (str): build_state.CONNECT_MODES のいずれか
+        frames (int): 計測するフレーム数
+
+    Returns:
+        dict: {"mode", "nodes", "node_types", "offset_parent_matrix", "seconds_per_frame"}
+    """
+    build_biped_template()
+    before = set(cmds.ls())
+    rig_base.main(connect_mode)
+    created = [n for n in cmds.ls() if n not in before]
+
+    joints = cmds.ls(core.SKELETON_GROUP_NAME, type="joint", dag=True) or []
+    connected = [n for n in cmds.ls(type="transform") if cmds.listConnections(f"{n}.offsetParentMatrix", s=True, d=False)]
+
+    return {
+        "mode": connect_mode,
+        "nodes": len(created),
+        "node_types": count_nodes(created),
+        "offset_parent_matrix": len(connected),
+        "seconds_per_frame": measure_evaluation(joints, frames),
+    }
+
+
+def compare(frames: int=100) -> list[dict]:
+    """
+    全ての接続モードのreportを作成する
+
+    Args:
+        frames (int): 計測するフレーム数
+
+    Returns:
+        list: reportの戻り値のリスト
+    """
+    return [report(mode, frames) for mode in build_state.CONNECT_MODES]
+
+
+def format_report(results: list[dict]) -> str:
+    """
+    compareの結果を表形式の文字列にする
+    """
+    modes = [r["mode"] for r in results]
+    rows = [["", *modes]]
+    rows.append(["nodes", *[str(r["nodes"]) for r in results]])
+    for node_type in NODE_TYPES:
+        rows.append([node_type, *[str(r["node_types"].get(node_type, 0)) for r in results]])
+
+    rows.append(["offsetParentMatrix", *[str(r["offset_parent_matrix"]) for r in results]])
+    rows.append(["ms / frame", *[f'{r["seconds_per_frame"] * 1000:.3f}' for r in results]])
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.rjust(w) for cell, w in zip(row, widths)) for row in rows)
+
+
+def main(frames: int=100) -> list[dict]:
+    results = compare(frames)
+    print(f"evaluation mode: {cmds.evaluationManager(q=True, mode=True)[0]}")
+    print(format_report(results))
+
+    return results
@@ -1,12 +1,21 @@
 import os
-import json
 import math
 import importlib
 from functools import partial
-from maya import cmds, mel
+from maya import mel
+from ysrig.cmds_proxy import cmds
 import maya.api.OpenMaya as om2
-from ysrig import create_node
+from ysrig import create_node, shape_registry, curve_points, attr_writer, scene_index, build_state, node_ledger, name_registry
 importlib.reload(create_node)
+importlib.reload(curve_points)
+importlib.reload(attr_writer)
+
+try:
+    from ysrig import mathlib
+    importlib.reload(mathlib)
+
+except ImportError: # numpyが無い環境ではom2で計算する
+    mathlib = None
 
 VERSION = "2.6.1"
 
@@ -39,17 +48,15 @@ class Curve:
         self.outliner_color = [1, 1, 1]
 
     def get_json_path(self):
-        self.json_path = os.path.join(prefs_path, "prefs", "ysrig", "controller_sahpe.json")
+        self.json_path = shape_registry.CTRL_SHAPE_JSON_PATH
 
     def pre_process(self):
         pass
 
     def create(self):
-        with open(self.json_path, "r") as f:
-            ld = json.load(f)
-        cv_pos = ld.get(self.shape_type)
-        self.scale_uniformly = ld.get(f"{self.shape_type}_Uniform_Scale")
-        self.parent_node = cmds.curve(d=1, p=cv_pos, name=self.name)
+        shape = shape_registry.get_shape(self.shape_type, self.json_path)
+        self.scale_uniformly = shape.uniform_scale
+        self.parent_node = cmds.curve(d=1, p=shape.cvs, name=self.name)
         self.shape_node = cmds.listRelatives(self.parent_node, s=True)[0]
         cmds.addAttr(self.shape_node, ln="YSNodeType", dt="string")
         cmds.setAttr(f"{self.parent_node}.overrideEnabled", True)
@@ -95,47 +102,16 @@ class Curve:
         if len(args) == 1:
             scale = [args[0]] * 3
 
-        tmp = cmds.createNode("transform")
-        cmds.parent(self.shape_node, tmp, r=True, s=True)
-        cmds.setAttr(f"{tmp}.scale", scale[0], scale[1], scale[2])
-        cmds.makeIdentity(tmp, a=True)
-        cmds.parent(self.shape_node, self.parent_node, r=True, s=True)
-        cmds.delete(tmp)
-        self.reset_shape_name()
+        curve_points.transform_shape(self.shape_node, curve_points.compose_matrix(scale=scale))
 
     def set_rotate(self, rotate):
-        tmp = cmds.createNode("transform")
-        cmds.parent(self.shape_node, tmp, r=True, s=True)
-        cmds.setAttr(f"{tmp}.rotate", rotate[0], rotate[1], rotate[2])
-        cmds.makeIdentity(tmp, a=True)
-        cmds.parent(self.shape_node, self.parent_node, r=True, s=True)
-        cmds.delete(tmp)
-        self.reset_shape_name()
+        curve_points.transform_shape(self.shape_node, curve_points.compose_matrix(rotate=rotate))
 
     def set_translate(self, translate):
-        tmp = cmds.createNode("transform")
-        cmds.parent(self.shape_node, tmp, r=True, s=True)
-        cmds.setAttr(f"{tmp}.translate", translate[0], translate[1], translate[2])
-        cmds.makeIdentity(tmp, a=True)
-        cmds.parent(self.shape_node, self.parent_node, r=True, s=True)
-        cmds.delete(tmp)
-        self.reset_shape_name()
+        curve_points.transform_shape(self.shape_node, curve_points.compose_matrix(translate=translate))
 
     def set_matrix(self, matrix, offset_scale=[1, 1, 1]):
-        tf = decompose_matrix(matrix)
-        tmp = cmds.createNode("transform")
-        cmds.parent(self.shape_node, tmp, r=True, s=True)
-
-        sc = [sc * s for sc, s, in zip(tf[2], offset_scale)]
-        cmds.setAttr(f"{tmp}.scale", *sc)
-        cmds.setAttr(f"{tmp}.rotate", *tf[1])
-        tl = [t * s for t, s, in zip(tf[0], offset_scale)]
-        cmds.setAttr(f"{tmp}.translate", *tl)
-
-        cmds.makeIdentity(tmp, a=True)
-        cmds.parent(self.shape_node, self.parent_node, r=True, s=True)
-        cmds.delete(tmp)
-        self.reset_shape_name()
+        curve_points.transform_shape(self.shape_node, get_shape_offset_matrix(matrix, offset_scale))
 
     def set_width(self, width):
         cmds.setAttr(f"{self.shape_node}.lineWidth", width)
@@ -263,6 +239,18 @@ FACIAL_COLOR_4 = [0.7, 1.0, 1.0]
 
 ###################
 
+### 動かないノードの判定 ###
+
+# ロックもしくはチャンネルボックスに無い場合に動かないとするアトリビュート
+STATIC_CHANNELS = {f"{attr}{axis}" for attr in ("translate", "rotate", "scale") for axis in "XYZ"} | {"shearXY", "shearXZ", "shearYZ"}
+
+# 接続がある場合に動くとするアトリビュート(前方一致)
+STATIC_INPUTS = (
+    "translate", "rotate", "scale", "shear", "offsetParentMatrix", "jointOrient", "inverseScale",
+)
+
+###################
+
 def set_ctrl_shape_color(node: str, color: list) -> list:
     """
     カーブシェイプの色を設定する
@@ -291,44 +279,30 @@ def clamp_curve_y_zero(node: str) -> None:
     Returns:
         None
     """
-    # 子シェイプを取得（typeでフィルタ）
-    shapes = cmds.listRelatives(node, children=True, type="nurbsCurve", fullPath=True) or []
-    if not shapes:
-        return
-
-    for shape in shapes:
-        # CV数を取得
-        cv_count = cmds.getAttr(f"{shape}.controlPoints", size=True)
-
-        for i in range(cv_count):
-            cv_name = f"{shape}.cv[{i}]"
+    curve_points.clamp_shape(node, axis=1, minimum=0.0)
 
-            # ワールド座標を取得
-            pos = cmds.pointPosition(cv_name, world=True)
 
-            if pos[1] < 0.0:
-                # y=0 に補正した位置をセット
-                new_pos = (pos[0], 0.0, pos[2])
-                cmds.xform(cv_name, ws=True, t=new_pos)
+def get_shape_offset_matrix(matrix: list, offset_scale: list=[1, 1, 1]) -> om2.MMatrix:
+    """
+    シェイプに焼き込む行列を作成する
+    translateとscaleにoffset_scaleを掛けてから合成する
 
+    Args:
+        matrix (list): 4x4の行列
+        offset_scale (list): [sx, sy, sz]
 
-def set_shape_matrix(node, matrix, offset_scale=[1, 1, 1]):
+    Returns:
+        om2.MMatrix: 行列
+    """
     tf = decompose_matrix(matrix)
-    shapes = cmds.listRelatives(node, s=True)
-    for shape in shapes:
-        tmp = cmds.createNode("transform")
-        cmds.parent(shape, tmp, r=True, s=True)
+    sc = [sc * s for sc, s, in zip(tf[2], offset_scale)]
+    tl = [t * s for t, s, in zip(tf[0], offset_scale)]
 
-        sc = [sc * s for sc, s, in zip(tf[2], offset_scale)]
-        cmds.setAttr(f"{tmp}.scale", *sc)
-        cmds.setAttr(f"{tmp}.rotate", *tf[1])
-        tl = [t * s for t, s, in zip(tf[0], offset_scale)]
-        cmds.setAttr(f"{tmp}.translate", *tl)
+    return curve_points.compose_matrix(tl, tf[1], sc)
 
-        cmds.makeIdentity(tmp, a=True)
-        cmds.parent(shape, node, r=True, s=True)
-        cmds.delete(tmp)
-        cmds.rename(shape, f"{node}Shape")
+
+def set_shape_matrix(node, matrix, offset_scale=[1, 1, 1]):
+    curve_points.transform_shape(node, get_shape_offset_matrix(matrix, offset_scale))
 
 
 def set_curve_width(node, width):
@@ -617,52 +591,18 @@ def get_enum_attribute(node, attr):
 
 
 def get_meta_nodes():
-    guide_group = GUIDE_GROUP_NAME
-    guide_modules_group = GUIDE_MODULES_GROUP_NAME
-
-    if not cmds.objExists(guide_group):
-        return []
-
-    root_module = cmds.listRelatives(guide_group, c=True)[0]
-    guide_modules = cmds.listRelatives(guide_modules_group, c=True) or []
-
-    modules_count = len(guide_modules)
-
-    meta_nodes = [None] * modules_count
-
-    root_settings = cmds.listRelatives(root_module, s=True)[0]
-    meta_nodes[0] = cmds.listConnections(root_settings, s=False, d=True, type="network")[0]
-
-    for i, module in enumerate(guide_modules):
-        if module == GUIDE_FACIALS_GROUP_NAME:
-            continue
-        
-        settings = cmds.listRelatives(module, s=True)[0]
-        meta_nodes[i] = cmds.listConnections(settings, s=False, d=True, type="network")[0]
-
-    return meta_nodes
+    """
+    bodyモジュールのメタノードをビルド順に返す 0番目はrootモジュール
+    scene_indexが保持するラベル付きのノードから、シーンを検索せずに求める
+    """
+    return scene_index.get().meta_nodes()
 
 
 def get_facial_meta_nodes():
-    guide_facials_group = GUIDE_FACIALS_GROUP_NAME
-
-    if not cmds.objExists(guide_facials_group):
-        return []
-
-    guide_modules = cmds.listRelatives(guide_facials_group, c=True) or []
-
-    modules_count = len(guide_modules)
-
-    meta_nodes = [None] * modules_count
-
-    for i, module in enumerate(guide_modules):
-        if module == GUIDE_FACIALS_GROUP_NAME:
-            continue
-        
-        settings = cmds.listRelatives(module, s=True)[0]
-        meta_nodes[i] = cmds.listConnections(settings, s=False, d=True, type="network")[0]
-
-    return meta_nodes
+    """
+    facialモジュールのメタノードをビルド順に返す
+    """
+    return scene_index.get().facial_meta_nodes()
 
 
 def get_distance(pos1 :list, pos2: list) -> float: 
@@ -676,7 +616,10 @@ def get_distance(pos1 :list, pos2: list) -> float:
     Returns:
         float: 2点間の距離
     """
-    return math.sqrt(sum((a - b) ** 2 for a, b in zip(pos1, pos2)))
+    if mathlib is None or len(pos1) != 3:
+        return math.sqrt(sum((a - b) ** 2 for a, b in zip(pos1, pos2)))
+
+    return float(mathlib.distance(pos1, pos2)[0])
 
 
 def get_round_rotate(rotate: list):
@@ -700,6 +643,9 @@ def get_divide_positions(start_end, divisions):
     """
     start = start_end[0]
     end = start_end[1]
+    if mathlib is not None:
+        return mathlib.divide_positions(start, end, divisions).tolist()
+
     result = [None] * divisions
     for i in range(divisions):
         t = i / (divisions - 1)
@@ -736,6 +682,9 @@ def get_average_pos_matrix(matrix_list: list) -> list:
     Returns:
         list of float: 平均位置を取ったmatrix（16要素のリスト）
     """
+    if mathlib is not None:
+        return mathlib.average_position_matrix(matrix_list).reshape(16).tolist()
+
     total_translation = om2.MVector(0, 0, 0)
 
     for mat in matrix_list:
@@ -780,11 +729,16 @@ def auto_scale_chain_ctrls(spaces: list, matrices: list, scale: float, scale_uni
     Returns:
         float: 最終的に設定されたscale値
     """
+    trs = decompose_matrices(matrices[:len(spaces) + 1])
+    positions = [t for t, r, s in trs]
+    if mathlib is not None:
+        distances = mathlib.chain_distances(positions).tolist()
+
+    else:
+        distances = [get_distance(pos, next_pos) for pos, next_pos in zip(positions, positions[1:])]
+
     all_dis = 0
-    for i, space in enumerate(spaces):
-        pos, rot = decompose_matrix(matrices[i])[:-1]
-        next_pos = decompose_matrix(matrices[i + 1])[0]
-        dis = get_distance(pos, next_pos)
+    for space, (pos, rot, scl), dis in zip(spaces, trs, distances):
         all_dis += dis
         cmds.setAttr(f"{space}.translate", *pos)
         cmds.setAttr(f"{space}.rotate", *rot)
@@ -815,6 +769,10 @@ def decompose_matrix(matrix_list: list) -> list:
     Returns:
         list: [[tx, ty, tz], [rx, ry, rz], [sx, sy, sz]]
     """
+    if mathlib is not None:
+        t, r, s, sh = mathlib.decompose(matrix_list)
+        return [t[0].tolist(), r[0].tolist(), s[0].tolist()]
+
     matrix = om2.MMatrix(matrix_list)
     transform = om2.MTransformationMatrix(matrix)
 
@@ -832,6 +790,95 @@ def decompose_matrix(matrix_list: list) -> list:
     return [t, r, s]
 
 
+def decompose_matrices(matrix_lists: list) -> list:
+    """
+    複数の行列をまとめて分解し、translate, rotate, scaleを抽出
+
+    Args:
+        matrix_lists (list): 4x4の行列のリスト
+
+    Returns:
+        list: [[[tx, ty, tz], [rx, ry, rz], [sx, sy, sz]], ...]
+    """
+    if not len(matrix_lists):
+        return []
+
+    if mathlib is None:
+        return [decompose_matrix(m) for m in matrix_lists]
+
+    t, r, s, sh = mathlib.decompose(matrix_lists)
+    return [list(trs) for trs in zip(t.tolist(), r.tolist(), s.tolist())]
+
+
+def mirror_matrices(matrix_lists: list, axis: str="X") -> list:
+    """
+    ワールド行列をワールドの原点を通る平面で反転する
+    cmds.mirrorJoint(mb=True)と同じく各軸を反転させ、行列式を正に保つ
+
+    Args:
+        matrix_lists (list): 4x4の行列のリスト
+        axis (str): 反転する軸 "X"の場合はYZ平面で反転する
+
+    Returns:
+        list: 反転した行列のリスト
+    """
+    if not len(matrix_lists):
+        return []
+
+    if mathlib is not None:
+        return mathlib.to_list(mathlib.mirror(matrix_lists, axis))
+
+    reflect = om2.MMatrix()
+    i = "XYZ".index(axis.upper())
+    reflect.setElement(i, i, -1)
+
+    result = []
+    for m in matrix_lists:
+        m = list(om2.MMatrix(m) * reflect)
+        result.append([-v for v in m[:12]] + m[12:])
+
+    return result
+
+
+def get_joint_transforms(matrix_lists: list, parents: list[int], parent_matrices: list=None) -> list:
+    """
+    ワールド行列と親子関係から、親子付けした後のジョイントのtranslateとjointOrientを求める
+    ワールド行列のスケールは使わない ジョイントを作成してからcmds.parentした場合と同じ値になる
+
+    Args:
+        matrix_lists (list): ジョイントのワールド行列のリスト
+        parents (list): 各ジョイントの親のインデックス 負の値はリストの外のノードが親
+        parent_matrices (list): リストの外の親のワールド行列 parentsの負の値のジョイントの順 Noneの場合は単位行列
+
+    Returns:
+        list: [[[tx, ty, tz], [jox, joy, joz]], ...]
+    """
+    if not len(matrix_lists):
+        return []
+
+    identity = list(om2.MMatrix.kIdentity)
+    external = iter(parent_matrices or [])
+    if mathlib is not None:
+        t, r, s, sh = mathlib.decompose(matrix_lists)
+        world = mathlib.compose(t, r)
+        parent_world = [world[p] if p >= 0 else mathlib.as_matrices(next(external, identity))[0] for p in parents]
+        t, r, s, sh = mathlib.decompose(mathlib.offset(parent_world, world))
+        return [list(tr) for tr in zip(t.tolist(), r.tolist())]
+
+    world = []
+    for m in matrix_lists:
+        t, r, s = decompose_matrix(m)
+        world.append(curve_points.compose_matrix(t, r))
+
+    result = []
+    for m, p in zip(world, parents):
+        parent = world[p] if p >= 0 else om2.MMatrix(next(external, identity))
+        t, r, s = decompose_matrix(list(m * parent.inverse()))
+        result.append([t, r])
+
+    return result
+
+
 def set_outliner_color(node, color):
     cmds.setAttr(f"{node}.useOutlinerColor", True)
     cmds.setAttr(f"{node}.outlinerColor", color[0], color[1], color[2])
@@ -847,354 +894,391 @@ def dict_to_attr(node: str, dict: dict) -> None:
 
     データがタプル型の場合、vectorやmatirxとして処理する
 
+    既に同じ値が設定されているアトリビュートや接続済みのアトリビュートはスキップし、
+    残りの追加、設定、接続、ロックはまとめて1回の操作として実行する
+
     Args:
         node (str): アトリビュートを設定するノード名
         dict (dict): 追加するアトリビュート群
     """
+    attr_writer.write(node, dict)
 
-    def check_attr(key: str) -> bool:
-        """
-        アトリビュートが存在しないかを調べて、あればFalse、なければTrueを返す
-        存在した場合、アトリビュートのロックを外す
-
-        Args:
-            key: アトリビュートの名前
-        
-        Returns:
-            bool: アトリビュートが存在しないかどうか
-        """
-        if cmds.attributeQuery(key, node=node, exists=True):
-            cmds.setAttr(f"{node}.{key}", l=False)
-            return False
 
-        else:
-            return True
+def list_to_tuple(in_list: list[list]) -> list[tuple]:
+    """
+    リストのリストを、タプルのリストに変換する
+    """
+    return [tuple(l) for l in in_list]
 
-    def check_list_attr(key: str) -> bool:
-        """
-        リスト型のアトリビュートが存在しないかを調べて、あればFalse、なければTrueを返す
-        存在した場合、アトリビュートのロックを外す
 
-        Args:
-            key: アトリビュートの名前
-        
-        Returns:
-            bool: アトリビュートが存在しないかどうか
-        """
-        if cmds.attributeQuery(key, node=node, exists=True):
-            index = cmds.getAttr(f"{node}.{key}", size=True)
-            for i in range(index):
-                cmds.setAttr(f"{node}.{key}[{i}]", l=False)
+def get_offset_matrix(node1: str, node2: str) -> list:
+    """
+    2つのノードのワールド上の差分のMatrixを返す
 
-            return False
+    Args:
+        node1 (str): 差分を取りたいノード1
+        node2 (str): 差分を取りたいノード2
 
-        else:
-            return True
+    Returns:
+        list : 差分の行列をリストにしたもの
 
-    ### 静的な単数アトリビュート ###
+    """
+    world_matrix = om2.MMatrix(cmds.getAttr(f"{node2}.worldMatrix[0]"))
+    world_inverse_matrix = om2.MMatrix(cmds.getAttr(f"{node1}.worldInverseMatrix[0]"))
 
-    def str_attr(key, data): # 文字列型の静的アトリビュート
-        if check_attr(key):
-            cmds.addAttr(node, ln=key, dt="string")
+    return list(world_matrix * world_inverse_matrix)
 
-        cmds.setAttr(f"{node}.{key}", data, type="string", l=True)
 
-    def float_attr(key, data): # 浮動小数点数型の静的アトリビュート
-        if check_attr(key):
-            cmds.addAttr(node, ln=key, at="double")
+def get_joint_orient_inverse_matrix(joint: str) -> list:
+    """
+    ジョイントのjointOrientの逆行列を返す
 
-        cmds.setAttr(f"{node}.{key}", data, l=True)
+    Args:
+        joint (str): ジョイント名
 
-    def int_attr(key, data): # 整数型の静的アトリビュート
-        if check_attr(key):
-            cmds.addAttr(node, ln=key, at="long")
+    Returns:
+        list : jointOrientの逆行列をリストにしたもの
+    """
+    orient = cmds.getAttr(f"{joint}.jointOrient")[0]
+    radians = [om2.MAngle(o, om2.MAngle.uiUnit()).asRadians() for o in orient]
 
-        cmds.setAttr(f"{node}.{key}", data, l=True)
+    return list(om2.MEulerRotation(*radians).asMatrix().inverse())
 
-    def bool_attr(key, data): # 真偽値型の静的アトリビュート
-        if check_attr(key):
-            cmds.addAttr(node, ln=key, at="bool")
 
-        cmds.setAttr(f"{node}.{key}", data, l=True)
+def connect_world_matrix_to_mm(src: str, dest: str, mm_node: str, start: int=1) -> int:
+    """
+    multMatrixノードにworldMatrixを接続する
 
-    def matrix_attr(key, data): # 行列型の静的アトリビュート
-        if check_attr(key):
-            cmds.addAttr(node, ln=key, dt="matrix")
+    Args:
+        src (str): 拘束する側のノード名
+        dest (str): 拘束される側のノード名
+        start (str): 接続する一つ目のインデックス
 
-        cmds.setAttr(f"{node}.{key}", data, type="matrix", l=True)
+    Returns:
+        int : multMatrixノードの、次に空いているインデックス
+    """
+    cmds.connectAttr(f"{src}.worldMatrix[0]",f"{mm_node}.matrixIn[{start}]")
+    cmds.connectAttr(f"{dest}.parentInverseMatrix[0]",f"{mm_node}.matrixIn[{start + 1}]")
 
-    def double2_attr(key, data): # double2型の静的アトリビュート
-        if check_attr(key):
-            cmds.addAttr(node, ln=key, at="double2")
-            for axis in "XY":
-                cmds.addAttr(node, ln=f"{key}{axis}", at="double", p=key)
+    return start + 2
 
-        cmds.setAttr(f"{node}.{key}", *data, l=True)
 
-    def double3_attr(key, data): # double3型の静的アトリビュート
-        if check_attr(key):
-            cmds.addAttr(node, ln=key, at="double3")
-            for axis in "XYZ":
-                cmds.addAttr(node, ln=f"{key}{axis}", at="double", p=key)
+def connect_local_matrix_to_mm(src: str, dest: str, mm_node: str, start: int=1) -> int:
+    """
+    multMatrixノードにlocalMatrixを接続する
+    offsetParentMatrixが接続されているノードは、その行列も含めて計算する
+    offsetParentMatrixで拘束するノードは、親から順に接続しておく必要がある
+    set_bake_staticが有効な場合は、続けて並ぶ動かないノードの行列を掛け合わせた1つの値を設定する
 
-        cmds.setAttr(f"{node}.{key}", *data, l=True)
+    Args:
+        src (str): 拘束する側のノード名
+        dest (str): 拘束される側のノード名
+        start (str): 接続する一つ目のインデックス
 
-    ### 静的な複数アトリビュート ###
+    Returns:
+        int : multMatrixノードの、次に空いているインデックス
+    """
+    root, srcs, dsts = name_registry.get_common_ancestor(src, dest)
+    bake = get_bake_static()
 
-    def list_of_str_attr(key, data): # 文字列のリスト型静的アトリビュート
-        if check_list_attr(key):
-            cmds.addAttr(node, ln=key, dt="string", multi=True)
+    index = start
+    static = []
+    for node in reversed(srcs):
+        if bake and _is_static_node(node):
+            static.append(node)
+            continue
 
-        for i, d in enumerate(data):
-            cmds.setAttr(f"{node}.{key}[{i}]", d, type="string", l=True)
+        index = _set_static_matrix(mm_node, index, static, "matrix")
+        cmds.connectAttr(f"{node}.matrix", f"{mm_node}.matrixIn[{index}]")
+        index += 1
+        if _has_offset_parent_matrix_input(node):
+            cmds.connectAttr(f"{node}.offsetParentMatrix", f"{mm_node}.matrixIn[{index}]")
+            index += 1
 
-    def list_of_float_attr(key, data): # 浮動小数点数のリスト型静的アトリビュート
-        if check_list_attr(key):
-            cmds.addAttr(node, ln=key, at="double", multi=True)
+    index = _set_static_matrix(mm_node, index, static, "matrix")
 
-        for i, d in enumerate(data):
-            cmds.setAttr(f"{node}.{key}[{i}]", d, l=True)
+    if any(_has_offset_parent_matrix_input(node) for node in dsts):
+        # offsetParentMatrixの逆行列を持つアトリビュートは無いため、共通の親からの差分をワールド行列で求める
+        if root:
+            cmds.connectAttr(f"{root}.worldMatrix[0]", f"{mm_node}.matrixIn[{index}]")
+            index += 1
 
-    def list_of_int_attr(key, data): # 整数のリスト型静的アトリビュート
-        if check_list_attr(key):
-            cmds.addAttr(node, ln=key, at="long", multi=True)
+        cmds.connectAttr(f"{dest}.parentInverseMatrix[0]", f"{mm_node}.matrixIn[{index}]")
+        return index + 1
 
-        for i, d in enumerate(data):
-            cmds.setAttr(f"{node}.{key}[{i}]", d, l=True)
+    for node in dsts:
+        if bake and _is_static_node(node):
+            static.append(node)
+            continue
 
-    def list_of_bool_attr(key, data): # 真偽値のリスト型静的アトリビュート
-        if check_list_attr(key):
-            cmds.addAttr(node, ln=key, at="bool", multi=True)
+        index = _set_static_matrix(mm_node, index, static, "inverseMatrix")
+        cmds.connectAttr(f"{node}.inverseMatrix", f"{mm_node}.matrixIn[{index}]")
+        index += 1
 
-        for i, d in enumerate(data):
-            cmds.setAttr(f"{node}.{key}[{i}]", d, l=True)
+    return _set_static_matrix(mm_node, index, static, "inverseMatrix")
 
-    def list_of_matrix_attr(key, data): # 行列のリスト型静的アトリビュート
-        if check_list_attr(key):
-            cmds.addAttr(node, ln=key, dt="matrix", multi=True)
 
-        for i, d in enumerate(data):
-            cmds.setAttr(f"{node}.{key}[{i}]", d, type="matrix", l=True)
+def _is_static_node(node: str) -> bool:
+    """
+    ローカルの行列が変わらないノードかを返す
+    translate, rotate, scale, shearが全てロックもしくはチャンネルボックスに無く、
+    行列に関わるアトリビュートに接続が無い場合に動かないとする
+    """
+    movable = set(cmds.listAttr(node, k=True, u=True) or []) | set(cmds.listAttr(node, cb=True, u=True) or [])
+    if movable & STATIC_CHANNELS:
+        return False
 
-    def list_of_double2_attr(key, data): # double2のリスト型静的アトリビュート
-        if check_list_attr(key):
-            cmds.addAttr(node, ln=key, at="double2", multi=True)
-            for axis in "XY":
-                cmds.addAttr(node, ln=f"{key}{axis}", at="double", p=key)
+    inputs = (cmds.listConnections(node, s=True, d=False, c=True, p=True) or [])[::2]
+    return not any(plug.split(".", 1)[1].startswith(STATIC_INPUTS) for plug in inputs)
 
-        for i, d in enumerate(data):
-            cmds.setAttr(f"{node}.{key}[{i}]", *d, l=True)
 
-    def list_of_double3_attr(key, data): # double2のリスト型静的アトリビュート
-        if check_list_attr(key):
-            cmds.addAttr(node, ln=key, at="double3", multi=True)
-            for axis in "XYZ":
-                cmds.addAttr(node, ln=f"{key}{axis}", at="double", p=key)
-
-        for i, d in enumerate(data):
-            cmds.setAttr(f"{node}.{key}[{i}]", *d, l=True)
-
-    # addAttrでdtの引数で設定されるアトリビュート型
-    DT_TYPES = {
-        "string", "matrix", "double3", "float3", "double2", "float2",
-        "vectorArray", "pointArray", "nurbsCurve", "nurbsSurface",
-        "reflectanceRGB", "spectrumRGB", "floatArray", "doubleArray",
-        "Int32Array", "compound"
-    }
-
-    ### 動的な単数アトリビュート ###
-
-    def connect_singular_attr(key, data, attr_type):
-        if check_attr(key):
-            if attr_type in DT_TYPES:
-                cmds.addAttr(node, ln=key, dt=attr_type)
-            
-            elif attr_type == "enum":
-                n, a = data.split(".")
-                enum = cmds.attributeQuery(a, node=n, listEnum=True)[0]
-                cmds.addAttr(node, ln=key, at=attr_type, en=enum)
+def _set_static_matrix(mm_node: str, index: int, nodes: list, attr: str) -> int:
+    """
+    nodesのattrの行列を順に掛け合わせた値をmultMatrixに設定し、nodesを空にする
 
-            else:
-                cmds.addAttr(node, ln=key, at=attr_type)
+    Returns:
+        int : multMatrixノードの、次に空いているインデックス
+    """
+    if not nodes:
+        return index
 
-        if [data] == cmds.listConnections(f"{node}.{key}", s=True, d=False, p=True):
-            return
+    matrix = om2.MMatrix()
+    for node in nodes:
+        matrix *= om2.MMatrix(cmds.getAttr(f"{node}.{attr}"))
 
-        cmds.connectAttr(data, f"{node}.{key}", f=True)
-        cmds.setAttr(f"{node}.{key}", l=True)
+    cmds.setAttr(f"{mm_node}.matrixIn[{index}]", list(matrix), type="matrix")
+    nodes.clear()
+    return index + 1
 
-    ### 動的な複数アトリビュート ###
 
-    def connect_list_attr(key, data, attr_type):
-        if check_list_attr(key):
-            if attr_type in DT_TYPES:
-                cmds.addAttr(node, ln=key, dt=attr_type, multi=True)
+def _has_offset_parent_matrix_input(node: str) -> bool:
+    if not cmds.attributeQuery("offsetParentMatrix", node=node, exists=True):
+        return False
 
-            else:
-                cmds.addAttr(node, ln=key, at=attr_type, multi=True)
+    return bool(cmds.listConnections(f"{node}.offsetParentMatrix", s=True, d=False))
 
-        for i, d in enumerate(data):
-            if [d] == cmds.listConnections(f"{node}.{key}[{i}]", s=True, d=False, p=True):
-                continue
 
-            cmds.connectAttr(d, f"{node}.{key}[{i}]", f=True)
-            cmds.setAttr(f"{node}.{key}[{i}]", l=True)
+def reset_matrix_network_cache() -> None:
+    """
+    connect_matrixで作成したノードのキャッシュを破棄する ビルドの開始時に呼ぶ
+    """
+    build_state.matrix_network_cache.clear()
 
-    for key in dict:
-        data = dict[key]
-        if isinstance(data, list):
-            d = data[0]
-            if isinstance(d, str):
-                if "." in d:
-                    attr_type = cmds.getAttr(d, type=True)
-                    connect_list_attr(key, data, attr_type)
 
-                else:
-                    list_of_str_attr(key, data)
+def get_connect_mode() -> str:
+    """
+    connect_matrixの接続モードを返す
+    """
+    return build_state.get_connect_mode()
 
-            elif isinstance(d, tuple):
-                if len(d) == 2:
-                    list_of_double2_attr(key, data)
 
-                elif len(d) == 3:
-                    list_of_double3_attr(key, data)
+def set_connect_mode(mode: str) -> str:
+    """
+    connect_matrixの接続モードを設定する
 
-                else:
-                    list_of_matrix_attr(key, data)
+    Args:
+        mode (str): build_state.CONNECT_MODE_DECOMPOSE もしくは build_state.CONNECT_MODE_OFFSET_PARENT
 
-            elif isinstance(d, float):
-                list_of_float_attr(key, data)
+    Returns:
+        str: 設定前の接続モード
+    """
+    return build_state.set_connect_mode(mode)
 
-            elif isinstance(d, bool):
-                list_of_bool_attr(key, data)
 
-            elif isinstance(d, int):
-                list_of_int_attr(key, data)
+def get_bake_static() -> bool:
+    """
+    ローカル接続で、動かないノードの行列をまとめて設定するかを返す
+    """
+    return build_state.get_bake_static()
 
-        else:
-            if isinstance(data, str):
-                if "." in data:
-                    attr_type = cmds.getAttr(data, type=True)
-                    connect_singular_attr(key, data, attr_type)
 
-                else:
-                    str_attr(key, data)
+def set_bake_static(enabled: bool) -> bool:
+    """
+    ローカル接続で、動かないノードの行列をまとめて設定するかを設定する
+    まとめたノードをビルド後に動かしても拘束には反映されない
 
-            elif isinstance(data, tuple):
-                if len(data) == 2:
-                    double2_attr(key, data)
+    Returns:
+        bool: 設定前の値
+    """
+    return build_state.set_bake_static(enabled)
 
-                elif len(data) == 3:
-                    double3_attr(key, data)
 
-                else:
-                    matrix_attr(key, data)
+def use_offset_parent_matrix(node: str) -> bool:
+    """
+    offsetParentMatrixモードで、ノードをoffsetParentMatrixで拘束できるかを返す
+    """
+    return get_connect_mode() == build_state.CONNECT_MODE_OFFSET_PARENT and can_connect_offset_parent_matrix(node)
 
-            elif isinstance(data, float):
-                float_attr(key, data)
 
-            elif isinstance(data, bool):
-                bool_attr(key, data)
+def can_connect_offset_parent_matrix(node: str) -> bool:
+    """
+    ノードのtranslate, rotate, scaleを初期値にし、offsetParentMatrixだけで拘束できるかを返す
 
-            elif isinstance(data, int):
-                int_attr(key, data)
+    以下の場合は拘束できない
+        offsetParentMatrixが無い、既に接続されている、もしくは単位行列でない
+        translate, rotate, scale, shearのいずれかがロック、もしくは接続されている
+        ピボット、rotateAxisが0でない
+        ジョイントのsegmentScaleCompensateが親、もしくは子のジョイントのscaleと接続されている
 
+    Args:
+        node (str): 拘束される側のノード名
 
-def list_to_tuple(in_list: list[list]) -> list[tuple]:
-    """
-    リストのリストを、タプルのリストに変換する
+    Returns:
+        bool: 拘束できるかどうか
     """
-    return [tuple(l) for l in in_list]
+    sel = om2.MSelectionList()
+    sel.add(node)
+    fn = om2.MFnDependencyNode(sel.getDependNode(0))
+    if not fn.hasAttribute("offsetParentMatrix"):
+        return False
 
+    plug = fn.findPlug("offsetParentMatrix", False)
+    if plug.isDestination or plug.isLocked:
+        return False
 
-def get_offset_matrix(node1: str, node2: str) -> list:
-    """
-    2つのノードのワールド上の差分のMatrixを返す
+    if not om2.MFnMatrixData(plug.asMObject()).matrix().isEquivalent(om2.MMatrix()):
+        return False
 
-    Args:
-        node1 (str): 差分を取りたいノード1
-        node2 (str): 差分を取りたいノード2
+    for attr in ("translate", "rotate", "scale", "shear"):
+        plug = fn.findPlug(attr, False)
+        for p in [plug] + [plug.child(i) for i in range(plug.numChildren())]:
+            if p.isDestination or p.isLocked:
+                return False
 
-    Returns:
-        list : 差分の行列をリストにしたもの
+    for attr in ("rotatePivot", "scalePivot", "rotatePivotTranslate", "scalePivotTranslate", "rotateAxis"):
+        if any(abs(v) > 1e-6 for v in cmds.getAttr(f"{node}.{attr}")[0]):
+            return False
 
-    """
-    mm = cmds.createNode("multMatrix", name="tmp")
+    if fn.typeName != "joint":
+        return True
 
-    cmds.connectAttr(f"{node2}.worldMatrix[0]", f"{mm}.matrixIn[0]")
-    cmds.connectAttr(f"{node1}.worldInverseMatrix[0]", f"{mm}.matrixIn[1]")
+    if cmds.getAttr(f"{node}.segmentScaleCompensate") and cmds.listConnections(f"{node}.inverseScale", s=True, d=False):
+        return False
 
-    offset_matrix = cmds.getAttr("%s.matrixSum"%(mm))
-    cmds.delete(mm)
+    for child in cmds.listConnections(f"{node}.scale", s=False, d=True, p=True) or []:
+        child_node, child_attr = child.split(".", 1)
+        if child_attr == "inverseScale" and cmds.getAttr(f"{child_node}.segmentScaleCompensate"):
+            return False
 
-    return offset_matrix
+    return True
 
 
-def connect_world_matrix_to_mm(src: str, dest: str, mm_node: str, start: int=1) -> int:
+def _round_matrix(matrix: list) -> tuple:
+    if matrix is None:
+        return None
+
+    return tuple(round(m, 6) for m in matrix)
+
+
+def _get_matrix_network(key: tuple) -> list:
     """
-    multMatrixノードにworldMatrixを接続する
+    キャッシュから同じ計算をしているノードを探す 削除されていた場合は破棄する
+    """
+    nodes = build_state.matrix_network_cache.get(key)
+    if nodes and all(cmds.objExists(n) for n in nodes if n):
+        node_ledger.claim(nodes)
+        return nodes
+
+    build_state.matrix_network_cache.pop(key, None)
+    return None
+
+
+def _create_matrix_network(src: str, dest: str, offset: list, post_matrix: list, lc: bool, name: str, decompose: bool=True) -> list:
+    """
+    offset * srcの行列 * destの親の逆行列 * post_matrix を計算するノードを作成する
+    同じ計算をするノードが既にあればそれを返す
 
     Args:
         src (str): 拘束する側のノード名
         dest (str): 拘束される側のノード名
-        start (str): 接続する一つ目のインデックス
+        offset (list): matrixIn[0]に設定する行列
+        post_matrix (list): 最後に掛ける行列 Noneの場合は掛けない
+        lc (bool): ローカル計算で接続するか
+        name (str): 作成するノードの名前に使う文字列
+        decompose (bool): decomposeMatrixを作成するか
 
     Returns:
-        int : multMatrixノードの、次に空いているインデックス
+        list : [mm_node, dm_node] decomposeがFalseの場合dm_nodeはNone
     """
-    cmds.connectAttr(f"{src}.worldMatrix[0]",f"{mm_node}.matrixIn[{start}]")
-    cmds.connectAttr(f"{dest}.parentInverseMatrix[0]",f"{mm_node}.matrixIn[{start + 1}]")
+    src_long = name_registry.get_full_path(src)
+    dest_parent = name_registry.get_full_path(dest).rpartition("|")[0] or None
+    key = ("local" if lc else "world", src_long, dest_parent, _round_matrix(offset), _round_matrix(post_matrix), decompose)
 
-    return start + 2
+    nodes = _get_matrix_network(key)
+    if nodes:
+        return nodes
 
+    mm_node = _create_node("multMatrix", name=f"Mm_{name}")
+    cmds.setAttr(f"{mm_node}.matrixIn[0]", offset, type="matrix")
+    if lc:
+        index = connect_local_matrix_to_mm(src, dest, mm_node)
 
-def connect_local_matrix_to_mm(src: str, dest: str, mm_node: str, start: int=1) -> int:
-    """
-    multMatrixノードにlocalMatrixを接続する
+    else:
+        index = connect_world_matrix_to_mm(src, dest, mm_node)
 
-    Args:
-        src (str): 拘束する側のノード名
-        dest (str): 拘束される側のノード名
-        start (str): 接続する一つ目のインデックス
+    if post_matrix is not None:
+        cmds.setAttr(f"{mm_node}.matrixIn[{index}]", post_matrix, type="matrix")
+
+    dm_node = None
+    if decompose:
+        dm_node = _create_node("decomposeMatrix", name=f"Dm_{name}")
+        cmds.connectAttr(f"{mm_node}.matrixSum", f"{dm_node}.inputMatrix")
+
+    build_state.matrix_network_cache[key] = [mm_node, dm_node]
+    return [mm_node, dm_node]
+
+
+def _create_rot_matrix_network(mm_node: str, post_matrix: list, name: str) -> list:
+    """
+    mm_nodeの結果にpost_matrixを掛けるノードを作成する
+    同じ計算をするノードが既にあればそれを返す
 
     Returns:
-        int : multMatrixノードの、次に空いているインデックス
+        list : [mm_node, dm_node]
     """
-    srcs = cmds.listRelatives(src, allParents=True, fullPath=True)[0] + "|" + src
-    dsts = cmds.listRelatives(dest, allParents=True, fullPath=True)[0]
+    key = ("rot", mm_node, _round_matrix(post_matrix))
+    nodes = _get_matrix_network(key)
+    if nodes:
+        return nodes
 
-    srcs = srcs.split('|')[1:]
-    dsts = dsts.split('|')[1:]
+    mm_rot_node = _create_node("multMatrix", name=f"Mm_{name}")
+    cmds.connectAttr(f"{mm_node}.matrixSum", f"{mm_rot_node}.matrixIn[0]")
+    cmds.setAttr(f"{mm_rot_node}.matrixIn[1]", post_matrix, type="matrix")
 
-    root = None
-    i = 0
-    src = srcs
-    dest = dsts + [dest]
-    while True:
-        if src[i] == dest[i]:
-            root = src[i]
-            i += 1
-        else:
-            break
+    dm_rot_node = _create_node("decomposeMatrix", name=f"Dm_{name}")
+    cmds.connectAttr(f"{mm_rot_node}.matrixSum", f"{dm_rot_node}.inputMatrix")
 
-    srcs = list(reversed(srcs[srcs.index(root) + 1:]))
-    dsts = dsts[dsts.index(root) + 1:]
-    
-    for i, node in enumerate(srcs, start=start):
-        cmds.connectAttr(f"{node}.matrix", f"{mm_node}.matrixIn[{i}]")
+    build_state.matrix_network_cache[key] = [mm_rot_node, dm_rot_node]
+    return [mm_rot_node, dm_rot_node]
 
-    index = len(srcs) + start
 
-    for i, node in enumerate(dsts, start=index):
-        cmds.connectAttr(f"{node}.inverseMatrix", f"{mm_node}.matrixIn[{i}]")
+def _connect_offset_parent_matrix(src: str, dest: str, offset: list, jo_inverse: list, lc: bool, name: str) -> str:
+    """
+    multMatrixの結果をoffsetParentMatrixに接続し、translate, rotate, scaleを初期値にする
+    ジョイントはjointOrientが残るため、先にjointOrientの逆行列を掛けておく
 
-    index += len(dsts)
-    return index
+    Returns:
+        str : mm_node
+    """
+    if jo_inverse is not None:
+        offset = list(om2.MMatrix(jo_inverse) * om2.MMatrix(offset))
+
+    mm_node = _create_matrix_network(src, dest, offset, None, lc, name, decompose=False)[0]
+    cmds.connectAttr(f"{mm_node}.matrixSum", f"{dest}.offsetParentMatrix")
+
+    cmds.setAttr(f"{dest}.translate", 0, 0, 0)
+    cmds.setAttr(f"{dest}.rotate", 0, 0, 0)
+    cmds.setAttr(f"{dest}.scale", 1, 1, 1)
+    cmds.setAttr(f"{dest}.shear", 0, 0, 0)
+
+    return mm_node
 
 
 def connect_matrix(src: str, dest: str, tl: bool=False, rt: bool=False, sc: bool=False, lc: bool=False, suffix: str="") -> list:
     """
     matrixでノード同士を拘束する
+    同じソース、オフセット、親の組み合わせの計算ノードが既にある場合はそれを共有する
+    offsetParentMatrixモードで全ての成分を拘束する場合は、可能であればdecomposeMatrixを使わずにoffsetParentMatrixに接続する
 
     Args:
         src (str): 拘束する側のノード名
@@ -1207,67 +1291,39 @@ def connect_matrix(src: str, dest: str, tl: bool=False, rt: bool=False, sc: bool
 
     Returns:
         list : 作成されたノードのリスト [mm_node, dm_node, mm_rot_node, dm_rot_node]
+               offsetParentMatrixに接続した場合は [mm_node, None, None, None]
     """
-    mm_node = _create_node("multMatrix", name=f"Mm_{dest}{suffix}")
-    cmds.setAttr(f"{mm_node}.matrixIn[0]", get_offset_matrix(src, dest), type="matrix")
-    if lc:
-        index = connect_local_matrix_to_mm(src, dest, mm_node)
-
-    else:
-        index = connect_world_matrix_to_mm(src, dest, mm_node)
-
-    node_type = cmds.nodeType(dest)
-    if node_type == "joint":
-        tmp_cm = cmds.createNode("composeMatrix", name="tmp_Cm")
-        tmp_im = cmds.createNode("inverseMatrix", name="tmp_Im")
-        cmds.connectAttr(f"{dest}.jointOrient", f"{tmp_cm}.inputRotate")
-        cmds.connectAttr(f"{tmp_cm}.outputMatrix", f"{tmp_im}.inputMatrix")
-        cmds.setAttr(f"{mm_node}.matrixIn[{index}]", cmds.getAttr(f"{tmp_im}.outputMatrix"), type="matrix")
-        cmds.delete(tmp_cm, tmp_im)
+    offset = get_offset_matrix(src, dest)
+    jo_inverse = None
+    if cmds.nodeType(dest) == "joint":
+        jo_inverse = get_joint_orient_inverse_matrix(dest)
 
-    dm_node = _create_node("decomposeMatrix", name=f"Dm_{dest}{suffix}")
-    cmds.connectAttr(f"{mm_node}.matrixSum", f"{dm_node}.inputMatrix")
+    if tl and rt and sc and use_offset_parent_matrix(dest):
+        mm_node = _connect_offset_parent_matrix(src, dest, offset, jo_inverse, lc, f"{dest}{suffix}")
+        return [mm_node, None, None, None]
 
     mm_rot_node = None
     dm_rot_node = None
 
-    connect_type = 1
-    if node_type == "joint":
-        if tl or sc:
-            mm_rot_node = cmds.rename(mm_node, f"{mm_node}_Rot")
-            dm_rot_node = cmds.rename(dm_node, f"{dm_node}_Rot")
-            mm_node, dm_node = cmds.duplicate([mm_rot_node, dm_rot_node], ic=True)
-
-            mm_node = cmds.rename(mm_node, mm_node.replace("_Rot1", ""))
-            dm_node = cmds.rename(dm_node, dm_node.replace("_Rot1", ""))
-            cmds.setAttr(f"{mm_node}.matrixIn[{index}]", [1,0,0,0,0,1,0,0,0,0,1,0,0,0,0,1], type="matrix")
-            connect_type = 2
-
-    if connect_type == 1:
-        if tl:
-            for axis in "XYZ":
-                cmds.connectAttr(f"{dm_node}.outputTranslate{axis}", f"{dest}.translate{axis}")
+    if jo_inverse is not None and (tl or sc):
+        # translateとscaleはjointOrientを含まない行列から、rotateはjointOrientの逆行列を掛けた行列から取る
+        mm_node, dm_node = _create_matrix_network(src, dest, offset, None, lc, f"{dest}{suffix}")
         if rt:
-            for axis in "XYZ":
-                cmds.connectAttr(f"{dm_node}.outputRotate{axis}", f"{dest}.rotate{axis}")
-        if sc:
-            for axis in "XYZ":
-                cmds.connectAttr(f"{dm_node}.outputScale{axis}", f"{dest}.scale{axis}")
-            cmds.connectAttr(f"{dm_node}.outputShear", f"{dest}.shear")
+            mm_rot_node, dm_rot_node = _create_rot_matrix_network(mm_node, jo_inverse, f"{dest}{suffix}_Rot")
 
-    if connect_type == 2:
-        if tl:
-            for axis in "XYZ":
-                cmds.connectAttr(f"{dm_node}.outputTranslate{axis}", f"{dest}.translate{axis}")
-        if rt:
-            for axis in "XYZ":
-                cmds.connectAttr(f"{dm_rot_node}.outputRotate{axis}", f"{dest}.rotate{axis}")
-        if sc:
-            for axis in "XYZ":
-                cmds.connectAttr(f"{dm_node}.outputScale{axis}", f"{dest}.scale{axis}")
-            cmds.connectAttr(f"{dm_node}.outputShear", f"{dest}.shear")
-        if not rt:
-            cmds.delete(mm_node, dm_node)
+    else:
+        mm_node, dm_node = _create_matrix_network(src, dest, offset, jo_inverse, lc, f"{dest}{suffix}")
+
+    if tl:
+        for axis in "XYZ":
+            cmds.connectAttr(f"{dm_node}.outputTranslate{axis}", f"{dest}.translate{axis}")
+    if rt:
+        for axis in "XYZ":
+            cmds.connectAttr(f"{dm_rot_node or dm_node}.outputRotate{axis}", f"{dest}.rotate{axis}")
+    if sc:
+        for axis in "XYZ":
+            cmds.connectAttr(f"{dm_node}.outputScale{axis}", f"{dest}.scale{axis}")
+        cmds.connectAttr(f"{dm_node}.outputShear", f"{dest}.shear")
 
     return [mm_node, dm_node, mm_rot_node, dm_rot_node]
 
@@ -1386,6 +1442,37 @@ def connect_scale_constraint(src, dest, mo=False):
     return node
 
 
+def connect_transform(src: str, dest: str) -> list:
+    """
+    srcのワールド上の位置、回転、スケールにdestを拘束する
+    通常はparentConstraintとscaleConstraintを使う
+    offsetParentMatrixモードでは、srcがoffsetParentMatrixで動いている場合もあるためworldMatrixを使うconnect_matrixで拘束する
+
+    Args:
+        src (str): 拘束する側のノード名
+        dest (str): 拘束される側のノード名
+
+    Returns:
+        list : 作成されたノードのリスト
+    """
+    if get_connect_mode() == build_state.CONNECT_MODE_OFFSET_PARENT:
+        return [n for n in connect_matrix(src, dest, tl=True, rt=True, sc=True) if n]
+
+    return [connect_parent_constraint(src, dest), connect_scale_constraint(src, dest)]
+
+
+def get_transform_attrs() -> list[str]:
+    """
+    プロキシからジョイントへconnect_same_attrで接続するアトリビュートを返す
+    offsetParentMatrixモードではoffsetParentMatrixも接続する
+    """
+    attrs = ["translate", "rotate", "scale"]
+    if get_connect_mode() == build_state.CONNECT_MODE_OFFSET_PARENT:
+        attrs.append("offsetParentMatrix")
+
+    return attrs
+
+
 def connect_same_attr(src: str, dest: str, attrs: list[str]) -> None:
     """
     同名のアトリビュート同士を接続する
@@ -1923,18 +2010,14 @@ def mirror_space(node: str, axis: str="X") -> list[list[float]]:
         list : 反転後のtransform情報 [[tx, ty, tz], [rx, ry, rz], [sx, sy, sz]]
     """
 
-    parent = cmds.listRelatives(node, p=True)
-    tmp_space = cmds.createNode("transform")
-
-    cmds.parent(node, tmp_space)
-    cmds.setAttr(f"{tmp_space}.scale{axis}", -1)
-    if parent:
-        cmds.parent(node, parent[0])
-
-    else:
-        cmds.parent(node, w=True)
+    # 原点でaxis方向に-1倍した親に入れて戻すのと同じ行列を計算する
+    world_matrix = om2.MMatrix(cmds.getAttr(f"{node}.worldMatrix[0]"))
+    parent_inverse_matrix = om2.MMatrix(cmds.getAttr(f"{node}.parentInverseMatrix[0]"))
+    reflect = om2.MMatrix()
+    i = "XYZ".index(axis)
+    reflect.setElement(i, i, -1)
 
-    cmds.delete(tmp_space)
+    cmds.xform(node, m=list(world_matrix * reflect * parent_inverse_matrix))
     matrix = cmds.getAttr(f"{node}.matrix")
     return decompose_matrix(matrix)
 
@@ -2124,7 +2207,7 @@ def rebuild_curve(curve, pnum):
 
 def get_curve_points_pos(curve) -> list[list[float]]:
     cv = cmds.listRelatives(curve, s=True)[0]
-    return [cmds.getAttr(f"{cv}.controlPoints[{i}]")[0] for i in range(cmds.getAttr(f"{cv}.controlPoints", size=True))]
+    return curve_points.get_points(cv)
 
 
 def cluster_curve(curve, prefix="Cluster_"):
@@ -1,5 +1,5 @@
 import re
-from maya import cmds
+from ysrig.cmds_proxy import cmds
 
 def connect_attr(src: list, dest: list, debug_print=False) -> None:
     """
@@ -3,8 +3,8 @@ import inspect
 from traceback import *
 import importlib
 from maya.api.OpenMaya import MGlobal
-from maya import cmds
-from ysrig import core
+from ysrig.cmds_proxy import cmds
+from ysrig import core, meta_snapshot, profiler, fast_build, node_ledger, plan_cache, name_registry
 importlib.reload(core)
 
 class CtrlBace:
@@ -12,33 +12,39 @@ class CtrlBace:
     コントローラー作成の基底クラス
     """
     def __init__(self, meta_node):
-        self._setup(meta_node)                 # 変数宣言
-        self.setup()
-        self.check_build()                     # ビルド条件を満たすかチェック
+        self._stage(self._setup, meta_node)               # 変数宣言
+        self._stage(self.setup)
+        self._stage(self.check_build)                     # ビルド条件を満たすかチェック
 
         if not self.build:
             return
 
-        self._get_color_class()
-        self._create_grp()
-        self.pre_process()                 # 前処理
-        self._create()                     # ノード作成
-        self.create()
-        self.set_color()                   # 色設定
-        self.set_space_transform()         # spaceノードのmatrix設定
-        self._add_settings()               # 設定用アトリビュート追加
-        self.add_settings()
-        self._connect()                    # ノード接続
-        self.connect()
-        self._set_attr()                   # アトリビュート設定
-        self._lock_attributes()            # ロックするアトリビュートを指定
-        self.lock_attributes()
-        self._lock()                       # アトリビュートロック
-        self._distribute_shape_instances()
-        self._collect_meta_data()          # メタノードに書き込む情報を指定
-        self.collect_meta_data()
-        self.post_process()                # 後処理
-        self._set_meta_data()              # メタノードに情報書き込み
+        self._stage(self._get_color_class)
+        self._stage(self._create_grp)
+        self._stage(self.pre_process)                 # 前処理
+        self._stage(self._create)                     # ノード作成
+        self._stage(self.create)
+        self._stage(self.set_color)                   # 色設定
+        self._stage(self.set_space_transform)         # spaceノードのmatrix設定
+        self._stage(self._add_settings)               # 設定用アトリビュート追加
+        self._stage(self.add_settings)
+        self._stage(self._connect)                    # ノード接続
+        self._stage(self.connect)
+        self._stage(self._set_attr)                   # アトリビュート設定
+        self._stage(self._lock_attributes)            # ロックするアトリビュートを指定
+        self._stage(self.lock_attributes)
+        self._stage(self._lock)                       # アトリビュートロック
+        self._stage(self._distribute_shape_instances)
+        self._stage(self._collect_meta_data)          # メタノードに書き込む情報を指定
+        self._stage(self.collect_meta_data)
+        self._stage(self.post_process)                # 後処理
+        self._stage(self._set_meta_data)              # メタノードに情報書き込み
+
+    def _stage(self, func, *args):
+        """
+        ステージを呼び出す profilerで計測中であれば処理時間を記録する
+        """
+        return profiler.stage(self, func, *args)
 
     def _setup(self, meta_node):
         self.build = True
@@ -49,6 +55,7 @@ class CtrlBace:
         self.color_class = None
 
         self.meta_node = meta_node
+        self.meta = meta_snapshot.get(meta_node)
         self.grp = None
         self.settings_node = None
         self.ctrls = [] 
@@ -57,23 +64,19 @@ class CtrlBace:
         self._lock_attrs = []
         self.lock_attrs = []
 
-        self.grp_name = cmds.getAttr(f"{self.meta_node}.GroupName")
-        self.side = cmds.getAttr(f"{self.meta_node}.Side")
-        self.joint_count = cmds.getAttr(f"{self.meta_node}.JointCount")
-        self.joint_names = core.get_list_attributes(self.meta_node, "JointName")
-        self.guide_world_matrices = core.get_list_attributes(self.meta_node, "GuidesWorldMatrix")
+        self.grp_name = self.meta.get("GroupName")
+        self.side = self.meta.get("Side")
+        self.joint_count = self.meta.get("JointCount")
+        self.joint_names = self.meta.get_list("JointName")
+        self.guide_world_matrices = self.meta.get_list("GuidesWorldMatrix")
 
     def setup(self):
         pass
 
     def check_build(self):
-        if cmds.objExists(f"CtrlEdit_{self.grp_name}_Group"):
+        if name_registry.exists_any([f"CtrlEdit_{self.grp_name}_Group"] + [f"Edit_{name}" for name in self.joint_names]):
             self.build = False
 
-        for name in self.joint_names:
-            if  cmds.objExists(f"Edit_{name}"):
-                self.build = False
-
     def _get_color_class(self):
         file_path = inspect.getfile(self.__class__)  # クラスのあるファイルパス
         dir_path = os.path.dirname(file_path)        # 親ディレクトリのパス
@@ -132,11 +135,12 @@ class CtrlBace:
         pass
 
     def _set_attr(self):
-        if not cmds.attributeQuery("LineWidth", node=self.meta_node, exists=True):
+        meta = meta_snapshot.get(self.meta_node)
+        if "LineWidth" not in meta:
             return
         
-        width = cmds.getAttr(f"{self.meta_node}.LineWidth")
-        ctrl_matrices = core.get_list_attributes(self.meta_node, "CtrlsMatrix")
+        width = meta.get("LineWidth")
+        ctrl_matrices = meta.get_list("CtrlsMatrix")
 
         for ctrl, matrix in zip(self.ctrls, ctrl_matrices):
             pos, rot, scl = core.decompose_matrix(matrix)
@@ -206,13 +210,64 @@ class CtrlColorBase:
                 core.set_ctrl_shape_color(ctrl, core.CENTER_MAIN_COLOR)
 
 
-def main():
-    cmds.undoInfo(ock=True)
+def create_module(meta_node: str) -> CtrlBace:
+    """
+    メタノードのモジュールのCtrlクラスをインスタンス化する
+    plan_cacheが有効な場合、入力が同じビルドの記録があれば再生してplan_cache.ReplayedModuleを返す
+    """
+    module = meta_snapshot.get(meta_node).get("Module")
+    module = importlib.import_module(f"ysrig.modules.{module}.ctrl")
+    klass = getattr(module, "Ctrl")
+
+    # 作成したノードをメタノードに記録する ビルドしなかった場合は前回の記録を残す
+    recorder = node_ledger.Recorder(meta_node, node_ledger.PHASE_CONTROLLER)
+    with recorder:
+        module = plan_cache.build(meta_node, node_ledger.PHASE_CONTROLLER, klass)
+
+    if module.build:
+        recorder.write()
+
+    return module
+
+
+def build(meta_nodes: list[str], create=create_module) -> list[CtrlBace]:
+    """
+    コントローラーを作成する アンドゥチャンクとプログレスウィンドウは呼び出し側で扱う
+
+    Args:
+        meta_nodes (list): メタノード bodyモジュール、facialモジュールの順
+        create (function): メタノードからモジュールのインスタンスを作成する関数
+
+    Returns:
+        list: 作成したモジュールのインスタンス
+    """
+    plan_cache.reset(node_ledger.PHASE_CONTROLLER)
+    with name_registry.session():
+        return [create(meta) for meta in meta_nodes]
+
+
+def remove_all() -> None:
+    """
+    コントローラーを削除する メタノードに記録された、グループの外のノードも削除する
+    """
+    meta_nodes = core.get_meta_nodes() + core.get_facial_meta_nodes()
+    node_ledger.remove(meta_nodes, node_ledger.PHASE_CONTROLLER, extra=[core.CTRL_EDIT_GROUP_NAME])
+
+
+def main(fast: bool=False):
+    """
+    全てのモジュールのコントローラーをビルドする
+
+    Args:
+        fast (bool): アンドゥの記録とビューポートの更新を止めてビルドするか
+                     失敗した場合はアンドゥの代わりに作成したノードを削除する
+    """
+    transaction = fast_build.BuildTransaction(fast)
+    transaction.begin()
 
     try:
         meta_nodes = core.get_meta_nodes()
         meta_nodes += core.get_facial_meta_nodes()
-        modules = [None] * len(meta_nodes)
 
         # プログレスウィンドウの初期化
         if cmds.progressWindow(q=True, isCancelled=True):
@@ -225,22 +280,22 @@ def main():
                             isInterruptable=False)
 
         # モジュールのメタノードを読み込んでインスタンスを作る
-        for i, meta in enumerate(meta_nodes):
-            module = cmds.getAttr(f"{meta}.Module")
-            module = importlib.import_module(f"ysrig.modules.{module}.ctrl")
-            klass = getattr(module, "Ctrl")
-            modules[i] = klass(meta)
+        def create(meta):
+            transaction.track(meta)
+            module = create_module(meta)
+            transaction.track()
 
             # 進捗を更新
             cmds.progressWindow(e=True, step=1, status=f"Building {meta}...")
+            return module
+
+        build(meta_nodes, create)
 
         cmds.select(cl=True)
-        cmds.undoInfo(cck=True)
-        
+        transaction.end(True)
 
     except:
-        cmds.undoInfo(cck=True)
-        cmds.undo()
+        transaction.end(False)
         print_exc()
         MGlobal.displayError("予期せぬエラーが発生しました")
 
@@ -0,0 +1,251 @@
+import math
+from ysrig.cmds_proxy import cmds
+import maya.api.OpenMaya as om2
+
+try:
+    from ysrig import mathlib
+
+except ImportError: # numpyが無い環境ではom2で計算する
+    mathlib = None
+
+
+def get_shapes(node: str) -> list[str]:
+    """
+    ノード配下のNURBSカーブシェイプを返す
+
+    Args:
+        node (str): transformノード名 もしくはシェイプ名
+
+    Returns:
+        list: シェイプ名のリスト
+    """
+    if cmds.objectType(node, isAType="nurbsCurve"):
+        return [node]
+
+    return cmds.listRelatives(node, s=True, type="nurbsCurve", fullPath=True) or []
+
+
+def get_points(shape: str) -> list[tuple[float]]:
+    """
+    シェイプの全コントロールポイントのローカル座標を一度に取得する
+
+    Args:
+        shape (str): カーブシェイプ名
+
+    Returns:
+        list: [(x, y, z), ...]
+    """
+    num = cmds.getAttr(f"{shape}.controlPoints", size=True)
+    if not num:
+        return []
+
+    points = cmds.getAttr(f"{shape}.controlPoints[0:{num - 1}]")
+    return [tuple(p) for p in points]
+
+
+def set_points(shape: str, points: list, start: int=0) -> None:
+    """
+    シェイプのコントロールポイントのローカル座標を一度に設定する
+
+    Args:
+        shape (str): カーブシェイプ名
+        points (list): [(x, y, z), ...]
+        start (int): pointsの最初の座標を設定するコントロールポイントのインデックス
+    """
+    if not len(points):
+        return
+
+    flat = [float(v) for p in points for v in p[:3]]
+    cmds.setAttr(f"{shape}.controlPoints[{start}:{start + len(points) - 1}]", *flat, type="double3")
+
+
+def set_changed_points(shape: str, points: list, changed: list) -> None:
+    """
+    値が変わったコントロールポイントだけを、連続する範囲ごとに一度ずつ設定する
+
+    Args:
+        shape (str): カーブシェイプ名
+        points (list): 全コントロールポイントの [(x, y, z), ...]
+        changed (list): pointsと同じ長さの、値が変わったかどうかのリスト
+    """
+    start = None
+    for i, flag in enumerate(list(changed) + [False]):
+        if flag and start is None:
+            start = i
+
+        elif not flag and start is not None:
+            set_points(shape, points[start:i], start)
+            start = None
+
+
+def get_world_matrix(shape: str) -> om2.MMatrix:
+    """
+    シェイプのワールド行列を返す
+
+    Args:
+        shape (str): カーブシェイプ名
+
+    Returns:
+        om2.MMatrix: 行列
+    """
+    return om2.MMatrix(cmds.getAttr(f"{shape}.worldMatrix[0]"))
+
+
+def get_world_points(shape: str) -> list[tuple[float]]:
+    """
+    シェイプの全コントロールポイントのワールド座標を一度に取得する
+    ポイントごとにpointPositionを呼ぶ代わりにローカル座標とワールド行列から計算する
+
+    Args:
+        shape (str): カーブシェイプ名
+
+    Returns:
+        list: [(x, y, z), ...]
+    """
+    return transform_points(get_points(shape), get_world_matrix(shape))
+
+
+def set_world_points(shape: str, points: list) -> None:
+    """
+    シェイプの全コントロールポイントをワールド座標で一度に設定する
+
+    Args:
+        shape (str): カーブシェイプ名
+        points (list): [(x, y, z), ...]
+    """
+    set_points(shape, transform_points(points, get_world_matrix(shape).inverse()))
+
+
+def clamp_points(points: list, axis: int=1, minimum: float=None, maximum: float=None) -> tuple[list, bool]:
+    """
+    座標のリストを指定軸の範囲内に収める
+
+    Args:
+        points (list): [(x, y, z), ...]
+        axis (int): 0 = x, 1 = y, 2 = z
+        minimum (float): 最小値 Noneの場合は制限しない
+        maximum (float): 最大値 Noneの場合は制限しない
+
+    Returns:
+        list: [(x, y, z), ...]
+        bool: 1つでも値が変わったかどうか
+    """
+    result = []
+    changed = False
+    for p in points:
+        v = p[axis]
+        if minimum is not None and v < minimum:
+            v = minimum
+
+        if maximum is not None and v > maximum:
+            v = maximum
+
+        if v != p[axis]:
+            p = list(p)
+            p[axis] = v
+            p = tuple(p)
+            changed = True
+
+        result.append(p)
+
+    return result, changed
+
+
+def compose_matrix(translate: list=[0, 0, 0], rotate: list=[0, 0, 0], scale: list=[1, 1, 1]) -> om2.MMatrix:
+    """
+    translate, rotate, scaleから行列を作成する
+    一時的なtransformノードにアトリビュートを設定した場合と同じ結果になる
+
+    Args:
+        translate (list): [tx, ty, tz]
+        rotate (list): [rx, ry, rz] 度数法 回転順序はxyz
+        scale (list): [sx, sy, sz]
+
+    Returns:
+        om2.MMatrix: 行列
+    """
+    tf = om2.MTransformationMatrix()
+    tf.setScale(scale, om2.MSpace.kTransform)
+    tf.setRotation(om2.MEulerRotation(*[math.radians(r) for r in rotate]))
+    tf.setTranslation(om2.MVector(translate), om2.MSpace.kTransform)
+
+    return tf.asMatrix()
+
+
+def transform_points(points: list, matrix) -> list[tuple[float]]:
+    """
+    座標のリストに行列を掛ける
+
+    Args:
+        points (list): [(x, y, z), ...]
+        matrix (om2.MMatrix or list): 4x4の行列
+
+    Returns:
+        list: [(x, y, z), ...]
+    """
+    matrix = om2.MMatrix(matrix)
+    result = []
+    for p in points:
+        pt = om2.MPoint(p[0], p[1], p[2]) * matrix
+        result.append((pt.x, pt.y, pt.z))
+
+    return result
+
+
+def transform_shape(node: str, matrix) -> None:
+    """
+    シェイプのコントロールポイントに行列を焼き込む
+    一時的なtransformノードに入れてmakeIdentityする処理をメモリ上で行う
+
+    Args:
+        node (str): transformノード名 もしくはシェイプ名
+        matrix (om2.MMatrix or list): 4x4の行列
+    """
+    for shape in get_shapes(node):
+        set_points(shape, transform_points(get_points(shape), matrix))
+
+
+def clamp_shape(node: str, axis: int=1, minimum: float=None, maximum: float=None, ws: bool=True) -> None:
+    """
+    シェイプのコントロールポイントを指定軸の範囲内に収める
+    読み込みはシェイプごとに一度 全てのポイントをまとめて判定し、値が変わったポイントだけを書き込む
+
+    Args:
+        node (str): transformノード名 もしくはシェイプ名
+        axis (int): 0 = x, 1 = y, 2 = z
+        minimum (float): 最小値
+        maximum (float): 最大値
+        ws (bool): ワールド座標で判定するかどうか
+    """
+    for shape in get_shapes(node):
+        points = get_points(shape)
+        if not points:
+            continue
+
+        matrix = get_world_matrix(shape) if ws else None
+        if mathlib is not None:
+            if ws:
+                points = mathlib.transform_points(points, list(matrix))
+
+            clamped, changed = mathlib.clamp_axis(points, axis, minimum, maximum)
+            if not changed.any():
+                continue
+
+            if ws:
+                clamped = mathlib.transform_points(clamped, list(matrix.inverse()))
+
+            set_changed_points(shape, clamped.tolist(), changed.tolist())
+            continue
+
+        if ws:
+            points = transform_points(points, matrix)
+
+        clamped, _ = clamp_points(points, axis, minimum, maximum)
+        changed = [a != b for a, b in zip(points, clamped)]
+        if not any(changed):
+            continue
+
+        if ws:
+            clamped = transform_points(clamped, matrix.inverse())
+
+        set_changed_points(shape, clamped, changed)
@@ -2,7 +2,7 @@ import os
 import json
 from maya import cmds
 from maya.api.OpenMaya import MGlobal
-from ysrig import core
+from ysrig import core, node_ledger
 
 
 def get_meta_data():
@@ -23,6 +23,9 @@ def get_meta_data():
             if attr == "PickerData":
                 continue
 
+            if attr in node_ledger.LEDGER_ATTRS.values():
+                continue
+
             if cmds.attributeQuery(attr, node=meta_node, multi=True):
                 data[attr] = core.get_list_attributes(meta_node, attr)
 
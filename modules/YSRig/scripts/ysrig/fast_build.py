@@ -0,0 +1,133 @@
+"""
+ビルドをアンドゥチャンクにまとめる代わりに、アンドゥの記録とビューポートの更新を止めて実行する
+
+    from ysrig import build_pipeline
+    result = build_pipeline.build_all(fast=True)
+
+    from ysrig import rig_base
+    rig_base.main(fast=True)
+
+fastモードでは作成したノードをモジュールごとに記録し、エラーが発生した場合は
+アンドゥの代わりに記録したノードだけを削除して元に戻す
+既存のノードに追加したアトリビュートや接続、値の変更は元に戻らないため、
+アンドゥの粒度が必要ないスクリプトやバッチでのビルドに使う
+
+記録中の状態を保持するため、このモジュールはreloadしない
+"""
+import maya.api.OpenMaya as om2
+from ysrig.cmds_proxy import cmds
+
+# モジュールの外で作成されたノードを記録するキー
+SHARED = ""
+
+
+class BuildTransaction:
+    """
+    ビルドの開始から終了までをまとめ、失敗した場合に元に戻すクラス
+
+    fastがFalseの場合はアンドゥチャンクを開き、失敗した場合はアンドゥする
+    fastがTrueの場合はアンドゥの記録とビューポートの更新を止め、
+    失敗した場合は作成したノードを削除する
+
+    Args:
+        fast (bool): fastモードで実行するか
+    """
+    def __init__(self, fast: bool=False):
+        self.fast = fast
+        self.nodes = {}            # {メタノード: [MObjectHandle]} 作成順
+        self.handles = []          # 全てのモジュールのMObjectHandle 作成順
+        self.current = SHARED
+
+        self._undo_state = None
+        self._refresh_suspended = None
+        self._callback = None
+
+    def begin(self) -> None:
+        if not self.fast:
+            cmds.undoInfo(ock=True)
+            return
+
+        self._undo_state = cmds.undoInfo(q=True, state=True)
+        self._refresh_suspended = cmds.refresh(q=True, suspend=True)
+        cmds.undoInfo(stateWithoutFlush=False)
+        cmds.refresh(suspend=True)
+        self._callback = om2.MDGMessage.addNodeAddedCallback(self._node_added, "dependNode")
+
+    def track(self, meta_node: str=SHARED) -> None:
+        """
+        以降に作成されるノードを記録するモジュールを切り替える
+        """
+        self.current = meta_node
+
+    def _node_added(self, mobj, *args):
+        handle = om2.MObjectHandle(mobj)
+        self.nodes.setdefault(self.current, []).append(handle)
+        self.handles.append(handle)
+
+    def end(self, success: bool) -> None:
+        """
+        ビルドを終了する 失敗した場合は元に戻す
+
+        Args:
+            success (bool): ビルドが成功したか
+        """
+        if not self.fast:
+            cmds.undoInfo(cck=True)
+            if not success:
+                cmds.undo()
+
+            return
+
+        if self._callback is not None:
+            om2.MMessage.removeCallback(self._callback)
+            self._callback = None
+
+        try:
+            if not success:
+                self.rollback()
+
+        finally:
+            cmds.refresh(suspend=self._refresh_suspended)
+            cmds.undoInfo(stateWithoutFlush=self._undo_state)
+
+    def created_nodes(self, meta_node: str=None) -> list[str]:
+        """
+        記録したノードのうち、存在しているものの名前を返す
+
+        Args:
+            meta_node (str): モジュールのメタノード Noneの場合は全て
+
+        Returns:
+            list: 作成順のノード名
+        """
+        handles = self.handles if meta_node is None else self.nodes.get(meta_node, [])
+        return [get_name(h) for h in handles if h.isValid()]
+
+    def rollback(self) -> int:
+        """
+        記録したノードを作成と逆の順に削除する
+        親や接続元と一緒に削除されたノードは飛ばす
+
+        Returns:
+            int: 削除したノードの数
+        """
+        count = 0
+        for handle in reversed(self.handles):
+            if handle.isValid():
+                cmds.delete(get_name(handle))
+                count += 1
+
+        self.nodes = {}
+        self.handles = []
+        return count
+
+
+def get_name(handle: om2.MObjectHandle) -> str:
+    """
+    MObjectHandleのノード名を返す DAGノードは一意になるパス
+    """
+    mobj = handle.object()
+    if mobj.hasFn(om2.MFn.kDagNode):
+        return om2.MFnDagNode(mobj).partialPathName()
+
+    return om2.MFnDependencyNode(mobj).name()
@@ -2,11 +2,15 @@ import os
 import json
 import inspect
 import importlib
-import winsound
+try:
+    import winsound
+
+except ImportError: # Windows以外、代替シーンで実行する場合
+    winsound = None
 import re
 from maya import cmds, OpenMayaUI
 from maya.api.OpenMaya import MGlobal
-from ysrig import core
+from ysrig import core, meta_snapshot
 importlib.reload(core)
 
 
@@ -35,7 +39,8 @@ elif int(ver) >= 2025:
 # グローバル変数
 this_file = os.path.abspath(__file__)                                                       # このファイルのパス
 prefs_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "prefs"))  # prefsディレクトリのパス
-maya_main_window = wrapInstance(int(OpenMayaUI.MQtUtil.mainWindow()), QtWidgets.QWidget)    # mayaのメインウィンドウ
+_main_window_ptr = OpenMayaUI.MQtUtil.mainWindow()
+maya_main_window = wrapInstance(int(_main_window_ptr), QtWidgets.QWidget) if _main_window_ptr is not None else None    # mayaのメインウィンドウ
 
 
 # GUI上の色リスト(RGB, 0-255)
@@ -908,7 +913,7 @@ class YSModuleList(QtWidgets.QDialog):
         self.layout.addWidget(self.button)
 
     def load_module(self):
-        modules = [cmds.getAttr(f"{meta}.GroupName") for meta in self.meta_nodes + self.facial_meta_nodes]
+        modules = [meta_snapshot.get(meta).get("GroupName") for meta in self.meta_nodes + self.facial_meta_nodes]
 
         self.module_list.addItems(modules)
 
@@ -916,7 +921,7 @@ class YSModuleList(QtWidgets.QDialog):
         module = self.module_list.currentItem()
 
         meta = f"Meta_{module.text()}"
-        joints = core.get_list_attributes(meta, "JointName")
+        joints = meta_snapshot.get(meta).get_list("JointName")
         joints = [jt for jt in joints if "_GB" not in jt]
         self.joint_list.clear()
         self.joint_list.addItems(joints)
@@ -1271,7 +1276,8 @@ class YSWarningDialog(YSDialog):
         self.layout.addLayout(self.sub_layout)
 
     def beep(self):
-        winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
+        if winsound:
+            winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
 
 
 class YSErrorDialog(YSDialog):
@@ -1299,7 +1305,8 @@ class YSErrorDialog(YSDialog):
         self.layout.addWidget(self.ok_button)
 
     def beep(self):
-        winsound.MessageBeep(winsound.MB_ICONHAND)
+        if winsound:
+            winsound.MessageBeep(winsound.MB_ICONHAND)
 
 
 class YSInputDialog(YSDialog):
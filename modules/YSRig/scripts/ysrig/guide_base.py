@@ -3,8 +3,8 @@ import inspect
 from traceback import *
 from importlib import *
 from maya.api.OpenMaya import MGlobal
-from maya import cmds
-from ysrig import core
+from ysrig.cmds_proxy import cmds
+from ysrig import core, profiler
 reload(core)
 
 META_NODE_SHOW = 0
@@ -14,35 +14,35 @@ class GuideBase:
     ガイド作成の基底クラス
     """
     def __init__(self, name, joint_count, parent, side, *args):
-        self._setup(name, joint_count, parent, side)         # 変数宣言
-        self.setup(*args)
-        self._handle_error()                   # エラーハンドリング用
-        self.handle_error()
+        self._stage(self._setup, name, joint_count, parent, side)       # 変数宣言
+        self._stage(self.setup, *args)
+        self._stage(self._handle_error)                   # エラーハンドリング用
+        self._stage(self.handle_error)
 
         if self.error:                         # 事前検知でエラーがあればここで終了
             return
         
         cmds.undoInfo(ock=True)
         try:
-            self._set_module_name()            # モジュールの名前をファイル名から取得
-            self._create_grp()                 # グループノード作成
-            self._add_settings()               # 設定用アトリビュート追加
-            self.add_settings()
-            self._create_meta_node()           # メタノード作成
-            self.pre_process()                 # 前処理
-            self._create()                     # ノード作成
-            self.create()
-            self._connect()                    # ノード接続
-            self.connect()
-            self._lock_attributes()            # ロックするアトリビュートを指定
-            self.lock_attributes()
-            self._lock()                       # アトリビュートロック
-            self._distribute_shape_instances()
-            self._collect_meta_data()          # メタノードに書き込む情報を指定
-            self.collect_meta_data()
-            self._post_process()               # 後処理
-            self.post_process()
-            self._set_meta_data()              # メタノードに情報書き込み
+            self._stage(self._set_module_name)            # モジュールの名前をファイル名から取得
+            self._stage(self._create_grp)                 # グループノード作成
+            self._stage(self._add_settings)               # 設定用アトリビュート追加
+            self._stage(self.add_settings)
+            self._stage(self._create_meta_node)           # メタノード作成
+            self._stage(self.pre_process)                 # 前処理
+            self._stage(self._create)                     # ノード作成
+            self._stage(self.create)
+            self._stage(self._connect)                    # ノード接続
+            self._stage(self.connect)
+            self._stage(self._lock_attributes)            # ロックするアトリビュートを指定
+            self._stage(self.lock_attributes)
+            self._stage(self._lock)                       # アトリビュートロック
+            self._stage(self._distribute_shape_instances)
+            self._stage(self._collect_meta_data)          # メタノードに書き込む情報を指定
+            self._stage(self.collect_meta_data)
+            self._stage(self._post_process)               # 後処理
+            self._stage(self.post_process)
+            self._stage(self._set_meta_data)              # メタノードに情報書き込み
 
             cmds.select(cl=True)
 
@@ -54,6 +54,12 @@ class GuideBase:
             MGlobal.displayError("予期せぬエラーが発生しました")
             return
 
+    def _stage(self, func, *args):
+        """
+        ステージを呼び出す profilerで計測中であれば処理時間を記録する
+        """
+        return profiler.stage(self, func, *args)
+
     def _setup(self, name, joint_count, parent, side):
         self.error = False
         self.connect_scale = True
@@ -6,36 +6,35 @@ from maya.api.OpenMaya import MGlobal
 from ysrig import core
 
 
-def main():
-    if cmds.objExists(core.GUIDE_GROUP_NAME):
-        MGlobal.displayError("すでにガイドが存在します")
-        return
+def load(file_path: str) -> dict:
+    """
+    export_meta_nodeで書き出したJSONを読み込む
+    """
+    with open(file_path, 'r', encoding="utf-8") as f:
+        return json.load(f)
 
-    file_path = cmds.fileDialog2(
-        fileMode=1,
-        caption="load json",
-        fileFilter="JSON Files (*.json)"
-    )
 
-    if not file_path:
-        return
+def build_from_data(data: dict, file_name: str="") -> bool:
+    """
+    JSONのデータからガイドを作成する
 
-    file_path = file_path[0]
-    
-    with open(file_path, 'r') as f:
-        data: dict = json.load(f)
+    Args:
+        data (dict): export_meta_node.get_meta_dataの戻り値
+        file_name (str): 読み込んだファイル名 YSRigグループに記録する
 
+    Returns:
+        bool: 作成できたか
+    """
     modules = list(data.keys())
     ysrig = modules[0]
     ver = data[modules[1]]
     build_type = "FromJSON"
-    file_name = os.path.basename(file_path)
     facial_root = data[modules[-1]]
     modules = modules[2:-1]
 
     if not ysrig == "YSRigMetaDataJSON":
         MGlobal.displayError("データの形式が間違っています")
-        return
+        return False
 
     for mod in modules:
         module = data[mod]["Module"]
@@ -53,4 +52,24 @@ def main():
     for attr in attrs:
         cmds.setAttr(attr[0], l=False)
         if attr[1]:
-            cmds.setAttr(*attr, l=True, type="string")
\ No newline at end of file
+            cmds.setAttr(*attr, l=True, type="string")
+
+    return True
+
+
+def main():
+    if cmds.objExists(core.GUIDE_GROUP_NAME):
+        MGlobal.displayError("すでにガイドが存在します")
+        return
+
+    file_path = cmds.fileDialog2(
+        fileMode=1,
+        caption="load json",
+        fileFilter="JSON Files (*.json)"
+    )
+
+    if not file_path:
+        return
+
+    file_path = file_path[0]
+    build_from_data(load(file_path), os.path.basename(file_path))
\ No newline at end of file
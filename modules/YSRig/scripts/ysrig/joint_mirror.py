@@ -0,0 +1,88 @@
+"""
+ジョイントの階層をYZ平面で反転した複製を作成する
+
+    from ysrig import joint_mirror
+    joint_mirror.mirror(["JT_L_Eye", "JT_L_UpperEyelid"])
+
+cmds.mirrorJoint(myz=True, mb=True, sr=["L_", "R_"])と同じ結果になるが、
+複製と名前の変更、親子付けをジョイントごとにコマンドで行わず、
+反転した行列からtranslateとjointOrientを求め、全ての階層を1つの計画でまとめて作成する
+"""
+from ysrig.cmds_proxy import cmds
+from ysrig import core, build_plan
+
+# 反転したジョイントに複製するアトリビュート
+COPY_ATTRS = [
+    "segmentScaleCompensate", "drawStyle", "preferredAngle",
+    "useOutlinerColor", "outlinerColor", "overrideEnabled", "overrideColorRGB",
+]
+
+IDENTITY = [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]
+
+
+def mirror(roots: list[str], search_replace: list[str]=["L_", "R_"], parents: list[str]=None, matrices: dict=None) -> list[str]:
+    """
+    rootsの階層のジョイントを反転して作成する
+
+    Args:
+        roots (list): 反転する階層の最上位のジョイント
+        search_replace (list): [検索する文字列, 置き換える文字列] 反転したジョイントの名前に使う
+        parents (list): rootsと同じ順の、反転したジョイントの親 Noneの場合、もしくは要素がNoneの場合は元のジョイントと同じ親
+        matrices (dict): {ジョイント名: ワールド行列} 計算済みの行列 含まれないジョイントはシーンから取得する
+
+    Returns:
+        list: 作成したジョイント rootsの順に、各階層を親から順に並べる
+    """
+    matrices = matrices or {}
+    parents = parents or [None] * len(roots)
+    search, replace = search_replace
+
+    names = []      # 反転したジョイント名
+    worlds = []     # 元のジョイントのワールド行列
+    values = []     # 元のジョイントのCOPY_ATTRSの値
+    indices = []    # 親のインデックス 負の値は階層の外の親
+    externals = []  # 階層の外の親
+    for root, parent in zip(roots, parents):
+        paths = {}
+        for path in cmds.ls(root, dag=True, type="joint", long=True) or []:
+            parent_path, _, name = path.rpartition("|")
+            if parent_path in paths:
+                indices.append(paths[parent_path])
+
+            else:
+                indices.append(-1)
+                externals.append(parent or parent_path)
+
+            paths[path] = len(names)
+            names.append(name.replace(search, replace))
+            worlds.append(matrices[name] if name in matrices else cmds.getAttr(f"{path}.worldMatrix[0]"))
+            values.append({attr: cmds.getAttr(f"{path}.{attr}") for attr in COPY_ATTRS})
+
+    if not names:
+        return []
+
+    external_worlds = [cmds.getAttr(f"{parent}.worldMatrix[0]") if parent else IDENTITY for parent in externals]
+    transforms = core.get_joint_transforms(core.mirror_matrices(worlds), indices, external_worlds)
+
+    plan = build_plan.BuildPlan()
+    external = iter(externals)
+    for i, name in enumerate(names):
+        if indices[i] < 0:
+            parent = next(external)
+            is_joint = cmds.nodeType(parent) == "joint"
+
+        else:
+            parent = names[indices[i]]
+            is_joint = True
+
+        pos, orient = transforms[i]
+        plan.create_node("joint", name, parent=parent, interesting=True, translate=pos, jointOrient=orient)
+        for attr, value in values[i].items():
+            plan.set_attr(f"{name}.{attr}", list(value[0]) if isinstance(value, list) else value)
+
+        # cmds.parentと同じくinverseScaleを親のscaleに繋ぐ
+        if is_joint:
+            plan.connect(f"{parent}.scale", f"{name}.inverseScale")
+
+    created = build_plan.apply(plan)
+    return [created[name] for name in names]
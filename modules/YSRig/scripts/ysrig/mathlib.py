@@ -0,0 +1,387 @@
+"""
+行列計算をまとめたモジュール
+
+Mayaを読み込まずに動作するため、Maya外でも検証、計測ができる
+行列はMayaと同じ行ベクトル形式 (p' = p * M) で扱い、回転順序はxyz (R = Rx * Ry * Rz)
+関数は (4, 4), (16,) の単体の行列と、(N, 4, 4), (N, 16) の行列の配列のどちらも受け付ける
+"""
+import numpy as np
+
+EPSILON = 1e-10
+
+
+def as_matrices(matrices) -> np.ndarray:
+    """
+    行列、もしくは行列のリストを (N, 4, 4) の配列に変換する
+
+    Args:
+        matrices (list or np.ndarray): 16要素のリスト、4x4のリスト、もしくはそれらのリスト
+
+    Returns:
+        np.ndarray: (N, 4, 4) の配列
+    """
+    m = np.asarray(matrices, dtype=np.float64)
+    if m.ndim == 1:
+        return m.reshape(1, 4, 4)
+
+    if m.ndim == 2:
+        if m.shape == (4, 4):
+            return m.reshape(1, 4, 4)
+
+        return m.reshape(-1, 4, 4)
+
+    return m.reshape(-1, 4, 4)
+
+
+def as_vectors(vectors) -> np.ndarray:
+    """
+    ベクトル、もしくはベクトルのリストを (N, 3) の配列に変換する
+    """
+    v = np.asarray(vectors, dtype=np.float64)
+    return v.reshape(-1, 3)
+
+
+def to_list(matrices) -> list:
+    """
+    (N, 4, 4) の配列を、16要素のリストのリストに変換する
+    """
+    return as_matrices(matrices).reshape(-1, 16).tolist()
+
+
+### 回転 ###
+
+# rotateOrderの列挙の順
+ROTATE_ORDERS = ["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]
+
+
+def _get_order(order) -> tuple[int, int, int, float]:
+    """
+    回転順序を軸のインデックスと、偶置換なら1、奇置換なら-1の符号にする
+
+    Args:
+        order (str or int): "xyz"などの文字列、もしくはrotateOrderの値
+    """
+    if not isinstance(order, str):
+        order = ROTATE_ORDERS[order]
+
+    i, j, k = ("xyz".index(axis) for axis in order.lower())
+    parity = 1.0 if (j - i) % 3 == 1 else -1.0
+    return i, j, k, parity
+
+
+def _axis_rotation(angles: np.ndarray, axis: int) -> np.ndarray:
+    """
+    1つの軸の回転行列を (N, 3, 3) で返す 行ベクトル形式
+    """
+    c = np.cos(angles)
+    s = np.sin(angles)
+    j, k = (axis + 1) % 3, (axis + 2) % 3
+
+    m = np.zeros((len(angles), 3, 3))
+    m[:, axis, axis] = 1.0
+    m[:, j, j] = c
+    m[:, j, k] = s
+    m[:, k, j] = -s
+    m[:, k, k] = c
+
+    return m
+
+
+def euler_to_rotation(rotate, degrees: bool=True, order="xyz") -> np.ndarray:
+    """
+    オイラー角から回転行列を作成する
+
+    Args:
+        rotate (list or np.ndarray): [rx, ry, rz] もしくは (N, 3)
+        degrees (bool): 度数法かどうか
+        order (str or int): 回転順序 "xyz"の場合は R = Rx * Ry * Rz
+
+    Returns:
+        np.ndarray: (N, 3, 3) の回転行列
+    """
+    r = as_vectors(rotate)
+    if degrees:
+        r = np.radians(r)
+
+    i, j, k, _ = _get_order(order)
+    return _axis_rotation(r[:, i], i) @ _axis_rotation(r[:, j], j) @ _axis_rotation(r[:, k], k)
+
+
+def rotation_to_euler(rotations, degrees: bool=True, order="xyz") -> np.ndarray:
+    """
+    回転行列からオイラー角を求める
+
+    Args:
+        rotations (np.ndarray): (N, 3, 3) の正規直交な回転行列
+        degrees (bool): 度数法で返すかどうか
+        order (str or int): 回転順序
+
+    Returns:
+        np.ndarray: (N, 3) の [rx, ry, rz]
+    """
+    m = np.asarray(rotations, dtype=np.float64).reshape(-1, 3, 3)
+    i, j, k, p = _get_order(order)
+    cb = np.hypot(m[:, i, i], m[:, i, j])
+    gimbal = cb < EPSILON
+
+    a = np.where(gimbal, np.arctan2(-p * m[:, k, j], m[:, j, j]), np.arctan2(p * m[:, j, k], m[:, k, k]))
+    b = np.arctan2(-p * m[:, i, k], cb)
+    c = np.where(gimbal, 0.0, np.arctan2(p * m[:, i, j], m[:, i, i]))
+
+    euler = np.empty((len(m), 3))
+    euler[:, i] = a
+    euler[:, j] = b
+    euler[:, k] = c
+    if degrees:
+        euler = np.degrees(euler)
+
+    return euler
+
+
+### 分解、合成 ###
+
+def decompose(matrices) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    行列をtranslate, rotate, scale, shearに分解する
+    om2.MTransformationMatrixと同じく M = S * Sh * R * T として分解し、
+    行列式が負の場合はX軸のスケールを反転させる
+
+    Args:
+        matrices (list or np.ndarray): 行列、もしくは行列のリスト
+
+    Returns:
+        np.ndarray: (N, 3) translate
+        np.ndarray: (N, 3) rotate 度数法
+        np.ndarray: (N, 3) scale
+        np.ndarray: (N, 3) shear [xy, xz, yz]
+    """
+    m = as_matrices(matrices)
+    t = m[:, 3, :3].copy()
+    r0 = m[:, 0, :3].copy()
+    r1 = m[:, 1, :3].copy()
+    r2 = m[:, 2, :3].copy()
+
+    sx = np.linalg.norm(r0, axis=-1)
+    r0 /= np.where(sx < EPSILON, 1.0, sx)[:, None]
+
+    shxy = np.einsum("ij,ij->i", r0, r1)
+    r1 -= shxy[:, None] * r0
+    sy = np.linalg.norm(r1, axis=-1)
+    r1 /= np.where(sy < EPSILON, 1.0, sy)[:, None]
+
+    shxz = np.einsum("ij,ij->i", r0, r2)
+    r2 -= shxz[:, None] * r0
+    shyz = np.einsum("ij,ij->i", r1, r2)
+    r2 -= shyz[:, None] * r1
+    sz = np.linalg.norm(r2, axis=-1)
+    r2 /= np.where(sz < EPSILON, 1.0, sz)[:, None]
+
+    safe_sy = np.where(sy < EPSILON, 1.0, sy)
+    safe_sz = np.where(sz < EPSILON, 1.0, sz)
+    shear = np.stack([shxy / safe_sy, shxz / safe_sz, shyz / safe_sz], axis=-1)
+
+    flip = np.einsum("ij,ij->i", r0, np.cross(r1, r2)) < 0
+    sx = np.where(flip, -sx, sx)
+    r0[flip] *= -1
+    shear[flip, 0] *= -1
+    shear[flip, 1] *= -1
+
+    rot = np.stack([r0, r1, r2], axis=1)
+    r = rotation_to_euler(rot)
+    s = np.stack([sx, sy, sz], axis=-1)
+
+    return t, r, s, shear
+
+
+def compose(translate=(0, 0, 0), rotate=(0, 0, 0), scale=(1, 1, 1), shear=None) -> np.ndarray:
+    """
+    translate, rotate, scaleから行列を作成する
+    translate, rotate, scaleはそれぞれ (3,) でも (N, 3) でもよい
+
+    Args:
+        translate (list or np.ndarray): translate
+        rotate (list or np.ndarray): rotate 度数法
+        scale (list or np.ndarray): scale
+        shear (list or np.ndarray): [xy, xz, yz] 省略した場合は0
+
+    Returns:
+        np.ndarray: (N, 4, 4) の行列
+    """
+    t = as_vectors(translate)
+    rot = euler_to_rotation(rotate)
+    s = as_vectors(scale)
+    n = max(len(t), len(rot), len(s))
+
+    upper = np.broadcast_to(rot, (n, 3, 3)).copy()
+    if shear is not None:
+        sh = np.broadcast_to(as_vectors(shear), (n, 3))
+        shear_m = np.broadcast_to(np.eye(3), (n, 3, 3)).copy()
+        shear_m[:, 1, 0] = sh[:, 0]
+        shear_m[:, 2, 0] = sh[:, 1]
+        shear_m[:, 2, 1] = sh[:, 2]
+        upper = shear_m @ upper
+
+    upper = np.broadcast_to(s, (n, 3))[:, :, None] * upper
+
+    m = np.zeros((n, 4, 4))
+    m[:, :3, :3] = upper
+    m[:, 3, :3] = np.broadcast_to(t, (n, 3))
+    m[:, 3, 3] = 1.0
+
+    return m
+
+
+### 演算 ###
+
+def inverse(matrices) -> np.ndarray:
+    """
+    逆行列を返す
+    """
+    return np.linalg.inv(as_matrices(matrices))
+
+
+def multiply(*matrices) -> np.ndarray:
+    """
+    行列を左から順に掛け合わせる multMatrixノードと同じ順序
+    """
+    result = as_matrices(matrices[0])
+    for m in matrices[1:]:
+        result = result @ as_matrices(m)
+
+    return result
+
+
+def offset(parents, children) -> np.ndarray:
+    """
+    parentsから見たchildrenの相対行列を返す
+    core.get_offset_matrix(parent, child) と同じ child * parent^-1
+
+    Args:
+        parents (list or np.ndarray): 基準となるワールド行列
+        children (list or np.ndarray): 対象のワールド行列
+
+    Returns:
+        np.ndarray: (N, 4, 4) の行列
+    """
+    return as_matrices(children) @ inverse(parents)
+
+
+def mirror(matrices, axis: str="X", behavior: bool=True) -> np.ndarray:
+    """
+    行列をワールドの原点を通る平面で反転する
+
+    Args:
+        matrices (list or np.ndarray): ワールド行列
+        axis (str): 反転する軸 "X", "Y", "Z"
+        behavior (bool): Trueの場合、mirrorJointのbehaviorと同じく各軸を反転させ行列式を正に保つ
+
+    Returns:
+        np.ndarray: (N, 4, 4) の行列
+    """
+    reflect = np.eye(4)
+    index = "XYZ".index(axis.upper())
+    reflect[index, index] = -1.0
+
+    m = as_matrices(matrices) @ reflect
+    if behavior:
+        m[:, :3, :3] *= -1.0
+
+    return m
+
+
+def get_translations(matrices) -> np.ndarray:
+    """
+    行列のtranslateだけを (N, 3) で返す
+    """
+    return as_matrices(matrices)[:, 3, :3].copy()
+
+
+def distance(pos1, pos2) -> np.ndarray:
+    """
+    2つの位置ベクトルの距離を返す
+    (3,) 同士なら (1,)、(N, 3) 同士なら (N,) の配列
+    """
+    return np.linalg.norm(as_vectors(pos1) - as_vectors(pos2), axis=-1)
+
+
+def chain_distances(positions) -> np.ndarray:
+    """
+    連続した位置ベクトルの隣同士の距離を返す
+
+    Args:
+        positions (list or np.ndarray): (N, 3)
+
+    Returns:
+        np.ndarray: (N - 1,) の配列
+    """
+    p = as_vectors(positions)
+    return np.linalg.norm(p[1:] - p[:-1], axis=-1)
+
+
+def divide_positions(start, end, divisions: int) -> np.ndarray:
+    """
+    2点間をdivisionsの数だけ等分した位置を返す 始点と終点を含む
+
+    Returns:
+        np.ndarray: (divisions, 3)
+    """
+    t = np.linspace(0.0, 1.0, divisions)[:, None]
+    start = np.asarray(start, dtype=np.float64)
+    end = np.asarray(end, dtype=np.float64)
+
+    return start + (end - start) * t
+
+
+def average_position_matrix(matrices) -> np.ndarray:
+    """
+    行列の平均位置にある、回転とスケールを持たない行列を返す
+
+    Returns:
+        np.ndarray: (4, 4)
+    """
+    m = np.eye(4)
+    m[3, :3] = get_translations(matrices).mean(axis=0)
+
+    return m
+
+
+### 座標 ###
+
+def transform_points(points, matrix) -> np.ndarray:
+    """
+    座標の配列に行列を掛ける om2.MPoint * om2.MMatrixと同じ 行列は4列目が(0, 0, 0, 1)のものに限る
+
+    Args:
+        points (list or np.ndarray): (N, 3)
+        matrix (list or np.ndarray): 4x4の行列
+
+    Returns:
+        np.ndarray: (N, 3)
+    """
+    m = as_matrices(matrix)[0]
+    return as_vectors(points) @ m[:3, :3] + m[3, :3]
+
+
+def clamp_axis(points, axis: int=1, minimum: float=None, maximum: float=None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    座標の配列の指定軸の値を範囲内に収める
+
+    Args:
+        points (list or np.ndarray): (N, 3)
+        axis (int): 0 = x, 1 = y, 2 = z
+        minimum (float): 最小値 Noneの場合は制限しない
+        maximum (float): 最大値 Noneの場合は制限しない
+
+    Returns:
+        np.ndarray: (N, 3) の配列
+        np.ndarray: 値が変わった座標を示す (N,) のbool配列
+    """
+    p = as_vectors(points).copy()
+    if minimum is None and maximum is None:
+        return p, np.zeros(len(p), dtype=bool)
+
+    values = np.clip(p[:, axis], minimum, maximum)
+    changed = values != p[:, axis]
+    p[:, axis] = values
+
+    return p, changed
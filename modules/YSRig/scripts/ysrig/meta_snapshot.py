@@ -0,0 +1,290 @@
+from types import MappingProxyType
+from ysrig.cmds_proxy import cmds
+import maya.api.OpenMaya as om2
+
+# {ハッシュ値: MetaSnapshot}
+_cache = {}
+# {ハッシュ値: [コールバックID, ...]}
+_callbacks = {}
+# シーンを開く、新規作成する際のコールバックID
+_scene_callbacks = []
+
+# get, get_listでdefaultを省略したことを示す値
+_MISSING = object()
+
+_INT_TYPES = {
+    getattr(om2.MFnNumericData, t) for t in ("kByte", "kChar", "kShort", "kInt", "kLong", "kInt64", "kAddr")
+    if hasattr(om2.MFnNumericData, t)
+}
+
+
+def _freeze(value):
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+
+    return value
+
+
+def _thaw(value):
+    """
+    cmds.getAttrと同じ形で返すため、行列はリストに、double3は[(x, y, z)]の形に戻す
+    """
+    if isinstance(value, _Compound):
+        return [tuple(value)]
+
+    if isinstance(value, tuple):
+        return list(value)
+
+    return value
+
+
+class _Compound(tuple):
+    """
+    double2, double3などの複合アトリビュートの値
+    """
+    __slots__ = ()
+
+
+def _read_plug(plug: om2.MPlug):
+    """
+    プラグの値をcmds.getAttrと同じ型で読み込む
+    """
+    attr = plug.attribute()
+
+    if plug.isCompound:
+        return _Compound(_read_plug(plug.child(i)) for i in range(plug.numChildren()))
+
+    if attr.hasFn(om2.MFn.kTypedAttribute):
+        data_type = om2.MFnTypedAttribute(attr).attrType()
+        if data_type == om2.MFnData.kString:
+            return plug.asString()
+
+        if data_type == om2.MFnData.kMatrix:
+            try:
+                return tuple(om2.MFnMatrixData(plug.asMObject()).matrix())
+
+            except RuntimeError:
+                return tuple(om2.MMatrix())
+
+        return None
+
+    if attr.hasFn(om2.MFn.kMatrixAttribute):
+        return tuple(om2.MFnMatrixData(plug.asMObject()).matrix())
+
+    if attr.hasFn(om2.MFn.kEnumAttribute):
+        return plug.asShort()
+
+    if attr.hasFn(om2.MFn.kUnitAttribute):
+        unit_type = om2.MFnUnitAttribute(attr).unitType()
+        if unit_type == om2.MFnUnitAttribute.kAngle:
+            return plug.asMAngle().asUnits(om2.MAngle.uiUnit())
+
+        if unit_type == om2.MFnUnitAttribute.kDistance:
+            return plug.asMDistance().asUnits(om2.MDistance.uiUnit())
+
+        if unit_type == om2.MFnUnitAttribute.kTime:
+            return plug.asMTime().asUnits(om2.MTime.uiUnit())
+
+        return plug.asDouble()
+
+    if attr.hasFn(om2.MFn.kNumericAttribute):
+        numeric_type = om2.MFnNumericAttribute(attr).numericType()
+        if numeric_type == om2.MFnNumericData.kBoolean:
+            return plug.asBool()
+
+        if numeric_type in _INT_TYPES:
+            return plug.asInt()
+
+        return plug.asDouble()
+
+    return None
+
+
+class MetaSnapshot:
+    """
+    メタノードの全ユーザーアトリビュートを一度に読み込んだ、変更できないデータ
+
+    get で cmds.getAttr と、get_list で core.get_list_attributes と同じ形の値を返す
+    """
+    __slots__ = ("node", "_values", "_lists")
+
+    def __init__(self, node: str, values: dict, lists: dict):
+        object.__setattr__(self, "node", node)
+        object.__setattr__(self, "_values", MappingProxyType(values))
+        object.__setattr__(self, "_lists", MappingProxyType(lists))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MetaSnapshot は変更できません")
+
+    def __contains__(self, attr):
+        return attr in self._values or attr in self._lists
+
+    def __getitem__(self, attr):
+        if attr in self._lists:
+            return self.get_list(attr)
+
+        return self.get(attr)
+
+    def keys(self) -> list[str]:
+        return list(self._values.keys()) + list(self._lists.keys())
+
+    def is_list(self, attr: str) -> bool:
+        return attr in self._lists
+
+    def get(self, attr: str, default=_MISSING):
+        """
+        単数アトリビュートの値を返す
+
+        Args:
+            attr (str): アトリビュート名
+            default: アトリビュートが存在しない場合に返す値 省略した場合はcmds.getAttrと同じくValueErrorを送出する
+
+        Returns:
+            cmds.getAttrと同じ型の値
+        """
+        if attr not in self._values:
+            return self._missing(attr, default)
+
+        return _thaw(self._values[attr])
+
+    def get_list(self, attr: str, default=_MISSING) -> list:
+        """
+        multi型アトリビュートの値をリストで返す
+
+        Args:
+            attr (str): multi型のアトリビュート名からインデックスを抜いた文字列
+            default: アトリビュートが存在しない場合に返す値 省略した場合はValueErrorを送出する
+
+        Returns:
+            list: 各インデックスの値
+        """
+        if attr not in self._lists:
+            return self._missing(attr, default)
+
+        return [_thaw(v) for v in self._lists[attr]]
+
+    def _missing(self, attr: str, default):
+        if default is _MISSING:
+            raise ValueError(f"アトリビュートが存在しません: {self.node}.{attr}")
+
+        return default
+
+
+def _get_mobject(node: str) -> om2.MObject:
+    sel = om2.MSelectionList()
+    sel.add(node)
+    return sel.getDependNode(0)
+
+
+def read(node: str) -> MetaSnapshot:
+    """
+    ノードの全ユーザーアトリビュートを読み込み、キャッシュせずにMetaSnapshotを作成する
+
+    Args:
+        node (str): メタノード名
+
+    Returns:
+        MetaSnapshot: 読み込んだデータ
+    """
+    fn = om2.MFnDependencyNode(_get_mobject(node))
+    values = {}
+    lists = {}
+
+    for i in range(fn.attributeCount()):
+        attr = fn.attribute(i)
+        fn_attr = om2.MFnAttribute(attr)
+        if not fn_attr.dynamic or not fn_attr.parent.isNull():
+            continue
+
+        name = fn_attr.name
+        plug = fn.findPlug(attr, False)
+
+        if fn_attr.array:
+            indices = plug.getExistingArrayAttributeIndices()
+            count = indices[-1] + 1 if len(indices) else 0 # 途中のインデックスが削除されていても最大のインデックスまで読む
+            lists[name] = tuple(_freeze(_read_plug(plug.elementByLogicalIndex(j))) for j in range(count))
+
+        else:
+            values[name] = _freeze(_read_plug(plug))
+
+    return MetaSnapshot(fn.name(), values, lists)
+
+
+def _install_scene_callbacks():
+    if _scene_callbacks:
+        return
+
+    for message in (om2.MSceneMessage.kBeforeNew, om2.MSceneMessage.kBeforeOpen, om2.MSceneMessage.kBeforeImport):
+        _scene_callbacks.append(om2.MSceneMessage.addCallback(message, lambda *args: clear()))
+
+
+def _install_node_callbacks(key: int, mobj: om2.MObject):
+    if key in _callbacks:
+        return
+
+    def invalidate_key(*args):
+        _cache.pop(key, None)
+
+    def node_deleted(*args):
+        _cache.pop(key, None)
+        ids = _callbacks.pop(key, [])
+        om2.MMessage.removeCallbacks(ids)
+
+    _callbacks[key] = [
+        om2.MNodeMessage.addAttributeChangedCallback(mobj, invalidate_key),
+        om2.MNodeMessage.addNodeDirtyPlugCallback(mobj, invalidate_key),
+        om2.MNodeMessage.addNameChangedCallback(mobj, invalidate_key),
+        om2.MNodeMessage.addNodePreRemovalCallback(mobj, node_deleted),
+    ]
+
+
+def get(node: str) -> MetaSnapshot:
+    """
+    メタノードのMetaSnapshotを返す
+    ノードのアトリビュートが変更されるまでは同じインスタンスを使い回す
+
+    Args:
+        node (str): メタノード名
+
+    Returns:
+        MetaSnapshot: 読み込んだデータ
+    """
+    mobj = _get_mobject(node)
+    key = om2.MObjectHandle(mobj).hashCode()
+
+    snapshot = _cache.get(key)
+    if snapshot is not None and snapshot.node == node:
+        return snapshot
+
+    _install_scene_callbacks()
+    _install_node_callbacks(key, mobj)
+    snapshot = read(node)
+    _cache[key] = snapshot
+
+    return snapshot
+
+
+def invalidate(node: str=None) -> None:
+    """
+    キャッシュを破棄する
+    nodeを省略した場合は全てのキャッシュを破棄する
+    """
+    if node is None:
+        _cache.clear()
+        return
+
+    if not cmds.objExists(node):
+        return
+
+    _cache.pop(om2.MObjectHandle(_get_mobject(node)).hashCode(), None)
+
+
+def clear() -> None:
+    """
+    キャッシュと全てのノードのコールバックを破棄する
+    """
+    _cache.clear()
+    for ids in _callbacks.values():
+        om2.MMessage.removeCallbacks(ids)
+
+    _callbacks.clear()
@@ -1,4 +1,4 @@
-from maya import cmds
+from ysrig.cmds_proxy import cmds
 from ysrig import core
 from ysrig.modules import root, spine_basic, neck_and_head_basic, shoulder_and_arm_ikfk, leg_and_foot_ikfk, finger_fk, eye_basic, eye_and_simple_eyelid, jaw_basic, biped
 from ysrig import picker_editor
@@ -1,6 +1,6 @@
 from importlib import *
 from maya.api.OpenMaya import MGlobal
-from maya import cmds
+from ysrig.cmds_proxy import cmds
 from ysrig import core, guide_base
 from ysrig.modules.chain_basic import gui
 reload(core)
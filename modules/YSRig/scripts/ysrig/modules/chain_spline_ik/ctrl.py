@@ -1,5 +1,5 @@
 from importlib import *
-from maya import cmds
+from ysrig.cmds_proxy import cmds
 from ysrig import core, ctrl_base
 reload(core)
 reload(ctrl_base)
@@ -9,7 +9,7 @@ All_CTRL_SHAPE = "Triangle"
 class Ctrl(ctrl_base.CtrlBace):
     def setup(self):
         self.ctrl_shape_type = core.get_enum_attribute(self.meta_node, "ControllrShapeType")
-        self.ctrl_count = cmds.getAttr(f"{self.meta_node}.ControllrCount")
+        self.ctrl_count = self.meta.get("ControllrCount")
         self.scale_uniformly = True
 
     def create(self):
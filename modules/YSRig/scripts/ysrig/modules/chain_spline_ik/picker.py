@@ -1,6 +1,5 @@
 import importlib
-from maya import cmds
-from ysrig import core
+from ysrig import core, meta_snapshot
 from ysrig.picker_editor import gui
 importlib.reload(gui)
 
@@ -13,7 +12,7 @@ class Data(gui.PickerData):
         HEIGHT = 20
 
         for side, grp in zip(side_list, grp_list):
-            ctrl_count = cmds.getAttr(f"{meta_node}.ControllrCount")
+            ctrl_count = meta_snapshot.get(meta_node).get("ControllrCount")
             names = core.create_numbered_names(grp, ctrl_count, gb=False)
             names = core.get_mirror_names(names, side_list, side)
 
@@ -1,6 +1,6 @@
 from importlib import *
 from maya.api.OpenMaya import MGlobal
-from maya import cmds
+from ysrig.cmds_proxy import cmds
 from ysrig import core
 from ysrig.modules.eye_basic import guide
 reload(core)
@@ -1,14 +1,13 @@
 import importlib
-from maya import cmds
-from ysrig import core
+from ysrig import core, meta_snapshot
 from ysrig.picker_editor import gui
 importlib.reload(gui)
 
 class Data(gui.PickerData):
     def create(self, shape_data, meta_node):
-        grp = cmds.getAttr(f"{meta_node}.GroupName")
+        grp = meta_snapshot.get(meta_node).get("GroupName")
         SUFFIX = ["Aim", "OpenClose", "ClosePos", "Scale"]
-        names = core.get_list_attributes(meta_node, "JointName")
+        names = meta_snapshot.get(meta_node).get_list("JointName")
         names = names[:1] + names[2:]
         names += [f"{names[0]}_{s}" for s in SUFFIX]
         names += [name.replace("L_", "R_") for name in names]
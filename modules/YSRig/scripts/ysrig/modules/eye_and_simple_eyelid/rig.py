@@ -1,8 +1,9 @@
 from importlib import *
-from maya import cmds
-from ysrig import core, rig_base
+from ysrig.cmds_proxy import cmds
+from ysrig import core, rig_base, joint_mirror
 reload(core)
 reload(rig_base)
+reload(joint_mirror)
 
 class Rig(rig_base.RigBace):
     def create_proxy(self):
@@ -12,9 +13,7 @@ class Rig(rig_base.RigBace):
                 self.proxies[2],
                 self.proxies[3],
         )
-        self.proxies += cmds.mirrorJoint(self.proxies[0], myz=True, mb=True, sr=["L_", "R_"])
-        self.proxies += cmds.mirrorJoint(self.proxies[2], myz=True, mb=True, sr=["L_", "R_"])
-        self.proxies += cmds.mirrorJoint(self.proxies[3], myz=True, mb=True, sr=["L_", "R_"])
+        self.proxies += joint_mirror.mirror([self.proxies[0], self.proxies[2], self.proxies[3]])
         self.base_joints += [jt.replace("L_", "R_") for jt in self.base_joints]
 
     def create(self):
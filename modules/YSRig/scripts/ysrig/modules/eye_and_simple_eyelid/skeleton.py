@@ -1,21 +1,15 @@
 from importlib import *
 from maya.api.OpenMaya import MGlobal
-from maya import cmds
-from ysrig import core, skeleton_base
+from ysrig.cmds_proxy import cmds
+from ysrig import core, skeleton_base, joint_mirror
 reload(core)
 reload(skeleton_base)
+reload(joint_mirror)
 
 class Skeleton(skeleton_base.facialSkeletonBase):
-    def parent(self):
-        core.create_hierarchy(
-        self.skeleton_grp,
-            self.joints[0], ":",
-                self.joints[1], "..",
-            self.joints[2],
-            self.joints[3]
-        )
+    def get_parents(self):
+        # joints[1]はjoints[0]の子、それ以外はskeleton_grpの子
+        return [-1, 0, -1, -1]
 
     def post_process(self):
-        cmds.mirrorJoint(self.joints[0], myz=True, mb=True, sr=["L_", "R_"])
-        cmds.mirrorJoint(self.joints[2], myz=True, mb=True, sr=["L_", "R_"])
-        cmds.mirrorJoint(self.joints[3], myz=True, mb=True, sr=["L_", "R_"])
\ No newline at end of file
+        joint_mirror.mirror([self.joints[0], self.joints[2], self.joints[3]], matrices=self.joint_world_matrices)
\ No newline at end of file
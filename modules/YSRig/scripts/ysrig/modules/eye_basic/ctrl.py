@@ -1,12 +1,12 @@
 from importlib import *
-from maya import cmds
+from ysrig.cmds_proxy import cmds
 from ysrig import core, ctrl_base
 reload(core)
 reload(ctrl_base)
 
 class Ctrl(ctrl_base.CtrlBace):
     def setup(self):
-        self.other_guide_world_matrices = core.get_list_attributes(self.meta_node, "OtherGuidesWorldMatrix")
+        self.other_guide_world_matrices = self.meta.get_list("OtherGuidesWorldMatrix")
 
     def create(self):
         self.ctrls = []
@@ -1,13 +1,12 @@
 import importlib
-from maya import cmds
-from ysrig import core
+from ysrig import core, meta_snapshot
 from ysrig.picker_editor import gui
 importlib.reload(gui)
 
 class Data(gui.PickerData):
     def create(self, shape_data, meta_node):
-        grp = cmds.getAttr(f"{meta_node}.GroupName")
-        names = core.get_list_attributes(meta_node, "JointName")[:-1]
+        grp = meta_snapshot.get(meta_node).get("GroupName")
+        names = meta_snapshot.get(meta_node).get_list("JointName")[:-1]
         names += [f"{names[0]}_Aim"]
         names += [name.replace("L_", "R_") for name in names]
         names += [f"{grp}_Aim"]
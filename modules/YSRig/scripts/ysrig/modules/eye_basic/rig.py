@@ -1,13 +1,14 @@
 from importlib import *
-from maya import cmds
-from ysrig import core, rig_base
+from ysrig.cmds_proxy import cmds
+from ysrig import core, rig_base, joint_mirror
 reload(core)
 reload(rig_base)
+reload(joint_mirror)
 
 class Rig(rig_base.RigBace):
     def create_proxy(self):
         super().create_proxy()
-        self.proxies += [cmds.mirrorJoint(self.proxies[0], myz=True, mb=True, sr=["L_", "R_"])[0]]
+        self.proxies += [joint_mirror.mirror([self.proxies[0]])[0]]
         self.base_joints = [self.base_joints[0], self.base_joints[0].replace("L_", "R_")]
 
     def create(self):
@@ -1,11 +1,12 @@
 from importlib import *
 from maya.api.OpenMaya import MGlobal
-from maya import cmds
-from ysrig import core, skeleton_base
+from ysrig.cmds_proxy import cmds
+from ysrig import core, skeleton_base, joint_mirror
 reload(core)
 reload(skeleton_base)
+reload(joint_mirror)
 
 class Skeleton(skeleton_base.facialSkeletonBase):
     def post_process(self):
         cmds.delete(self.joints[1])
-        cmds.mirrorJoint(self.joints[0], myz=True, mb=True, sr=["L_", "R_"])
\ No newline at end of file
+        joint_mirror.mirror([self.joints[0]], matrices=self.joint_world_matrices)
\ No newline at end of file
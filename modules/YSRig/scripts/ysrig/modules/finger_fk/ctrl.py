@@ -1,5 +1,5 @@
 from importlib import *
-from maya import cmds
+from ysrig.cmds_proxy import cmds
 from ysrig import core, ctrl_base
 reload(core)
 reload(ctrl_base)
@@ -7,8 +7,8 @@ reload(ctrl_base)
 class Ctrl(ctrl_base.CtrlBace):
     def setup(self):
         self.ctrl_shape_type = core.get_enum_attribute(self.meta_node, "FKControllrShapeType")
-        self.carpal_flags = core.get_list_attributes(self.meta_node, "CarpalFlag")
-        self.other_guide_world_matrices = core.get_list_attributes(self.meta_node, "OtherGuidesWorldMatrix")
+        self.carpal_flags = self.meta.get_list("CarpalFlag")
+        self.other_guide_world_matrices = self.meta.get_list("OtherGuidesWorldMatrix")
         self.scale_uniformly = True
         self.all_ctrls = []
         self.all_ctrl_spaces = []
@@ -1,6 +1,5 @@
 import importlib
-from maya import cmds
-from ysrig import core
+from ysrig import core, meta_snapshot
 from ysrig.picker_editor import gui
 importlib.reload(gui)
 
@@ -14,7 +13,7 @@ class Data(gui.PickerData):
         datas = []
 
         for side, grp in zip(side_list, grp_list):
-            all_names = core.get_list_attributes(meta_node, "JointName")
+            all_names = meta_snapshot.get(meta_node).get_list("JointName")
             all_names = core.get_mirror_names(all_names, side_list, side)
             names_chunk = core.get_chunk_list(all_names, 4)
 
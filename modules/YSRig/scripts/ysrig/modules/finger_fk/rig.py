@@ -1,5 +1,5 @@
 from importlib import *
-from maya import cmds
+from ysrig.cmds_proxy import cmds
 from ysrig import core, rig_base
 reload(core)
 reload(rig_base)
@@ -9,7 +9,7 @@ reload(rig_base)
 class Rig(rig_base.RigBace):
     def setup(self):
         self.ctrl_shape_type = core.get_enum_attribute(self.meta_node, "FKControllrShapeType")
-        self.carpal_flags = core.get_list_attributes(self.meta_node, "CarpalFlag")
+        self.carpal_flags = self.meta.get_list("CarpalFlag")
 
     def create_proxy(self):
         self.base_joints_chunk = core.get_chunk_list(self.base_joints, 4)
@@ -149,16 +149,16 @@ class Rig(rig_base.RigBace):
 
 
     def _connect(self):
+        attrs = core.get_transform_attrs()
         for proxies, base_joints in zip(self.proxies_chunk, self.base_joints_chunk):
             if self.parent_joint == rig_base.RigBace.ROOT_JOINT:
-                core.connect_parent_constraint(proxies[0], base_joints[0])
-                core.connect_scale_constraint(proxies[0], base_joints[0])
+                core.connect_transform(proxies[0], base_joints[0])
                 for px, jt in zip(proxies[1:], base_joints[1:]):
-                    core.connect_same_attr(px, jt, ["translate", "rotate", "scale"])
+                    core.connect_same_attr(px, jt, attrs)
 
             else:
                 for px, jt in zip(proxies, base_joints):
-                    core.connect_same_attr(px, jt, ["translate", "rotate", "scale"])
+                    core.connect_same_attr(px, jt, attrs)
 
     def connect(self):
         for i, proxies, ctrls, spaces, flag, all_ctrl in zip(range(len(self.proxies_chunk)), self.proxies_chunk, self.ctrls_chunk, self.ctrl_spaces_chunk, self.carpal_flags, self.all_ctrls):
@@ -191,8 +191,8 @@ class Rig(rig_base.RigBace):
         if not cmds.attributeQuery("PositiveWeights", node=self.meta_node, exists=True):
             return
 
-        positive_weights = core.get_list_attributes(self.meta_node, "PositiveWeights")
-        negative_weights = core.get_list_attributes(self.meta_node, "NegativeWeights")
+        positive_weights = self.meta.get_list("PositiveWeights")
+        negative_weights = self.meta.get_list("NegativeWeights")
         positive_weights_chunk = core.get_chunk_list(positive_weights, 3)
         negative_weights_chunk = core.get_chunk_list(negative_weights, 3)
 
@@ -228,103 +228,7 @@ class Rig(rig_base.RigBace):
         self.meta_data["NegativeWeights"] = core.compose_attr_paths(ctrls, "NegativeWeight", multi=True)
 
 
-class RigMirror(Rig):
-    def _setup(self, meta_node):
-        super()._setup(meta_node)
-        self.src_joints = [f"JT_{name}" for name in self.joint_names]
-        self.src_side = self.side[:]
-        self.build, self.side, self.grp_name, self.joint_names = rig_base.get_mirror_names(self.side, self.grp_name, self.joint_names)
-
-    def create(self):
-        self.ctrls_chunk = []
-        self.ctrl_spaces_chunk = []
-        self.all_ctrls = []
-        self.all_ctrl_spaces = []
-        ctrl_instances= []
-        carpal_ctrl_instance = []
-        all_ctrl_instance = []
-        self.grps = []
-
-        self.src_joints_chunk = core.get_chunk_list(self.src_joints, 4)
-        metac_index = len(self.joint_names_chunk) * 3
-
-        if self.flag:
-            metac_index = metac_index - 3
-
-        for i, names, base_joints, src_joints in zip(range(len(self.joint_names_chunk)), self.joint_names_chunk, self.base_joints_chunk, self.src_joints_chunk):
-            if len(base_joints) == 1:
-                continue
-
-            grp = cmds.createNode("transform", name=names[-1].replace("_GB", "_Finger_Group"))
-            ctrls = core.convert_joint_to_controller(src_joints[:-1], sr=[self.src_side, self.side])
-            cmds.matchTransform(grp, ctrls[0])
-            core.create_hierarchy(
-                self.grp,
-                    grp, ":",
-                        ctrls[0]
-                )
-
-            ctrl_spaces_chunk = []
-            ctrls_chunk = []
-            for j, name, ctrl in zip(range(len(names)), names, ctrls + ["tmp"]):
-                if "_GB" in name:
-                    c = core.CtrlCurve(name.replace("_GB", "_All"), "Roll")
-                    if self.flag:
-                        pos, rot = core.decompose_matrix(self.ctrl_space_matrices[metac_index + i + 1])[:-1]
-
-                    else:
-                        pos, rot = core.decompose_matrix(self.ctrl_space_matrices[metac_index + i])[:-1]
-
-                    cmds.setAttr(f"{c.parent_node}.translate", *pos)
-                    cmds.setAttr(f"{c.parent_node}.rotate", *rot)
-                    s = core.create_space(c.parent_node, parent=True)
-                    all_ctrl_instance += [c]
-                    self.all_ctrls += [c.parent_node]
-                    self.all_ctrl_spaces += [s]
-                    cmds.parent(s, grp)
-                    cmds.parent(grp, self.ctrl_grp)
-
-                else:
-                    c = core.CtrlCurve(f"{name}1", self.ctrl_shape_type)
-                    c.reparent_shape(ctrl)
-                    s = core.create_space(c.parent_node, parent=True)
-                    ctrl_instances += [c]
-                    self.ctrl_spaces += [s]
-                    self.ctrls += [c.parent_node]
-
-                ctrl_spaces_chunk += [s]
-                ctrls_chunk += [c.parent_node]
-
-            self.grps += [grp]
-            self.ctrl_spaces_chunk += [ctrl_spaces_chunk]
-            self.ctrls_chunk += [ctrls_chunk]
-
-        if self.flag:
-            self.ctrls_chunk += [[]]
-            self.ctrl_spaces_chunk += [[]]
-
-            ctrl = core.CtrlCurve(f"{self.grp_name}_Carpal", self.ctrl_shape_type)
-            pos, rot = core.decompose_matrix(self.ctrl_space_matrices[metac_index])[0:2]
-            cmds.setAttr(f"{ctrl.parent_node}.translate", *pos)
-            cmds.setAttr(f"{ctrl.parent_node}.rotate", *rot)
-            space = core.create_space(ctrl.parent_node, parent=True)
-            cmds.parent(space, self.ctrl_grp)
-
-            self.ctrl_spaces += [space]
-            self.ctrl_spaces_chunk[-1] = [space]
-            self.ctrls += [ctrl.parent_node]
-            self.ctrls_chunk[-1] = [ctrl.parent_node]
-
-            carpal_ctrl_instance = ctrl
-
-            self.ctrl_instances = ctrl_instances + [carpal_ctrl_instance] + all_ctrl_instance
-
-        else:
-
-            self.ctrl_instances = ctrl_instances + all_ctrl_instance
-
-        core.mirror_space(self.ctrl_grp)
-
+class RigMirror(rig_base.RigMirrorBace, Rig):
     def set_attr(self):
         for ctrls in self.ctrls_chunk:
             for ctrl in ctrls[:-1]:
@@ -1,35 +1,37 @@
 from importlib import *
 from maya.api.OpenMaya import MGlobal
-from maya import cmds
-from ysrig import core, skeleton_base
+from ysrig.cmds_proxy import cmds
+from ysrig import core, skeleton_base, joint_mirror
 reload(core)
 reload(skeleton_base)
+reload(joint_mirror)
 
 class Skeleton(skeleton_base.SkeletonBase):
     def setup(self):
-        self.carpal_flags = core.get_list_attributes(self.meta_node, "CarpalFlag")
+        self.carpal_flags = self.meta.get_list("CarpalFlag")
         self.carpal = False
         for flag in self.carpal_flags:
             if flag:
                 self.carpal = True
 
-    def parent(self):
-        joint_chunks = core.get_chunk_list(self.joints, 4)
-        for joints in joint_chunks:
-            for i, jt in enumerate(joints):
-                if i:
-                    cmds.parent(jt, joints[i - 1])
+    def get_parents(self):
+        parents = []
+        index_chunks = core.get_chunk_list(list(range(len(self.joint_names))), 4)
+        for i, indices in enumerate(index_chunks):
+            for j, index in enumerate(indices):
+                if j:
+                    parents.append(index - 1)
+
+                elif self.carpal and i < len(index_chunks) - 1 and self.carpal_flags[i]:
+                    parents.append(len(self.joint_names) - 1)
 
                 else:
-                    cmds.parent(jt, self.skeleton_grp)
+                    parents.append(-1)
 
-        if self.carpal:
-            for i, joints in enumerate(joint_chunks[:-1]):
-                if self.carpal_flags[i]:
-                    cmds.parent(joints[0], self.joints[-1])
+        return parents
 
     def parent_external(self):
-        parent = cmds.getAttr(f"{self.meta_node}.ParentName")
+        parent = self.meta.get("ParentName")
         if parent:
             parent = f"JT_{parent}"
 
@@ -47,27 +49,10 @@ class Skeleton(skeleton_base.SkeletonBase):
     def mirror(self):
         self.get_prefixes()
 
-        if self.parent_name:
-            parent = self.parent_name.replace(self.prefixes[0], self.prefixes[1])
-
         joint_chunks = core.get_chunk_list(self.joints, 4)
-        for joints, flag in zip(joint_chunks, self.carpal_flags):
-            if not flag:
-                cmds.mirrorJoint(joints[0], myz=True, mb=True, sr=self.prefixes)
-                if self.parent_name:
-                    fst_joint = joints[0].replace(self.prefixes[0], self.prefixes[1])
-                    if cmds.objExists(parent):
-                        cmds.parent(fst_joint, parent)
-
-                    else:
-                        cmds.parent(fst_joint, "JT_Root")
-
+        roots = [joints[0] for joints, flag in zip(joint_chunks, self.carpal_flags) if not flag]
         if self.carpal:
-            cmds.mirrorJoint(self.joints[-1], myz=True, mb=True, sr=self.prefixes)
-            if self.parent_name:
-                fst_joint = self.joints[-1].replace(self.prefixes[0], self.prefixes[1])
-                if cmds.objExists(parent):
-                    cmds.parent(fst_joint, parent)
+            roots += [self.joints[-1]]
 
-                else:
-                    cmds.parent(fst_joint, "JT_Root")
\ No newline at end of file
+        parent = self.get_mirror_parent()
+        joint_mirror.mirror(roots, self.prefixes, [parent] * len(roots), self.joint_world_matrices)
\ No newline at end of file
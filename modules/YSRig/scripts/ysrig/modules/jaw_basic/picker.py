@@ -1,13 +1,12 @@
 import importlib
-from maya import cmds
-from ysrig import core
+from ysrig import core, meta_snapshot
 from ysrig.picker_editor import gui
 importlib.reload(gui)
 
 class Data(gui.PickerData):
     def create(self, shape_data, meta_node):
-        grp = cmds.getAttr(f"{meta_node}.GroupName")
-        name = core.get_list_attributes(meta_node, "JointName")[0]
+        grp = meta_snapshot.get(meta_node).get("GroupName")
+        name = meta_snapshot.get(meta_node).get_list("JointName")[0]
         s = shape_data["Jaw"]
         color = core.get_ctrl_color_code(name)
         buttons = [gui.ButtonData(name=name, shape_points=s["cvs"], position=s["pos"], color=color)]
@@ -1,5 +1,5 @@
 from importlib import *
-from maya import cmds
+from ysrig.cmds_proxy import cmds
 from ysrig import core, ctrl_base
 reload(core)
 reload(ctrl_base)
@@ -7,9 +7,9 @@ reload(ctrl_base)
 class Ctrl(ctrl_base.CtrlBace):
     def setup(self):
         self.pvctrl_shape_type = core.get_enum_attribute(self.meta_node, "PVControllrShapeType")
-        self.root_matrix = cmds.getAttr(f"{self.meta_node}.RootMatrix")
-        self.guide_joint_matrices = core.get_list_attributes(self.meta_node, "GuideJointsMatrix")
-        self.other_guide_world_matrices = core.get_list_attributes(self.meta_node, "OtherGuidesWorldMatrix")
+        self.root_matrix = self.meta.get("RootMatrix")
+        self.guide_joint_matrices = self.meta.get_list("GuideJointsMatrix")
+        self.other_guide_world_matrices = self.meta.get_list("OtherGuidesWorldMatrix")
 
     def create(self):
         for i, name in enumerate(self.joint_names[:-1]):
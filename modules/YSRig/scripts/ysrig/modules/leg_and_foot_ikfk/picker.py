@@ -1,7 +1,7 @@
 import importlib
 from functools import partial
 from maya import cmds
-from ysrig import core
+from ysrig import core, meta_snapshot
 from ysrig.picker_editor import gui
 importlib.reload(gui)
 
@@ -17,14 +17,14 @@ class Data(gui.PickerData):
         datas = []
 
         for side, grp in zip(side_list, grp_list):
-            names = core.get_list_attributes(meta_node, "JointName")[:-1]
+            names = meta_snapshot.get(meta_node).get_list("JointName")[:-1]
             names = core.get_mirror_names(names, side_list, side)
             names += [f"{grp}_{n}" for n in ["PV", "IK", "REV_FK_Toe", "REV_FK_ToeSub"]]
             revs = [f"{grp}_{n}" for n in ["REV_All", "REV_Heel", "REV_OutSide", "REV_InSide", "REV_ToeTip", "REV_Toe"]]
             shapes = ["UpperLeg", "ForeLeg", "Foot", "Toe1", "Toe2", "PV", "IK_Foot", "IK_Toe1", "IK_Toe2"]
             rev_shapes = ["ALL", "Heel", "OUT", "IN", "ToeTip", "Toe"]
 
-            toe_sub = cmds.getAttr(f"{meta_node}.JointCount") == 6
+            toe_sub = meta_snapshot.get(meta_node).get("JointCount") == 6
             if not toe_sub:
                 names = names[:-1]
                 shapes.pop(3)
@@ -89,9 +89,9 @@ class Data(gui.PickerData):
 
 
 def ik_fk_matching(meta_node, side, switch):
-    grp_name = cmds.getAttr(f"{meta_node}.GroupName")
-    joint_names = core.get_list_attributes(meta_node, "JointName")
-    base_side = cmds.getAttr(f"{meta_node}.Side")
+    grp_name = meta_snapshot.get(meta_node).get("GroupName")
+    joint_names = meta_snapshot.get(meta_node).get_list("JointName")
+    base_side = meta_snapshot.get(meta_node).get("Side")
 
     search, replace = core.get_mirror_replacement(side, base_side)
     grp_name = grp_name.replace(search, replace)
@@ -1,14 +1,15 @@
 from importlib import *
-from maya import cmds
-from ysrig import core, rig_base
+from ysrig.cmds_proxy import cmds
+from ysrig import core, rig_base, build_plan
 reload(core)
 reload(rig_base)
+reload(build_plan)
 
 class Rig(rig_base.RigBace):
     def setup(self):
         self.pv_ctrl_shape_type = core.get_enum_attribute(self.meta_node, "PVControllrShapeType")
-        self.root_matrix = cmds.getAttr(f"{self.meta_node}.RootMatrix")
-        self.guide_joint_matrices = core.get_list_attributes(self.meta_node, "GuideJointsMatrix")
+        self.root_matrix = self.meta.get("RootMatrix")
+        self.guide_joint_matrices = self.meta.get_list("GuideJointsMatrix")
 
     def create(self):
         fk_ctrls = core.convert_joint_to_controller(self.base_joints[:-1])
@@ -234,41 +235,75 @@ class Rig(rig_base.RigBace):
                                 out_tl=f"{self.ctrl_spaces[1]}.translate:XYZ", out_rt=f"{self.ctrl_spaces[1]}.rotate:XYZ")
 
         # ↓ リバースフットギミック
+        # 全てのノードを計画してから、まとめて作成、接続する
+        plan = build_plan.BuildPlan()
+        foot = self.ctrls[-6]
 
         # Heel
-        cd = core.connect_condition(name=f"Cd_{self.ctrls[-5]}", operation=3, ft=f"{self.ctrls[-6]}.rotateX", fr=f"{self.ctrls[-6]}.rotateX")
-        fm = core.connect_float_math(name=f"Fm_{self.ctrls[-5]}", operation=2, fa=f"{cd}.outColorR", fb=-1)
-        core.connect_compose_matrix(name=f"Cm_{self.ctrls[-5]}", rz=f"{fm}.outFloat", out=[f"{self.ctrls[-5]}.offsetParentMatrix"])
+        cd = plan.create_node("condition", f"Cd_{self.ctrls[-5]}", operation=3)
+        plan.connect(f"{foot}.rotateX", f"{cd}.firstTerm", f"{cd}.colorIfFalseR")
+        fm = plan.create_node("floatMath", f"Fm_{self.ctrls[-5]}", operation=2, floatB=-1)
+        plan.connect(f"{cd}.outColorR", f"{fm}.floatA")
+        self._plan_rotate_z_offset(plan, self.ctrls[-5], f"{fm}.outFloat")
 
         # Out
-        cd = core.connect_condition(name=f"Cd_{self.ctrls[-4]}", operation=3, ft=f"{self.ctrls[-6]}.rotateZ", fr=f"{self.ctrls[-6]}.rotateZ")
-        fm = core.connect_float_math(name=f"Fm_{self.ctrls[-4]}", operation=2, fa=f"{cd}.outColorR", fb=-1)
-        core.connect_compose_matrix(name=f"Cm_{self.ctrls[-4]}", rz=f"{fm}.outFloat", out=[f"{self.ctrls[-4]}.offsetParentMatrix"])
+        cd = plan.create_node("condition", f"Cd_{self.ctrls[-4]}", operation=3)
+        plan.connect(f"{foot}.rotateZ", f"{cd}.firstTerm", f"{cd}.colorIfFalseR")
+        fm = plan.create_node("floatMath", f"Fm_{self.ctrls[-4]}", operation=2, floatB=-1)
+        plan.connect(f"{cd}.outColorR", f"{fm}.floatA")
+        self._plan_rotate_z_offset(plan, self.ctrls[-4], f"{fm}.outFloat")
 
         # In
-        cd = core.connect_condition(name=f"Cd_{self.ctrls[-3]}", operation=4, ft=f"{self.ctrls[-6]}.rotateZ", fr=f"{self.ctrls[-6]}.rotateZ")
-        core.connect_compose_matrix(name=f"Cm_{self.ctrls[-3]}", rz=f"{cd}.outColorR", out=[f"{self.ctrls[-3]}.offsetParentMatrix"])
+        cd = plan.create_node("condition", f"Cd_{self.ctrls[-3]}", operation=4)
+        plan.connect(f"{foot}.rotateZ", f"{cd}.firstTerm", f"{cd}.colorIfFalseR")
+        self._plan_rotate_z_offset(plan, self.ctrls[-3], f"{cd}.outColorR")
 
         # Toe
-        fm1 = core.connect_float_math(name=f"Fm_{self.ctrls[-2]}", operation=1, fa=f"{self.ctrls[-6]}.rotateX", fb=f"{self.ctrls[-6]}.ToeLiftThreshold")
-        fm2 = core.connect_float_math(name=f"Fm_{self.ctrls[-1]}", operation=1, fa=f"{self.ctrls[-6]}.ToeLiftThreshold", fb=f"{fm1}.outFloat")
-
-        cd = core.connect_condition(name=f"Cd_{self.ctrls[-2]}", operation=3, ft=f"{fm1}.outFloat", fr=0, tr=f"{fm1}.outFloat")
-        core.connect_compose_matrix(name=f"Cm_{self.ctrls[-2]}", rz=f"{cd}.outColorR", out=[f"{self.ctrls[-2]}.offsetParentMatrix"])
-
-        cd1 = core.connect_condition(name=f"Cd_{self.ctrls[-1]}_01", operation=3, ft=f"{self.ctrls[-6]}.rotateX", fr=0, tr=f"{self.ctrls[-6]}.rotateX")
-        cd2 = core.connect_condition(name=f"Cd_{self.ctrls[-1]}_02", operation=4, ft=f"{self.ctrls[-6]}.rotateX", st=f"{self.ctrls[-6]}.ToeLiftThreshold", fr=f"{fm2}.outFloat", tr=f"{cd1}.outColorR")
-        cd3 = core.connect_condition(name=f"Cd_{self.ctrls[-1]}_03", operation=3, ft=f"{cd2}.outColorR", fr=0, tr=f"{cd2}.outColorR")
-        core.connect_compose_matrix(name=f"Cm_{self.ctrls[-1]}", rz=f"{cd3}.outColorR", out=[f"{self.ctrls[-1]}.offsetParentMatrix"])
-
-        cd1 = core.connect_condition(name=f"Cd_{self.rev_toe_ctrls[-1]}_01", operation=3, ft=f"{self.ctrls[-6]}.rotateX", fr=0, tr=f"{self.ctrls[-6]}.rotateX")
-        cd2 = core.connect_condition(name=f"Cd_{self.rev_toe_ctrls[-1]}_02", operation=3, ft=f"{self.ctrls[-6]}.rotateX", st=f"{self.ctrls[-6]}.ToeContactAngle", fr=f"{cd1}.outColorR", tr=f"{self.ctrls[-6]}.ToeContactAngle")
-        fm = core.connect_float_math(name=f"Fm_{self.rev_toe_ctrls[-1]}", operation=2, fa=f"{cd2}.outColorR", fb=-1)
-        core.connect_compose_matrix(name=f"Cm_{self.rev_toe_ctrls[-1]}", rz=f"{fm}.outFloat", out=[f"{self.rev_toe_ctrls[-1]}.offsetParentMatrix"])
+        fm1 = plan.create_node("floatMath", f"Fm_{self.ctrls[-2]}", operation=1)
+        plan.connect(f"{foot}.rotateX", f"{fm1}.floatA")
+        plan.connect(f"{foot}.ToeLiftThreshold", f"{fm1}.floatB")
+        fm2 = plan.create_node("floatMath", f"Fm_{self.ctrls[-1]}", operation=1)
+        plan.connect(f"{foot}.ToeLiftThreshold", f"{fm2}.floatA")
+        plan.connect(f"{fm1}.outFloat", f"{fm2}.floatB")
+
+        cd = plan.create_node("condition", f"Cd_{self.ctrls[-2]}", operation=3, colorIfFalseR=0)
+        plan.connect(f"{fm1}.outFloat", f"{cd}.firstTerm", f"{cd}.colorIfTrueR")
+        self._plan_rotate_z_offset(plan, self.ctrls[-2], f"{cd}.outColorR")
+
+        cd1 = plan.create_node("condition", f"Cd_{self.ctrls[-1]}_01", operation=3, colorIfFalseR=0)
+        plan.connect(f"{foot}.rotateX", f"{cd1}.firstTerm", f"{cd1}.colorIfTrueR")
+        cd2 = plan.create_node("condition", f"Cd_{self.ctrls[-1]}_02", operation=4)
+        plan.connect(f"{foot}.rotateX", f"{cd2}.firstTerm")
+        plan.connect(f"{foot}.ToeLiftThreshold", f"{cd2}.secondTerm")
+        plan.connect(f"{fm2}.outFloat", f"{cd2}.colorIfFalseR")
+        plan.connect(f"{cd1}.outColorR", f"{cd2}.colorIfTrueR")
+        cd3 = plan.create_node("condition", f"Cd_{self.ctrls[-1]}_03", operation=3, colorIfFalseR=0)
+        plan.connect(f"{cd2}.outColorR", f"{cd3}.firstTerm", f"{cd3}.colorIfTrueR")
+        self._plan_rotate_z_offset(plan, self.ctrls[-1], f"{cd3}.outColorR")
+
+        cd1 = plan.create_node("condition", f"Cd_{self.rev_toe_ctrls[-1]}_01", operation=3, colorIfFalseR=0)
+        plan.connect(f"{foot}.rotateX", f"{cd1}.firstTerm", f"{cd1}.colorIfTrueR")
+        cd2 = plan.create_node("condition", f"Cd_{self.rev_toe_ctrls[-1]}_02", operation=3)
+        plan.connect(f"{foot}.rotateX", f"{cd2}.firstTerm")
+        plan.connect(f"{foot}.ToeContactAngle", f"{cd2}.secondTerm", f"{cd2}.colorIfTrueR")
+        plan.connect(f"{cd1}.outColorR", f"{cd2}.colorIfFalseR")
+        fm = plan.create_node("floatMath", f"Fm_{self.rev_toe_ctrls[-1]}", operation=2, floatB=-1)
+        plan.connect(f"{cd2}.outColorR", f"{fm}.floatA")
+        self._plan_rotate_z_offset(plan, self.rev_toe_ctrls[-1], f"{fm}.outFloat")
+
+        build_plan.apply(plan)
 
         # IKの伸び切りチェッカー
         core.connect_ik_stretch_warning([self.ik_joints[0], self.hds[0]], cmds.getAttr(f"{self.ik_joints[1]}.tx") * 2, ctrls=[self.ctrls[-8], self.ctrls[-7]])
 
+    def _plan_rotate_z_offset(self, plan, ctrl, src):
+        """
+        srcの値をZ軸の回転としてctrlのoffsetParentMatrixに接続するcomposeMatrixを計画する
+        """
+        cm = plan.create_node("composeMatrix", f"Cm_{ctrl}", useEulerRotation=True, inputRotateOrder=0)
+        plan.connect(src, f"{cm}.inputRotateZ")
+        plan.connect(f"{cm}.outputMatrix", f"{ctrl}.offsetParentMatrix")
+
     def set_attr(self):
         cmds.setAttr(f"{self.settings_node}.IKFK", 0)
         cmds.setAttr(f"{self.settings_node}.FK_WL", 1)
@@ -321,130 +356,7 @@ class Rig(rig_base.RigBace):
         self.meta_data["ToeContactAngle"] = core.compose_attr_paths(self.ctrls[-6], "ToeContactAngle")
 
 
-class RigMirror(Rig):
-    def _setup(self, meta_node):
-        super()._setup(meta_node)
-        self.src_joints = [f"JT_{name}" for name in self.joint_names]
-        self.src_side = self.side[:]
-        self.build, self.side, self.grp_name, self.joint_names = rig_base.get_mirror_names(self.side, self.grp_name, self.joint_names)
-
-    def create(self):
-        fk_ctrls = core.convert_joint_to_controller(self.src_joints[:-1], sr=[f"{self.src_side}_", f"{self.side}_"])
-        self.ctrls = [None] * (len(fk_ctrls) + 8)
-        self.ctrl_instances = [None] * (len(fk_ctrls) + 8)
-
-        total_count = 0
-        for i, ctrl, name in zip(range(len(fk_ctrls)), fk_ctrls, self.joint_names):
-            if i == 2:
-                c = core.CtrlCurve(f"{name}1", "Cube")
-
-            else:
-                c = core.CtrlCurve(f"{name}1", "BoundingBox")
-
-            c.reparent_shape(ctrl)
-            self.ctrl_instances[i] = c
-            self.ctrls[i] = c.parent_node
-
-            total_count += 1
-
-        cmds.parent(self.ctrls[2], w=True)
-        cmds.parent(self.ctrls[3], w=True)
-        rot = core.decompose_matrix(self.root_matrix)[1]
-        rot = [r1 + r2 for r1, r2 in zip(rot, core.decompose_matrix(self.guide_joint_matrices[2])[1])]
-        cmds.setAttr(f"{self.ctrls[2]}.jointOrient", 0, 0, 0)
-        cmds.setAttr(f"{self.ctrls[2]}.rotate", *rot)
-        core.create_hierarchy(
-            self.ctrls[1],
-                self.ctrls[2], ":",
-                    self.ctrls[3],
-        )
-        cmds.makeIdentity(self.ctrls[2], a=True)
-
-        ik_ctrl = core.CtrlCurve(f"{self.grp_name}_IK", "Foot_IK")
-        pv_ctrl = core.CtrlCurve(f"{self.grp_name}_PV", self.pv_ctrl_shape_type)
-        rev_all_ctrl = core.CtrlCurve(f"{self.grp_name}_REV_All", "Pin")
-
-        for c in [pv_ctrl, ik_ctrl, rev_all_ctrl]:
-            pos, rot = core.decompose_matrix(self.ctrl_space_matrices[total_count])[:-1]
-            cmds.setAttr(f"{c.parent_node}.translate", *pos)
-            cmds.setAttr(f"{c.parent_node}.rotate", *rot)
-
-            self.ctrl_instances[total_count] = c
-            self.ctrls[total_count] = c.parent_node
-            total_count += 1
-
-        pos = core.decompose_matrix(self.ctrl_space_matrices[2])[0]
-        cmds.setAttr(f"{self.ctrls[-7]}.translate", *pos)
-        cmds.setAttr(f"{self.ctrls[-7]}.rotate", 0, 0, 0)
-
-        self.rev_toe_ctrls = [None] * len(self.base_joints[3:-1])
-        self.rev_toe_ctrl_instances = [None] * len(self.base_joints[3:-1])
-
-        toe_ctrls = core.convert_joint_to_controller(self.src_joints[3:-1], prefix="Ctrl_REV_FK_", sr=[f"{self.src_side}_", f"{self.side}_"])
-        toe_ctrls = [cmds.rename(n, f"Ctrl_{self.grp_name}_REV_FK_{s}") for n, s in zip(toe_ctrls, ["Toe", "ToeSub"])]
-        for i, ctrl, name in zip(range(len(toe_ctrls)), toe_ctrls, self.joint_names[3:-1]):
-            c = core.CtrlCurve(f"{name}1", "BoundingBox")
-
-            c.reparent_shape(ctrl)
-            self.rev_toe_ctrl_instances[i] = c
-            self.rev_toe_ctrls[i] = c.parent_node
-
-        for suffix, mat in zip(["Heel", "OutSide", "InSide", "ToeTip", "Toe"], self.ctrl_space_matrices[-5:]):
-            ctrl = core.CtrlCurve(f"{self.grp_name}_REV_{suffix}", "Rev")
-            pos, rot = core.decompose_matrix(mat)[:-1]
-            cmds.setAttr(f"{ctrl.parent_node}.translate", *pos)
-            cmds.setAttr(f"{ctrl.parent_node}.rotate", *rot)
-            self.ctrl_instances[total_count] = ctrl
-            self.ctrls[total_count] = ctrl.parent_node
-            total_count += 1
-
-        pos = core.decompose_matrix(self.ctrl_space_matrices[3])[0]
-        cmds.setAttr(f"{self.ctrls[-1]}.translate", *pos)
-
-        self.hds = [None] * 3
-
-        self.ik_joints = core.convert_joint_to_controller(self.src_joints, prefix="Ikjt_", sr=[f"{self.src_side}_", f"{self.side}_"])
-        self.hds[0], ef = cmds.ikHandle(sj=self.ik_joints[0], ee=self.ik_joints[2], name=f"Ikhandle_{self.grp_name}")
-        self.hds[1], ef = cmds.ikHandle(sj=self.ik_joints[3], ee=self.ik_joints[4], sol="ikSCsolver", name=f"Ikhandle_{self.grp_name}_Toe")
-        self.hds[2], ef = cmds.ikHandle(sj=self.ik_joints[2], ee=self.ik_joints[3], sol="ikSCsolver", name=f"Ikhandle_{self.grp_name}_Foot")
-        for hd in self.hds:
-            cmds.setAttr(f"{hd}.visibility", False)
-
-        core.create_hierarchy(
-            self.ctrl_grp,
-                fk_ctrls[0],
-                self.ik_joints[0],
-                ik_ctrl.parent_node, ":",
-                    self.ctrls[-5], ":",
-                        self.ctrls[-4], ":",
-                            self.ctrls[-3], ":",
-                                self.ctrls[-2], ":",
-                                    self.ctrls[-1], ":",
-                                        self.hds[0], "..",
-                                    toe_ctrls[0], ":", 
-                                        self.hds[1],
-                                        self.hds[2], "..", "..", "..", "..", "..",
-                rev_all_ctrl.parent_node, "..",
-                pv_ctrl.parent_node,
-            )
-        
-        ctrls = self.ctrls[:1] + self.ctrls[-8:] + self.rev_toe_ctrls[:1]
-        self.ctrl_spaces = [None] * len(ctrls)
-        for i, ctrl in enumerate(ctrls):
-            self.ctrl_spaces[i] = core.create_space(ctrl, parent=True)
-
-        self.knee_line = core.connect_curve_point(f"CV_{self.grp_name}_Knee", [self.ik_joints[1], self.ctrls[-8]], parent=self.ctrl_grp, lc=self.connect_type)
-
-        target_ik = cmds.createNode("transform", name=f"Target_{self.grp_name}_IK")
-        cmds.parent(target_ik, self.ik_joints[2])
-        cmds.matchTransform(target_ik, self.ctrls[2])
-
-        target_fk = cmds.createNode("transform", name=f"Target_{self.grp_name}_FK")
-        cmds.parent(target_fk, self.ctrls[2])
-        cmds.matchTransform(target_fk, self.ctrls[-7])
-
-        core.mirror_space(self.ctrl_grp)
-
+class RigMirror(rig_base.RigMirrorBace, Rig):
     def set_attr(self):
         cmds.setAttr(f"{self.settings_node}.IKFK", 0)
         cmds.setAttr(f"{self.settings_node}.FK_WL", 1)
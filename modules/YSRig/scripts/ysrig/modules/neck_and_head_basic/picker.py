@@ -1,6 +1,5 @@
 import importlib
-from maya import cmds
-from ysrig import core
+from ysrig import core, meta_snapshot
 from ysrig.picker_editor import gui
 importlib.reload(gui)
 
@@ -11,9 +10,9 @@ class Data(gui.PickerData):
         datas = []
 
         for side, grp in zip(side_list, grp_list):
-            names = core.get_list_attributes(meta_node, "JointName")[:-1]
+            names = meta_snapshot.get(meta_node).get_list("JointName")[:-1]
             names = core.get_mirror_names(names, side_list, side)
-            neck_count = cmds.getAttr(f"{meta_node}.JointCount") - 3
+            neck_count = meta_snapshot.get(meta_node).get("JointCount") - 3
             
             buttons = []
 
@@ -1,5 +1,5 @@
 from importlib import *
-from maya import cmds
+from ysrig.cmds_proxy import cmds
 from ysrig import core, rig_base
 reload(core)
 reload(rig_base)
@@ -50,28 +50,5 @@ class Rig(rig_base.RigBace):
                 self.lock_attrs += [ctrl, ["translate", "scale", "visibility"]]
 
 
-class RigMirror(Rig):
-    def _setup(self, meta_node):
-        super()._setup(meta_node)
-        self.src_joints = [f"JT_{name}" for name in self.joint_names]
-        self.src_side = self.side[:]
-        self.build, self.side, self.grp_name, self.joint_names = rig_base.get_mirror_names(self.side, self.grp_name, self.joint_names)
-
-    def create(self):
-        self.ctrls = core.convert_joint_to_controller(self.src_joints[:-1], sr=[self.src_side, self.side])
-        cmds.parent(self.ctrls[0], self.ctrl_grp)
-
-        self.ctrl_spaces = [None] * (self.joint_count - 1)
-        self.ctrl_instances = [None] * (self.joint_count - 1)
-        for i, name in enumerate(self.joint_names[:-1]):
-            if name == self.joint_names[-2]:
-                ctrl = core.CtrlCurve(f"{name}1", "Head")
-
-            else:
-                ctrl = core.CtrlCurve(f"{name}1", "Neck")
-
-            self.ctrl_spaces[i] = core.create_space(self.ctrls[i], parent=True)
-            ctrl.reparent_shape(self.ctrls[i])
-            self.ctrl_instances[i] = ctrl
-
-        core.mirror_space(self.ctrl_grp)
\ No newline at end of file
+class RigMirror(rig_base.RigMirrorBace, Rig):
+    pass
\ No newline at end of file
@@ -1,13 +1,12 @@
 import importlib
-from maya import cmds
-from ysrig import core
+from ysrig import core, meta_snapshot
 from ysrig.picker_editor import gui
 importlib.reload(gui)
 
 
 class Data(gui.PickerData):
     def create(self, shape_data, meta_node):
-        grp = cmds.getAttr(f"{meta_node}.GroupName")
+        grp = meta_snapshot.get(meta_node).get("GroupName")
         names = ["Root", "Root_Offset"]
         buttons = []
         for name, shape in zip(names, shape_data):
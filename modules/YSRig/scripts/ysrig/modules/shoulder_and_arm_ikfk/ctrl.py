@@ -1,5 +1,5 @@
 from importlib import *
-from maya import cmds
+from ysrig.cmds_proxy import cmds
 from ysrig import core, ctrl_base
 reload(core)
 reload(ctrl_base)
@@ -8,7 +8,7 @@ class Ctrl(ctrl_base.CtrlBace):
     def setup(self):
         self.ikctrl_shape_type = core.get_enum_attribute(self.meta_node, "IKControllrShapeType")
         self.pvctrl_shape_type = core.get_enum_attribute(self.meta_node, "PVControllrShapeType")
-        self.other_guide_world_matrices = core.get_list_attributes(self.meta_node, "OtherGuidesWorldMatrix")
+        self.other_guide_world_matrices = self.meta.get_list("OtherGuidesWorldMatrix")
 
     def create(self):
         ctrls = [None] * (self.joint_count + 1)
@@ -1,7 +1,7 @@
 import importlib
 from functools import partial
 from maya import cmds
-from ysrig import core
+from ysrig import core, meta_snapshot
 from ysrig.picker_editor import gui
 importlib.reload(gui)
 
@@ -13,7 +13,7 @@ class Data(gui.PickerData):
         datas = []
 
         for side, grp in zip(side_list, grp_list):
-            names = core.get_list_attributes(meta_node, "JointName")[:-1]
+            names = meta_snapshot.get(meta_node).get_list("JointName")[:-1]
             names = core.get_mirror_names(names, side_list, side)
             names += [f"{grp}_IK", f"{grp}_PV"]
 
@@ -48,9 +48,9 @@ class Data(gui.PickerData):
 
 
 def ik_fk_matching(meta_node, side, switch):
-    grp_name = cmds.getAttr(f"{meta_node}.GroupName")
-    joint_names = core.get_list_attributes(meta_node, "JointName")
-    base_side = cmds.getAttr(f"{meta_node}.Side")
+    grp_name = meta_snapshot.get(meta_node).get("GroupName")
+    joint_names = meta_snapshot.get(meta_node).get_list("JointName")
+    base_side = meta_snapshot.get(meta_node).get("Side")
 
     search, replace = core.get_mirror_replacement(side, base_side)
     grp_name = grp_name.replace(search, replace)
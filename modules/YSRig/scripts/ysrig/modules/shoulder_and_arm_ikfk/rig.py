@@ -1,5 +1,5 @@
 from importlib import *
-from maya import cmds
+from ysrig.cmds_proxy import cmds
 from ysrig import core, rig_base
 reload(core)
 reload(rig_base)
@@ -144,60 +144,7 @@ class Rig(rig_base.RigBace):
         cmds.transformLimits(self.ctrls[2], rz=[elbow_orient, 0], erz=[1, 0])
 
 
-class RigMirror(Rig):
-    def _setup(self, meta_node):
-        super()._setup(meta_node)
-        self.src_joints = [f"JT_{name}" for name in self.joint_names]
-        self.src_side = self.side[:]
-        self.build, self.side, self.grp_name, self.joint_names = rig_base.get_mirror_names(self.side, self.grp_name, self.joint_names)
-
+class RigMirror(rig_base.RigMirrorBace, Rig):
     def create(self):
-        self.ctrls = [None] * 6
-        self.ctrl_instances = [None] * 6
-        self.ctrl_spaces = [None] * 6
-
-        fk_ctrls = core.convert_joint_to_controller(self.src_joints[:-1], sr=[f"{self.src_side}_", f"{self.side}_"])
-        for i, ctrl, name in zip(range(4), fk_ctrls, self.joint_names):
-            if i:
-                c = core.CtrlCurve(f"{name}1", "BoundingBox")
-
-            else:
-                c = core.CtrlCurve(f"{name}1", "Shoulder")
-
-            c.reparent_shape(ctrl)
-            self.ctrl_instances[i] = c
-            self.ctrls[i] = c.parent_node
-
-        ik_ctrl = core.CtrlCurve(f"{self.grp_name}_IK", self.ik_ctrl_shape_type)
-        pv_ctrl = core.CtrlCurve(f"{self.grp_name}_PV", self.pv_ctrl_shape_type)
-        self.ctrl_instances[4:] = [ik_ctrl, pv_ctrl]
-        self.ctrls[4:] = [ik_ctrl.parent_node, pv_ctrl.parent_node]
-
-        pos = core.decompose_matrix(self.ctrl_space_matrices[4])[0]
-        cmds.setAttr(f"{self.ctrls[4]}.translate", *pos)
-        pos = core.decompose_matrix(self.ctrl_space_matrices[5])[0]
-        cmds.setAttr(f"{self.ctrls[5]}.translate", *pos)
-
-        self.ik_joints = core.convert_joint_to_controller(self.src_joints[1:4], prefix="Ikjt_", sr=[f"{self.src_side}_", f"{self.side}_"])
-        self.hd, ef = cmds.ikHandle(sj=self.ik_joints[0], ee=self.ik_joints[2], name=f"Ikhandle_{self.grp_name}")
-        cmds.setAttr(f"{self.hd}.visibility", False)
-
-        cmds.parent(self.ctrls[1], w=True)
-        cmds.parent(self.ctrls[3], self.proxies[2])
-        core.create_hierarchy(
-            self.ctrl_grp,
-                self.ctrls[0], ":",
-                    self.ctrls[1],
-                    self.ik_joints[0],
-                    self.ctrls[4],
-                    self.ctrls[5],
-                    self.hd
-            )
-
-        for i, ctrl in enumerate(self.ctrls[:2] + self.ctrls[3:] + [self.hd]):
-            self.ctrl_spaces[i] = core.create_space(ctrl, parent=True)
-
-        self.elbow_line = core.connect_curve_point(f"CV_{self.grp_name}_Elbow", [self.ik_joints[1], self.ctrls[5]], parent=self.ctrl_grp, lc=self.connect_type)
-
-        core.mirror_space(self.ctrl_grp)
+        super().create()
         core.mirror_space(self.ctrl_spaces[2])
@@ -1,16 +1,15 @@
 import importlib
-from maya import cmds
-from ysrig import core
+from ysrig import core, meta_snapshot
 from ysrig.picker_editor import gui
 importlib.reload(gui)
 
 
 class Data(gui.PickerData):
     def create(self, shape_data, meta_node):
-        grp = cmds.getAttr(f"{meta_node}.GroupName")
-        names = core.get_list_attributes(meta_node, "JointName")
+        grp = meta_snapshot.get(meta_node).get("GroupName")
+        names = meta_snapshot.get(meta_node).get_list("JointName")
         names = names + [f"{grp}_Torso"]
-        spine_count = cmds.getAttr(f"{meta_node}.JointCount") - 1
+        spine_count = meta_snapshot.get(meta_node).get("JointCount") - 1
         
         buttons = []
 
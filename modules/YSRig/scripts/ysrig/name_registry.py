@@ -0,0 +1,278 @@
+"""
+YSRigのノード名(JT_, Proxy_, Ctrl_, Edit_, Guide_)をMObjectHandleに解決して保持し、
+ノードの存在と親をシーンを検索せずに返す
+
+    from ysrig import name_registry
+    with name_registry.session():
+        if name_registry.exists_any(["JT_L_UpperArm", "JT_L_ForeArm"]):
+            ...
+
+        root, srcs, dsts = name_registry.get_common_ancestor("Ctrl_L_Hand", "Proxy_L_Hand")
+
+セッションの開始時に1回のlsで対象のノードを登録し、セッションの間はノードの追加、削除、
+名前の変更をコールバックで追って登録を更新する
+登録していない名前と、セッションの外での問い合わせはcmdsで行う
+同じ名前のノードが複数ある場合は、その名前だけcmdsで問い合わせる
+
+DAGノードのワールド直下から自身までの階層もセッションの間保持し、
+親子関係が変わったノード、削除したノードを含む階層だけを破棄する
+
+登録の状態を保持するため、このモジュールはreloadしない
+"""
+from contextlib import contextmanager
+import maya.api.OpenMaya as om2
+from ysrig.cmds_proxy import cmds
+
+# 登録するノード名の接頭辞
+PREFIXES = ("JT_", "Proxy_", "Ctrl_", "Edit_", "Guide_")
+
+# {ノード名: MObjectHandle} 同じ名前のノードが複数ある場合はNone
+_handles = {}
+# {ハッシュ値: (MObjectHandle, ...)} ワールド直下から自身までのDAGノード
+_chains = {}
+_callbacks = []
+_depth = 0
+
+
+def is_active() -> bool:
+    return _depth > 0
+
+
+def is_target(name: str) -> bool:
+    """
+    登録する名前か 短い名前のみ対象にする
+    """
+    return name.startswith(PREFIXES) and "|" not in name
+
+
+@contextmanager
+def session():
+    """
+    with文の間、名前の登録を使う 入れ子にした場合は外側のセッションを使う
+    """
+    begin()
+    try:
+        yield
+
+    finally:
+        end()
+
+
+def begin() -> None:
+    global _depth
+    _depth += 1
+    if _depth > 1:
+        return
+
+    _handles.clear()
+    _chains.clear()
+    sel = om2.MSelectionList()
+    for path in cmds.ls([f"{prefix}*" for prefix in PREFIXES], long=True) or []:
+        sel.add(path)
+
+    for i in range(sel.length()):
+        _register(sel.getDependNode(i))
+
+    _callbacks.append(om2.MDGMessage.addNodeAddedCallback(_node_added, "dependNode"))
+    _callbacks.append(om2.MDGMessage.addNodeRemovedCallback(_node_removed, "dependNode"))
+    _callbacks.append(om2.MNodeMessage.addNameChangedCallback(om2.MObject.kNullObj, _name_changed))
+    _callbacks.append(om2.MDagMessage.addAllDagChangesCallback(_dag_changed))
+
+
+def end() -> None:
+    global _depth
+    _depth = max(_depth - 1, 0)
+    if _depth:
+        return
+
+    for callback in _callbacks:
+        om2.MMessage.removeCallback(callback)
+
+    _callbacks.clear()
+    _handles.clear()
+    _chains.clear()
+
+
+### コールバック ###
+
+def _register(mobj: om2.MObject) -> None:
+    name = om2.MFnDependencyNode(mobj).name()
+    if not is_target(name):
+        return
+
+    new = om2.MObjectHandle(mobj)
+    handle = _handles.get(name, False)
+    if handle is False or (handle is not None and not handle.isValid()):
+        _handles[name] = new
+
+    elif handle is not None and handle.hashCode() != new.hashCode():
+        _handles[name] = None
+
+
+def _unregister(mobj: om2.MObject, name: str) -> None:
+    handle = _handles.get(name)
+    if handle is not None and (not handle.isValid() or handle.hashCode() == om2.MObjectHandle(mobj).hashCode()):
+        del _handles[name]
+
+
+def _node_added(mobj, *args):
+    _register(mobj)
+
+
+def _drop_chains(mobj: om2.MObject) -> None:
+    """
+    mobjを含む階層を破棄する mobjとその子孫の階層が対象になる
+    階層は親の分も保持するため、mobj自身の階層が無ければ他の階層にも含まれない
+    """
+    key = om2.MObjectHandle(mobj).hashCode()
+    if key not in _chains:
+        return
+
+    for k in [k for k, chain in _chains.items() if any(h.hashCode() == key for h in chain)]:
+        del _chains[k]
+
+
+def _node_removed(mobj, *args):
+    _unregister(mobj, om2.MFnDependencyNode(mobj).name())
+    _drop_chains(mobj)
+
+
+def _name_changed(mobj, old_name, *args):
+    _unregister(mobj, old_name)
+    _register(mobj)
+
+
+def _dag_changed(msg, child, parent, *args):
+    _drop_chains(child.node())
+
+
+### 問い合わせ ###
+
+def _get_handle(name: str):
+    """
+    登録したMObjectHandleを返す
+    存在しない場合はNone、登録の対象外や同じ名前のノードが複数ある場合など、cmdsで問い合わせる場合は ... を返す
+    """
+    if not _depth or not is_target(name):
+        return ...
+
+    handle = _handles.get(name)
+    if name in _handles and handle is None:
+        return ...
+
+    if handle is None or not handle.isValid():
+        return None
+
+    return handle
+
+
+def exists(name: str) -> bool:
+    handle = _get_handle(name)
+    if handle is ...:
+        return cmds.objExists(name)
+
+    return handle is not None
+
+
+def get_existing(names: list[str]) -> list[str]:
+    """
+    namesのうち存在するものを返す 登録していない名前はまとめて1回のlsで問い合わせる
+    """
+    handles = [_get_handle(name) for name in names]
+    queries = [name for name, handle in zip(names, handles) if handle is ...]
+    found = set()
+    if queries:
+        found = {path.rsplit("|", 1)[-1] for path in cmds.ls(queries) or []}
+
+    return [name for name, handle in zip(names, handles) if (name in found if handle is ... else handle is not None)]
+
+
+def exists_any(names: list[str]) -> bool:
+    return bool(get_existing(names))
+
+
+def get_full_path(name: str) -> str:
+    """
+    DAGノードのフルパスを返す
+    """
+    handle = _get_handle(name)
+    if handle is ... or handle is None:
+        return cmds.ls(name, long=True)[0]
+
+    return om2.MFnDagNode(handle.object()).fullPathName()
+
+
+def get_parent(name: str) -> str:
+    """
+    DAGノードの親の短い名前を返す 親がワールドの場合はNone
+    """
+    handle = _get_handle(name)
+    if handle is ... or handle is None:
+        parents = cmds.listRelatives(name, p=True)
+        return parents[0] if parents else None
+
+    parent_path = om2.MFnDagNode(handle.object()).fullPathName().rpartition("|")[0]
+    return parent_path.rsplit("|", 1)[-1] or None
+
+
+def _get_object(name: str) -> om2.MObject:
+    handle = _get_handle(name)
+    if handle is not ... and handle is not None:
+        return handle.object()
+
+    sel = om2.MSelectionList()
+    sel.add(name)
+    return sel.getDependNode(0)
+
+
+def _get_chain(mobj: om2.MObject) -> tuple:
+    """
+    ワールド直下からmobjまでのMObjectHandleを返す セッションの間は親ごとに保持して使い回す
+    """
+    handle = om2.MObjectHandle(mobj)
+    chain = _chains.get(handle.hashCode())
+    if chain is not None:
+        return chain
+
+    fn = om2.MFnDagNode(mobj)
+    parent = fn.parent(0) if fn.parentCount() else None
+    if parent is None or parent.hasFn(om2.MFn.kWorld):
+        chain = (handle,)
+
+    else:
+        chain = _get_chain(parent) + (handle,)
+
+    if _depth:
+        _chains[handle.hashCode()] = chain
+
+    return chain
+
+
+def get_common_ancestor(src: str, dest: str) -> tuple:
+    """
+    srcとdestの最も近い共通の親を返す src, destが共通の親の場合もある
+
+    Args:
+        src (str): DAGノード名
+        dest (str): DAGノード名
+
+    Returns:
+        tuple: (共通の親 無い場合はNone,
+                [共通の親の子からsrcまでのノード名],
+                [共通の親の子からdestの親までのノード名])
+    """
+    srcs = _get_chain(_get_object(src))
+    dsts = _get_chain(_get_object(dest))
+
+    i = 0
+    for a, b in zip(srcs, dsts):
+        if a.hashCode() != b.hashCode():
+            break
+
+        i += 1
+
+    def names(handles):
+        return [om2.MFnDependencyNode(h.object()).name() for h in handles]
+
+    root = names(srcs[i - 1:i])[0] if i else None
+    return root, names(srcs[i:]), names(dsts[i:-1])
@@ -0,0 +1,175 @@
+"""
+モジュールがビルドで作成したノードを、フェーズごとにメタノードへ記録する
+
+    from ysrig import node_ledger
+    recorder = node_ledger.Recorder(meta_node, node_ledger.PHASE_RIG)
+    with recorder:
+        module = klass(meta_node)
+
+    recorder.write()
+
+    node_ledger.remove([meta_node], node_ledger.PHASE_RIG)
+
+ノードはUUIDで記録するため、名前が変わっても追える
+削除する際はシーンを走査せず、記録したUUIDから1回のdeleteで削除する
+connect_matrixのキャッシュのように他のモジュールが作成したノードを使い回した場合は、
+claimで使い回したモジュールにも記録し、そのモジュールが残っている間は削除しない
+ikHandleが最初の1つで作成するソルバーのように、シーン全体で共有するノードは記録しない
+
+記録中の状態を保持するため、このモジュールはreloadしない
+"""
+import maya.api.OpenMaya as om2
+from ysrig.cmds_proxy import cmds
+
+### フェーズ ###
+PHASE_SKELETON = "skeleton"
+PHASE_CONTROLLER = "controller"
+PHASE_RIG = "rig"
+
+# {フェーズ: メタノードに追加するアトリビュート}
+LEDGER_ATTRS = {
+    PHASE_SKELETON: "YSSkeletonNodes",
+    PHASE_CONTROLLER: "YSControllerNodes",
+    PHASE_RIG: "YSRigNodes",
+}
+
+# シーン全体で共有するため、作成したモジュールに記録しないノードタイプ
+SHARED_NODE_TYPES = ["ikRPsolver", "ikSCsolver", "ikSplineSolver", "ikSpringSolver"]
+
+# 記録中のRecorder 入れ子の場合は最後の要素に記録する
+_stack = []
+
+
+class Recorder:
+    """
+    with文の間に作成されたノードを記録するクラス
+
+    Args:
+        meta_node (str): モジュールのメタノード
+        phase (str): PHASE_SKELETON, PHASE_CONTROLLER, PHASE_RIGのいずれか
+    """
+    def __init__(self, meta_node: str, phase: str):
+        self.meta_node = meta_node
+        self.phase = phase
+        self.handles = []
+        self.claimed = []     # 他のモジュールが作成して使い回したノード名
+        self._callback = None
+
+    def __enter__(self):
+        _stack.append(self)
+        self._callback = om2.MDGMessage.addNodeAddedCallback(self._node_added, "dependNode")
+        return self
+
+    def __exit__(self, *args):
+        om2.MMessage.removeCallback(self._callback)
+        self._callback = None
+        _stack.remove(self)
+        return False
+
+    def _node_added(self, mobj, *args):
+        if _stack and _stack[-1] is self:
+            self.handles.append(om2.MObjectHandle(mobj))
+
+    def uuids(self) -> list[str]:
+        """
+        記録したノードのうち、存在しているもののUUIDを作成順に返す 共有するノードは除く
+        """
+        fns = [om2.MFnDependencyNode(h.object()) for h in self.handles if h.isValid()]
+        uuids = [fn.uuid().asString() for fn in fns if fn.typeName not in SHARED_NODE_TYPES]
+        if self.claimed:
+            uuids += cmds.ls(self.claimed, uuid=True) or []
+
+        return list(dict.fromkeys(uuids))
+
+    def write(self) -> None:
+        """
+        記録したノードをメタノードに書き込む 既に記録があれば置き換える
+        """
+        write(self.meta_node, self.phase, self.uuids())
+
+
+def claim(nodes: list[str]) -> None:
+    """
+    既に存在するノードを、記録中のモジュールも使っていることにする
+    """
+    if _stack:
+        _stack[-1].claimed += [n for n in nodes if n]
+
+
+def has_ledger(meta_node: str, phase: str) -> bool:
+    return cmds.attributeQuery(LEDGER_ATTRS[phase], node=meta_node, exists=True)
+
+
+def read(meta_node: str, phase: str) -> list[str]:
+    """
+    メタノードに記録されたUUIDを返す 記録が無い場合は空のリスト
+    """
+    if not has_ledger(meta_node, phase):
+        return []
+
+    return (cmds.getAttr(f"{meta_node}.{LEDGER_ATTRS[phase]}") or "").split()
+
+
+def write(meta_node: str, phase: str, uuids: list[str]) -> None:
+    attr = LEDGER_ATTRS[phase]
+    if not has_ledger(meta_node, phase):
+        cmds.addAttr(meta_node, ln=attr, dt="string")
+
+    cmds.setAttr(f"{meta_node}.{attr}", " ".join(uuids), type="string")
+
+
+def get_nodes(meta_nodes: list[str], phase: str) -> list[str]:
+    """
+    メタノードに記録されたノードのうち、存在しているものをフルパスで返す
+    """
+    uuids = [u for meta in meta_nodes for u in read(meta, phase)]
+    if not uuids:
+        return []
+
+    return cmds.ls(uuids, long=True) or []
+
+
+def _top_nodes(nodes: list[str]) -> list[str]:
+    """
+    親が一緒に削除されるDAGノードを除く nodesはフルパス
+    """
+    paths = set(nodes)
+    result = []
+    for node in nodes:
+        parts = node.split("|")
+        if not any("|".join(parts[:i]) in paths for i in range(2, len(parts))):
+            result.append(node)
+
+    return result
+
+
+def remove(meta_nodes: list[str], phase: str, others: list[str]=None, extra: list[str]=None) -> list[str]:
+    """
+    メタノードに記録されたノードを1回のdeleteで削除し、記録を空にする
+    共有するノードは、以前のビルドで記録されていても削除しない
+
+    Args:
+        meta_nodes (list): 削除するモジュールのメタノード
+        phase (str): PHASE_SKELETON, PHASE_CONTROLLER, PHASE_RIGのいずれか
+        others (list): 残すモジュールのメタノード これらに記録されたノードは削除しない
+        extra (list): 一緒に削除するノード 存在しないものは無視する
+
+    Returns:
+        list: 削除したノード
+    """
+    keep = {u for meta in others or [] for u in read(meta, phase)}
+    uuids = [u for meta in meta_nodes for u in read(meta, phase) if u not in keep]
+    targets = uuids + (extra or [])
+    nodes = (cmds.ls(targets, long=True) or []) if targets else []
+    if nodes:
+        shared = set(cmds.ls(nodes, long=True, type=SHARED_NODE_TYPES) or [])
+        nodes = _top_nodes([n for n in nodes if n not in shared])
+
+    if nodes:
+        cmds.delete(nodes)
+
+    for meta in meta_nodes:
+        if has_ledger(meta, phase):
+            write(meta, phase, [])
+
+    return nodes
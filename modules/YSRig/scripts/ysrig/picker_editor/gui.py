@@ -1,13 +1,12 @@
 from __future__ import annotations
 
 import os
-import json
 import math
 from dataclasses import dataclass, field, asdict
 from typing import List, Dict, Optional, Literal
 import importlib
 from maya import cmds
-from ysrig import gui_base, core
+from ysrig import gui_base, core, shape_registry, meta_snapshot
 
 if int(gui_base.ver) <= 2024:
     from PySide2 import QtWidgets, QtCore, QtGui
@@ -51,7 +50,7 @@ TITLE = "Picker Editor"
 OBJ = f"YS_{TITLE}_Gui"
 THIS_FILE_PATH = os.path.abspath(__file__)
 PREFS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "prefs"))
-JSON_PATH = os.path.join(PREFS_PATH, "ysrig", "button_shape.json")
+JSON_PATH = shape_registry.BUTTON_SHAPE_JSON_PATH
 TLRT_SPIN_STEP = 10
 SC_SPIN_STEP = 0.1
 
@@ -1647,10 +1646,10 @@ class Data(PickerData):
         modules_list = [PickerModuleData(name="Facial_Silhouette", position={'x': 0, 'y': 0}, buttons=button, lock=True)]
 
         for meta in get_meta_nodes(core.get_facial_meta_nodes, "Picker_Facial"):
-            module = cmds.getAttr(f"{meta}.Module")
+            module = meta_snapshot.get(meta).get("Module")
             module = importlib.import_module(f"ysrig.modules.{module}.picker")
             klass = getattr(module, "Data")
-            ins = klass(shape_data[cmds.getAttr(f"{meta}.Module")]["default"], meta)
+            ins = klass(shape_data[meta_snapshot.get(meta).get("Module")]["default"], meta)
             modules_list += ins.datas
 
         s = shape_data["facial"]["default"]["Pointer"]
@@ -1665,18 +1664,17 @@ class Data(PickerData):
 
 
 def get_shape_data() -> list[PickerModuleData]:
-    with open(JSON_PATH, "r") as f:
-        data = json.load(f)
+    data = shape_registry.get_button_shapes(json_path=JSON_PATH)
 
     modules_list = []
 
     cmds.undoInfo(ock=True)
 
     for meta in get_meta_nodes(core.get_meta_nodes, core.PICKER_GROUP_NAME):
-        module = cmds.getAttr(f"{meta}.Module")
+        module = meta_snapshot.get(meta).get("Module")
         module = importlib.import_module(f"ysrig.modules.{module}.picker")
         klass = getattr(module, "Data")
-        ins = klass(data[cmds.getAttr(f"{meta}.Module")]["default"], meta)
+        ins = klass(data[meta_snapshot.get(meta).get("Module")]["default"], meta)
         modules_list += ins.datas
 
     if get_meta_nodes(core.get_facial_meta_nodes, "Picker_Facial"):
@@ -0,0 +1,422 @@
+"""
+コントローラーとリグのビルドで、モジュールがシーンに加えた操作をファイルに保存し、
+入力が同じ次のビルドではモジュールの処理を実行せずに保存した操作を再生する
+
+    from ysrig import build_pipeline
+    result = build_pipeline.build_all(cache=True)
+
+キャッシュのキーは、build_hashのハッシュ値(メタノード、親ジョイントの行列、YSRigのバージョン、
+モジュールのファイルの内容、接続モード)と、同じフェーズで先にビルドしたモジュールのキー
+先のモジュールが変わった場合は、以降のモジュールもキャッシュを使わない
+
+記録する操作
+    cmds_proxyを通したcmdsとmel.evalのうち、問い合わせ以外の呼び出し
+    build_planをモディファイアで適用した計画
+    connect_matrixのキャッシュに追加したノードと、node_ledgerに使い回しを記録したノード
+cmds_proxyを通さずにシーンを変更するモジュールがあると再生しても再現できないため、
+モジュールはcmds_proxyのcmdsを使う
+
+キャッシュはgzipで圧縮したJSONで、CACHE_DIRに1モジュール1ファイルで保存する
+CACHE_DIRはインストール先ではなく、ユーザーが書き込めるMayaのユーザーディレクトリ(MAYA_APP_DIR)の下に置く
+合計がMAX_BYTESを超えた場合は、最後に使ってから長いファイルから削除する
+
+記録中の状態を保持するため、このモジュールはreloadしない
+"""
+import os
+import gzip
+import json
+import hashlib
+import maya.api.OpenMaya as om2
+from ysrig.cmds_proxy import cmds
+from ysrig import cmds_proxy, core, build_hash, build_plan, build_state, node_ledger, fast_build
+
+CACHE_DIR = os.path.join(os.environ.get("MAYA_APP_DIR") or os.path.join(os.path.expanduser("~"), "maya"), "ysrig", "build_cache")
+MAX_BYTES = 256 * 1024 * 1024
+
+# キャッシュのファイルの形式を変えた場合に上げる
+FORMAT_VERSION = 1
+
+# {フェーズ: ハッシュ値に含めるモジュールのファイル}
+SOURCE_FILES = {
+    node_ledger.PHASE_CONTROLLER: "ctrl.py",
+    node_ledger.PHASE_RIG: "rig.py",
+}
+
+# シーンを変更しないため記録しないコマンド
+READ_ONLY_COMMANDS = {
+    "about", "attributeQuery", "connectionInfo", "exactWorldBoundingBox", "getAttr", "internalVar",
+    "isConnected", "listAttr", "listConnections", "listHistory", "listRelatives", "ls", "nodeType",
+    "objExists", "objectType", "pluginInfo", "pointPosition", "referenceQuery",
+    "progressWindow", "refresh", "undoInfo", "warning",
+}
+
+### 記録する操作 ###
+OP_CMDS = "cmds"
+OP_MEL = "mel"
+OP_PLAN = "plan"
+
+_enabled = False
+
+# {フェーズ: 同じフェーズで先にビルドしたモジュールのキーをまとめたハッシュ値}
+_chain = {}
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool) -> bool:
+    """
+    キャッシュを使うかを設定する
+
+    Returns:
+        bool: 設定前の値
+    """
+    global _enabled
+    previous = _enabled
+    _enabled = bool(enabled)
+    return previous
+
+
+def reset(phase: str) -> None:
+    """
+    フェーズのビルドの開始時に呼ぶ
+    """
+    _chain[phase] = ""
+
+
+class ReplayedModule:
+    """
+    キャッシュを再生したモジュールの代わりに返すクラス
+    """
+    def __init__(self, meta_node: str):
+        self.meta_node = meta_node
+        self.build = True
+        self.error = False
+        self.cached = True
+
+
+class Journal:
+    """
+    with文の間のシーンへの操作を記録するクラス
+    """
+    def __init__(self):
+        self.ops = []
+        self._matrix_cache = {}
+        self._claimed = []
+
+    def __enter__(self):
+        self._matrix_cache = dict(build_state.matrix_network_cache)
+        self._claimed = list(node_ledger._stack[-1].claimed) if node_ledger._stack else []
+        cmds_proxy.cmds.add_listener(self)
+        cmds_proxy.mel.add_listener(self)
+        build_plan.add_observer(self.record_plan)
+        return self
+
+    def __exit__(self, *args):
+        cmds_proxy.cmds.remove_listener(self)
+        cmds_proxy.mel.remove_listener(self)
+        build_plan.remove_observer(self.record_plan)
+        return False
+
+    def record(self, name, args, kwargs, seconds, result=None):
+        # cmds_proxyのリスナーとして呼ばれる
+        if result is cmds_proxy.FAILED or name in READ_ONLY_COMMANDS:
+            return
+
+        # モディファイアで適用中の計画の中の呼び出しは、record_planで計画として記録する
+        if build_plan.is_applying():
+            return
+
+        if kwargs.get("q") or kwargs.get("query"):
+            return
+
+        # モジュールが後で引数のリストを書き換えても記録が変わらないように複製する
+        if name.startswith("mel."):
+            self.ops.append([OP_MEL, name[4:], _copy(args), _copy(kwargs), _get_names(result)])
+
+        else:
+            self.ops.append([OP_CMDS, name, _copy(args), _copy(kwargs), _get_names(result)])
+
+    def record_plan(self, plan: build_plan.BuildPlan, names: dict) -> None:
+        self.ops.append([OP_PLAN, plan.to_data(), dict(names)])
+
+    def to_data(self) -> dict:
+        """
+        記録した操作と、with文の間に追加されたconnect_matrixのキャッシュ、使い回したノードを返す
+        """
+        matrix_cache = [[list(key), nodes] for key, nodes in build_state.matrix_network_cache.items() if self._matrix_cache.get(key) != nodes]
+        claimed = list(node_ledger._stack[-1].claimed[len(self._claimed):]) if node_ledger._stack else []
+        return {
+            "format": FORMAT_VERSION,
+            "ops": self.ops,
+            "matrix_cache": _copy(matrix_cache),
+            "claimed": claimed,
+        }
+
+
+def _get_names(result):
+    """
+    戻り値のうち、再生時の名前の置き換えに使うノード名だけを残す
+    """
+    if isinstance(result, str):
+        return result
+
+    if isinstance(result, (list, tuple)) and all(isinstance(r, str) for r in result):
+        return list(result)
+
+    return None
+
+
+def _copy(value):
+    if isinstance(value, (list, tuple)):
+        return [_copy(v) for v in value]
+
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+
+    return value
+
+
+def _to_tuple(value):
+    if isinstance(value, list):
+        return tuple(_to_tuple(v) for v in value)
+
+    return value
+
+
+### キー ###
+
+def get_key(meta_node: str, phase: str) -> str:
+    """
+    モジュールのキャッシュのキーを返す
+    """
+    h = hashlib.sha1()
+    h.update(f"{FORMAT_VERSION}:{phase}:{_chain.get(phase, '')}".encode("utf-8"))
+    h.update(build_hash.compute(meta_node, core.VERSION, SOURCE_FILES[phase]).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _advance(phase: str, key: str) -> None:
+    _chain[phase] = hashlib.sha1(f"{_chain.get(phase, '')}{key}".encode("utf-8")).hexdigest()
+
+
+### ファイル ###
+
+def get_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.json.gz")
+
+
+def load(key: str) -> dict:
+    """
+    キャッシュを読み込み、最後に使った日時を更新する 無い場合、読めない場合はNone
+    """
+    path = get_path(key)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+
+    except (OSError, ValueError):
+        discard(key)
+        return None
+
+    if data.get("format") != FORMAT_VERSION:
+        discard(key)
+        return None
+
+    os.utime(path)
+    return data
+
+
+def save(key: str, data: dict) -> bool:
+    """
+    キャッシュを保存し、合計の容量を超えた分を削除する
+
+    Returns:
+        bool: 保存できたか JSONに変換できない値を含む場合はFalse
+    """
+    try:
+        text = json.dumps(data, separators=(",", ":"))
+
+    except (TypeError, ValueError):
+        return False
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with gzip.open(get_path(key), "wt", encoding="utf-8") as f:
+        f.write(text)
+
+    evict()
+    return True
+
+
+def discard(key: str) -> None:
+    path = get_path(key)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def evict(max_bytes: int=None) -> list[str]:
+    """
+    キャッシュの合計がmax_bytesを超えている間、最後に使ってから長いファイルを削除する
+
+    Args:
+        max_bytes (int): 上限 Noneの場合はMAX_BYTES
+
+    Returns:
+        list: 削除したファイルのパス
+    """
+    if max_bytes is None:
+        max_bytes = MAX_BYTES
+
+    if not os.path.isdir(CACHE_DIR):
+        return []
+
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith(".json.gz"):
+            path = os.path.join(CACHE_DIR, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(e[1] for e in entries)
+    removed = []
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+
+        os.remove(path)
+        total -= size
+        removed.append(path)
+
+    return removed
+
+
+def clear() -> None:
+    """
+    全てのキャッシュを削除する
+    """
+    evict(0)
+
+
+### 再生 ###
+
+class _Names:
+    """
+    記録したノード名から、再生で作成されたノード名への置き換え
+    同じシーンで再生した場合は名前が変わらないため、空のまま
+    """
+    def __init__(self):
+        self.names = {}
+
+    def resolve(self, value):
+        if not self.names:
+            return value
+
+        if isinstance(value, str):
+            if value in self.names:
+                return self.names[value]
+
+            node, sep, attr = value.partition(".")
+            if sep and node in self.names:
+                return self.names[node] + sep + attr
+
+            return value
+
+        if isinstance(value, list):
+            return [self.resolve(v) for v in value]
+
+        if isinstance(value, dict):
+            return {k: self.resolve(v) for k, v in value.items()}
+
+        return value
+
+    def update(self, recorded, actual) -> None:
+        if isinstance(recorded, str) and isinstance(actual, str):
+            if recorded != actual:
+                self.names[recorded] = actual
+
+        elif isinstance(recorded, list) and isinstance(actual, (list, tuple)) and len(recorded) == len(actual):
+            for r, a in zip(recorded, actual):
+                self.update(r, a)
+
+
+def replay(data: dict) -> None:
+    """
+    記録した操作を順に実行する
+    """
+    names = _Names()
+    for op in data["ops"]:
+        kind = op[0]
+        if kind == OP_PLAN:
+            plan = build_plan.BuildPlan([names.resolve(o) for o in op[1]])
+            for planned, created in build_plan.apply(plan).items():
+                names.update(op[2].get(planned), created)
+
+            continue
+
+        _, name, args, kwargs, recorded = op
+        func = getattr(cmds_proxy.mel if kind == OP_MEL else cmds, name)
+        result = func(*names.resolve(args), **names.resolve(kwargs))
+        if recorded is not None:
+            names.update(recorded, _get_names(result))
+
+    for key, nodes in data["matrix_cache"]:
+        build_state.matrix_network_cache[_to_tuple(key)] = names.resolve(nodes)
+
+    node_ledger.claim(names.resolve(data["claimed"]))
+
+
+def _rollback(handles: list) -> None:
+    for handle in reversed(handles):
+        if handle.isValid():
+            cmds.delete(fast_build.get_name(handle))
+
+
+def build(meta_node: str, phase: str, klass):
+    """
+    キャッシュがあれば再生し、無ければモジュールをビルドして記録する
+    キャッシュを使わない設定の場合は、そのままビルドする
+
+    Args:
+        meta_node (str): メタノード
+        phase (str): node_ledger.PHASE_CONTROLLER もしくは node_ledger.PHASE_RIG
+        klass: モジュールのCtrl, Rigクラス
+
+    Returns:
+        モジュールのインスタンス 再生した場合はReplayedModule
+    """
+    if not _enabled:
+        return klass(meta_node)
+
+    key = get_key(meta_node, phase)
+    data = load(key)
+    if data is not None:
+        handles = []
+        callback = om2.MDGMessage.addNodeAddedCallback(lambda mobj, *args: handles.append(om2.MObjectHandle(mobj)), "dependNode")
+        try:
+            replay(data)
+            _advance(phase, key)
+            return ReplayedModule(meta_node)
+
+        except Exception:
+            # シーンがキャッシュと合わない場合は、作成したノードを削除してビルドし直す
+            om2.MMessage.removeCallback(callback)
+            callback = None
+            _rollback(handles)
+            discard(key)
+
+        finally:
+            if callback is not None:
+                om2.MMessage.removeCallback(callback)
+
+    with Journal() as journal:
+        module = klass(meta_node)
+
+    if module.build:
+        save(key, journal.to_data())
+
+    _advance(phase, key)
+    return module
@@ -0,0 +1,278 @@
+"""
+ビルドの各モジュール、各ステージの処理時間を計測する
+
+    from ysrig import profiler
+    with profiler.profile() as prof:
+        build_pipeline.build_all()
+
+    prof.write_json("D:/build_report.json")
+    prof.write_chrome_trace("D:/build_trace.json")  # chrome://tracing で開く
+
+各基底クラスの__init__は、ステージをstage関数を通して呼び出す
+計測していない間はそのまま呼び出すだけなので、通常のビルドには影響しない
+ステージごとにcmdsの呼び出し回数と、作成されたノードの数も数える
+
+計測中の状態を保持するため、このモジュールはreloadしない
+"""
+import json
+import time
+from contextlib import contextmanager
+import maya.api.OpenMaya as om2
+from ysrig import cmds_proxy
+
+_active = None
+
+
+class _Event:
+    __slots__ = ("name", "category", "meta_node", "start", "end", "nested", "cmds_calls", "nodes", "children")
+
+    def __init__(self, name, category, meta_node, nested):
+        self.name = name
+        self.category = category
+        self.meta_node = meta_node
+        self.start = time.perf_counter()
+        self.end = None
+        self.nested = nested  # 同じクラスのステージの中で呼ばれたか
+        self.cmds_calls = {}
+        self.nodes = 0
+        self.children = 0.0   # 子のステージの合計時間
+
+    @property
+    def seconds(self):
+        return self.end - self.start
+
+    @property
+    def self_seconds(self):
+        return self.seconds - self.children
+
+
+class Profiler:
+    """
+    ステージの計測結果を保持するクラス
+
+    cmdsの呼び出し回数はcmds_proxyのリスナーとして、
+    ノードの追加はMDGMessageのコールバックで数える
+    回数とノード数は、実行中の一番内側のステージに加算する
+    """
+    def __init__(self):
+        self.events = []
+        self.stack = []
+        self.origin = None
+        self.seconds = 0.0
+        self.other_cmds_calls = {}   # ステージの外で呼ばれたcmds
+        self.other_nodes = 0
+
+        self._callback = None
+
+    ### 計測の開始、終了 ###
+
+    def start(self):
+        self.origin = time.perf_counter()
+        cmds_proxy.cmds.add_listener(self)
+        cmds_proxy.mel.add_listener(self)
+        self._callback = om2.MDGMessage.addNodeAddedCallback(self._node_added, "dependNode")
+
+    def stop(self):
+        if self._callback is not None:
+            om2.MMessage.removeCallback(self._callback)
+            self._callback = None
+
+        cmds_proxy.cmds.remove_listener(self)
+        cmds_proxy.mel.remove_listener(self)
+        self.seconds = time.perf_counter() - self.origin
+
+    def record(self, name, args, kwargs, seconds, result=None):
+        # cmds_proxyのリスナーとして呼ばれる
+        calls = self.stack[-1].cmds_calls if self.stack else self.other_cmds_calls
+        calls[name] = calls.get(name, 0) + 1
+
+    def _node_added(self, *args):
+        if self.stack:
+            self.stack[-1].nodes += 1
+
+        else:
+            self.other_nodes += 1
+
+    ### ステージ ###
+
+    def call(self, instance, func, *args, **kwargs):
+        """
+        ステージを計測しながら呼び出す
+        """
+        category = get_category(instance)
+        nested = any(e.category == category for e in self.stack)
+        event = _Event(func.__name__, category, getattr(instance, "meta_node", None), nested)
+        self.stack.append(event)
+        try:
+            return func(*args, **kwargs)
+
+        finally:
+            event.end = time.perf_counter()
+            self.stack.pop()
+            if self.stack:
+                self.stack[-1].children += event.seconds
+
+            self.events.append(event)
+
+    ### 出力 ###
+
+    def report(self) -> dict:
+        """
+        モジュールのクラス、ステージごとに集計した結果を返す
+
+        Returns:
+            dict: {"version", "seconds", "modules": {クラス: {"seconds", "stages": {ステージ: {...}}}}, "other"}
+                  seconds は子のステージを含む時間、self_seconds は含まない時間
+        """
+        from ysrig import core
+
+        modules = {}
+        for e in self.events:
+            module = modules.setdefault(e.category, {"seconds": 0.0, "self_seconds": 0.0, "cmds_calls": 0, "nodes": 0, "stages": {}})
+            stage = module["stages"].setdefault(e.name, {"count": 0, "seconds": 0.0, "self_seconds": 0.0, "cmds_calls": 0, "nodes": 0, "cmds": {}})
+
+            stage["count"] += 1
+            stage["seconds"] += e.seconds
+            stage["self_seconds"] += e.self_seconds
+            stage["cmds_calls"] += sum(e.cmds_calls.values())
+            stage["nodes"] += e.nodes
+            for name, count in e.cmds_calls.items():
+                stage["cmds"][name] = stage["cmds"].get(name, 0) + count
+
+            module["self_seconds"] += e.self_seconds
+            module["cmds_calls"] += sum(e.cmds_calls.values())
+            module["nodes"] += e.nodes
+            if not e.nested:
+                module["seconds"] += e.seconds
+
+        return {
+            "version": core.VERSION,
+            "seconds": self.seconds,
+            "modules": modules,
+            "other": {"cmds_calls": sum(self.other_cmds_calls.values()), "nodes": self.other_nodes, "cmds": dict(self.other_cmds_calls)},
+        }
+
+    def top_stages(self, count: int=10) -> list[tuple]:
+        """
+        子のステージを除いた時間が長い順に、(クラス, ステージ, 秒数) を返す
+        """
+        totals = {}
+        for e in self.events:
+            key = (e.category, e.name)
+            totals[key] = totals.get(key, 0.0) + e.self_seconds
+
+        items = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:count]
+        return [(category, name, seconds) for (category, name), seconds in items]
+
+    def chrome_trace(self) -> dict:
+        """
+        chrome://tracing で読み込める形式の辞書を返す
+        """
+        events = []
+        for e in sorted(self.events, key=lambda e: e.start):
+            events.append({
+                "name": e.name,
+                "cat": e.category,
+                "ph": "X",
+                "ts": (e.start - self.origin) * 1e6,
+                "dur": e.seconds * 1e6,
+                "pid": 1,
+                "tid": 1,
+                "args": {"meta_node": e.meta_node, "cmds_calls": sum(e.cmds_calls.values()), "nodes": e.nodes},
+            })
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=4, ensure_ascii=False)
+
+    def write_chrome_trace(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def get_category(instance) -> str:
+    """
+    インスタンスのクラスを "モジュール名.ファイル名.クラス名" の形で返す
+    """
+    klass = instance.__class__
+    module = klass.__module__
+    if module.startswith("ysrig.modules."):
+        module = module[len("ysrig.modules."):]
+
+    elif module.startswith("ysrig."):
+        module = module[len("ysrig."):]
+
+    return f"{module}.{klass.__name__}"
+
+
+def stage(instance, func, *args, **kwargs):
+    """
+    ステージを呼び出す 計測中であれば計測する
+
+    Args:
+        instance: ステージを持つモジュールのインスタンス
+        func (function): ステージのメソッド
+
+    Returns:
+        funcの戻り値
+    """
+    if _active is None:
+        return func(*args, **kwargs)
+
+    return _active.call(instance, func, *args, **kwargs)
+
+
+def is_active() -> bool:
+    return _active is not None
+
+
+@contextmanager
+def profile():
+    """
+    with文の間のビルドを計測する 入れ子にした場合は外側のProfilerを使う
+
+    Yields:
+        Profiler: 計測結果
+    """
+    global _active
+    if _active is not None:
+        yield _active
+        return
+
+    prof = Profiler()
+    _active = prof
+    prof.start()
+    try:
+        yield prof
+
+    finally:
+        prof.stop()
+        _active = None
+
+
+def profile_build(json_path: str=None, trace_path: str=None, **kwargs) -> Profiler:
+    """
+    build_pipeline.build_allを計測し、結果をファイルに書き出す
+
+    Args:
+        json_path (str): 集計結果のJSONの書き出し先 Noneの場合は書き出さない
+        trace_path (str): Chrome traceの書き出し先 Noneの場合は書き出さない
+        **kwargs: build_allの引数
+
+    Returns:
+        Profiler: 計測結果
+    """
+    from ysrig import build_pipeline
+
+    with profile() as prof:
+        build_pipeline.build_all(**kwargs)
+
+    if json_path:
+        prof.write_json(json_path)
+
+    if trace_path:
+        prof.write_chrome_trace(trace_path)
+
+    return prof
@@ -3,9 +3,13 @@ import inspect
 from traceback import *
 import importlib
 from maya.api.OpenMaya import MGlobal
-from maya import cmds
-from ysrig import core
+from ysrig.cmds_proxy import cmds
+from ysrig import core, meta_snapshot, build_hash, profiler, fast_build, node_ledger, plan_cache, rig_mirror, name_registry
 importlib.reload(core)
+importlib.reload(rig_mirror)
+
+IDENTITY_MATRIX = [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]
+
 
 class RigBace:
     """
@@ -16,38 +20,46 @@ class RigBace:
     ROOT_CTRL = "Ctrl_Root"
     ROOT_OFFSET_CTRL = "Ctrl_Root_Offset"
 
-    def __init__(self, meta_node):
-        self._setup(meta_node)                          # 変数宣言
-        self.setup()
-        self.check_build()                              # ビルド条件を満たすかチェック
+    def __init__(self, meta_node, source=None):
+        self.source = source                                       # ミラー側の場合は元のモジュール
+        self._stage(self._setup, meta_node)                        # 変数宣言
+        self._stage(self.setup)
+        self._stage(self.check_build)                              # ビルド条件を満たすかチェック
 
         if not self.build:
             return
 
-        self._get_class()
-        self._create_grp()
-        self.parent_grp()
-        self.pre_process()                 # 前処理
-        self.get_base_joints()             # jointの名前を取得
-        self.create_proxy()                # proxyジョイント作成
-        self.create_ctrl_grp()             # コントローラーのグループ
-        self._create()                     # ノード作成
-        self.create()
-        self.set_color()                   # 色設定
-        self.set_shape_transform()
-        self.add_settings()                # 設定用アトリビュート追加
-        self._connect()                    # ノード接続
-        self.connect()
-        self.set_attr()                    # アトリビュート設定
-        self._lock_attributes()            # ロックするアトリビュートを指定
-        self.lock_attributes()
-        self._lock()                       # アトリビュートロック
-        self._distribute_shape_instances()
-        self.collect_meta_data()           # メタノードに書き込む情報を指定
-        self.post_process()                # 後処理
-        self._set_meta_data()              # メタノードに情報書き込み
-        self.connect_visibility()
-        self.mirror()
+        self._stage(self._get_class)
+        self._stage(self._create_grp)
+        self._stage(self.parent_grp)
+        self._stage(self.pre_process)                 # 前処理
+        self._stage(self.get_base_joints)             # jointの名前を取得
+        self._stage(self.create_proxy)                # proxyジョイント作成
+        self._stage(self.create_ctrl_grp)             # コントローラーのグループ
+        with rig_mirror.Recorder(self):               # ミラー側で再生するため記録する
+            self._stage(self._create)                 # ノード作成
+            self._stage(self.create)
+        self._stage(self.set_color)                   # 色設定
+        self._stage(self.set_shape_transform)
+        self._stage(self.add_settings)                # 設定用アトリビュート追加
+        self._stage(self._connect)                    # ノード接続
+        self._stage(self.connect)
+        self._stage(self.set_attr)                    # アトリビュート設定
+        self._stage(self._lock_attributes)            # ロックするアトリビュートを指定
+        self._stage(self.lock_attributes)
+        self._stage(self._lock)                       # アトリビュートロック
+        self._stage(self._distribute_shape_instances)
+        self._stage(self.collect_meta_data)           # メタノードに書き込む情報を指定
+        self._stage(self.post_process)                # 後処理
+        self._stage(self._set_meta_data)              # メタノードに情報書き込み
+        self._stage(self.connect_visibility)
+        self._stage(self.mirror)
+
+    def _stage(self, func, *args):
+        """
+        ステージを呼び出す profilerで計測中であれば処理時間を記録する
+        """
+        return profiler.stage(self, func, *args)
 
     def _setup(self, meta_node):
         self.build = True
@@ -58,6 +70,7 @@ class RigBace:
         self.color_class = None
 
         self.meta_node = meta_node
+        self.meta = meta_snapshot.get(meta_node)
         self.grp = None
         self.settings_node = None
         self.ctrl_grp = None
@@ -72,29 +85,29 @@ class RigBace:
         self._lock_attrs = []
         self.lock_attrs = []
 
-        self.grp_name = cmds.getAttr(f"{self.meta_node}.GroupName")
-        self.side = cmds.getAttr(f"{self.meta_node}.Side")
-        self.joint_count = cmds.getAttr(f"{self.meta_node}.JointCount")
-        self.joint_names = core.get_list_attributes(self.meta_node, "JointName")
+        self.grp_name = self.meta.get("GroupName")
+        self.side = self.meta.get("Side")
+        self.joint_count = self.meta.get("JointCount")
+        self.joint_names = self.meta.get_list("JointName")
+
+        self.ctrl_matrices = self.meta.get_list("CtrlsMatrix")
+        self.ctrl_space_matrices = self.meta.get_list("CtrlSpacesMatrix")
+        self.ctrl_line_width = self.meta.get("LineWidth")
 
-        self.ctrl_matrices = core.get_list_attributes(self.meta_node, "CtrlsMatrix")
-        self.ctrl_space_matrices = core.get_list_attributes(self.meta_node, "CtrlSpacesMatrix")
-        self.ctrl_line_width = cmds.getAttr(f"{self.meta_node}.LineWidth")
+        self.translate_enabled = self.meta.get("TranslateEnabled")
+        self.connect_type = self.meta.get("ConnectType")
 
-        self.translate_enabled = cmds.getAttr(f"{self.meta_node}.TranslateEnabled")
-        self.connect_type = cmds.getAttr(f"{self.meta_node}.ConnectType")
+        # ミラー側を作成する場合は、ノード作成を記録してミラー側で再生する
+        self.record_create = bool(self.meta.get("Mirror")) and get_mirror_names(self.side, self.grp_name, self.joint_names)[0]
+        self.create_record = None
 
     def setup(self):
         pass
 
     def check_build(self):
-        if cmds.objExists(f"Controller_{self.grp_name}_Group"):
+        if name_registry.exists_any([f"Controller_{self.grp_name}_Group"] + [f"Proxy_{name}" for name in self.joint_names]):
             self.build = False
 
-        for name in self.joint_names:
-            if  cmds.objExists(f"Proxy_{name}"):
-                self.build = False
-
     def _get_class(self):
         file_path = inspect.getfile(self.__class__)  # クラスのあるファイルパス
         dir_path = os.path.dirname(file_path)        # 親ディレクトリのパス
@@ -123,14 +136,13 @@ class RigBace:
 
     def parent_grp(self):
         cmds.parent(self.grp, RigBace.ROOT_OFFSET_CTRL)
-        self.parent_joint = cmds.listRelatives(f"JT_{self.joint_names[0]}", p=True)[0]
+        self.parent_joint = name_registry.get_parent(f"JT_{self.joint_names[0]}")
         cmds.matchTransform(self.grp, self.parent_joint)
 
         if self.parent_joint == RigBace.ROOT_JOINT:
             return
 
-        core.connect_parent_constraint(self.parent_joint, self.grp)
-        core.connect_scale_constraint(self.parent_joint, self.grp)
+        core.connect_transform(self.parent_joint, self.grp)
 
     def pre_process(self):
         pass
@@ -141,7 +153,12 @@ class RigBace:
             self.base_joints[i] = f"JT_{name}"
 
     def create_proxy(self):
-        jts = cmds.duplicate(self.base_joints, po=True, rc=True)
+        base_joints = self.base_joints
+        # スケルトンでゴールボーンが削除されている場合は複製しない
+        if not self.meta.get("GoalBone") and "_GB" in base_joints[-1]:
+            base_joints = base_joints[:-1]
+
+        jts = cmds.duplicate(base_joints, po=True, rc=True)
         for jt in jts:
             cmds.setAttr(f"{jt}.drawStyle", 2)
 
@@ -176,15 +193,15 @@ class RigBace:
         pass
 
     def _connect(self):
+        attrs = core.get_transform_attrs()
         if self.parent_joint == RigBace.ROOT_JOINT:
-            core.connect_parent_constraint(self.proxies[0], self.base_joints[0])
-            core.connect_scale_constraint(self.proxies[0], self.base_joints[0])
+            core.connect_transform(self.proxies[0], self.base_joints[0])
             for px, jt in zip(self.proxies[1:], self.base_joints[1:]):
-                core.connect_same_attr(px, jt, ["translate", "rotate", "scale"])
+                core.connect_same_attr(px, jt, attrs)
 
         else:
             for px, jt in zip(self.proxies, self.base_joints):
-                core.connect_same_attr(px, jt, ["translate", "rotate", "scale"])
+                core.connect_same_attr(px, jt, attrs)
 
     def connect(self):
         pass
@@ -224,8 +241,36 @@ class RigBace:
         cmds.connectAttr(f"Controller_Root_Settings.{self.grp_name}", f"{self.grp}.visibility")
 
     def mirror(self):
-        if cmds.getAttr(f"{self.meta_node}.Mirror"):
-            klass = self.mirror_class(self.meta_node)
+        if self.meta.get("Mirror"):
+            klass = self.mirror_class(self.meta_node, self)
+
+
+class RigMirrorBace(RigBace):
+    """
+    ミラー側のリグの基底クラス モジュールのRigと一緒に継承する
+
+        class RigMirror(rig_base.RigMirrorBace, Rig):
+            pass
+
+    ノード作成ではRigのcreateを実行せず、元のモジュールのcreateの記録をサイドを置き換えて再生し、
+    ctrl_grpを反転する それ以外のステージはミラー側の名前で実行する
+    """
+    def _setup(self, meta_node):
+        super()._setup(meta_node)
+        self.src_joints = [f"JT_{name}" for name in self.joint_names]
+        self.src_side = self.side[:]
+        self.build, self.side, self.grp_name, self.joint_names = get_mirror_names(self.side, self.grp_name, self.joint_names)
+        self.record_create = False
+
+    def _create(self):
+        pass
+
+    def create(self):
+        if self.source is None or self.source.create_record is None:
+            raise RuntimeError(f"{self.meta_node}: ミラー元のモジュールの記録がありません")
+
+        rig_mirror.replay(self.source.create_record, self.src_side, self.side, self)
+        core.mirror_space(self.ctrl_grp)
 
 
 def get_mirror_names(side, group_name, joint_names):
@@ -250,13 +295,182 @@ def get_mirror_names(side, group_name, joint_names):
     return [True, replace_side.replace("_", ""), group_name, joint_names]
 
 
-def main():
-    cmds.undoInfo(ock=True)
+def get_module_names(meta_node: str) -> list[str]:
+    """
+    モジュールのリグのグループ名を返す ミラーで作成されるモジュールを含む
+    """
+    meta = meta_snapshot.get(meta_node)
+    group_name = meta.get("GroupName")
+    names = [group_name]
+    if meta.get("Mirror"):
+        mirror = get_mirror_names(meta.get("Side"), group_name, meta.get_list("JointName", []))
+        if mirror[0]:
+            names.append(mirror[2])
+
+    return names
+
+
+def get_module_groups(meta_node: str) -> list[str]:
+    """
+    モジュールのリグが作成するController_{グループ名}_Groupを返す ミラーで作成されるグループを含む
+    """
+    return [f"Controller_{name}_Group" for name in get_module_names(meta_node)]
+
+
+def get_module_joints(meta_node: str) -> list[str]:
+    """
+    モジュールのリグが動かすスケルトンのジョイント名を返す ミラーで作成されるジョイントを含む
+    """
+    meta = meta_snapshot.get(meta_node)
+    joint_names = meta.get_list("JointName", [])
+    if meta.get("Mirror"):
+        joint_names = joint_names + get_mirror_names(meta.get("Side"), meta.get("GroupName"), joint_names)[3]
+
+    return [f"JT_{name}" for name in joint_names]
+
+
+def write_build_hash(meta_node: str) -> str:
+    """
+    モジュールの入力のハッシュ値を、リグのグループに書き込む
+
+    Returns:
+        str: 書き込んだハッシュ値
+    """
+    value = build_hash.compute(meta_node, core.VERSION)
+    for grp in get_module_groups(meta_node):
+        if cmds.objExists(grp):
+            build_hash.write(grp, value)
+
+    return value
+
+
+def release_joint(joint: str) -> None:
+    """
+    リグからジョイントへの接続を外し、コンストレイントとoffsetParentMatrixを初期状態に戻す
+    """
+    attrs = ["offsetParentMatrix", "translate", "rotate", "scale", "shear"]
+    attrs += [f"{attr}{axis}" for attr in ["translate", "rotate", "scale"] for axis in "XYZ"]
+    for attr in attrs:
+        for src in cmds.listConnections(f"{joint}.{attr}", s=True, d=False, p=True) or []:
+            cmds.disconnectAttr(src, f"{joint}.{attr}")
+
+    constraints = cmds.listRelatives(joint, c=True, type=["parentConstraint", "scaleConstraint"], fullPath=True)
+    if constraints:
+        cmds.delete(constraints)
+
+    cmds.setAttr(f"{joint}.offsetParentMatrix", IDENTITY_MATRIX, type="matrix")
+
+
+def remove_module(meta_node: str) -> None:
+    """
+    モジュールのリグを削除する ミラーで作成されたリグも削除する
+    メタノードに作成したノードの記録があれば、記録したノードだけを削除する
+    """
+    for jt in get_module_joints(meta_node):
+        if cmds.objExists(jt):
+            release_joint(jt)
+
+    groups = get_module_groups(meta_node)
+    if node_ledger.has_ledger(meta_node, node_ledger.PHASE_RIG):
+        others = [m for m in core.get_meta_nodes() + core.get_facial_meta_nodes() if m != meta_node]
+        node_ledger.remove([meta_node], node_ledger.PHASE_RIG, others=others, extra=groups)
+
+    else:
+        groups = [grp for grp in groups if cmds.objExists(grp)]
+        proxies = cmds.ls(groups, type="joint", dag=True) if groups else []
+        proxies = [proxy for proxy in proxies if "Proxy_" in proxy]
+        if proxies + groups:
+            cmds.delete(proxies + groups)
+
+    if not cmds.objExists("Controller_Root_Settings"):
+        return
+
+    for name in get_module_names(meta_node):
+        if cmds.attributeQuery(name, node="Controller_Root_Settings", exists=True):
+            cmds.deleteAttr(f"Controller_Root_Settings.{name}")
+
+
+def remove_all() -> None:
+    """
+    全てのモジュールのリグを削除する
+    全てのメタノードに作成したノードの記録があれば、記録したノードだけを削除する
+    """
+    meta_nodes = core.get_meta_nodes() + core.get_facial_meta_nodes()
+    if meta_nodes and all(node_ledger.has_ledger(m, node_ledger.PHASE_RIG) for m in meta_nodes):
+        for jt in [jt for m in meta_nodes for jt in get_module_joints(m)]:
+            if cmds.objExists(jt):
+                release_joint(jt)
+
+        node_ledger.remove(meta_nodes, node_ledger.PHASE_RIG, extra=[core.RIG_GROUP_NAME])
+        return
+
+    proxies = cmds.ls(core.RIG_GROUP_NAME, type="joint", dag=True)
+    proxies = [proxy for proxy in proxies if "Proxy_" in proxy]
+    for jt in cmds.ls(core.SKELETON_GROUP_NAME, type="joint", dag=True) or []:
+        if cmds.listConnections(f"{jt}.offsetParentMatrix", s=True, d=False):
+            release_joint(jt)
+
+    cmds.delete(proxies + [core.RIG_GROUP_NAME])
+
+
+def create_module(meta_node: str) -> RigBace:
+    """
+    メタノードのモジュールのRigクラスをインスタンス化する
+    plan_cacheが有効な場合、入力が同じビルドの記録があれば再生してplan_cache.ReplayedModuleを返す
+    """
+    module = meta_snapshot.get(meta_node).get("Module")
+    module = importlib.import_module(f"ysrig.modules.{module}.rig")
+    klass = getattr(module, "Rig")
+
+    # 作成したノードをメタノードに記録する ビルドしなかった場合は前回の記録を残す
+    recorder = node_ledger.Recorder(meta_node, node_ledger.PHASE_RIG)
+    with recorder:
+        module = plan_cache.build(meta_node, node_ledger.PHASE_RIG, klass)
+
+    if module.build:
+        recorder.write()
+
+    return module
+
+
+def build(meta_nodes: list[str], create=create_module) -> list[RigBace]:
+    """
+    リグを作成する アンドゥチャンクとプログレスウィンドウは呼び出し側で扱う
+
+    Args:
+        meta_nodes (list): メタノード bodyモジュール、facialモジュールの順
+        create (function): メタノードからモジュールのインスタンスを作成する関数
+
+    Returns:
+        list: 作成したモジュールのインスタンス
+    """
+    core.reset_matrix_network_cache()
+    plan_cache.reset(node_ledger.PHASE_RIG)
+    with name_registry.session():
+        modules = [create(meta) for meta in meta_nodes]
+        for meta, module in zip(meta_nodes, modules):
+            if module.build:
+                write_build_hash(meta)
+
+    return modules
+
+
+def main(connect_mode: str=None, fast: bool=False):
+    """
+    全てのモジュールのリグをビルドする
+
+    Args:
+        connect_mode (str): connect_matrixの接続モード Noneの場合は既定のdecomposeMatrixで接続する
+        fast (bool): アンドゥの記録とビューポートの更新を止めてビルドするか
+                     失敗した場合はアンドゥの代わりに作成したノードを削除する
+    """
+    previous_mode = core.set_connect_mode(connect_mode)
+    transaction = fast_build.BuildTransaction(fast)
+    transaction.begin()
 
     try:
         meta_nodes = core.get_meta_nodes()
         meta_nodes += core.get_facial_meta_nodes()
-        modules = [None] * len(meta_nodes)
 
         # プログレスウィンドウの初期化
         if cmds.progressWindow(q=True, isCancelled=True):
@@ -269,27 +483,26 @@ def main():
                             isInterruptable=False)
 
         # モジュールのメタノードを読み込んでインスタンスを作る
-        for i, meta in enumerate(meta_nodes):
-            if cmds.progressWindow(q=True, isCancelled=True):
-                cmds.progressWindow(endProgress=True)
-                cmds.warning("Cancelled by user")
-                return
-
-            module = cmds.getAttr(f"{meta}.Module")
-            module = importlib.import_module(f"ysrig.modules.{module}.rig")
-            klass = getattr(module, "Rig")
-            modules[i] = klass(meta)
+        def create(meta):
+            transaction.track(meta)
+            module = create_module(meta)
+            transaction.track()
 
             # 進捗を更新
             cmds.progressWindow(e=True, step=1, status=f"Building {meta}...")
+            return module
+
+        build(meta_nodes, create)
 
         cmds.select(cl=True)
-        cmds.undoInfo(cck=True)
+        transaction.end(True)
 
     except:
-        cmds.undoInfo(cck=True)
-        cmds.undo()
+        transaction.end(False)
         print_exc()
         MGlobal.displayError("予期せぬエラーが発生しました")
 
+    finally:
+        core.set_connect_mode(previous_mode)
+
     cmds.progressWindow(endProgress=True)
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+ミラー側のリグを、元のモジュールのノード作成の記録から作成する
+
+元のモジュールのcreateの間のシーンへの操作と、createで設定したインスタンス変数を記録し、
+ミラー側では名前のサイドを置き換えて再生する 再生した後にctrl_grpを反転するのは、
+ミラー側でcreateを実行していた時と同じ
+
+ジョイント(JT_)は元のサイドのものを読んで作成するため、操作の中のジョイント名は置き換えない
+インスタンス変数はミラー側のモジュールの値として使うため、ジョイント名も置き換える
+"""
+import re
+import copy
+from ysrig import core, plan_cache
+
+# 操作の中で置き換えない名前の接頭辞
+EXEMPT_PREFIXES = ["JT_"]
+
+
+def get_renamer(src_side: str, dst_side: str, exempt: list[str]=EXEMPT_PREFIXES):
+    """
+    名前の中の "{src_side}_" を "{dst_side}_" に置き換える関数を返す
+    英数字の直後の "{src_side}_" と、exemptの接頭辞の直後のものは置き換えない
+
+    Args:
+        src_side (str): 元のサイド "L" もしくは "R"
+        dst_side (str): ミラー側のサイド
+        exempt (list): 置き換えない名前の接頭辞
+
+    Returns:
+        function: func(str) -> str
+    """
+    prefixes = "|".join(re.escape(p) for p in exempt) or "(?!)"
+    pattern = re.compile(rf"(?<![A-Za-z0-9])({prefixes})?{re.escape(src_side)}_")
+
+    def rename(text: str) -> str:
+        return pattern.sub(lambda m: m.group(0) if m.group(1) else f"{dst_side}_", text)
+
+    return rename
+
+
+def rename(value, func):
+    """
+    値に含まれる文字列を全てfuncで置き換えた複製を返す
+    リスト、タプル、辞書とコントローラーのカーブ(core.Curve)の中も置き換える
+    """
+    if isinstance(value, str):
+        return func(value)
+
+    if isinstance(value, list):
+        return [rename(v, func) for v in value]
+
+    if isinstance(value, tuple):
+        return tuple(rename(v, func) for v in value)
+
+    if isinstance(value, dict):
+        return {rename(k, func): rename(v, func) for k, v in value.items()}
+
+    if isinstance(value, core.Curve):
+        curve = copy.copy(value)
+        curve.__dict__ = rename(value.__dict__, func)
+        return curve
+
+    return value
+
+
+class Recorder:
+    """
+    with文の間のモジュールの操作と、値が変わったインスタンス変数を記録するクラス
+    ミラー側を作成しないモジュールでは何もしない
+
+    Args:
+        module (rig_base.RigBace): 記録するモジュール
+    """
+    def __init__(self, module):
+        self.module = module
+        self.journal = None
+        self.attrs = {}
+
+    def __enter__(self):
+        if not getattr(self.module, "record_create", False):
+            return self
+
+        # 要素を追加したリストも変わったと判定できるようにリストと辞書は複製する
+        self.attrs = {k: copy.copy(v) if isinstance(v, (list, dict)) else v for k, v in vars(self.module).items()}
+        self.journal = plan_cache.Journal().__enter__()
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if self.journal is None:
+            return False
+
+        self.journal.__exit__(exc_type, *args)
+        if exc_type is None:
+            attrs = {k: v for k, v in vars(self.module).items() if k not in self.attrs or not _same(self.attrs[k], v)}
+            self.module.create_record = {"data": self.journal.to_data(), "attrs": attrs}
+
+        return False
+
+
+def _same(a, b) -> bool:
+    try:
+        return bool(a == b)
+
+    except Exception:
+        return a is b
+
+
+def replay(record: dict, src_side: str, dst_side: str, module) -> None:
+    """
+    記録した操作をサイドを置き換えて再生し、インスタンス変数をmoduleに設定する
+
+    Args:
+        record (dict): Recorderが元のモジュールに記録したcreate_record
+        src_side (str): 元のサイド
+        dst_side (str): ミラー側のサイド
+        module (rig_base.RigBace): ミラー側のモジュール
+    """
+    plan_cache.replay(rename(record["data"], get_renamer(src_side, dst_side)))
+
+    rename_all = get_renamer(src_side, dst_side, exempt=[])
+    for attr, value in record["attrs"].items():
+        setattr(module, attr, rename(value, rename_all))
@@ -1,6 +1,7 @@
 from maya import cmds
 import os
 import json
+from ysrig import shape_registry, curve_points
 
 path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
@@ -11,17 +12,14 @@ def save_shape():
 
     for sel in selection:
         cv = cmds.listRelatives(sel, s=True)[0]
-        cv_pos = []
-
-        for i in range(cmds.getAttr(f"{cv}.controlPoints", size=True)):
-            cv_pos.append(cmds.getAttr(f"{cv}.controlPoints[{i}]")[0])
-
-        data[sel] = cv_pos
+        data[sel] = curve_points.get_points(cv)
         data[f"{sel}_Uniform_Scale"] = cmds.getAttr("%s.displayRotatePivot"%(sel))
         
     with open(savefile, "w") as f:
         json.dump(data, f, indent=4)
 
+    shape_registry.invalidate(savefile)
+
 """
 from ysrig import save_json
 save_json.save_shape()
@@ -43,16 +41,14 @@ def save_button_shape():
                 k = shape.replace(f"{shape_type}_", "")
                 mod[sel][key][k] = {}
                 mod[sel][key][k]["pos"] = {"x": cmds.getAttr(f"{shape}.translateX"), "y": cmds.getAttr(f"{shape}.translateZ")}
-                mod[sel][key][k]["cvs"] = []
 
                 cv = cmds.listRelatives(shape, s=True)[0]
-                for i in range(cmds.getAttr(f"{cv}.controlPoints", size=True)):
-                    pos = cmds.getAttr(f"{cv}.controlPoints[{i}]")[0]
-                    pos = [pos[0], pos[2]]
-                    mod[sel][key][k]["cvs"] += [pos]
+                mod[sel][key][k]["cvs"] = [[pos[0], pos[2]] for pos in curve_points.get_points(cv)]
 
     with open(savefile, "w") as f:
         json.dump(mod, f, indent=4)
+
+    shape_registry.invalidate(savefile)
 """
 from ysrig import save_json
 save_json.save_button_shape()
@@ -0,0 +1,435 @@
+import maya.api.OpenMaya as om2
+from ysrig import meta_snapshot
+
+LABEL_ATTR = "YSNodeLabel"
+
+### ラベル ###
+META_NODE_LABEL = "Meta_Node"
+GUIDE_SETTING_LABEL = "Guide_Setting"
+CTRL_EDIT_SETTING_LABEL = "CtrlEdit_Setting"
+CONTROLLER_SETTING_LABEL = "Controller_Setting"
+CTRL_GROUP_LABEL = "Ctrl_Group"
+
+### 固定の名前 coreと同じ値 ###
+GUIDE_GROUP_NAME = "Guide_Group"
+GUIDE_MODULES_GROUP_NAME = "Guide_Module_Group"
+GUIDE_FACIALS_GROUP_NAME = "Guide_Facial_Group"
+CTRL_EDIT_MODULES_GROUP_NAME = "ControllerEdit_Module_Group"
+RIG_MODULES_GROUP_NAME = "Controller_Module_Group"
+
+PROXY_PREFIX = "Proxy_"
+
+# {ラベル: (モジュールの辞書のキー, 名前の接頭辞, 名前の接尾辞)} 名前からグループ名を求める
+MODULE_NODES = {
+    META_NODE_LABEL: ("meta", "Meta_", ""),
+    GUIDE_SETTING_LABEL: ("guide_settings", "Guide_", "_Settings"),
+    GUIDE_MODULES_GROUP_NAME: ("guide_group", "Guide_", "_Group"),
+    CTRL_EDIT_SETTING_LABEL: ("ctrl_edit_settings", "CtrlEdit_", "_Settings"),
+    CTRL_EDIT_MODULES_GROUP_NAME: ("ctrl_edit_group", "CtrlEdit_", "_Group"),
+    CONTROLLER_SETTING_LABEL: ("controller_settings", "Controller_", "_Settings"),
+    RIG_MODULES_GROUP_NAME: ("controller_group", "Controller_", "_Group"),
+    CTRL_GROUP_LABEL: ("ctrl_group", "", "_Ctrl_Group"),
+}
+
+_index = None
+
+
+class SceneIndex:
+    """
+    YSNodeLabelを持つノードをラベルごとに保持するクラス
+
+    最初の参照時にシーン全体を一度だけ問い合わせ、以降はノードの追加、削除、名前変更の
+    コールバックで差分だけを更新する
+    ラベルごと、モジュールのグループ名ごとの辞書と、メタノードの順番は参照時に作って保持し、
+    ラベル付きのノードが変わるまで使い回す
+    メタノードの順番はガイドのグループの子の順番で決まるため、ガイドのグループにだけ
+    子の追加、削除、並べ替えのコールバックを登録する
+    """
+    def __init__(self):
+        self._labels = {}          # {ハッシュ値: (MObjectHandle, ラベル)}
+        self._pending = []         # 追加されたがまだラベルを調べていないノード
+        self._names = None         # {ノード名: ハッシュ値}
+        self._by_label = None      # {ラベル: [ノード名, ...]}
+        self._modules = None       # {グループ名: {モジュールの辞書のキー: MObjectHandle}}
+        self._meta_nodes = None    # (bodyのメタノード, facialのメタノード)
+        self._proxies = {}         # {グループ名: [MObjectHandle, ...]}
+        self._built = False
+        self._callbacks = []
+        self._group_callbacks = {} # {ガイドのグループのハッシュ値: [コールバックID, ...]}
+
+    ### コールバック ###
+
+    def install(self):
+        if self._callbacks:
+            return
+
+        self._callbacks = [
+            om2.MDGMessage.addNodeAddedCallback(self._node_added, "dependNode"),
+            om2.MDGMessage.addNodeRemovedCallback(self._node_removed, "dependNode"),
+            om2.MNodeMessage.addNameChangedCallback(om2.MObject(), self._name_changed),
+        ]
+        for message in (om2.MSceneMessage.kAfterNew, om2.MSceneMessage.kAfterOpen, om2.MSceneMessage.kAfterImport, om2.MSceneMessage.kAfterCreateReference):
+            self._callbacks.append(om2.MSceneMessage.addCallback(message, self._scene_changed))
+
+    def uninstall(self):
+        if self._callbacks:
+            om2.MMessage.removeCallbacks(self._callbacks)
+
+        self._callbacks = []
+        self._remove_group_callbacks()
+
+    def _watch_group(self, handle: om2.MObjectHandle):
+        """
+        ガイドのグループの子が変わった時に、メタノードの順番を破棄する
+        """
+        key = handle.hashCode()
+        if key in self._group_callbacks:
+            return
+
+        path = om2.MDagPath.getAPathTo(handle.object())
+        self._group_callbacks[key] = [
+            om2.MDagMessage.addChildAddedDagPathCallback(path, self._children_changed),
+            om2.MDagMessage.addChildRemovedDagPathCallback(path, self._children_changed),
+            om2.MDagMessage.addChildReorderedDagPathCallback(path, self._children_changed),
+        ]
+
+    def _remove_group_callbacks(self, key: int=None):
+        keys = list(self._group_callbacks) if key is None else [key]
+        for k in keys:
+            callbacks = self._group_callbacks.pop(k, None)
+            if callbacks:
+                om2.MMessage.removeCallbacks(callbacks)
+
+    def _node_added(self, mobj, *args):
+        self._pending.append(om2.MObjectHandle(mobj))
+
+    def _node_removed(self, mobj, *args):
+        key = om2.MObjectHandle(mobj).hashCode()
+        if key in self._labels:
+            del self._labels[key]
+            self._remove_group_callbacks(key)
+            self._dirty()
+
+        elif om2.MFnDependencyNode(mobj).name().startswith(PROXY_PREFIX):
+            self._proxies = {}
+
+    def _name_changed(self, mobj, old_name, *args):
+        if om2.MObjectHandle(mobj).hashCode() in self._labels:
+            self._dirty()
+
+        elif old_name.startswith(PROXY_PREFIX) or om2.MFnDependencyNode(mobj).name().startswith(PROXY_PREFIX):
+            self._proxies = {}
+
+    def _children_changed(self, *args):
+        self._meta_nodes = None
+
+    def _scene_changed(self, *args):
+        self.reset()
+
+    def _dirty(self):
+        self._names = None
+        self._by_label = None
+        self._modules = None
+        self._meta_nodes = None
+        self._proxies = {}
+
+    def reset(self):
+        self._labels = {}
+        self._pending = []
+        self._built = False
+        self._remove_group_callbacks()
+        self._dirty()
+
+    ### 索引の更新 ###
+
+    def _add(self, mobj):
+        fn = om2.MFnDependencyNode(mobj)
+        if not fn.hasAttribute(LABEL_ATTR):
+            return False
+
+        handle = om2.MObjectHandle(mobj)
+        label = fn.findPlug(LABEL_ATTR, False).asString()
+        self._labels[handle.hashCode()] = (handle, label)
+        return True
+
+    def _build(self):
+        """
+        YSNodeLabelを持つ全てのノードを1回の問い合わせで取得する
+        """
+        self._labels = {}
+        self._pending = []
+        sel = om2.MSelectionList()
+        try:
+            sel.add(f"*.{LABEL_ATTR}")
+
+        except RuntimeError:
+            pass
+
+        for i in range(sel.length()):
+            self._add(sel.getDependNode(i))
+
+        self._built = True
+        self._dirty()
+
+    def _update(self):
+        if not self._built:
+            self._build()
+            return
+
+        if not self._pending:
+            return
+
+        # ラベルはノード作成後に追加されるため、参照時にまとめて調べる
+        pending, self._pending = self._pending, []
+        added = False
+        proxy = False
+        for handle in pending:
+            if not handle.isValid() or handle.hashCode() in self._labels:
+                continue
+
+            if self._add(handle.object()):
+                added = True
+
+            elif om2.MFnDependencyNode(handle.object()).name().startswith(PROXY_PREFIX):
+                proxy = True
+
+        if added:
+            self._dirty()
+
+        elif proxy:
+            self._proxies = {}
+
+    def _ensure_names(self):
+        self._update()
+        if self._names is not None:
+            return
+
+        self._names = {}
+        self._by_label = {}
+        for key, (handle, label) in list(self._labels.items()):
+            if not handle.isValid():
+                del self._labels[key]
+                continue
+
+            obj = handle.object()
+            if obj.hasFn(om2.MFn.kDagNode):
+                name = om2.MFnDagNode(obj).partialPathName()
+
+            else:
+                name = om2.MFnDependencyNode(obj).name()
+
+            self._names[name] = key
+            self._by_label.setdefault(label, []).append(name)
+
+    def _ensure_modules(self):
+        """
+        ラベル付きのノードの名前から、グループ名ごとの辞書を作る
+        """
+        self._ensure_names()
+        if self._modules is not None:
+            return
+
+        self._modules = {}
+        for label, (key, prefix, suffix) in MODULE_NODES.items():
+            for name in self._by_label.get(label, []):
+                # Guide_Module_Groupのように、ラベルと同じ名前の全体のグループは除く
+                short = name.rsplit("|", 1)[-1]
+                if short == label or not short.startswith(prefix) or not short.endswith(suffix) or len(short) <= len(prefix) + len(suffix):
+                    continue
+
+                group_name = short[len(prefix):len(short) - len(suffix)]
+                self._modules.setdefault(group_name, {})[key] = self._labels[self._names[name]][0]
+
+    ### 参照 ###
+
+    def nodes(self, label: str) -> list[str]:
+        """
+        ラベルを持つノード名のリストを返す
+
+        Args:
+            label (str): YSNodeLabelの値
+
+        Returns:
+            list: ノード名のリスト
+        """
+        self._ensure_names()
+        return list(self._by_label.get(label, []))
+
+    def exists(self, name: str) -> bool:
+        """
+        ラベル付きのノードが存在するかを返す
+        """
+        self._ensure_names()
+        return name in self._names
+
+    def handle(self, name: str) -> om2.MObjectHandle:
+        """
+        ラベル付きのノードのMObjectHandleを返す 存在しない場合はNone
+        """
+        self._ensure_names()
+        key = self._names.get(name)
+        if key is None:
+            return None
+
+        return self._labels[key][0]
+
+    ### メタノード ###
+
+    def _get_children(self, name: str) -> list[om2.MObject]:
+        handle = self.handle(name)
+        if handle is None or not handle.isValid():
+            return None
+
+        self._watch_group(handle)
+        fn = om2.MFnDagNode(handle.object())
+        return [fn.child(i) for i in range(fn.childCount())]
+
+    def _collect_meta_nodes(self, by_group: dict, group: str, root: str=None) -> list[str]:
+        """
+        groupの子のモジュールのメタノードを子の順に返す 0番目はrootの最初の子のモジュールで置き換える
+        メタノードが無い子の位置はNoneになる
+        """
+        modules = self._get_children(group)
+        if modules is None:
+            return []
+
+        meta_nodes = [None] * len(modules)
+        if root:
+            meta_nodes[0] = by_group.get(om2.MObjectHandle(self._get_children(root)[0]).hashCode())
+
+        for i, module in enumerate(modules):
+            if om2.MFnDependencyNode(module).name() == GUIDE_FACIALS_GROUP_NAME:
+                continue
+
+            meta_nodes[i] = by_group.get(om2.MObjectHandle(module).hashCode())
+
+        return meta_nodes
+
+    def _ensure_meta_nodes(self) -> tuple[list[str], list[str]]:
+        """
+        bodyとfacialのメタノードを求める
+        ガイドの作成中のように、GroupMatrixの接続やペアレントが済んでいないメタノードがある場合は保持しない
+        """
+        self._ensure_modules()
+        if self._meta_nodes is not None:
+            return self._meta_nodes
+
+        # {ガイドのグループのハッシュ値: メタノード名} GroupMatrixの接続元がモジュールのグループ
+        by_group = {}
+        for name in self._by_label.get(META_NODE_LABEL, []):
+            fn = om2.MFnDependencyNode(self.handle(name).object())
+            if not fn.hasAttribute("GroupMatrix"):
+                continue
+
+            plug = fn.findPlug("GroupMatrix", False)
+            if plug.isDestination:
+                by_group[om2.MObjectHandle(plug.source().node()).hashCode()] = name
+
+        if not self.exists(GUIDE_GROUP_NAME):
+            result = ([], [])
+
+        else:
+            result = (self._collect_meta_nodes(by_group, GUIDE_MODULES_GROUP_NAME, root=GUIDE_GROUP_NAME),
+                      self._collect_meta_nodes(by_group, GUIDE_FACIALS_GROUP_NAME))
+
+        found = result[0] + result[1]
+        if None not in found and len(set(found)) == len(self._by_label.get(META_NODE_LABEL, [])):
+            self._meta_nodes = result
+
+        return result
+
+    def meta_nodes(self) -> list[str]:
+        """
+        bodyモジュールのメタノードをビルド順に返す 0番目はrootモジュール
+        """
+        return list(self._ensure_meta_nodes()[0])
+
+    def facial_meta_nodes(self) -> list[str]:
+        """
+        facialモジュールのメタノードをビルド順に返す
+        """
+        return list(self._ensure_meta_nodes()[1])
+
+    ### モジュール ###
+
+    def _find(self, group_name: str, key: str) -> str:
+        self._ensure_modules()
+        handle = self._modules.get(group_name, {}).get(key)
+        if handle is None or not handle.isValid():
+            return None
+
+        obj = handle.object()
+        if obj.hasFn(om2.MFn.kDagNode):
+            return om2.MFnDagNode(obj).partialPathName()
+
+        return om2.MFnDependencyNode(obj).name()
+
+    def meta_node(self, group_name: str) -> str:
+        """
+        グループ名からメタノードを返す 存在しない場合はNone
+        """
+        return self._find(group_name, "meta")
+
+    def proxies(self, group_name: str) -> list[om2.MObjectHandle]:
+        """
+        グループ名からプロキシジョイントのMObjectHandleを返す
+        存在しないプロキシはNoneになる
+        """
+        self._update()
+        handles = self._proxies.get(group_name)
+        if handles is not None:
+            return list(handles)
+
+        meta = self.meta_node(group_name)
+        if not meta:
+            return []
+
+        handles = []
+        sel = om2.MSelectionList()
+        for name in meta_snapshot.get(meta).get_list("JointName", []):
+            try:
+                sel.clear()
+                sel.add(f"{PROXY_PREFIX}{name}")
+                handles.append(om2.MObjectHandle(sel.getDependNode(0)))
+
+            except RuntimeError:
+                handles.append(None)
+
+        self._proxies[group_name] = handles
+        return list(handles)
+
+    def module(self, group_name: str) -> dict:
+        """
+        グループ名から、そのモジュールに属するラベル付きノードとプロキシジョイントをまとめて返す
+
+        Args:
+            group_name (str): モジュールのグループ名
+
+        Returns:
+            dict: {"meta", "guide_group", "guide_settings", "ctrl_edit_group", "ctrl_edit_settings",
+                   "controller_group", "controller_settings", "ctrl_group", "proxies"}
+                  存在しないノードはNone
+        """
+        result = {key: self._find(group_name, key) for key, _, _ in MODULE_NODES.values()}
+        result["proxies"] = self.proxies(group_name)
+        return result
+
+
+def get() -> SceneIndex:
+    """
+    シーンのインデックスを返す 初回の呼び出し時にコールバックを登録する
+    """
+    global _index
+    if _index is None:
+        _index = SceneIndex()
+        _index.install()
+
+    return _index
+
+
+def reset() -> None:
+    """
+    インデックスを破棄し、次の参照時に作り直す
+    """
+    if _index is not None:
+        _index.reset()
@@ -0,0 +1,196 @@
+import os
+import copy
+import json
+from dataclasses import dataclass
+
+prefs_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+CTRL_SHAPE_JSON_PATH = os.path.join(prefs_path, "prefs", "ysrig", "controller_sahpe.json")
+BUTTON_SHAPE_JSON_PATH = os.path.join(prefs_path, "prefs", "ysrig", "button_shape.json")
+
+UNIFORM_SCALE_SUFFIX = "_Uniform_Scale"
+
+
+@dataclass(frozen=True)
+class ShapeData:
+    """
+    コントローラーシェイプ1つ分のデータ
+
+    name = シェイプの名前
+    cvs = コントロールポイントの座標 ((x, y, z), ...)
+    uniform_scale = 三軸同じスケールで扱うかどうか
+    """
+    name: str
+    cvs: tuple
+    uniform_scale: bool
+
+
+class JsonCache:
+    """
+    jsonファイルを一度だけ読み込み、ファイルの更新日時が変わるまで結果を使い回すクラス
+    """
+    def __init__(self, json_path):
+        self.json_path = json_path
+        self._mtime = None
+        self._data = None
+
+    def _is_dirty(self):
+        try:
+            mtime = os.stat(self.json_path).st_mtime_ns
+
+        except OSError:
+            mtime = None
+
+        return self._data is None or mtime != self._mtime
+
+    def _reload(self):
+        self._mtime = os.stat(self.json_path).st_mtime_ns
+        with open(self.json_path, "r") as f:
+            raw = json.load(f)
+
+        self._data = self.parse(raw)
+
+    def parse(self, raw):
+        return raw
+
+    def data(self):
+        if self._is_dirty():
+            self._reload()
+
+        return self._data
+
+    def invalidate(self):
+        self._mtime = None
+        self._data = None
+
+
+class ShapeRegistry(JsonCache):
+    """
+    controller_sahpe.json の内容を {シェイプ名: ShapeData} として保持するクラス
+    """
+    def parse(self, raw):
+        shapes = {}
+        for key, value in raw.items():
+            if key.endswith(UNIFORM_SCALE_SUFFIX):
+                continue
+
+            cvs = tuple(tuple(p) for p in value)
+            uniform_scale = bool(raw.get(f"{key}{UNIFORM_SCALE_SUFFIX}"))
+            shapes[key] = ShapeData(key, cvs, uniform_scale)
+
+        return shapes
+
+    def get(self, name):
+        shapes = self.data()
+        if name not in shapes:
+            raise KeyError(f"'{name}' は {os.path.basename(self.json_path)} に登録されていません")
+
+        return shapes[name]
+
+    def names(self):
+        return list(self.data().keys())
+
+    def exists(self, name):
+        return name in self.data()
+
+
+class ButtonShapeRegistry(JsonCache):
+    """
+    button_shape.json の内容を保持するクラス
+    ピッカー側で値が書き換えられても影響が出ないよう、取り出す際はコピーを返す
+    """
+    def get(self, module=None):
+        data = self.data()
+        if module is None:
+            return copy.deepcopy(data)
+
+        return copy.deepcopy(data[module])
+
+
+_registries = {}
+
+
+def get_registry(json_path=CTRL_SHAPE_JSON_PATH) -> ShapeRegistry:
+    """
+    jsonのパスに対応したShapeRegistryを返す
+    同じパスに対しては同じインスタンスを返す
+
+    Args:
+        json_path (str): controller_sahpe.json のパス
+
+    Returns:
+        ShapeRegistry: シェイプのレジストリ
+    """
+    json_path = os.path.abspath(json_path)
+    if json_path not in _registries:
+        _registries[json_path] = ShapeRegistry(json_path)
+
+    return _registries[json_path]
+
+
+def get_button_registry(json_path=BUTTON_SHAPE_JSON_PATH) -> ButtonShapeRegistry:
+    """
+    jsonのパスに対応したButtonShapeRegistryを返す
+
+    Args:
+        json_path (str): button_shape.json のパス
+
+    Returns:
+        ButtonShapeRegistry: ボタンシェイプのレジストリ
+    """
+    json_path = os.path.abspath(json_path)
+    if json_path not in _registries:
+        _registries[json_path] = ButtonShapeRegistry(json_path)
+
+    return _registries[json_path]
+
+
+def get_shape(name: str, json_path: str=CTRL_SHAPE_JSON_PATH) -> ShapeData:
+    """
+    シェイプ名からShapeDataを返す
+
+    Args:
+        name (str): シェイプ名
+        json_path (str): 参照するjsonのパス
+
+    Returns:
+        ShapeData: シェイプのデータ
+    """
+    return get_registry(json_path).get(name)
+
+
+def get_shape_names(json_path: str=CTRL_SHAPE_JSON_PATH) -> list[str]:
+    """
+    登録されているシェイプ名のリストを返す
+    """
+    return get_registry(json_path).names()
+
+
+def get_button_shapes(module: str=None, json_path: str=BUTTON_SHAPE_JSON_PATH) -> dict:
+    """
+    ピッカー用のボタンシェイプを返す
+
+    Args:
+        module (str): モジュール名 省略した場合は全てのデータを返す
+        json_path (str): 参照するjsonのパス
+
+    Returns:
+        dict: ボタンシェイプのデータ
+    """
+    return get_button_registry(json_path).get(module)
+
+
+def invalidate(json_path: str=None) -> None:
+    """
+    キャッシュを破棄する
+    json_pathを省略した場合は全てのキャッシュを破棄する
+    """
+    if json_path is None:
+        for registry in _registries.values():
+            registry.invalidate()
+
+        return
+
+    json_path = os.path.abspath(json_path)
+    if json_path in _registries:
+        _registries[json_path].invalidate()
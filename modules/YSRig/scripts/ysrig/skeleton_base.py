@@ -1,9 +1,10 @@
 from traceback import *
 import importlib
 from maya.api.OpenMaya import MGlobal
-from maya import cmds
-from ysrig import core, reload
+from ysrig.cmds_proxy import cmds
+from ysrig import core, reload, meta_snapshot, profiler, fast_build, node_ledger, build_plan, joint_mirror, name_registry
 importlib.reload(core)
+importlib.reload(joint_mirror)
 
 
 class SkeletonBase:
@@ -11,34 +12,42 @@ class SkeletonBase:
     ガイド作成の基底クラス
     """
     def __init__(self, meta_node):
-        self._setup(meta_node)                 # 変数宣言
-        self.setup()
-        self.check_build()                     # ビルド条件を満たすかチェック
+        self._stage(self._setup, meta_node)               # 変数宣言
+        self._stage(self.setup)
+        self._stage(self.check_build)                     # ビルド条件を満たすかチェック
 
         if not self.build:
             return
 
-        self.pre_process()                 # 前処理
-        self.create()                      # ノード作成
-        self.parent()                      # ジョイントを階層化
-        self.connect()                     # ノード接続
-        self.post_process()                # 後処理
+        self._stage(self.pre_process)                 # 前処理
+        self._stage(self.create)                      # ノード作成
+        self._stage(self.parent)                      # ジョイントを階層化
+        self._stage(self.connect)                     # ノード接続
+        self._stage(self.post_process)                # 後処理
+
+    def _stage(self, func, *args):
+        """
+        ステージを呼び出す profilerで計測中であれば処理時間を記録する
+        """
+        return profiler.stage(self, func, *args)
 
     def _setup(self, meta_node):
         self.error = False
         self.build = True
 
         self.meta_node = meta_node
+        self.meta = meta_snapshot.get(meta_node)
 
-        self.group_name = cmds.getAttr(f"{self.meta_node}.GroupName")
-        self.parent_name = f'JT_{cmds.getAttr(f"{self.meta_node}.ParentName")}'
-        self.side = cmds.getAttr(f"{self.meta_node}.Side")
+        self.group_name = self.meta.get("GroupName")
+        self.parent_name = f'JT_{self.meta.get("ParentName")}'
+        self.side = self.meta.get("Side")
         self.prefixes = []
-        self.joint_names = core.get_list_attributes(self.meta_node, "JointName")
-        self.joint_count = cmds.getAttr(f"{self.meta_node}.JointCount")
+        self.joint_names = self.meta.get_list("JointName")
+        self.joint_count = self.meta.get("JointCount")
         self.joints = [None] * self.joint_count
-        self.guides_world_matrix = core.get_list_attributes(self.meta_node, "GuidesWorldMatrix")
-        self.create_goal_bone = cmds.getAttr(f"{self.meta_node}.GoalBone")
+        self.joint_world_matrices = {}  # {ジョイント名: ワールド行列} 反転に使う
+        self.guides_world_matrix = self.meta.get_list("GuidesWorldMatrix")
+        self.create_goal_bone = self.meta.get("GoalBone")
 
         self.skeleton_grp = core.SKELETON_GROUP_NAME
 
@@ -46,32 +55,54 @@ class SkeletonBase:
         pass
 
     def check_build(self):
-        for name in self.joint_names:
-            if  cmds.objExists(f"JT_{name}"):
-                self.build = False
+        if name_registry.exists_any([f"JT_{name}" for name in self.joint_names]):
+            self.build = False
 
     def pre_process(self):
         pass
 
-    def create(self):
-        for i, name in enumerate(self.joint_names):
-            jt = cmds.createNode("joint", name=f"JT_{name}")
-            cmds.setAttr(f"{jt}.segmentScaleCompensate", False)
-
-            trs = core.decompose_matrix(self.guides_world_matrix[i])
-            pos = trs[0]
-            orient = trs[1]
+    def get_parents(self) -> list[int]:
+        """
+        各ジョイントの親のインデックスを返す 負の値はskeleton_grpの子にする
+        既定では0番目のジョイントをskeleton_grpの子にし、以降は1つ前のジョイントの子にする
 
-            cmds.setAttr(f"{jt}.translate", *pos)
-            cmds.setAttr(f"{jt}.jointOrient", *orient)
+        Returns:
+            list: joint_namesと同じ順の親のインデックス
+        """
+        return [i - 1 for i in range(len(self.joint_names))]
 
-            self.joints[i] = jt
+    def create(self):
+        """
+        ガイドの行列から全てのジョイントの親子関係、translate、jointOrientを求め、
+        作成と親子付けを1つの計画にまとめて適用する
+        """
+        parents = self.get_parents()
+        grp_matrix = cmds.getAttr(f"{self.skeleton_grp}.worldMatrix[0]")
+        transforms = core.get_joint_transforms(self.guides_world_matrix, parents, [grp_matrix] * parents.count(-1))
+
+        # ジョイントの子はcmds.parentと同じくinverseScaleを親のscaleに繋ぐ
+        grp_is_joint = cmds.nodeType(self.skeleton_grp) == "joint"
+
+        plan = build_plan.BuildPlan()
+        names = [f"JT_{name}" for name in self.joint_names]
+        for i in get_creation_order(parents):
+            parent = names[parents[i]] if parents[i] >= 0 else self.skeleton_grp
+            pos, orient = transforms[i]
+            plan.create_node("joint", names[i], parent=parent, interesting=True,
+                             segmentScaleCompensate=False, translate=pos, jointOrient=orient)
+
+            if parents[i] >= 0 or grp_is_joint:
+                plan.connect(f"{parent}.scale", f"{names[i]}.inverseScale")
+
+        created = build_plan.apply(plan)
+        self.joints = [created[name] for name in names]
+        self.joint_world_matrices = dict(zip(self.joints, self.guides_world_matrix))
 
     def parent(self):
-        cmds.parent(self.joints[0], self.skeleton_grp)
-        for i, jt in enumerate(self.joints):
-            if i:
-                cmds.parent(jt, self.joints[i - 1])
+        """
+        create()で親子付けまで行うため何もしない 親子関係はget_parents()で指定する
+        """
+        pass
 
     def connect(self):
         pass
@@ -88,7 +119,7 @@ class SkeletonBase:
         self.parent_external()
 
     def parent_external(self):
-        parent = cmds.getAttr(f"{self.meta_node}.ParentName")
+        parent = self.meta.get("ParentName")
         if not parent:
             if not self.group_name == "Root":
                 parent = "Root"
@@ -112,7 +143,7 @@ class SkeletonBase:
         if not self.build:
             return
 
-        if not cmds.getAttr(f"{self.meta_node}.Mirror"):
+        if not self.meta.get("Mirror"):
             return
 
         if self.side == "":
@@ -120,18 +151,22 @@ class SkeletonBase:
 
         self.mirror()
 
-    def mirror(self):
-        self.get_prefixes()
-        cmds.mirrorJoint(self.joints[0], myz=True, mb=True, sr=self.prefixes)
+    def get_mirror_parent(self) -> str:
+        """
+        反転したジョイントの親を返す 反転した親が無い場合はJT_Root
+        """
+        if not self.parent_name:
+            return None
 
-        if self.parent_name:
-            parent = self.parent_name.replace(self.prefixes[0], self.prefixes[1])
-            fst_joint = self.joints[0].replace(self.prefixes[0], self.prefixes[1])
-            if cmds.objExists(parent):
-                cmds.parent(fst_joint, parent)
+        parent = self.parent_name.replace(self.prefixes[0], self.prefixes[1])
+        if name_registry.exists(parent):
+            return parent
 
-            else:
-                cmds.parent(fst_joint, "JT_Root")
+        return "JT_Root"
+
+    def mirror(self):
+        self.get_prefixes()
+        joint_mirror.mirror([self.joints[0]], self.prefixes, [self.get_mirror_parent()], self.joint_world_matrices)
 
 
 class facialSkeletonBase(SkeletonBase):
@@ -140,46 +175,86 @@ class facialSkeletonBase(SkeletonBase):
         self.skeleton_grp = f"JT_{core.FACIALS_ROOT_NAME}"
 
 
-def main():
-    cmds.undoInfo(ock=True)
+def get_creation_order(parents: list[int]) -> list[int]:
+    """
+    親が先に作成されるように並べたジョイントのインデックスを返す
 
-    facials_root = f"JT_{core.FACIALS_ROOT_NAME}"
-    meta_nodes = core.get_meta_nodes()
-    facial_meta_nodes = core.get_facial_meta_nodes()
-    facial_root_parent_name = cmds.getAttr(f"{meta_nodes[0]}.FacialRootName")
-    facial_root_parent = f"JT_{facial_root_parent_name}"
-    skeleton_modules = [None] * len(meta_nodes)
-    facial_skeleton_modules = [None] * len(facial_meta_nodes)
+    Args:
+        parents (list): 各ジョイントの親のインデックス 負の値はリストの外のノードが親
 
-    total_steps = len(meta_nodes) + len(facial_meta_nodes)
+    Returns:
+        list: ジョイントのインデックス
+    """
+    order = []
+    added = set()
 
-    # プログレスウィンドウの初期化
-    if cmds.progressWindow(q=True, isCancelled=True):
-        cmds.progressWindow(endProgress=True)
+    def add(i):
+        if i in added:
+            return
 
-    cmds.progressWindow(title="Build Skeleton",
-                        progress=0,
-                        max=total_steps,
-                        status="Initializing...",
-                        isInterruptable=False)
+        if parents[i] >= 0:
+            add(parents[i])
+
+        added.add(i)
+        order.append(i)
+
+    for i in range(len(parents)):
+        add(i)
+
+    return order
+
+
+def create_module(meta_node: str) -> SkeletonBase:
+    """
+    メタノードのモジュールのSkeletonクラスをインスタンス化する
+    """
+    module = meta_snapshot.get(meta_node).get("Module")
+    module = importlib.import_module(f"ysrig.modules.{module}.skeleton")
+    klass = getattr(module, "Skeleton")
+
+    # 作成したノードをメタノードに記録する ビルドしなかった場合は前回の記録を残す
+    recorder = node_ledger.Recorder(meta_node, node_ledger.PHASE_SKELETON)
+    with recorder:
+        module = klass(meta_node)
+
+    if module.build:
+        recorder.write()
+
+    return module
+
+
+def build(meta_nodes: list[str], facial_meta_nodes: list[str], create=create_module) -> list[SkeletonBase]:
+    """
+    スケルトンを作成する アンドゥチャンクとプログレスウィンドウは呼び出し側で扱う
+
+    Args:
+        meta_nodes (list): bodyモジュールのメタノード 0番目はrootモジュール
+        facial_meta_nodes (list): facialモジュールのメタノード
+        create (function): メタノードからモジュールのインスタンスを作成する関数
+
+    Returns:
+        list: 作成したモジュールのインスタンス bodyモジュール、facialモジュールの順
+              rootモジュールのメタノードがない場合は何も作らずに空のリストを返す
+    """
+    # スケルトンのグループとFacialRootNameはrootモジュールが持つ
+    if not meta_nodes:
+        return []
+
+    with name_registry.session():
+        facials_root = f"JT_{core.FACIALS_ROOT_NAME}"
+        facial_root_parent_name = cmds.getAttr(f"{meta_nodes[0]}.FacialRootName")
+        facial_root_parent = f"JT_{facial_root_parent_name}"
 
-    try:
         p = False
 
         # facials_rootがなければ作る
-        if not cmds.objExists(facials_root):
+        if not name_registry.exists(facials_root):
             cmds.createNode("joint", name=facials_root)
             cmds.setAttr(f"{facials_root}.drawStyle", 3)
             p = True
 
         # bodyモジュールのメタノードを読み込んでインスタンスを作る
-        for i, meta in enumerate(meta_nodes):
-            module = cmds.getAttr(f"{meta}.Module")
-            module = importlib.import_module(f"ysrig.modules.{module}.skeleton")
-            klass = getattr(module, "Skeleton")
-            skeleton_modules[i] = klass(meta)
-
-            cmds.progressWindow(e=True, step=1, status=f"Loading Body Module: {meta}")
+        skeleton_modules = [create(meta) for meta in meta_nodes]
 
         # bodyモジュール同士をペアレント
         for module in skeleton_modules:
@@ -196,31 +271,75 @@ def main():
                 cmds.parent(facials_root, core.SKELETON_GROUP_NAME)
 
         # facialモジュールのメタノードを読み込んでインスタンスを作る
-        for i, meta in enumerate(facial_meta_nodes):
-            module = cmds.getAttr(f"{meta}.Module")
-            module = importlib.import_module(f"ysrig.modules.{module}.skeleton")
-            klass = getattr(module, "Skeleton")
-            facial_skeleton_modules[i] = klass(meta)
+        facial_skeleton_modules = [create(meta) for meta in facial_meta_nodes]
 
-            cmds.progressWindow(e=True, step=1, status=f"Loading Facial Module: {meta}")
+        # facialのジョイントの色をまとめて設定する
+        plan = build_plan.BuildPlan()
+        for joint in cmds.ls(facials_root, dag=True, type="joint"):
+            plan.set_attr(f"{joint}.useOutlinerColor", True)
+            plan.set_attr(f"{joint}.overrideEnabled", True)
+            plan.set_attr(f"{joint}.outlinerColor", core.FACIAL_COLOR_4)
+            plan.set_attr(f"{joint}.overrideColorRGB", core.FACIAL_COLOR_1)
 
-        facial_joints = cmds.ls(facials_root, dag=True, type="joint")
-        for joint in facial_joints:
-            cmds.setAttr(f"{joint}.useOutlinerColor", True)
-            cmds.setAttr(f"{joint}.overrideEnabled", True)
-            cmds.setAttr(f"{joint}.outlinerColor", *core.FACIAL_COLOR_4)
-            cmds.setAttr(f"{joint}.overrideColorRGB", *core.FACIAL_COLOR_1)
+        build_plan.apply(plan)
 
         # facialモジュールがなければfacials_rootを消す
         if not facial_meta_nodes:
             cmds.delete(facials_root)
 
+    return skeleton_modules + facial_skeleton_modules
+
+
+def remove_all() -> None:
+    """
+    スケルトンを削除する メタノードに記録された、グループの外のノードも削除する
+    """
+    meta_nodes = core.get_meta_nodes() + core.get_facial_meta_nodes()
+    node_ledger.remove(meta_nodes, node_ledger.PHASE_SKELETON, extra=[core.SKELETON_GROUP_NAME])
+
+
+def main(fast: bool=False):
+    """
+    全てのモジュールのスケルトンをビルドする
+
+    Args:
+        fast (bool): アンドゥの記録とビューポートの更新を止めてビルドするか
+                     失敗した場合はアンドゥの代わりに作成したノードを削除する
+    """
+    transaction = fast_build.BuildTransaction(fast)
+    transaction.begin()
+
+    meta_nodes = core.get_meta_nodes()
+    facial_meta_nodes = core.get_facial_meta_nodes()
+
+    total_steps = len(meta_nodes) + len(facial_meta_nodes)
+
+    # プログレスウィンドウの初期化
+    if cmds.progressWindow(q=True, isCancelled=True):
+        cmds.progressWindow(endProgress=True)
+
+    cmds.progressWindow(title="Build Skeleton",
+                        progress=0,
+                        max=total_steps,
+                        status="Initializing...",
+                        isInterruptable=False)
+
+    def create(meta):
+        transaction.track(meta)
+        module = create_module(meta)
+        transaction.track()
+        label = "Facial" if meta in facial_meta_nodes else "Body"
+        cmds.progressWindow(e=True, step=1, status=f"Loading {label} Module: {meta}")
+        return module
+
+    try:
+        build(meta_nodes, facial_meta_nodes, create)
+
         cmds.select(cl=True)
-        cmds.undoInfo(cck=True)
+        transaction.end(True)
 
     except:
-        cmds.undoInfo(cck=True)
-        cmds.undo()
+        transaction.end(False)
         print_exc()
         MGlobal.displayError("予期せぬエラーが発生しました")
 
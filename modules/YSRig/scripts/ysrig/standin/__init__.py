@@ -0,0 +1,41 @@
+"""
+Mayaを使わずにYSRigのビルドを実行するための、メモリ上のDG/DAGの代替
+
+    from ysrig import standin
+    standin.install()
+
+    from ysrig.modules.biped import guide
+
+maya.cmds, maya.api.OpenMayaのうち、YSRigが使うコマンドとクラスだけを実装する
+計測と回帰テストのためのもので、Mayaのシーンと同じ結果になることは保証しない
+"""
+import os
+import sys
+
+MAYA_PATH = os.path.dirname(os.path.abspath(__file__))
+
+
+def install() -> None:
+    """
+    mayaパッケージを代替に置き換える mayaをimportする前に呼び出す
+    """
+    loaded = sys.modules.get("maya")
+    if loaded is not None:
+        if os.path.dirname(os.path.abspath(getattr(loaded, "__file__", "") or "")) == os.path.join(MAYA_PATH, "maya"):
+            return
+
+        raise RuntimeError("mayaパッケージが既に読み込まれています")
+
+    sys.path.insert(0, MAYA_PATH)
+
+
+def is_installed() -> bool:
+    return MAYA_PATH in sys.path
+
+
+def current_scene():
+    """
+    代替シーンを返す
+    """
+    from ysrig.standin import scene as scene_module
+    return scene_module.get()
@@ -0,0 +1,130 @@
+"""
+代替シーンのアトリビュートの定義
+"""
+
+# cmds.getAttr(type=True) と同じ型名
+NUMERIC_TYPES = {"double", "doubleLinear", "doubleAngle", "float", "bool", "long", "short", "byte", "enum", "time", "char"}
+INT_TYPES = {"long", "short", "byte", "enum", "char"}
+COMPOUND_TYPES = {"double3", "float3", "double2", "float2", "long3", "long2", "TdataCompound", "compound"}
+
+
+class AttrSpec:
+    """
+    アトリビュート1つ分の定義
+
+    long = ロングネーム
+    short = ショートネーム
+    type = cmds.getAttr(type=True) と同じ型名
+    children = compound型の子のAttrSpec
+    multi = インデックスを持つか
+    output = ノードの計算結果か
+    """
+    __slots__ = ("long", "short", "type", "default", "children", "parent", "multi", "output", "dynamic",
+                 "keyable", "channel_box", "writable", "enum_names", "min", "max", "_child_map", "chain")
+
+    def __init__(self, long, short=None, type="double", default=0.0, children=None, multi=False, output=False,
+                 dynamic=False, keyable=False, enum_names=None, min=None, max=None, writable=True):
+        self.long = long
+        self.short = short or long
+        self.type = type
+        self.default = default
+        self.children = list(children or [])
+        self.parent = None
+        self.multi = multi
+        self.output = output
+        self.dynamic = dynamic
+        self.keyable = keyable
+        self.channel_box = False
+        self.writable = writable and not output
+        self.enum_names = enum_names
+        self.min = min
+        self.max = max
+        self._child_map = {}
+        self.chain = (self,)
+        for child in self.children:
+            self.add_child(child)
+
+    def add_child(self, child: "AttrSpec") -> None:
+        child.parent = self
+        if child not in self.children:
+            self.children.append(child)
+
+        self._child_map[child.long] = child
+        self._child_map[child.short] = child
+        child._set_chain()
+
+    def _set_chain(self):
+        self.chain = (self.parent.chain if self.parent else ()) + (self,)
+        for child in self.children:
+            child._set_chain()
+
+    def child(self, name: str) -> "AttrSpec":
+        return self._child_map.get(name)
+
+    @property
+    def is_compound(self) -> bool:
+        return bool(self.children) or self.type in COMPOUND_TYPES
+
+    @property
+    def multi_specs(self) -> tuple:
+        """
+        自身と親のうちmulti型のもの 親から順
+        """
+        return tuple(s for s in self.chain if s.multi)
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def __repr__(self):
+        return f"<AttrSpec {self.long}>"
+
+
+### 定義用の関数 ###
+
+def num(long, short=None, type="double", dv=0.0, k=False, **kwargs) -> AttrSpec:
+    return AttrSpec(long, short, type, dv, keyable=k, **kwargs)
+
+
+def flag(long, short=None, dv=False, k=False, **kwargs) -> AttrSpec:
+    return AttrSpec(long, short, "bool", dv, keyable=k, **kwargs)
+
+
+def integer(long, short=None, dv=0, type="long", **kwargs) -> AttrSpec:
+    return AttrSpec(long, short, type, dv, **kwargs)
+
+
+def enum(long, short=None, names="", dv=0, k=False, **kwargs) -> AttrSpec:
+    return AttrSpec(long, short, "enum", dv, keyable=k, enum_names=names, **kwargs)
+
+
+def string(long, short=None, **kwargs) -> AttrSpec:
+    return AttrSpec(long, short, "string", None, **kwargs)
+
+
+def matrix(long, short=None, **kwargs) -> AttrSpec:
+    from ysrig.standin.transform import IDENTITY
+    return AttrSpec(long, short, "matrix", IDENTITY, **kwargs)
+
+
+def message(long="message", short="msg", **kwargs) -> AttrSpec:
+    return AttrSpec(long, short, "message", None, **kwargs)
+
+
+def vector(long, short=None, suffixes="XYZ", child_type="doubleLinear", dv=(0.0, 0.0, 0.0), k=False,
+           short_suffixes=None, type="double3", output=False, multi=False) -> AttrSpec:
+    """
+    translateX, translateY, translateZ のような子を持つcompound型
+    """
+    short = short or long
+    if short_suffixes is None:
+        short_suffixes = suffixes.lower() if short != long else suffixes
+
+    children = [AttrSpec(f"{long}{s}", f"{short}{ss}", child_type, d, keyable=k, output=output)
+                for s, ss, d in zip(suffixes, short_suffixes, dv)]
+    return AttrSpec(long, short, type, None, children, output=output, multi=multi)
+
+
+def compound(long, short=None, children=(), multi=False, output=False) -> AttrSpec:
+    return AttrSpec(long, short, "TdataCompound", None, children, multi=multi, output=output)
@@ -0,0 +1,27 @@
+"""
+batch_buildで代替シーンを使うためのバックエンド
+
+    python -m ysrig.batch_build chara.json --backend ysrig.standin.backend:StandinBackend
+"""
+from ysrig import standin
+
+
+class StandinBackend:
+    """
+    代替シーンでシーンを操作するバックエンド
+    保存するファイルはMayaのシーンではなく、ノードと接続を書き出したJSON
+    """
+    def initialize(self) -> None:
+        standin.install()
+
+    def new_scene(self) -> None:
+        from maya import cmds
+        cmds.file(new=True, force=True)
+
+    def save_scene(self, path: str) -> None:
+        from maya import cmds
+        cmds.file(rename=path)
+        cmds.file(save=True, force=True)
+
+    def uninitialize(self) -> None:
+        pass
@@ -0,0 +1,14 @@
+"""
+代替シーンで動くmaya.OpenMayaUIのサブセット
+UIが無いため、メインウィンドウは存在しない
+"""
+
+
+class MQtUtil:
+    @staticmethod
+    def mainWindow():
+        return None
+
+    @staticmethod
+    def findControl(name: str):
+        return None
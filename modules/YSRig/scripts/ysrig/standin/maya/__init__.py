@@ -0,0 +1,4 @@
+"""
+代替シーンで動くmayaパッケージ
+ysrig.standin.install() で sys.path に追加した場合だけ読み込まれる
+"""
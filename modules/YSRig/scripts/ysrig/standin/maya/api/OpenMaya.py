@@ -0,0 +1,1193 @@
+"""
+代替シーンで動くmaya.api.OpenMayaのサブセット
+行列、ベクトルの計算と、YSRigが使う関数セット、プラグ、コールバックだけを実装する
+"""
+import math
+import numpy as np
+from ysrig.standin import scene as _scene_module, transform as tf, node_types
+from ysrig.standin.scene import Plug
+
+
+def _scene():
+    return _scene_module.get()
+
+
+### 計算 ###
+
+class MSpace:
+    kInvalid = 0
+    kTransform = 1
+    kPreTransform = 2
+    kPostTransform = 3
+    kWorld = 4
+    kObject = kPreTransform
+
+
+class MMatrix:
+    """
+    4x4の行列 行ベクトル形式
+    """
+    kIdentity = None
+
+    def __init__(self, value=None):
+        if value is None:
+            self._m = np.eye(4)
+
+        elif isinstance(value, MMatrix):
+            self._m = value._m.copy()
+
+        else:
+            self._m = np.array([v for row in value for v in (row if isinstance(row, (list, tuple)) else [row])],
+                               dtype=np.float64).reshape(4, 4)
+
+    @classmethod
+    def _wrap(cls, array) -> "MMatrix":
+        m = cls.__new__(cls)
+        m._m = np.asarray(array, dtype=np.float64)
+        return m
+
+    def __mul__(self, other):
+        if isinstance(other, MMatrix):
+            return MMatrix._wrap(self._m @ other._m)
+
+        return MMatrix._wrap(self._m * other)
+
+    def __iter__(self):
+        return iter(self._m.reshape(16).tolist())
+
+    def __len__(self):
+        return 16
+
+    def __getitem__(self, index):
+        return self._m.reshape(16)[index]
+
+    def __eq__(self, other):
+        return isinstance(other, MMatrix) and np.array_equal(self._m, other._m)
+
+    def __repr__(self):
+        return f"MMatrix({self._m.reshape(16).tolist()})"
+
+    def inverse(self) -> "MMatrix":
+        return MMatrix._wrap(np.linalg.inv(self._m))
+
+    def transpose(self) -> "MMatrix":
+        return MMatrix._wrap(self._m.T.copy())
+
+    def isEquivalent(self, other, tolerance: float=1e-10) -> bool:
+        return bool(np.all(np.abs(self._m - MMatrix(other)._m) <= tolerance))
+
+    def getElement(self, row: int, column: int) -> float:
+        return float(self._m[row, column])
+
+    def setElement(self, row: int, column: int, value: float) -> "MMatrix":
+        self._m[row, column] = value
+        return self
+
+    def det4x4(self) -> float:
+        return float(np.linalg.det(self._m))
+
+
+MMatrix.kIdentity = MMatrix()
+
+
+class MVector:
+    def __init__(self, *args):
+        values = list(args[0]) if len(args) == 1 else list(args)
+        values = (values + [0.0, 0.0, 0.0])[:3]
+        self.x, self.y, self.z = (float(v) for v in values)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.x}, {self.y}, {self.z})"
+
+    def _array(self) -> np.ndarray:
+        return np.array([self.x, self.y, self.z])
+
+    def __add__(self, other):
+        return type(self)(self._array() + np.array(list(other)[:3]))
+
+    def __sub__(self, other):
+        return MVector(self._array() - np.array(list(other)[:3]))
+
+    def __neg__(self):
+        return type(self)(-self._array())
+
+    def __truediv__(self, value: float):
+        return type(self)(self._array() / value)
+
+    def __mul__(self, other):
+        if isinstance(other, MMatrix):
+            return type(self)(self._array() @ other._m[:3, :3])
+
+        if isinstance(other, MVector):
+            return float(self._array() @ other._array())
+
+        return type(self)(self._array() * other)
+
+    __rmul__ = __mul__
+
+    def __xor__(self, other):
+        return MVector(np.cross(self._array(), other._array()))
+
+    def length(self) -> float:
+        return float(np.linalg.norm(self._array()))
+
+    def normal(self) -> "MVector":
+        length = self.length()
+        return MVector(self._array() / length) if length > tf.EPSILON else MVector(self)
+
+    def normalize(self) -> "MVector":
+        self.x, self.y, self.z = self.normal()
+        return self
+
+    def isEquivalent(self, other, tolerance: float=1e-10) -> bool:
+        return bool(np.all(np.abs(self._array() - np.array(list(other)[:3])) <= tolerance))
+
+
+class MPoint(MVector):
+    def __init__(self, *args):
+        values = list(args[0]) if len(args) == 1 else list(args)
+        super().__init__(values[:3])
+        self.w = float(values[3]) if len(values) > 3 else 1.0
+
+    def __mul__(self, other):
+        if isinstance(other, MMatrix):
+            p = np.append(self._array(), self.w) @ other._m
+            return MPoint(p[:3] / (p[3] or 1.0))
+
+        return MPoint(self._array() * other)
+
+    def __sub__(self, other):
+        return MVector(self._array() - np.array(list(other)[:3]))
+
+    def distanceTo(self, other) -> float:
+        return float(np.linalg.norm(self._array() - np.array(list(other)[:3])))
+
+
+class MEulerRotation:
+    kXYZ, kYZX, kZXY, kXZY, kYXZ, kZYX = range(6)
+
+    def __init__(self, *args):
+        values = list(args[0]) if len(args) == 1 and not isinstance(args[0], (int, float)) else list(args)
+        self.x, self.y, self.z = (float(v) for v in (values + [0.0, 0.0, 0.0])[:3])
+        self.order = int(values[3]) if len(values) > 3 else self.kXYZ
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def asMatrix(self) -> MMatrix:
+        m = np.eye(4)
+        m[:3, :3] = tf.euler_to_rotation((self.x, self.y, self.z), self.order, degrees=False)
+        return MMatrix._wrap(m)
+
+
+class MTransformationMatrix:
+    """
+    M = S * Sh * R * T として扱う ピボットは扱わない
+    """
+    def __init__(self, matrix=None):
+        self._t = [0.0, 0.0, 0.0]
+        self._r = [0.0, 0.0, 0.0]
+        self._s = [1.0, 1.0, 1.0]
+        self._sh = [0.0, 0.0, 0.0]
+        self._order = MEulerRotation.kXYZ
+        if matrix is not None:
+            m = matrix._m if isinstance(matrix, MMatrix) else matrix
+            if isinstance(matrix, MTransformationMatrix):
+                m = matrix.asMatrix()._m
+
+            t, r, s, sh = tf.decompose(m)
+            self._t, self._s, self._sh = t, s, sh
+            self._r = [math.radians(v) for v in r]
+
+    def asMatrix(self, *args) -> MMatrix:
+        return MMatrix._wrap(tf.compose(self._t, [math.degrees(v) for v in self._r], self._s, self._sh, self._order))
+
+    def translation(self, space: int=MSpace.kTransform) -> MVector:
+        return MVector(self._t)
+
+    def setTranslation(self, vector, space: int=MSpace.kTransform) -> "MTransformationMatrix":
+        self._t = [float(v) for v in list(vector)[:3]]
+        return self
+
+    def rotation(self, asQuaternion: bool=False) -> MEulerRotation:
+        return MEulerRotation(*self._r, self._order)
+
+    def setRotation(self, rotation) -> "MTransformationMatrix":
+        self._r = [rotation.x, rotation.y, rotation.z]
+        self._order = getattr(rotation, "order", MEulerRotation.kXYZ)
+        return self
+
+    def scale(self, space: int=MSpace.kTransform) -> list:
+        return list(self._s)
+
+    def setScale(self, scale, space: int=MSpace.kTransform) -> "MTransformationMatrix":
+        self._s = [float(v) for v in scale]
+        return self
+
+    def shear(self, space: int=MSpace.kTransform) -> list:
+        return list(self._sh)
+
+
+class MAngle:
+    kInvalid, kRadians, kDegrees, kAngMinutes, kAngSeconds = range(5)
+    _FACTORS = {kRadians: 1.0, kDegrees: math.pi / 180.0, kAngMinutes: math.pi / 10800.0, kAngSeconds: math.pi / 648000.0}
+
+    def __init__(self, value: float=0.0, unit: int=kRadians):
+        self._radians = float(value) * self._FACTORS[unit]
+
+    @staticmethod
+    def uiUnit() -> int:
+        return MAngle.kDegrees
+
+    def asRadians(self) -> float:
+        return self._radians
+
+    def asDegrees(self) -> float:
+        return math.degrees(self._radians)
+
+    def asUnits(self, unit: int) -> float:
+        return self._radians / self._FACTORS[unit]
+
+
+class MDistance:
+    kInvalid, kInches, kFeet, kYards, kMiles, kMillimeters, kCentimeters, kKilometers, kMeters = range(9)
+    _FACTORS = {kInches: 2.54, kFeet: 30.48, kYards: 91.44, kMiles: 160934.4, kMillimeters: 0.1,
+                kCentimeters: 1.0, kKilometers: 100000.0, kMeters: 100.0}
+
+    def __init__(self, value: float=0.0, unit: int=kCentimeters):
+        self._cm = float(value) * self._FACTORS[unit]
+
+    @staticmethod
+    def uiUnit() -> int:
+        return MDistance.kCentimeters
+
+    def asUnits(self, unit: int) -> float:
+        return self._cm / self._FACTORS[unit]
+
+
+class MTime:
+    kInvalid, kHours, kMinutes, kSeconds, kMilliseconds = range(5)
+    kFilm = 6
+    _FACTORS = {kHours: 3600.0, kMinutes: 60.0, kSeconds: 1.0, kMilliseconds: 0.001, kFilm: 1.0 / 24.0}
+
+    def __init__(self, value: float=0.0, unit: int=kFilm):
+        self._seconds = float(value) * self._FACTORS[unit]
+
+    @staticmethod
+    def uiUnit() -> int:
+        return MTime.kFilm
+
+    def asUnits(self, unit: int) -> float:
+        return self._seconds / self._FACTORS[unit]
+
+    @property
+    def value(self) -> float:
+        return self.asUnits(self.uiUnit())
+
+
+### オブジェクト ###
+
+class MFn:
+    kInvalid = 0
+    kBase = 1
+    kDependencyNode = 4
+    kDagNode = 107
+    kTransform = 110
+    kJoint = 121
+    kWorld = 253
+    kAttribute = 554
+    kCompoundAttribute = 571
+    kMessageAttribute = 575
+    kNumericAttribute = 576
+    kTypedAttribute = 588
+    kUnitAttribute = 589
+    kEnumAttribute = 585
+    kMatrixAttribute = 579
+    kData = 584
+    kMatrixData = 587
+
+
+_UNIT_TYPES = {"doubleLinear": 2, "doubleAngle": 1, "time": 3}
+
+
+class MObject:
+    """
+    ノード、アトリビュート、データのいずれかを保持する
+    """
+    kNullObj = None
+
+    def __init__(self, other=None):
+        self._node = getattr(other, "_node", None)
+        self._attr = getattr(other, "_attr", None)
+        self._data = getattr(other, "_data", None)
+
+    @classmethod
+    def _of(cls, node=None, attr=None, data=None) -> "MObject":
+        obj = cls()
+        obj._node = node
+        obj._attr = attr
+        obj._data = data
+        return obj
+
+    def isNull(self) -> bool:
+        return self._node is None and self._attr is None and self._data is None
+
+    def __eq__(self, other):
+        return isinstance(other, MObject) and self._node is other._node and self._attr is other._attr and self._data is other._data
+
+    def __hash__(self):
+        return hash((id(self._node), id(self._attr)))
+
+    def apiType(self) -> int:
+        if self._node is not None:
+            if self._node.type.is_a("joint"):
+                return MFn.kJoint
+
+            if self._node.type.transform:
+                return MFn.kTransform
+
+            return MFn.kDagNode if self._node.is_dag else MFn.kDependencyNode
+
+        if self._attr is not None:
+            return _attr_type(self._attr)
+
+        if self._data is not None:
+            return MFn.kMatrixData
+
+        return MFn.kInvalid
+
+    def hasFn(self, fn_type: int) -> bool:
+        if self._node is not None:
+            if fn_type == MFn.kDependencyNode:
+                return True
+
+            if fn_type == MFn.kDagNode:
+                return self._node.is_dag
+
+            if fn_type == MFn.kTransform:
+                return self._node.type.transform
+
+            if fn_type == MFn.kJoint:
+                return self._node.type.is_a("joint")
+
+            return False
+
+        if self._attr is not None:
+            return fn_type in (MFn.kAttribute, _attr_type(self._attr))
+
+        if self._data is not None:
+            return fn_type in (MFn.kData, MFn.kMatrixData)
+
+        return False
+
+
+MObject.kNullObj = MObject()
+
+
+def _attr_type(spec) -> int:
+    if spec.children:
+        return MFn.kCompoundAttribute
+
+    if spec.type == "message":
+        return MFn.kMessageAttribute
+
+    if spec.type == "matrix":
+        return MFn.kMatrixAttribute
+
+    if spec.type == "enum":
+        return MFn.kEnumAttribute
+
+    if spec.type in _UNIT_TYPES:
+        return MFn.kUnitAttribute
+
+    if spec.type in _NUMERIC_TYPES:
+        return MFn.kNumericAttribute
+
+    return MFn.kTypedAttribute
+
+
+class MUuid:
+    def __init__(self, value: str=""):
+        self._value = value
+
+    def asString(self) -> str:
+        return self._value
+
+    def valid(self) -> bool:
+        return bool(self._value)
+
+
+class MObjectHandle:
+    def __init__(self, obj: MObject=None):
+        self._obj = MObject(obj) if obj is not None else MObject()
+
+    def isValid(self) -> bool:
+        return self._obj._node is not None and self._obj._node.alive
+
+    def isAlive(self) -> bool:
+        return self.isValid()
+
+    def hashCode(self) -> int:
+        return self._obj._node.id if self._obj._node is not None else 0
+
+    def object(self) -> MObject:
+        return self._obj if self.isValid() else MObject()
+
+    def __eq__(self, other):
+        return isinstance(other, MObjectHandle) and self._obj == other._obj
+
+    def __hash__(self):
+        return self.hashCode()
+
+
+class MSelectionList:
+    def __init__(self):
+        self._items = []
+
+    def add(self, pattern: str, searchChildNamespaces: bool=False) -> "MSelectionList":
+        scene = _scene()
+        if isinstance(pattern, MObject):
+            self._items.append(pattern)
+            return self
+
+        node_name, sep, attr = str(pattern).partition(".")
+        if "*" in node_name or "?" in node_name:
+            import fnmatch
+            nodes = [n for n in scene.nodes.values() if fnmatch.fnmatchcase(n.name, node_name.rsplit("|", 1)[-1])]
+            if sep:
+                nodes = [n for n in nodes if n.spec(attr) is not None]
+
+            if not nodes:
+                raise RuntimeError("(kInvalidParameter): Object does not exist")
+
+            self._items.extend(MObject._of(node=n) for n in nodes)
+            return self
+
+        node = scene.find(node_name)
+        if node is None:
+            raise RuntimeError("(kInvalidParameter): Object does not exist")
+
+        if sep:
+            try:
+                self._items.append(MPlug._wrap(scene.plug(attr, node)))
+
+            except ValueError:
+                raise RuntimeError("(kInvalidParameter): Object does not exist")
+
+        else:
+            self._items.append(MObject._of(node=node))
+
+        return self
+
+    def length(self) -> int:
+        return len(self._items)
+
+    def isEmpty(self) -> bool:
+        return not self._items
+
+    def clear(self) -> "MSelectionList":
+        self._items = []
+        return self
+
+    def getDependNode(self, index: int) -> MObject:
+        item = self._items[index]
+        if isinstance(item, MPlug):
+            return MObject._of(node=item._plug.node)
+
+        return item
+
+    def getDagPath(self, index: int) -> "MDagPath":
+        return MDagPath._of(self.getDependNode(index)._node)
+
+    def getPlug(self, index: int) -> "MPlug":
+        item = self._items[index]
+        if not isinstance(item, MPlug):
+            raise TypeError("(kInvalidParameter): Item is not a plug")
+
+        return item
+
+    def getSelectionStrings(self) -> list:
+        return [i.name() if isinstance(i, MPlug) else i._node.name for i in self._items]
+
+
+class MDagPath:
+    def __init__(self):
+        self._node = None
+
+    @classmethod
+    def _of(cls, node) -> "MDagPath":
+        path = cls()
+        path._node = node
+        return path
+
+    @staticmethod
+    def getAPathTo(obj: MObject) -> "MDagPath":
+        return MDagPath._of(_target(obj))
+
+    def node(self) -> MObject:
+        return MObject._of(node=self._node)
+
+    def fullPathName(self) -> str:
+        return self._node.path() if self._node is not None else ""
+
+    def partialPathName(self) -> str:
+        return self._node.name if self._node is not None else ""
+
+    def isValid(self) -> bool:
+        return self._node is not None and self._node.alive
+
+
+### 関数セット ###
+
+class MFnBase:
+    def __init__(self, obj: MObject=None):
+        self._obj = MObject(obj) if obj is not None else MObject()
+
+    def object(self) -> MObject:
+        return self._obj
+
+
+class MFnDependencyNode(MFnBase):
+    def __init__(self, obj: MObject=None):
+        super().__init__(obj)
+        self._specs = None
+
+    @property
+    def _node(self):
+        return self._obj._node
+
+    def name(self) -> str:
+        return self._node.name
+
+    def setName(self, name: str) -> str:
+        return _scene().rename(self._node, name)
+
+    @property
+    def typeName(self) -> str:
+        return self._node.type.name
+
+    def uuid(self):
+        return MUuid(self._node.uuid)
+
+    @property
+    def isLocked(self) -> bool:
+        return False
+
+    def hasAttribute(self, name: str) -> bool:
+        return self._node.spec(name) is not None
+
+    def _all_specs(self) -> list:
+        if self._specs is None:
+            self._specs = list(self._node.all_specs())
+
+        return self._specs
+
+    def attributeCount(self) -> int:
+        return len(self._all_specs())
+
+    def attribute(self, index) -> MObject:
+        if isinstance(index, str):
+            spec = self._node.spec(index)
+            if spec is None:
+                raise RuntimeError("(kInvalidParameter): Object does not exist")
+
+            return MObject._of(attr=spec)
+
+        return MObject._of(attr=self._all_specs()[index])
+
+    def findPlug(self, attr, wantNetworkedPlug: bool=False) -> "MPlug":
+        spec = attr._attr if isinstance(attr, MObject) else self._node.spec(attr)
+        if spec is None:
+            raise RuntimeError("(kInvalidParameter): Cannot find the plug")
+
+        return MPlug._wrap(Plug(self._node, spec, (None,) * len(spec.multi_specs)))
+
+
+class MFnDagNode(MFnDependencyNode):
+    def __init__(self, obj=None):
+        if isinstance(obj, MDagPath):
+            obj = MObject._of(node=obj._node)
+
+        super().__init__(obj)
+
+    def partialPathName(self) -> str:
+        return self._node.name
+
+    def fullPathName(self) -> str:
+        return self._node.path()
+
+    def getPath(self) -> MDagPath:
+        return MDagPath._of(self._node)
+
+    def parentCount(self) -> int:
+        return len(self._node.parents)
+
+    def parent(self, index: int) -> MObject:
+        return MObject._of(node=self._node.parents[index])
+
+    def childCount(self) -> int:
+        return len(self._node.children)
+
+    def child(self, index: int) -> MObject:
+        return MObject._of(node=self._node.children[index])
+
+
+class MFnAttribute(MFnBase):
+    @property
+    def _spec(self):
+        return self._obj._attr
+
+    @property
+    def name(self) -> str:
+        return self._spec.long
+
+    @property
+    def shortName(self) -> str:
+        return self._spec.short
+
+    @property
+    def dynamic(self) -> bool:
+        return self._spec.dynamic
+
+    @property
+    def array(self) -> bool:
+        return self._spec.multi
+
+    @property
+    def keyable(self) -> bool:
+        return self._spec.keyable
+
+    @property
+    def writable(self) -> bool:
+        return self._spec.writable
+
+    @property
+    def parent(self) -> MObject:
+        return MObject._of(attr=self._spec.parent) if self._spec.parent is not None else MObject()
+
+
+class MFnData:
+    kInvalid = 0
+    kNumeric = 1
+    kPlugin = 2
+    kPluginGeometry = 3
+    kString = 4
+    kMatrix = 5
+    kStringArray = 6
+    kDoubleArray = 7
+    kNurbsCurve = 15
+
+
+class MFnNumericData:
+    kInvalid = 0
+    kBoolean = 1
+    kByte = 2
+    kChar = 3
+    kShort = 4
+    k2Short = 5
+    k3Short = 6
+    kLong = 7
+    kInt = 7
+    k2Long = 8
+    k3Long = 9
+    kInt64 = 10
+    kFloat = 11
+    k2Float = 12
+    k3Float = 13
+    kDouble = 14
+    k2Double = 15
+    k3Double = 16
+    k4Double = 17
+    kAddr = 18
+
+
+_NUMERIC_TYPES = {"bool": MFnNumericData.kBoolean, "byte": MFnNumericData.kByte, "char": MFnNumericData.kChar,
+                  "short": MFnNumericData.kShort, "long": MFnNumericData.kLong, "float": MFnNumericData.kFloat,
+                  "double": MFnNumericData.kDouble}
+
+
+class MFnTypedAttribute(MFnAttribute):
+    def attrType(self) -> int:
+        if self._spec.type == "string":
+            return MFnData.kString
+
+        if self._spec.type == "matrix":
+            return MFnData.kMatrix
+
+        if self._spec.type in ("double3", "float3", "double2", "float2"):
+            return MFnData.kNumeric
+
+        if self._spec.type == "nurbsCurve":
+            return MFnData.kNurbsCurve
+
+        return MFnData.kInvalid
+
+
+class MFnNumericAttribute(MFnAttribute):
+    def numericType(self) -> int:
+        return _NUMERIC_TYPES.get(self._spec.type, MFnNumericData.kInvalid)
+
+
+class MFnUnitAttribute(MFnAttribute):
+    kInvalid = 0
+    kAngle = 1
+    kDistance = 2
+    kTime = 3
+
+    def unitType(self) -> int:
+        return _UNIT_TYPES.get(self._spec.type, self.kInvalid)
+
+
+class MFnEnumAttribute(MFnAttribute):
+    def fieldName(self, value: int) -> str:
+        for i, field in enumerate((self._spec.enum_names or "").split(":")):
+            name, _, index = field.partition("=")
+            if (int(index) if index else i) == value:
+                return name
+
+        raise RuntimeError("(kInvalidParameter): Invalid enum value")
+
+
+class MFnMatrixAttribute(MFnAttribute):
+    pass
+
+
+class MFnCompoundAttribute(MFnAttribute):
+    def numChildren(self) -> int:
+        return len(self._spec.children)
+
+    def child(self, index: int) -> MObject:
+        return MObject._of(attr=self._spec.children[index])
+
+
+class MFnMatrixData(MFnBase):
+    def matrix(self) -> MMatrix:
+        return MMatrix(self._obj._data)
+
+    def create(self, matrix) -> MObject:
+        self._obj = MObject._of(data=tuple(MMatrix(matrix)))
+        return self._obj
+
+    def set(self, matrix) -> None:
+        self._obj._data = tuple(MMatrix(matrix))
+
+
+### プラグ ###
+
+class MPlug:
+    def __init__(self, node: MObject=None, attr: MObject=None):
+        self._plug = None
+        if node is not None and attr is not None:
+            spec = attr._attr
+            self._plug = Plug(node._node, spec, (None,) * len(spec.multi_specs))
+
+    @classmethod
+    def _wrap(cls, plug) -> "MPlug":
+        p = cls()
+        p._plug = plug
+        return p
+
+    def __eq__(self, other):
+        return isinstance(other, MPlug) and self._plug == other._plug
+
+    def __hash__(self):
+        return hash(self._plug)
+
+    def __repr__(self):
+        return f"MPlug({self.name()})"
+
+    def isNull(self) -> bool:
+        return self._plug is None
+
+    @property
+    def isCompound(self) -> bool:
+        return bool(self._plug.spec.children)
+
+    @property
+    def isArray(self) -> bool:
+        return self._plug.is_array
+
+    @property
+    def isElement(self) -> bool:
+        return self._plug.spec.multi and self._plug.indices[-1] is not None
+
+    @property
+    def isChild(self) -> bool:
+        return self._plug.spec.parent is not None
+
+    @property
+    def isLocked(self) -> bool:
+        return _scene().is_locked(self._plug)
+
+    @isLocked.setter
+    def isLocked(self, value: bool) -> None:
+        _scene().set_locked(self._plug, value)
+
+    @property
+    def isDestination(self) -> bool:
+        return _scene().source(self._plug) is not None
+
+    @property
+    def isSource(self) -> bool:
+        return bool(_scene().destinations(self._plug))
+
+    @property
+    def isConnected(self) -> bool:
+        return self.isDestination or self.isSource
+
+    @property
+    def logicalIndex(self) -> int:
+        return self._plug.indices[-1] if self._plug.indices else -1
+
+    def node(self) -> MObject:
+        return MObject._of(node=self._plug.node)
+
+    def attribute(self) -> MObject:
+        return MObject._of(attr=self._plug.spec)
+
+    def name(self) -> str:
+        return self._plug.name()
+
+    def partialName(self, includeNodeName: bool=False, includeNonMandatoryIndices: bool=False,
+                    includeInstancedIndices: bool=False, useAlias: bool=False, useFullAttributePath: bool=False,
+                    useLongNames: bool=False) -> str:
+        name = self._plug.attr_name(long=useLongNames)
+        return f"{self._plug.node.name}.{name}" if includeNodeName else name
+
+    def numChildren(self) -> int:
+        return len(self._plug.spec.children)
+
+    def child(self, index) -> "MPlug":
+        spec = index._attr if isinstance(index, MObject) else self._plug.spec.children[index]
+        return MPlug._wrap(self._plug.child(spec))
+
+    def parent(self) -> "MPlug":
+        spec = self._plug.spec.parent
+        return MPlug._wrap(self._plug.ancestor(spec))
+
+    def elementByLogicalIndex(self, index: int) -> "MPlug":
+        return MPlug._wrap(self._plug.element(index))
+
+    def array(self) -> "MPlug":
+        return MPlug._wrap(self._plug.element(None))
+
+    def getExistingArrayAttributeIndices(self) -> list:
+        return _scene().element_indices(self._plug)
+
+    def numElements(self) -> int:
+        return len(self.getExistingArrayAttributeIndices())
+
+    def source(self) -> "MPlug":
+        src = _scene().source(self._plug)
+        return MPlug._wrap(src) if src is not None else MPlug()
+
+    def destinations(self) -> list:
+        return [MPlug._wrap(p) for p in _scene().destinations(self._plug)]
+
+    def connectedTo(self, asDst: bool, asSrc: bool) -> list:
+        result = []
+        if asDst:
+            src = _scene().source(self._plug)
+            if src is not None:
+                result.append(MPlug._wrap(src))
+
+        if asSrc:
+            result.extend(self.destinations())
+
+        return result
+
+    ### 値 ###
+
+    def _value(self):
+        return _scene().value(self._plug)
+
+    def asDouble(self) -> float:
+        return float(self._value() or 0.0)
+
+    def asFloat(self) -> float:
+        return self.asDouble()
+
+    def asInt(self) -> int:
+        return int(self._value() or 0)
+
+    def asShort(self) -> int:
+        return self.asInt()
+
+    def asChar(self) -> int:
+        return self.asInt()
+
+    def asBool(self) -> bool:
+        return bool(self._value())
+
+    def asString(self) -> str:
+        value = self._value()
+        return "" if value is None else str(value)
+
+    def asMAngle(self) -> MAngle:
+        return MAngle(self.asDouble(), MAngle.kDegrees)
+
+    def asMDistance(self) -> MDistance:
+        return MDistance(self.asDouble(), MDistance.kCentimeters)
+
+    def asMTime(self) -> MTime:
+        return MTime(self.asDouble(), MTime.kFilm)
+
+    def asMObject(self) -> MObject:
+        value = self._value()
+        if self._plug.spec.type == "matrix":
+            return MObject._of(data=tuple(value) if value is not None else tf.IDENTITY)
+
+        return MObject._of(data=value)
+
+    def _set(self, value) -> None:
+        scene = _scene()
+        if scene.is_locked(self._plug) or scene.source(self._plug) is not None:
+            raise RuntimeError("(kFailure): Unexpected Internal Failure")
+
+        scene.set_value(self._plug, value)
+
+    def setDouble(self, value: float) -> None:
+        self._set(float(value))
+
+    def setFloat(self, value: float) -> None:
+        self._set(float(value))
+
+    def setInt(self, value: int) -> None:
+        self._set(int(value))
+
+    def setShort(self, value: int) -> None:
+        self._set(int(value))
+
+    def setBool(self, value: bool) -> None:
+        self._set(bool(value))
+
+    def setString(self, value: str) -> None:
+        self._set(str(value))
+
+    def setMAngle(self, value: MAngle) -> None:
+        self._set(value.asDegrees())
+
+    def setMDistance(self, value: MDistance) -> None:
+        self._set(value.asUnits(MDistance.kCentimeters))
+
+    def setMObject(self, value: MObject) -> None:
+        self._set(value._data)
+
+
+### モディファイア ###
+
+class MDGModifier:
+    """
+    createNodeはその場でノードを作成し、それ以外の操作はdoItまで溜めておく
+    """
+    def __init__(self):
+        self._ops = []
+
+    def createNode(self, type_name: str) -> MObject:
+        return MObject._of(node=_scene().create(type_name))
+
+    def renameNode(self, node: MObject, name: str) -> "MDGModifier":
+        self._ops.append(lambda: _scene().rename(node._node, name))
+        return self
+
+    def connect(self, src: MPlug, dest: MPlug) -> "MDGModifier":
+        self._ops.append(lambda: _scene().connect(src._plug, dest._plug))
+        return self
+
+    def disconnect(self, src: MPlug, dest: MPlug) -> "MDGModifier":
+        self._ops.append(lambda: _scene().disconnect(src._plug, dest._plug))
+        return self
+
+    def _set(self, plug: MPlug, value) -> "MDGModifier":
+        self._ops.append(lambda: plug._set(value))
+        return self
+
+    def newPlugValueDouble(self, plug: MPlug, value: float) -> "MDGModifier":
+        return self._set(plug, float(value))
+
+    def newPlugValueFloat(self, plug: MPlug, value: float) -> "MDGModifier":
+        return self._set(plug, float(value))
+
+    def newPlugValueInt(self, plug: MPlug, value: int) -> "MDGModifier":
+        return self._set(plug, int(value))
+
+    def newPlugValueBool(self, plug: MPlug, value: bool) -> "MDGModifier":
+        return self._set(plug, bool(value))
+
+    def newPlugValueString(self, plug: MPlug, value: str) -> "MDGModifier":
+        return self._set(plug, str(value))
+
+    def newPlugValueMAngle(self, plug: MPlug, value: MAngle) -> "MDGModifier":
+        return self._set(plug, value.asDegrees())
+
+    def newPlugValueMDistance(self, plug: MPlug, value: MDistance) -> "MDGModifier":
+        return self._set(plug, value.asUnits(MDistance.kCentimeters))
+
+    def doIt(self) -> None:
+        ops, self._ops = self._ops, []
+        for op in ops:
+            op()
+
+
+class MDagModifier(MDGModifier):
+    def createNode(self, type_name: str, parent: MObject=MObject.kNullObj) -> MObject:
+        scene = _scene()
+        parent_node = parent._node if parent is not None else None
+        if parent_node is None and node_types.get(type_name).shape:
+            parent_node = scene.create("transform")
+
+        return MObject._of(node=scene.create(type_name, parent=parent_node))
+
+    def reparentNode(self, node: MObject, newParent: MObject=MObject.kNullObj) -> "MDagModifier":
+        parent = newParent._node if newParent is not None else None
+        self._ops.append(lambda: _scene().set_parent(node._node, parent))
+        return self
+
+
+### コールバック ###
+
+class MGlobal:
+    @staticmethod
+    def displayError(message: str) -> None:
+        _scene().errors.append(message)
+        print(f"# Error: {message}")
+
+    @staticmethod
+    def displayWarning(message: str) -> None:
+        print(f"# Warning: {message}")
+
+    @staticmethod
+    def displayInfo(message: str) -> None:
+        print(message)
+
+    @staticmethod
+    def getSelectionListByName(name: str) -> MSelectionList:
+        return MSelectionList().add(name)
+
+    @staticmethod
+    def getActiveSelectionList() -> MSelectionList:
+        sel = MSelectionList()
+        for node in _scene().selection:
+            sel.add(MObject._of(node=node))
+
+        return sel
+
+
+def _target(mobj: MObject):
+    return mobj._node if mobj is not None and not mobj.isNull() else None
+
+
+class MMessage:
+    @staticmethod
+    def removeCallback(callback_id: int) -> None:
+        _scene().remove_callback(callback_id)
+
+    @staticmethod
+    def removeCallbacks(callback_ids) -> None:
+        for callback_id in list(callback_ids):
+            _scene().remove_callback(callback_id)
+
+
+class MDGMessage(MMessage):
+    @staticmethod
+    def addNodeAddedCallback(func, nodeType: str="dependNode", clientData=None) -> int:
+        return _scene().add_callback("node_added", lambda node: func(MObject._of(node=node), clientData), nodeType)
+
+    @staticmethod
+    def addNodeRemovedCallback(func, nodeType: str="dependNode", clientData=None) -> int:
+        return _scene().add_callback("node_removed", lambda node: func(MObject._of(node=node), clientData), nodeType)
+
+    @staticmethod
+    def addConnectionCallback(func, clientData=None) -> int:
+        return _scene().add_callback(
+            "connection", lambda src, dest, made: func(MPlug._wrap(src), MPlug._wrap(dest), made, clientData))
+
+
+class MNodeMessage(MMessage):
+    kConnectionMade = 0x01
+    kConnectionBroken = 0x02
+    kAttributeSet = 0x08
+    kAttributeLocked = 0x10
+    kAttributeAdded = 0x40
+    kAttributeRemoved = 0x80
+
+    @staticmethod
+    def addNameChangedCallback(node: MObject, func, clientData=None) -> int:
+        return _scene().add_callback(
+            "name_changed", lambda n, old: func(MObject._of(node=n), old, clientData), _target(node))
+
+    @staticmethod
+    def addAttributeChangedCallback(node: MObject, func, clientData=None) -> int:
+        return _scene().add_callback(
+            "attr_changed", lambda n, plug: func(MNodeMessage.kAttributeSet, MPlug._wrap(plug), MPlug(), clientData), _target(node))
+
+    @staticmethod
+    def addNodeDirtyPlugCallback(node: MObject, func, clientData=None) -> int:
+        return _scene().add_callback(
+            "plug_dirty", lambda n, plug: func(MObject._of(node=n), MPlug._wrap(plug), clientData), _target(node))
+
+    @staticmethod
+    def addNodePreRemovalCallback(node: MObject, func, clientData=None) -> int:
+        return _scene().add_callback("pre_removal", lambda n: func(MObject._of(node=n), clientData), _target(node))
+
+
+class MDagMessage(MMessage):
+    kParentAdded = 0
+    kParentRemoved = 1
+
+    @staticmethod
+    def addAllDagChangesCallback(func, clientData=None) -> int:
+        def callback(node):
+            parent = node.parents[0] if node.parents else None
+            func(MDagMessage.kParentAdded, MDagPath._of(node), MDagPath._of(parent), clientData)
+
+        return _scene().add_callback("dag_changed", callback)
+
+    @staticmethod
+    def addChildAddedDagPathCallback(node: MDagPath, func, clientData=None) -> int:
+        return _scene().add_callback(
+            "child_added", lambda parent, child: func(MDagPath._of(child), MDagPath._of(parent), clientData), node._node)
+
+    @staticmethod
+    def addChildRemovedDagPathCallback(node: MDagPath, func, clientData=None) -> int:
+        return _scene().add_callback(
+            "child_removed", lambda parent, child: func(MDagPath._of(child), MDagPath._of(parent), clientData), node._node)
+
+    @staticmethod
+    def addChildReorderedDagPathCallback(node: MDagPath, func, clientData=None) -> int:
+        return _scene().add_callback(
+            "child_reordered", lambda parent, child: func(MDagPath._of(child), MDagPath._of(parent), clientData), node._node)
+
+
+class MSceneMessage(MMessage):
+    kSceneUpdate = 0
+    kBeforeNew = 1
+    kAfterNew = 2
+    kBeforeImport = 3
+    kAfterImport = 4
+    kBeforeOpen = 5
+    kAfterOpen = 6
+    kBeforeSave = 9
+    kAfterSave = 10
+    kAfterCreateReference = 47
+
+    _KINDS = {kBeforeNew: "before_new", kAfterNew: "after_new", kBeforeImport: "before_import",
+              kAfterImport: "after_import", kBeforeOpen: "before_open", kAfterOpen: "after_open",
+              kBeforeSave: "before_save", kAfterSave: "after_save", kAfterCreateReference: "after_create_reference"}
+
+    @staticmethod
+    def addCallback(message: int, func, clientData=None) -> int:
+        kind = MSceneMessage._KINDS.get(message, f"scene_{message}")
+        return _scene().add_callback(kind, lambda *args: func(clientData))
@@ -0,0 +1,1893 @@
+"""
+代替シーンで動くmaya.cmdsのサブセット
+YSRigのビルドで使うコマンドとフラグだけを実装する
+
+コマンドの戻り値とエラーはmaya.cmdsに合わせる
+存在しないオブジェクトはValueError、コマンドの失敗はRuntimeError
+"""
+import re
+import fnmatch
+import numpy as np
+from ysrig.standin import scene as _scene_module, transform as tf, node_types
+from ysrig.standin.attributes import AttrSpec, NUMERIC_TYPES, INT_TYPES, COMPOUND_TYPES
+from ysrig.standin.scene import Plug
+
+_RANGE = re.compile(r"\[(\d+):(\d+)\]")
+_COMPONENT = re.compile(r"^(.+)\.(?:cv|vtx)\[(\d+)\]$")
+_UUID = re.compile(r"[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{12}")
+
+# addAttrのdtで作成される型
+_DATA_TYPES = {"string", "matrix", "double3", "float3", "double2", "float2", "stringArray", "doubleArray",
+               "floatArray", "Int32Array", "vectorArray", "pointArray", "nurbsCurve", "nurbsSurface", "mesh"}
+
+# 子を持たないcompound型 (addAttrのdtで作成したもの) の要素数
+_DATA_SIZES = {"double3": 3, "float3": 3, "long3": 3, "double2": 2, "float2": 2, "long2": 2}
+
+_state = {"undo": True, "refresh_suspended": False}
+
+
+def _scene():
+    return _scene_module.get()
+
+
+def _flag(kwargs: dict, *names, default=None):
+    """
+    ロングネームとショートネームのどちらかで指定されたフラグの値を返す
+    """
+    for name in names:
+        if name in kwargs:
+            return kwargs[name]
+
+    return default
+
+
+def _flatten(args) -> list:
+    result = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            result.extend(_flatten(arg))
+
+        elif arg is not None:
+            result.append(arg)
+
+    return result
+
+
+def _node(name: str):
+    node = _scene().find(str(name))
+    if node is None:
+        raise ValueError(f"No object matches name: {name}")
+
+    return node
+
+
+def _plug(path: str) -> Plug:
+    return _scene().plug(str(path))
+
+
+def _expand(path: str) -> list[str]:
+    """
+    "node.attr[0:3]" を要素ごとのパスに展開する
+    """
+    match = _RANGE.search(path)
+    if not match:
+        return [path]
+
+    start, end = int(match.group(1)), int(match.group(2))
+    return [path[:match.start()] + f"[{i}]" + path[match.end():] for i in range(start, end + 1)]
+
+
+def _selection_or(args) -> list:
+    names = _flatten(args)
+    if names:
+        return names
+
+    return [n.name for n in _scene().selection]
+
+
+### 値の変換 ###
+
+def _format(plug: Plug, value):
+    """
+    シーンの値をcmds.getAttrと同じ形にする
+    """
+    spec = plug.spec
+    if spec.children:
+        return [tuple(_format(plug.child(c), v) for c, v in zip(spec.children, value))]
+
+    if value is None:
+        return None
+
+    if spec.type == "matrix":
+        return list(value)
+
+    if spec.type in _DATA_SIZES:
+        return [tuple(value)]
+
+    if spec.type == "bool":
+        return bool(value)
+
+    if spec.type in INT_TYPES:
+        return int(value)
+
+    if spec.type in NUMERIC_TYPES:
+        return float(value)
+
+    return value
+
+
+def _coerce(spec: AttrSpec, value):
+    if spec.type == "bool":
+        return bool(value)
+
+    if spec.type in INT_TYPES:
+        return int(value)
+
+    if spec.type in NUMERIC_TYPES:
+        return float(value)
+
+    if spec.type == "matrix":
+        return tf.to_tuple(value)
+
+    return value
+
+
+def _count(spec: AttrSpec) -> int:
+    """
+    setAttrで1つの要素に渡す値の数
+    """
+    if spec.children:
+        return sum(_count(c) for c in spec.children)
+
+    if spec.type == "matrix":
+        return 16
+
+    return _DATA_SIZES.get(spec.type, 1)
+
+
+def _split_values(spec: AttrSpec, values: list):
+    """
+    平坦な値のリストを、specの形の値にする
+    """
+    if spec.children:
+        result = []
+        for child in spec.children:
+            n = _count(child)
+            result.append(_split_values(child, values[:n]))
+            values = values[n:]
+
+        return tuple(result)
+
+    if spec.type == "matrix":
+        return _coerce(spec, values)
+
+    if spec.type in _DATA_SIZES:
+        return tuple(float(v) for v in values)
+
+    return _coerce(spec, values[0])
+
+
+def _is_connected(plug: Plug) -> bool:
+    node = plug.node
+    if not node.inputs:
+        return False
+
+    for spec in plug.spec.chain:
+        if plug.ancestor(spec).key in node.inputs:
+            return True
+
+    return False
+
+
+### アトリビュート ###
+
+def getAttr(path: str, **kwargs):
+    scene = _scene()
+    if _RANGE.search(str(path)):
+        result = []
+        for p in _expand(str(path)):
+            value = getAttr(p)
+            result.extend(value if isinstance(value, list) and value and isinstance(value[0], tuple) else [value])
+
+        return result
+
+    plug = _plug(path)
+    spec = plug.spec
+
+    if _flag(kwargs, "type", "typ"):
+        if spec.type == "TdataCompound" and not spec.multi and all(c.type in NUMERIC_TYPES for c in spec.children):
+            return "TdataCompound"
+
+        return spec.type
+
+    if _flag(kwargs, "lock", "l"):
+        return scene.is_locked(plug)
+
+    if _flag(kwargs, "keyable", "k"):
+        return plug.node.keyable.get(spec.long, spec.keyable)
+
+    if _flag(kwargs, "channelBox", "cb"):
+        return plug.node.channel_box.get(spec.long, spec.channel_box)
+
+    if _flag(kwargs, "settable", "se"):
+        return spec.writable and not scene.is_locked(plug) and not _is_connected(plug)
+
+    if _flag(kwargs, "multiIndices", "mi"):
+        indices = scene.element_indices(plug)
+        return indices or None
+
+    if _flag(kwargs, "size", "s"):
+        if spec.multi or spec.multi_specs:
+            indices = scene.element_indices(plug)
+            return indices[-1] + 1 if indices else 0
+
+        return len(spec.children) or 1
+
+    if plug.is_array:
+        if spec.output:
+            return _format(plug, scene.value(plug.element(0)))
+
+        return [_format(plug, scene.value(plug.element(i))) for i in scene.element_indices(plug)] or None
+
+    if spec.type == "message":
+        return None
+
+    return _format(plug, scene.value(plug))
+
+
+def setAttr(path: str, *values, **kwargs):
+    scene = _scene()
+    values = _flatten(values)
+    paths = _expand(str(path))
+    lock = _flag(kwargs, "lock", "l")
+    keyable = _flag(kwargs, "keyable", "k")
+    channel_box = _flag(kwargs, "channelBox", "cb")
+    value_type = _flag(kwargs, "type", "typ")
+
+    for p in paths:
+        plug = _plug(p)
+        node = plug.node
+        if lock is False:
+            scene.set_locked(plug, False)
+
+        if values:
+            spec = plug.spec
+            if scene.is_locked(plug):
+                raise RuntimeError(f"setAttr: The attribute '{plug.name()}' is locked or connected and cannot be modified.")
+
+            if _is_connected(plug):
+                raise RuntimeError(f"setAttr: The attribute '{plug.name()}' is locked or connected and cannot be modified.")
+
+            if value_type == "string" or spec.type == "string":
+                scene.set_value(plug, None if values[0] is None else str(values[0]))
+                values = values[1:]
+
+            else:
+                n = _count(spec)
+                if len(values) < n:
+                    raise RuntimeError(f"setAttr: Error reading data element number {len(values) + 1}: {plug.name()}")
+
+                scene.set_value(plug, _split_values(spec, values[:n]))
+                values = values[n:]
+
+        if lock:
+            scene.set_locked(plug, True)
+
+        if keyable is not None:
+            node.keyable[plug.spec.long] = bool(keyable)
+            if keyable:
+                node.channel_box[plug.spec.long] = False
+
+        if channel_box is not None:
+            node.channel_box[plug.spec.long] = bool(channel_box)
+
+        if lock is not None or keyable is not None or channel_box is not None:
+            scene.emit("attr_changed", node, plug)
+
+
+def _new_spec(kwargs: dict) -> AttrSpec:
+    long = _flag(kwargs, "longName", "ln")
+    short = _flag(kwargs, "shortName", "sn") or long
+    attr_type = _flag(kwargs, "attributeType", "at") or _flag(kwargs, "dataType", "dt") or "double"
+    if attr_type == "fltMatrix":
+        attr_type = "matrix"
+
+    default = _flag(kwargs, "defaultValue", "dv")
+    if default is None:
+        if _flag(kwargs, "dataType", "dt") in _DATA_SIZES:
+            default = (0.0,) * _DATA_SIZES[attr_type]
+
+        elif attr_type in ("string", "message", "compound") or attr_type in COMPOUND_TYPES:
+            default = None
+
+        elif attr_type == "matrix":
+            default = tf.IDENTITY
+
+        elif attr_type == "bool":
+            default = False
+
+        elif attr_type in INT_TYPES:
+            default = 0
+
+        else:
+            default = 0.0
+
+    elif attr_type in NUMERIC_TYPES:
+        default = _coerce(AttrSpec(long, type=attr_type), default)
+
+    if attr_type == "compound":
+        attr_type = "TdataCompound"
+
+    spec = AttrSpec(long, short, attr_type, default, multi=bool(_flag(kwargs, "multi", "m")), dynamic=True,
+                    keyable=bool(_flag(kwargs, "keyable", "k")), enum_names=_flag(kwargs, "enumName", "en"),
+                    min=_flag(kwargs, "minValue", "min"), max=_flag(kwargs, "maxValue", "max"))
+    if attr_type == "enum" and spec.enum_names is None:
+        spec.enum_names = ""
+
+    return spec
+
+
+def addAttr(*args, **kwargs):
+    scene = _scene()
+    targets = _selection_or(args)
+
+    if _flag(kwargs, "query", "q"):
+        plug = _plug(targets[0]) if "." in targets[0] else Plug(_node(targets[0]), _node(targets[0]).spec(_flag(kwargs, "longName", "ln")))
+        spec = plug.spec
+        if _flag(kwargs, "enumName", "en"):
+            return spec.enum_names
+
+        if _flag(kwargs, "minValue", "min"):
+            return spec.min
+
+        if _flag(kwargs, "maxValue", "max"):
+            return spec.max
+
+        if _flag(kwargs, "defaultValue", "dv"):
+            return spec.default
+
+        if _flag(kwargs, "keyable", "k"):
+            return plug.node.keyable.get(spec.long, spec.keyable)
+
+        if _flag(kwargs, "multi", "m"):
+            return spec.multi
+
+        if _flag(kwargs, "parent", "p"):
+            return spec.parent.long if spec.parent else spec.long
+
+        if _flag(kwargs, "attributeType", "at"):
+            return spec.type
+
+        if _flag(kwargs, "dataType", "dt"):
+            return [spec.type]
+
+        return None
+
+    if _flag(kwargs, "edit", "e"):
+        for target in targets:
+            plug = _plug(target)
+            if _flag(kwargs, "enumName", "en") is not None:
+                plug.spec.enum_names = _flag(kwargs, "enumName", "en")
+
+            if _flag(kwargs, "keyable", "k") is not None:
+                plug.node.keyable[plug.spec.long] = bool(_flag(kwargs, "keyable", "k"))
+
+            if _flag(kwargs, "defaultValue", "dv") is not None:
+                plug.spec.default = _coerce(plug.spec, _flag(kwargs, "defaultValue", "dv"))
+
+            if _flag(kwargs, "minValue", "min") is not None:
+                plug.spec.min = _flag(kwargs, "minValue", "min")
+
+            if _flag(kwargs, "maxValue", "max") is not None:
+                plug.spec.max = _flag(kwargs, "maxValue", "max")
+
+        return None
+
+    long = _flag(kwargs, "longName", "ln")
+    parent_name = _flag(kwargs, "parent", "p")
+    for target in targets:
+        node = _node(target.split(".")[0])
+        if node.spec(long) is not None:
+            raise RuntimeError(f"addAttr: Found a duplicate attribute name '{long}' on node '{node.name}'.")
+
+        spec = _new_spec(kwargs)
+        parent = None
+        if parent_name:
+            parent = node.spec(parent_name)
+            if parent is None:
+                raise RuntimeError(f"addAttr: Parent attribute '{parent_name}' not found on node '{node.name}'.")
+
+        node.add_attr(spec, parent)
+        scene.emit("attr_changed", node, Plug(node, spec, (None,) * len(spec.multi_specs)))
+
+
+def deleteAttr(*args, **kwargs):
+    scene = _scene()
+    attr = _flag(kwargs, "attribute", "at")
+    for target in _flatten(args):
+        plug = _plug(f"{target}.{attr}" if attr else target)
+        if not plug.spec.dynamic:
+            raise RuntimeError(f"deleteAttr: Cannot delete static attribute '{plug.name()}'.")
+
+        for own, other in scene.connections(Plug(plug.node, plug.spec, (None,) * len(plug.spec.multi_specs))):
+            if own.node.inputs.get(own.key) == other:
+                scene.disconnect(other, own, transfer=False)
+
+            else:
+                scene.disconnect(own, other)
+
+        plug.node.remove_attr(plug.spec)
+        scene.emit("attr_changed", plug.node, plug)
+
+
+def attributeQuery(attr: str, **kwargs):
+    node = _node(_flag(kwargs, "node", "n"))
+    spec = node.spec(re.sub(r"\[\d+\]", "", attr).split(".")[-1])
+
+    if _flag(kwargs, "exists", "ex"):
+        return spec is not None
+
+    if spec is None:
+        raise RuntimeError(f"attributeQuery: No attribute named {attr} found on {node.name}")
+
+    if _flag(kwargs, "listChildren", "lc"):
+        return [c.long for c in spec.children] or None
+
+    if _flag(kwargs, "listParent", "lp"):
+        return [spec.parent.long] if spec.parent else None
+
+    if _flag(kwargs, "listSiblings", "ls"):
+        return [c.long for c in spec.parent.children if c is not spec] if spec.parent else None
+
+    if _flag(kwargs, "multi", "m"):
+        return spec.multi
+
+    if _flag(kwargs, "listEnum", "le"):
+        return [spec.enum_names] if spec.type == "enum" else None
+
+    if _flag(kwargs, "attributeType", "at"):
+        if spec.type in _DATA_TYPES and spec.dynamic and spec.type not in COMPOUND_TYPES:
+            return "typed"
+
+        return "compound" if spec.type == "TdataCompound" else spec.type
+
+    if _flag(kwargs, "readable", "r"):
+        return True
+
+    if _flag(kwargs, "writable", "w"):
+        return spec.writable
+
+    if _flag(kwargs, "keyable", "k"):
+        return node.keyable.get(spec.long, spec.keyable)
+
+    if _flag(kwargs, "channelBox", "ch"):
+        return node.channel_box.get(spec.long, spec.channel_box)
+
+    if _flag(kwargs, "minExists", "mne"):
+        return spec.min is not None
+
+    if _flag(kwargs, "maxExists", "mxe"):
+        return spec.max is not None
+
+    if _flag(kwargs, "minimum", "min"):
+        return [spec.min]
+
+    if _flag(kwargs, "maximum", "max"):
+        return [spec.max]
+
+    if _flag(kwargs, "longName", "ln"):
+        return spec.long
+
+    if _flag(kwargs, "shortName", "sn"):
+        return spec.short
+
+    if _flag(kwargs, "niceName", "nn"):
+        return re.sub(r"(?<=[a-z])(?=[A-Z])", " ", spec.long[0].upper() + spec.long[1:])
+
+    if _flag(kwargs, "usedAsColor", "uac"):
+        return spec.type == "float3" and spec.long.lower().endswith(("color", "colour", "rgb"))
+
+    if _flag(kwargs, "hidden", "h"):
+        return False
+
+    return None
+
+
+def listAttr(*args, **kwargs):
+    names = _selection_or(args)
+    short = _flag(kwargs, "shortNames", "sn")
+    keyable = _flag(kwargs, "keyable", "k")
+    user_defined = _flag(kwargs, "userDefined", "ud")
+    locked = _flag(kwargs, "locked", "l")
+    unlocked = _flag(kwargs, "unlocked", "u")
+    channel_box = _flag(kwargs, "channelBox", "cb")
+    multi = _flag(kwargs, "multi", "m")
+    patterns = _flag(kwargs, "string", "st")
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    scene = _scene()
+    result = []
+    for name in names:
+        node = _node(name.split(".")[0])
+        if "." in name:
+            specs = list(_plug(name).spec.walk())
+
+        else:
+            specs = [s for s in node.all_specs()]
+
+        for spec in specs:
+            if user_defined and not spec.dynamic:
+                continue
+
+            if keyable and not node.keyable.get(spec.long, spec.keyable):
+                continue
+
+            if channel_box and not node.channel_box.get(spec.long, spec.channel_box):
+                continue
+
+            attr = spec.short if short else spec.long
+            if patterns and not any(fnmatch.fnmatchcase(spec.long, p) or fnmatch.fnmatchcase(spec.short, p) for p in patterns):
+                continue
+
+            if spec.multi_specs:
+                if not multi:
+                    if spec.multi and spec.parent is None or not spec.multi_specs[:-1] and spec.multi:
+                        result.append(attr)
+
+                    elif not spec.multi:
+                        result.append(attr)
+
+                    continue
+
+                for i in scene.element_indices(Plug(node, spec, (None,) * len(spec.multi_specs))):
+                    plug = Plug(node, spec, (0,) * (len(spec.multi_specs) - 1) + (i,))
+                    if locked and not scene.is_locked(plug) or unlocked and scene.is_locked(plug):
+                        continue
+
+                    result.append(plug.attr_name(long=not short))
+
+                continue
+
+            plug = Plug(node, spec, ())
+            if locked and not scene.is_locked(plug) or unlocked and scene.is_locked(plug):
+                continue
+
+            result.append(attr)
+
+    return result or None
+
+
+def connectAttr(src: str, dest: str, **kwargs):
+    scene = _scene()
+    src_plug = _plug(src)
+    dest_plug = _plug(dest)
+    if src_plug.is_array:
+        src_plug = src_plug.element(0)
+
+    if dest_plug.is_array:
+        if _flag(kwargs, "nextAvailable", "na"):
+            indices = scene.element_indices(dest_plug)
+            dest_plug = dest_plug.element(indices[-1] + 1 if indices else 0)
+
+        else:
+            dest_plug = dest_plug.element(0)
+
+    if scene.is_locked(dest_plug):
+        raise RuntimeError(f"connectAttr: The destination attribute '{dest_plug.name()}' is locked.")
+
+    old = scene.source(dest_plug)
+    if old is not None:
+        if old == src_plug:
+            raise RuntimeError(f"connectAttr: '{src_plug.name()}' is already connected to '{dest_plug.name()}'.")
+
+        if not _flag(kwargs, "force", "f"):
+            raise RuntimeError(f"connectAttr: The destination attribute '{dest_plug.name()}' cannot be connected to because it already has an incoming connection.")
+
+    scene.connect(src_plug, dest_plug)
+
+
+def disconnectAttr(src: str, dest: str=None, **kwargs):
+    scene = _scene()
+    src_plug = _plug(src)
+    if dest is None:
+        for own, other in scene.connections(src_plug, source=False):
+            scene.disconnect(own, other)
+
+        return
+
+    dest_plug = _plug(dest)
+    if src_plug.is_array:
+        src_plug = src_plug.element(0)
+
+    if scene.source(dest_plug) != src_plug:
+        raise RuntimeError(f"disconnectAttr: There is no connection from '{src_plug.name()}' to '{dest_plug.name()}' to disconnect")
+
+    scene.disconnect(src_plug, dest_plug)
+
+
+def listConnections(*args, **kwargs):
+    scene = _scene()
+    source = _flag(kwargs, "source", "s", default=True)
+    destination = _flag(kwargs, "destination", "d", default=True)
+    plugs = _flag(kwargs, "plugs", "p")
+    connections = _flag(kwargs, "connections", "c")
+    type_name = _flag(kwargs, "type", "t")
+    shapes = _flag(kwargs, "shapes", "sh")
+
+    result = []
+    for name in _flatten(args):
+        if "." in name:
+            pairs = scene.connections(_plug(name), source, destination)
+
+        else:
+            pairs = scene.node_connections(_node(name), source, destination)
+
+        for own, other in pairs:
+            node = other.node
+            if node.is_shape and not shapes and not plugs and node.parents:
+                node = node.parents[0]
+
+            if type_name and not node.type.is_a(type_name):
+                continue
+
+            if connections:
+                result.append(own.name())
+
+            result.append(other.name() if plugs else node.name)
+
+    return result or None
+
+
+### ノード ###
+
+def createNode(node_type: str, **kwargs):
+    scene = _scene()
+    name = _flag(kwargs, "name", "n")
+    parent = _flag(kwargs, "parent", "p")
+    parent = _node(parent) if parent else None
+
+    if node_types.get(node_type).shape:
+        if parent is None:
+            parent = scene.create("transform", "transform1")
+
+        node = scene.create(node_type, name or f"{node_type}Shape1", parent=parent)
+
+    else:
+        node = scene.create(node_type, name, parent=parent)
+
+    if not _flag(kwargs, "skipSelect", "ss"):
+        scene.selection = [node]
+
+    return node.name
+
+
+def objExists(name: str) -> bool:
+    if not name:
+        return False
+
+    try:
+        if "." in name:
+            _plug(name)
+            return True
+
+        return _scene().find(name) is not None
+
+    except ValueError:
+        return False
+
+
+def delete(*args, **kwargs):
+    scene = _scene()
+    names = _selection_or(args)
+    nodes = [_node(n) for n in names]
+    for node in nodes:
+        scene.delete(node)
+
+
+def rename(*args, **kwargs) -> str:
+    args = _flatten(args)
+    if len(args) == 1:
+        node = _scene().selection[0]
+        name = args[0]
+
+    else:
+        node = _node(args[0])
+        name = args[1]
+
+    if "|" in name or not name:
+        raise RuntimeError(f"rename: New name '{name}' is invalid.")
+
+    return _scene().rename(node, name)
+
+
+def nodeType(name: str, **kwargs):
+    if _flag(kwargs, "isTypeName", "itn"):
+        node_type = node_types.get(name)
+
+    else:
+        node_type = _node(name.split(".")[0]).type
+
+    if _flag(kwargs, "inherited", "i"):
+        return list(node_type.lineage)
+
+    return node_type.name
+
+
+def objectType(name: str, **kwargs):
+    node = _node(name)
+    type_name = _flag(kwargs, "isAType", "isa")
+    if type_name is not None:
+        return node.type.is_a(type_name)
+
+    type_name = _flag(kwargs, "isType", "i")
+    if type_name is not None:
+        return node.type.name == type_name
+
+    return node.type.name
+
+
+def _walk(node) -> list:
+    """
+    自身と子孫 深さ優先の順
+    """
+    result = [node]
+    for child in node.children:
+        result.extend(_walk(child))
+
+    return result
+
+
+def _display_name(node, long: bool) -> str:
+    if long and node.is_dag:
+        return node.path()
+
+    return node.name
+
+
+def ls(*args, **kwargs):
+    scene = _scene()
+    type_names = _flag(kwargs, "type", "typ")
+    if isinstance(type_names, str):
+        type_names = [type_names]
+
+    long = _flag(kwargs, "long", "l")
+    dag = _flag(kwargs, "dag")
+    names = _flatten(args)
+
+    if _flag(kwargs, "selection", "sl"):
+        nodes = list(scene.selection)
+        if names:
+            nodes = [n for n in nodes if n.name in names]
+
+    elif names:
+        nodes = []
+        for name in names:
+            if "." in name:
+                if objExists(name):
+                    nodes.append(name)
+
+                continue
+
+            if any(c in name for c in "*?["):
+                pattern = name.rsplit("|", 1)[-1]
+                nodes.extend(n for n in scene.nodes.values() if fnmatch.fnmatchcase(n.name, pattern))
+
+            else:
+                node = scene.find(name)
+                if node is None and _UUID.fullmatch(name):
+                    node = scene.find_uuid(name)
+
+                if node is not None:
+                    nodes.append(node)
+
+    else:
+        nodes = list(scene.nodes.values())
+
+    if dag:
+        nodes = [d for n in nodes if not isinstance(n, str) for d in _walk(n)]
+
+    if _flag(kwargs, "dagObjects", "do"):
+        nodes = [n for n in nodes if isinstance(n, str) or n.is_dag]
+
+    if _flag(kwargs, "transforms", "tr"):
+        nodes = [n for n in nodes if not isinstance(n, str) and n.type.transform]
+
+    if _flag(kwargs, "shapes", "s"):
+        nodes = [n for n in nodes if not isinstance(n, str) and n.is_shape]
+
+    if type_names:
+        nodes = [n for n in nodes if not isinstance(n, str) and any(n.type.is_a(t) for t in type_names)]
+
+    if _flag(kwargs, "uuid"):
+        return [n.uuid for n in nodes if not isinstance(n, str)]
+
+    result = []
+    seen = set()
+    for node in nodes:
+        name = node if isinstance(node, str) else _display_name(node, long)
+        if name not in seen:
+            seen.add(name)
+            result.append(name)
+
+    return result
+
+
+def select(*args, **kwargs):
+    scene = _scene()
+    if _flag(kwargs, "clear", "cl"):
+        scene.selection = []
+        return
+
+    nodes = [_node(n) for n in _flatten(args)]
+    if _flag(kwargs, "add", "af"):
+        scene.selection += [n for n in nodes if n not in scene.selection]
+
+    elif _flag(kwargs, "deselect", "d"):
+        scene.selection = [n for n in scene.selection if n not in nodes]
+
+    elif _flag(kwargs, "toggle", "tgl"):
+        for node in nodes:
+            if node in scene.selection:
+                scene.selection.remove(node)
+
+            else:
+                scene.selection.append(node)
+
+    else:
+        scene.selection = nodes
+
+
+### 親子関係 ###
+
+def _connect_inverse_scale(node) -> None:
+    """
+    ジョイントの親がジョイントの場合、親のscaleをinverseScaleに接続する
+    """
+    if not node.type.is_a("joint"):
+        return
+
+    scene = _scene()
+    plug = scene.plug("inverseScale", node)
+    old = scene.source(plug)
+    if old is not None:
+        scene.disconnect(old, plug, transfer=False)
+        scene.set_value(plug, (1.0, 1.0, 1.0), emit=False)
+
+    parent = node.parents[0] if node.parents else None
+    if parent is not None and parent.type.is_a("joint"):
+        scene.connect(scene.plug("scale", parent), plug)
+
+
+def _parent_instance(path: str):
+    """
+    "親|子" の形のパスから、置き換える親を返す
+    """
+    if "|" not in path:
+        return None
+
+    names = [n for n in path.split("|") if n]
+    if len(names) < 2:
+        return None
+
+    return _scene().find(names[-2])
+
+
+def parent(*args, **kwargs):
+    scene = _scene()
+    names = _flatten(args)
+    world = _flag(kwargs, "world", "w")
+    relative = _flag(kwargs, "relative", "r")
+    add = _flag(kwargs, "addObject", "add")
+
+    if world:
+        new_parent = None
+        children = names
+
+    else:
+        new_parent = _node(names[-1])
+        children = names[:-1]
+
+    result = []
+    for name in children:
+        node = _node(name)
+        if new_parent is not None and new_parent in node.parents and not add:
+            result.append(node.name)
+            continue
+
+        if new_parent is None and not node.parents:
+            raise RuntimeError(f"parent: Object '{node.name}' is already a child of world.")
+
+        world_matrix = None if relative or node.is_shape else _world(node)
+        if add:
+            node.parents.append(new_parent)
+            new_parent.children.append(node)
+            scene.invalidate()
+            scene.emit("dag_changed", node)
+
+        else:
+            scene.set_parent(node, new_parent, replace=_parent_instance(name))
+
+        if world_matrix is not None:
+            _set_world_matrix(node, world_matrix, joint_orient=True)
+
+        _connect_inverse_scale(node)
+        result.append(node.name)
+
+    return result
+
+
+def reorder(*args, **kwargs):
+    scene = _scene()
+    front = _flag(kwargs, "front", "f")
+    back = _flag(kwargs, "back", "b")
+    relative = _flag(kwargs, "relative", "r", default=0)
+
+    for name in _flatten(args):
+        node = _node(name)
+        siblings = node.parents[0].children if node.parents else None
+        if siblings is None:
+            continue
+
+        index = siblings.index(node)
+        siblings.remove(node)
+        if front:
+            index = 0
+
+        elif back:
+            index = len(siblings)
+
+        else:
+            index = min(max(index + relative, 0), len(siblings))
+
+        siblings.insert(index, node)
+        scene.invalidate()
+        scene.emit("child_reordered", node.parents[0], node)
+
+
+def listRelatives(*args, **kwargs):
+    names = _flatten(args)
+    if not names:
+        names = [n.name for n in _scene().selection]
+
+    full_path = _flag(kwargs, "fullPath", "f")
+    type_names = _flag(kwargs, "type", "typ")
+    if isinstance(type_names, str):
+        type_names = [type_names]
+
+    result = []
+    for name in names:
+        node = _node(name)
+        if _flag(kwargs, "parent", "p"):
+            relatives = node.parents[:1]
+            instance = _parent_instance(name)
+            if instance is not None:
+                relatives = [instance]
+
+        elif _flag(kwargs, "allParents", "ap"):
+            relatives = list(node.parents)
+
+        elif _flag(kwargs, "allDescendents", "ad"):
+            relatives = list(reversed(node.descendants()))
+
+        elif _flag(kwargs, "shapes", "s"):
+            relatives = [c for c in node.children if c.is_shape]
+
+        else:
+            relatives = list(node.children)
+
+        if _flag(kwargs, "noIntermediate", "ni"):
+            relatives = [r for r in relatives if not (r.is_shape and r.values.get(("intermediateObject", ())))]
+
+        if type_names:
+            relatives = [r for r in relatives if any(r.type.is_a(t) for t in type_names)]
+
+        result.extend(r.path() if full_path else r.name for r in relatives)
+
+    return result or None
+
+
+def instance(*args, **kwargs):
+    scene = _scene()
+    result = []
+    for name in _selection_or(args):
+        node = _node(name)
+        holder = scene.create("transform", _flag(kwargs, "name", "n") or f"{(node.parents[0].name if node.parents else node.name)}1")
+        if node.is_shape:
+            node.parents.append(holder)
+            holder.children.append(node)
+
+        else:
+            for child in node.children:
+                child.parents.append(holder)
+                holder.children.append(child)
+
+            _set_local_matrix(holder, _local(node))
+
+        scene.invalidate()
+        scene.emit("dag_changed", node)
+        result.append(holder.name)
+
+    return result
+
+
+### 行列 ###
+
+def _world(node, index: int=0) -> np.ndarray:
+    return tf.as_matrix(_scene().value(Plug(node, node.spec("worldMatrix"), (index,))))
+
+
+def _local(node) -> np.ndarray:
+    return tf.as_matrix(_scene().value(Plug(node, node.spec("matrix"), ())))
+
+
+def _parent_world(node) -> np.ndarray:
+    return node_types._parent_matrix(_scene(), node, 0) if node.is_dag else np.eye(4)
+
+
+def _read(node, attr):
+    return _scene().read(node, attr)
+
+
+def _set_free(node, attr: str, value) -> None:
+    """
+    接続とロックが無い成分だけ値を設定する
+    """
+    scene = _scene()
+    plug = scene.plug(attr, node)
+    if plug.spec.children:
+        for child, v in zip(plug.spec.children, value):
+            _set_free(node, child.long, v)
+
+        return
+
+    if scene.is_locked(plug) or _is_connected(plug):
+        return
+
+    scene.set_value(plug, _coerce(plug.spec, value))
+
+
+def _normalized(matrix3) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (3, 3) の行列をスケールと回転行列に分ける
+    """
+    m = np.array(matrix3, dtype=np.float64)
+    scale = np.linalg.norm(m, axis=1)
+    rotation = m / np.where(scale < tf.EPSILON, 1.0, scale)[:, None]
+    if np.linalg.det(rotation) < 0:
+        rotation[0] *= -1.0
+        scale[0] *= -1.0
+
+    return scale, rotation
+
+
+def _set_local_matrix(node, matrix, joint_orient: bool=False) -> None:
+    """
+    ローカル行列 (offsetParentMatrixを除く) になるようにtranslate, rotate, scaleを設定する
+    ジョイントはjoint_orientがTrueの場合はrotateを保ってjointOrientを、Falseの場合はjointOrientを保ってrotateを変更する
+    """
+    matrix = tf.as_matrix(matrix)
+    order = _read(node, "rotateOrder")
+    if not node.type.is_a("joint"):
+        t, r, s, sh = tf.decompose(matrix, order)
+        rotate_axis = _read(node, "rotateAxis")
+        if any(abs(v) > tf.EPSILON for v in rotate_axis):
+            scale, rotation = _normalized(matrix[:3, :3])
+            r = tf.rotation_to_euler(np.linalg.inv(tf.euler_to_rotation(rotate_axis)) @ rotation, order)
+
+        _set_free(node, "translate", t)
+        _set_free(node, "rotate", r)
+        _set_free(node, "scale", s)
+        _set_free(node, "shear", sh)
+        return
+
+    m3 = matrix[:3, :3]
+    if _read(node, "segmentScaleCompensate"):
+        m3 = m3 @ np.diag(_read(node, "inverseScale"))
+
+    scale, rotation = _normalized(m3)
+    rotate_axis = tf.euler_to_rotation(_read(node, "rotateAxis"))
+    if joint_orient:
+        rotate = tf.euler_to_rotation(_read(node, "rotate"), order)
+        _set_free(node, "jointOrient", tf.rotation_to_euler(np.linalg.inv(rotate_axis @ rotate) @ rotation))
+
+    else:
+        orient = tf.euler_to_rotation(_read(node, "jointOrient"))
+        _set_free(node, "rotate", tf.rotation_to_euler(np.linalg.inv(rotate_axis) @ rotation @ np.linalg.inv(orient), order))
+
+    _set_free(node, "translate", matrix[3, :3].tolist())
+    _set_free(node, "scale", scale.tolist())
+
+
+def _set_world_matrix(node, matrix, joint_orient: bool=False) -> None:
+    parent = tf.as_matrix(_read(node, "offsetParentMatrix")) @ _parent_world(node)
+    _set_local_matrix(node, tf.as_matrix(matrix) @ np.linalg.inv(parent), joint_orient)
+
+
+def _pivot_world(node) -> np.ndarray:
+    pivot = np.append(np.array(_read(node, "rotatePivot")) if node.spec("rotatePivot") else np.zeros(3), 1.0)
+    return (pivot @ _world(node))[:3]
+
+
+def matchTransform(*args, **kwargs):
+    names = _flatten(args)
+    target = _node(names[-1])
+    pos = _flag(kwargs, "position", "pos")
+    rot = _flag(kwargs, "rotation", "rot")
+    scl = _flag(kwargs, "scale", "scl")
+    if not any((pos, rot, scl)):
+        pos = rot = scl = True
+
+    target_world = _world(target)
+    target_scale, target_rotation = _normalized(target_world[:3, :3])
+    for name in names[:-1]:
+        node = _node(name)
+        world = _world(node)
+        scale, rotation = _normalized(world[:3, :3])
+        if rot:
+            rotation = target_rotation
+
+        if scl:
+            scale = target_scale
+
+        matrix = np.eye(4)
+        matrix[:3, :3] = np.diag(scale) @ rotation
+        matrix[3, :3] = world[3, :3]
+        if pos:
+            pivot = np.array(_read(node, "rotatePivot")) if node.spec("rotatePivot") else np.zeros(3)
+            matrix[3, :3] = _pivot_world(target) - pivot @ matrix[:3, :3]
+
+        _set_world_matrix(node, matrix)
+
+
+def makeIdentity(*args, **kwargs):
+    scene = _scene()
+    apply = _flag(kwargs, "apply", "a")
+    flags = [_flag(kwargs, n, s) for n, s in (("translate", "t"), ("rotate", "r"), ("scale", "s"))]
+    translate, rotate, scale = flags if any(flags) else (True, True, True)
+    joint_orient = _flag(kwargs, "jointOrient", "jo")
+
+    for name in _selection_or(args):
+        node = _node(name)
+        if not apply:
+            if translate:
+                _set_free(node, "translate", (0, 0, 0))
+
+            if rotate:
+                _set_free(node, "rotate", (0, 0, 0))
+                if joint_orient and node.type.is_a("joint"):
+                    _set_free(node, "jointOrient", (0, 0, 0))
+
+            if scale:
+                _set_free(node, "scale", (1, 1, 1))
+
+            continue
+
+        for n in _walk(node):
+            if not n.type.transform:
+                continue
+
+            _freeze(n, translate, rotate, scale)
+
+        scene.emit("dag_changed", node)
+
+
+def _freeze(node, translate: bool, rotate: bool, scale: bool) -> None:
+    """
+    makeIdentity(apply=True) 子のtranslateとシェイプに行列を焼き込み、値を初期値にする
+    """
+    if node.type.is_a("joint"):
+        order = _read(node, "rotateOrder")
+        if rotate:
+            orientation = (tf.euler_to_rotation(_read(node, "rotateAxis")) @ tf.euler_to_rotation(_read(node, "rotate"), order)
+                           @ tf.euler_to_rotation(_read(node, "jointOrient")))
+            _set_free(node, "jointOrient", tf.rotation_to_euler(orientation))
+            _set_free(node, "rotate", (0, 0, 0))
+            _set_free(node, "rotateAxis", (0, 0, 0))
+
+        if scale:
+            s = np.array(_read(node, "scale"))
+            for child in node.children:
+                if child.type.transform:
+                    _set_free(child, "translate", (np.array(_read(child, "translate")) * s).tolist())
+
+            _set_free(node, "scale", (1, 1, 1))
+
+        return
+
+    local = _local(node)
+    baked = np.eye(4)
+    t, r, s, sh = tf.decompose(local, _read(node, "rotateOrder"))
+    if scale:
+        baked[:3, :3] = np.diag(s) @ tf.shear_matrix(sh)
+
+    if rotate:
+        baked[:3, :3] = baked[:3, :3] @ tf.euler_to_rotation(r, _read(node, "rotateOrder"))
+
+    if translate:
+        baked[3, :3] = t
+
+    for child in node.children:
+        if child.is_shape and child.type.is_a("nurbsCurve"):
+            plug = _scene().plug("controlPoints", child)
+            for i in _scene().element_indices(plug):
+                point = np.append(np.array(_scene().value(plug.element(i))), 1.0) @ baked
+                _scene().set_value(plug.element(i), tuple(point[:3].tolist()), emit=False)
+
+        elif child.type.transform:
+            _set_local_matrix(child, _local(child) @ baked)
+
+    remaining = local @ np.linalg.inv(baked)
+    _set_local_matrix(node, remaining)
+    if translate:
+        _set_free(node, "translate", (0, 0, 0))
+        _set_free(node, "rotatePivot", t)
+        _set_free(node, "scalePivot", t)
+
+
+def xform(*args, **kwargs):
+    names = _selection_or(args)
+    query = _flag(kwargs, "query", "q")
+    world_space = _flag(kwargs, "worldSpace", "ws")
+    relative = _flag(kwargs, "relative", "r")
+    translation = _flag(kwargs, "translation", "t")
+    matrix = _flag(kwargs, "matrix", "m")
+    rotation = _flag(kwargs, "rotation", "ro")
+    scale = _flag(kwargs, "scale", "s")
+
+    if query:
+        node = _node(names[0])
+        if matrix:
+            return (_world(node) if world_space else _local(node)).reshape(16).tolist()
+
+        if translation:
+            if world_space:
+                return _world(node)[3, :3].tolist()
+
+            return list(_read(node, "translate"))
+
+        if rotation:
+            if world_space:
+                return tf.rotation_to_euler(_normalized(_world(node)[:3, :3])[1], _read(node, "rotateOrder"))
+
+            return list(_read(node, "rotate"))
+
+        if scale:
+            return _normalized((_world(node) if world_space else _local(node))[:3, :3])[0].tolist()
+
+        if _flag(kwargs, "rotatePivot", "rp"):
+            return _pivot_world(node).tolist() if world_space else list(_read(node, "rotatePivot"))
+
+        return None
+
+    for name in names:
+        node = _node(name)
+        if matrix is not None:
+            if world_space:
+                _set_world_matrix(node, matrix)
+
+            else:
+                _set_local_matrix(node, matrix)
+
+        if translation is not None:
+            if world_space:
+                world = _world(node)
+                world[3, :3] = np.array(translation) + (world[3, :3] if relative else 0.0)
+                _set_world_matrix(node, world)
+
+            else:
+                current = np.array(_read(node, "translate")) if relative else 0.0
+                _set_free(node, "translate", (np.array(translation) + current).tolist())
+
+        if rotation is not None:
+            if world_space:
+                world = _world(node)
+                s, _ = _normalized(world[:3, :3])
+                world[:3, :3] = np.diag(s) @ tf.euler_to_rotation(rotation, _read(node, "rotateOrder"))
+                _set_world_matrix(node, world)
+
+            else:
+                current = np.array(_read(node, "rotate")) if relative else 0.0
+                _set_free(node, "rotate", (np.array(rotation) + current).tolist())
+
+        if scale is not None:
+            current = np.array(_read(node, "scale")) if relative else 1.0
+            _set_free(node, "scale", (np.array(scale) * current).tolist())
+
+
+def move(*args, **kwargs):
+    values = [a for a in args if isinstance(a, (int, float))]
+    names = [a for a in _flatten(args) if isinstance(a, str)]
+    relative = _flag(kwargs, "relative", "r")
+    object_space = _flag(kwargs, "objectSpace", "os") or _flag(kwargs, "localSpace", "ls")
+    for name in _selection_or(names):
+        node = _node(name)
+        vector = np.array(values[:3], dtype=np.float64)
+        if object_space:
+            current = np.array(_read(node, "translate"))
+            _set_free(node, "translate", (current + vector if relative else vector).tolist())
+            continue
+
+        world = _world(node)
+        world[3, :3] = world[3, :3] + vector if relative else vector
+        _set_world_matrix(node, world)
+
+
+def rotate(*args, **kwargs):
+    values = [a for a in args if isinstance(a, (int, float))]
+    names = [a for a in _flatten(args) if isinstance(a, str)]
+    axes = [i for i, a in enumerate("xyz") if _flag(kwargs, a)]
+    rotate_values = [0.0, 0.0, 0.0]
+    if axes:
+        for axis, v in zip(axes, values):
+            rotate_values[axis] = v
+
+    else:
+        rotate_values = (values + [0.0, 0.0, 0.0])[:3]
+
+    relative = _flag(kwargs, "relative", "r")
+    object_space = _flag(kwargs, "objectSpace", "os")
+    delta = tf.euler_to_rotation(rotate_values)
+    for name in _selection_or(names):
+        node = _node(name)
+        world = _world(node)
+        scale, rotation = _normalized(world[:3, :3])
+        if relative:
+            rotation = delta @ rotation if object_space else rotation @ delta
+
+        else:
+            rotation = delta
+
+        world[:3, :3] = np.diag(scale) @ rotation
+        _set_world_matrix(node, world)
+
+
+def transformLimits(*args, **kwargs):
+    scene = _scene()
+    for name in _selection_or(args):
+        node = _node(name)
+        for channel, prefix in (("t", "Trans"), ("r", "Rot"), ("s", "Scale")):
+            for axis in "xyz":
+                limits = kwargs.get(f"{channel}{axis}")
+                enables = kwargs.get(f"e{channel}{axis}")
+                for bound, i in (("min", 0), ("max", 1)):
+                    if limits is not None:
+                        scene.set_value(scene.plug(f"{bound}{prefix}{axis.upper()}Limit", node), float(limits[i]))
+
+                    if enables is not None:
+                        scene.set_value(scene.plug(f"{bound}{prefix}{axis.upper()}LimitEnable", node), bool(enables[i]))
+
+
+### 複製 ###
+
+def _copy_spec(spec: AttrSpec) -> AttrSpec:
+    copy = AttrSpec(spec.long, spec.short, spec.type, spec.default, [_copy_spec(c) for c in spec.children],
+                    multi=spec.multi, output=spec.output, dynamic=spec.dynamic, keyable=spec.keyable,
+                    enum_names=spec.enum_names, min=spec.min, max=spec.max, writable=spec.writable)
+    copy.channel_box = spec.channel_box
+    return copy
+
+
+def _copy_node(node, name: str=None):
+    scene = _scene()
+    new = scene.create(node.type.name, name or node.name)
+    for spec in node.dynamic_attrs:
+        new.add_attr(_copy_spec(spec))
+
+    new.values = dict(node.values)
+    new.locked = set(node.locked)
+    new.keyable = dict(node.keyable)
+    new.channel_box = dict(node.channel_box)
+    new.elements = {k: set(v) for k, v in node.elements.items()}
+    return new
+
+
+def duplicate(*args, **kwargs):
+    scene = _scene()
+    names = _selection_or(args)
+    parent_only = _flag(kwargs, "parentOnly", "po")
+    new_name = _flag(kwargs, "name", "n")
+    nodes = [_node(n) for n in names]
+    mapping = {}
+
+    def copy_tree(node, name=None):
+        new = _copy_node(node, name)
+        mapping[node] = new
+        if not parent_only:
+            for child in node.children:
+                if child in nodes:
+                    continue
+
+                new_child = copy_tree(child)
+                new_child.parents.append(new)
+                new.children.append(new_child)
+
+        return new
+
+    result = []
+    for i, node in enumerate(nodes):
+        new = copy_tree(node, new_name if i == 0 else None)
+        result.append(new.name)
+
+    for node in nodes:
+        new = mapping[node]
+        if node.parents:
+            parent = mapping.get(node.parents[0], node.parents[0])
+            scene.set_parent(new, parent)
+
+        _connect_inverse_scale(new)
+
+    for new in mapping.values():
+        for child in new.children:
+            _connect_inverse_scale(child)
+
+    scene.selection = [mapping[n] for n in nodes]
+    return result
+
+
+def mirrorJoint(*args, **kwargs):
+    scene = _scene()
+    root = _node(_flatten(args)[0])
+    if _flag(kwargs, "mirrorXY", "mxy"):
+        axis = "Z"
+
+    elif _flag(kwargs, "mirrorXZ", "mxz"):
+        axis = "Y"
+
+    else:
+        axis = "X"
+
+    behavior = bool(_flag(kwargs, "mirrorBehavior", "mb"))
+    search, replace = _flag(kwargs, "searchReplace", "sr", default=("", ""))
+
+    from ysrig import mathlib
+    joints = [j for j in _walk(root) if j.type.is_a("joint")]
+    worlds = {j: _world(j) for j in joints}
+    mapping = {}
+    result = []
+    for joint in joints:
+        name = joint.name.replace(search, replace) if search else joint.name
+        new = _copy_node(joint, name)
+        mapping[joint] = new
+        result.append(new.name)
+        parent = joint.parents[0] if joint.parents else None
+        scene.set_parent(new, mapping.get(parent, parent))
+        _connect_inverse_scale(new)
+        _set_world_matrix(new, mathlib.mirror(worlds[joint], axis, behavior)[0], joint_orient=True)
+
+    return result
+
+
+### IK ###
+
+def _solver(solver_type: str):
+    scene = _scene()
+    node = scene.find(solver_type)
+    if node is None:
+        node = scene.create(solver_type, solver_type)
+
+    return node
+
+
+def ikHandle(*args, **kwargs):
+    scene = _scene()
+    start = _node(_flag(kwargs, "startJoint", "sj"))
+    end = _node(_flag(kwargs, "endEffector", "ee"))
+    solver_type = _flag(kwargs, "solver", "sol", default="ikRPsolver")
+    name = _flag(kwargs, "name", "n") or "ikHandle1"
+    curve = _flag(kwargs, "curve", "c")
+
+    effector = scene.create("ikEffector", "effector1", parent=end.parents[0] if end.parents else None)
+    scene.connect(scene.plug("translate", end), scene.plug("translate", effector))
+    handle = scene.create("ikHandle", name)
+    world = np.eye(4)
+    world[3, :3] = _world(end)[3, :3]
+    _set_world_matrix(handle, world)
+
+    scene.connect(scene.plug("message", start), scene.plug("startJoint", handle))
+    scene.connect(scene.plug("handlePath[0]", effector), scene.plug("endEffector", handle))
+    scene.connect(scene.plug("message", _solver(solver_type)), scene.plug("ikSolver", handle))
+
+    result = [handle.name, effector.name]
+    if solver_type == "ikSplineSolver":
+        if curve:
+            curve_node = _node(curve)
+            shape = curve_node if curve_node.is_shape else [c for c in curve_node.children if c.is_shape][0]
+
+        else:
+            chain = [start]
+            while chain[-1] is not end and any(c.type.is_a("joint") for c in chain[-1].children):
+                chain.append([c for c in chain[-1].children if c.type.is_a("joint")][0])
+
+            transform = _node(curve_cmd(d=1, p=[_world(j)[3, :3].tolist() for j in chain], name="curve1"))
+            shape = transform.children[0]
+            result.append(transform.name)
+
+        scene.connect(scene.plug("worldSpace[0]", shape), scene.plug("inCurve", handle))
+
+    scene.selection = [handle]
+    return result
+
+
+def poleVectorConstraint(*args, **kwargs):
+    scene = _scene()
+    names = _flatten(args)
+    handle = _node(names[-1])
+    node = scene.create("poleVectorConstraint", _flag(kwargs, "name", "n") or f"{handle.name}_poleVectorConstraint1", parent=handle)
+    _connect_targets(node, [_node(n) for n in names[:-1]], _flag(kwargs, "weight", "w", default=1.0))
+    scene.connect(scene.plug("parentInverseMatrix[0]", handle), scene.plug("constraintParentInverseMatrix", node))
+
+    start = scene.source(scene.plug("startJoint", handle))
+    if start is not None:
+        scene.set_value(scene.plug("pivotSpace", node), tuple(_world(start.node)[3, :3].tolist()))
+
+    scene.connect(scene.plug("constraintTranslate", node), scene.plug("poleVector", handle))
+    return [node.name]
+
+
+### カーブ ###
+
+def curve_cmd(**kwargs) -> str:
+    scene = _scene()
+    points = [tuple(float(v) for v in p) for p in _flag(kwargs, "point", "p")]
+    degree = _flag(kwargs, "degree", "d", default=3)
+    name = _flag(kwargs, "name", "n") or "curve1"
+    transform = scene.create("transform", name)
+    shape_name = f"curveShape{name[5:]}" if re.fullmatch(r"curve\d+", transform.name) else f"{transform.name}Shape"
+    shape = scene.create("nurbsCurve", shape_name, parent=transform)
+    for i, p in enumerate(points):
+        scene.set_value(scene.plug(f"controlPoints[{i}]", shape), p, emit=False)
+
+    scene.set_value(scene.plug("degree", shape), degree, emit=False)
+    scene.set_value(scene.plug("spans", shape), max(len(points) - degree, 1), emit=False)
+    scene.selection = [transform]
+    return transform.name
+
+
+def _curve_shape(name: str):
+    node = _node(name)
+    if node.is_shape:
+        return node
+
+    shapes = [c for c in node.children if c.type.is_a("nurbsCurve")]
+    if not shapes:
+        raise RuntimeError(f"{name} is not a curve.")
+
+    return shapes[0]
+
+
+def _curve_points(shape) -> list[np.ndarray]:
+    scene = _scene()
+    plug = scene.plug("controlPoints", shape)
+    return [np.array(scene.value(plug.element(i))) for i in scene.element_indices(plug)]
+
+
+def rebuildCurve(*args, **kwargs):
+    """
+    コントロールポイントを折れ線の長さで等間隔に再配置する
+    """
+    scene = _scene()
+    name = _flatten(args)[0]
+    shape = _curve_shape(name)
+    degree = _flag(kwargs, "degree", "d", default=3)
+    spans = _flag(kwargs, "spans", "s", default=4)
+    count = spans + degree if spans else len(_curve_points(shape))
+
+    points = _curve_points(shape)
+    lengths = np.concatenate([[0.0], np.cumsum([np.linalg.norm(b - a) for a, b in zip(points[:-1], points[1:])])])
+    total = lengths[-1] or 1.0
+    new_points = []
+    for i in range(count):
+        d = total * i / max(count - 1, 1)
+        j = min(int(np.searchsorted(lengths, d, side="right")) - 1, len(points) - 2)
+        j = max(j, 0)
+        segment = lengths[j + 1] - lengths[j] or 1.0
+        new_points.append(points[j] + (points[j + 1] - points[j]) * (d - lengths[j]) / segment)
+
+    plug = scene.plug("controlPoints", shape)
+    for i in scene.element_indices(plug):
+        scene.remove_element(plug.element(i))
+
+    for i, p in enumerate(new_points):
+        scene.set_value(plug.element(i), tuple(p.tolist()), emit=False)
+
+    scene.set_value(scene.plug("degree", shape), degree, emit=False)
+    scene.set_value(scene.plug("spans", shape), spans, emit=False)
+    scene.emit("attr_changed", shape, plug)
+    return [_node(name).name]
+
+
+def _component(name: str):
+    match = _COMPONENT.match(name)
+    if not match:
+        raise ValueError(f"No object matches name: {name}")
+
+    return _curve_shape(match.group(1)), int(match.group(2))
+
+
+def pointPosition(name: str, **kwargs) -> list:
+    shape, index = _component(name)
+    point = np.array(_scene().read(shape, f"controlPoints[{index}]"))
+    if _flag(kwargs, "local", "l"):
+        return point.tolist()
+
+    return (np.append(point, 1.0) @ _world(shape))[:3].tolist()
+
+
+def cluster(*args, **kwargs):
+    scene = _scene()
+    components = _selection_or(args)
+    name = _flag(kwargs, "name", "n") or "cluster1"
+    positions = [np.array(pointPosition(c)) for c in components]
+    center = np.mean(positions, axis=0) if positions else np.zeros(3)
+
+    deformer = scene.create("cluster", name)
+    scene.set_value(scene.plug("relative", deformer), bool(_flag(kwargs, "relative", "rel")), emit=False)
+    handle = scene.create("transform", f"{deformer.name}Handle")
+    handle_shape = scene.create("clusterHandle", f"{handle.name}Shape", parent=handle)
+    scene.set_value(scene.plug("origin", handle_shape), tuple(center.tolist()), emit=False)
+    scene.set_value(scene.plug("rotatePivot", handle), tuple(center.tolist()), emit=False)
+    scene.set_value(scene.plug("scalePivot", handle), tuple(center.tolist()), emit=False)
+    scene.connect(scene.plug("worldMatrix[0]", handle), scene.plug("matrix", deformer))
+    scene.selection = [handle]
+    return [deformer.name, handle.name]
+
+
+### 拘束 ###
+
+_TARGET_ATTRS = (
+    ("translate", "targetTranslate"), ("rotate", "targetRotate"), ("scale", "targetScale"),
+    ("rotatePivot", "targetRotatePivot"), ("rotatePivotTranslate", "targetRotateTranslate"),
+    ("rotateOrder", "targetRotateOrder"), ("jointOrient", "targetJointOrient"),
+    ("segmentScaleCompensate", "targetScaleCompensate"), ("inverseScale", "targetInverseScale"),
+)
+
+
+def _connect_targets(node, targets: list, weight: float) -> None:
+    scene = _scene()
+    for i, target in enumerate(targets):
+        element = f"target[{i}]"
+        for src, dest in _TARGET_ATTRS:
+            if target.spec(src) is not None and node.spec(dest) is not None:
+                scene.connect(scene.plug(src, target), scene.plug(f"{element}.{dest}", node))
+
+        scene.connect(scene.plug("parentMatrix[0]", target), scene.plug(f"{element}.targetParentMatrix", node))
+        weight_attr = f"{target.name}W{i}"
+        node.add_attr(AttrSpec(weight_attr, f"w{i}", "double", float(weight), dynamic=True, keyable=True, min=0.0))
+        scene.connect(scene.plug(weight_attr, node), scene.plug(f"{element}.targetWeight", node))
+
+
+def _connect_outputs(node, dest, pairs: list, skip) -> None:
+    scene = _scene()
+    skip = [skip] if isinstance(skip, str) else list(skip or [])
+    for src, attr in pairs:
+        for axis in "XYZ":
+            if axis.lower() in skip:
+                continue
+
+            plug = scene.plug(f"{attr}{axis}", dest)
+            if scene.source(plug) is None and not scene.is_locked(plug):
+                scene.connect(scene.plug(f"{src}{axis}", node), plug)
+
+
+def _constraint(kind: str, args: tuple, kwargs: dict) -> list:
+    scene = _scene()
+    names = _flatten(args)
+    dest = _node(names[-1])
+    targets = [_node(n) for n in names[:-1]]
+    node = scene.create(kind, _flag(kwargs, "name", "n") or f"{dest.name}_{kind}1", parent=dest)
+    _connect_targets(node, targets, _flag(kwargs, "weight", "w", default=1.0))
+
+    scene.connect(scene.plug("parentInverseMatrix[0]", dest), scene.plug("constraintParentInverseMatrix", node))
+    for src, attr in (("rotatePivot", "constraintRotatePivot"), ("rotatePivotTranslate", "constraintRotateTranslate"),
+                      ("rotateOrder", "constraintRotateOrder"), ("jointOrient", "constraintJointOrient")):
+        if dest.spec(src) is not None and node.spec(attr) is not None:
+            scene.connect(scene.plug(src, dest), scene.plug(attr, node))
+
+    if kind == "aimConstraint":
+        scene.connect(scene.plug("translate", dest), scene.plug("constraintTranslate", node))
+        for flags, attr in ((("aimVector", "aim"), "aimVector"), (("upVector", "u"), "upVector"), (("worldUpVector", "wu"), "worldUpVector")):
+            value = _flag(kwargs, *flags)
+            if value is not None:
+                scene.set_value(scene.plug(attr, node), tuple(float(v) for v in value), emit=False)
+
+        up_type = _flag(kwargs, "worldUpType", "wut")
+        if up_type is not None:
+            scene.set_value(scene.plug("worldUpType", node), ["scene", "object", "objectrotation", "vector", "none"].index(up_type.lower()), emit=False)
+
+        up_object = _flag(kwargs, "worldUpObject", "wuo")
+        if up_object:
+            scene.connect(scene.plug("worldMatrix[0]", _node(up_object)), scene.plug("worldUpMatrix", node))
+
+    if _flag(kwargs, "maintainOffset", "mo"):
+        _maintain_offset(kind, node, dest, targets)
+
+    skip = _flag(kwargs, "skip", "sk")
+    if kind == "parentConstraint":
+        _connect_outputs(node, dest, [("constraintTranslate", "translate")], _flag(kwargs, "skipTranslate", "st"))
+        _connect_outputs(node, dest, [("constraintRotate", "rotate")], _flag(kwargs, "skipRotate", "sr"))
+
+    elif kind == "pointConstraint":
+        _connect_outputs(node, dest, [("constraintTranslate", "translate")], skip)
+
+    elif kind == "scaleConstraint":
+        _connect_outputs(node, dest, [("constraintScale", "scale")], skip)
+
+    else:
+        _connect_outputs(node, dest, [("constraintRotate", "rotate")], skip)
+
+    return [node.name]
+
+
+def _local_rotation(node) -> np.ndarray:
+    rotation = tf.euler_to_rotation(_read(node, "rotateAxis")) @ tf.euler_to_rotation(_read(node, "rotate"), _read(node, "rotateOrder"))
+    if node.type.is_a("joint"):
+        rotation = rotation @ tf.euler_to_rotation(_read(node, "jointOrient"))
+
+    return rotation
+
+
+def _maintain_offset(kind: str, node, dest, targets: list) -> None:
+    scene = _scene()
+    if kind == "parentConstraint":
+        world = _world(dest)
+        world[:3, :3] = _normalized(world[:3, :3])[1]
+        for i in range(len(targets)):
+            target = node_types._target_world(scene, node, i)
+            target[:3, :3] = _normalized(target[:3, :3])[1]
+            t, r, _, _ = tf.decompose(world @ np.linalg.inv(target))
+            scene.set_value(scene.plug(f"target[{i}].targetOffsetTranslate", node), tuple(t), emit=False)
+            scene.set_value(scene.plug(f"target[{i}].targetOffsetRotate", node), tuple(r), emit=False)
+
+    elif kind == "pointConstraint":
+        raw = node_types.point_constraint_local(scene, node, offset=False)
+        scene.set_value(scene.plug("offset", node), tuple((np.array(_read(dest, "translate")) - raw).tolist()), emit=False)
+
+    elif kind == "scaleConstraint":
+        raw = node_types.scale_constraint_local(scene, node, offset=False)
+        current = np.array(_read(dest, "scale"))
+        scene.set_value(scene.plug("offset", node), tuple((current / np.where(np.abs(raw) < tf.EPSILON, 1.0, raw)).tolist()), emit=False)
+
+    else:
+        compute = node_types.orient_constraint_local if kind == "orientConstraint" else node_types.aim_constraint_local
+        raw = compute(scene, node, offset=False)
+        offset = _local_rotation(dest) @ np.linalg.inv(raw)
+        scene.set_value(scene.plug("offset", node), tuple(tf.rotation_to_euler(offset)), emit=False)
+
+
+def parentConstraint(*args, **kwargs):
+    return _constraint("parentConstraint", args, kwargs)
+
+
+def pointConstraint(*args, **kwargs):
+    return _constraint("pointConstraint", args, kwargs)
+
+
+def orientConstraint(*args, **kwargs):
+    return _constraint("orientConstraint", args, kwargs)
+
+
+def scaleConstraint(*args, **kwargs):
+    return _constraint("scaleConstraint", args, kwargs)
+
+
+def aimConstraint(*args, **kwargs):
+    return _constraint("aimConstraint", args, kwargs)
+
+
+def joint(*args, **kwargs):
+    scene = _scene()
+    names = _flatten(args)
+    parent_node = _node(names[0]) if names else (scene.selection[0] if scene.selection else None)
+    node = scene.create("joint", _flag(kwargs, "name", "n") or "joint1", parent=parent_node)
+    position = _flag(kwargs, "position", "p")
+    if position is not None:
+        world = np.eye(4)
+        world[3, :3] = position
+        _set_world_matrix(node, world)
+
+    _connect_inverse_scale(node)
+    scene.selection = [node]
+    return node.name
+
+
+### シーン、アンドゥ、UI ###
+
+def undoInfo(*args, **kwargs):
+    if _flag(kwargs, "query", "q"):
+        if _flag(kwargs, "state", "st"):
+            return _state["undo"]
+
+        if _flag(kwargs, "undoQueueEmpty", "uqe"):
+            return True
+
+        return None
+
+    state = _flag(kwargs, "state", "st")
+    if state is None:
+        state = _flag(kwargs, "stateWithoutFlush", "swf")
+
+    if state is not None:
+        _state["undo"] = bool(state)
+
+
+def undo(*args, **kwargs):
+    pass
+
+
+def redo(*args, **kwargs):
+    pass
+
+
+def refresh(*args, **kwargs):
+    if _flag(kwargs, "query", "q"):
+        return _state["refresh_suspended"]
+
+    suspend = _flag(kwargs, "suspend", "su")
+    if suspend is not None:
+        _state["refresh_suspended"] = bool(suspend)
+
+
+def progressWindow(*args, **kwargs):
+    if _flag(kwargs, "query", "q"):
+        return False if _flag(kwargs, "isCancelled", "ic") is not None else 0
+
+    return True
+
+
+def evaluationManager(*args, **kwargs):
+    if _flag(kwargs, "query", "q"):
+        return ["off"]
+
+    return None
+
+
+def error(message: str="", **kwargs):
+    raise RuntimeError(message)
+
+
+def warning(message: str="", **kwargs):
+    print(f"# Warning: {message}")
+
+
+def about(**kwargs):
+    if _flag(kwargs, "version", "v"):
+        return "2025"
+
+    if _flag(kwargs, "apiVersion", "api"):
+        return 20250000
+
+    if _flag(kwargs, "batch", "b"):
+        return True
+
+    return None
+
+
+def file(*args, **kwargs):
+    scene = _scene()
+    if _flag(kwargs, "query", "q"):
+        if _flag(kwargs, "sceneName", "sn"):
+            return scene.file_name
+
+        return None
+
+    if _flag(kwargs, "new", "f") is True or kwargs.get("new"):
+        scene.clear()
+        return None
+
+    rename = _flag(kwargs, "rename", "rn")
+    if rename:
+        scene.file_name = rename
+        return rename
+
+    if _flag(kwargs, "save", "s"):
+        if not scene.file_name:
+            raise RuntimeError("file: No file name has been specified.")
+
+        scene.save(scene.file_name)
+        return scene.file_name
+
+    return None
+
+
+globals()["curve"] = curve_cmd
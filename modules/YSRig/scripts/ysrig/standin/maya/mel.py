@@ -0,0 +1,128 @@
+"""
+代替シーンで動くmaya.melのサブセット
+attr_writerが作成するaddAttr, setAttr, connectAttr, disconnectAttrの文だけを解釈する
+"""
+import re
+from maya import cmds
+
+_TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|(;)|([^\s;"]+)')
+_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "\\": "\\", "\"": "\""}
+
+# {コマンド: {フラグ: (ロングネーム, 引数の数)}}
+_FLAGS = {
+    "addAttr": {
+        "ln": ("longName", 1), "longName": ("longName", 1), "sn": ("shortName", 1), "shortName": ("shortName", 1),
+        "at": ("attributeType", 1), "attributeType": ("attributeType", 1), "dt": ("dataType", 1),
+        "dataType": ("dataType", 1), "en": ("enumName", 1), "enumName": ("enumName", 1), "m": ("multi", 0),
+        "multi": ("multi", 0), "p": ("parent", 1), "parent": ("parent", 1), "dv": ("defaultValue", 1),
+        "defaultValue": ("defaultValue", 1), "k": ("keyable", 1), "keyable": ("keyable", 1),
+        "min": ("minValue", 1), "minValue": ("minValue", 1), "max": ("maxValue", 1), "maxValue": ("maxValue", 1),
+    },
+    "setAttr": {
+        "l": ("lock", 1), "lock": ("lock", 1), "type": ("type", 1), "typ": ("type", 1),
+        "k": ("keyable", 1), "keyable": ("keyable", 1), "cb": ("channelBox", 1), "channelBox": ("channelBox", 1),
+    },
+    "connectAttr": {"f": ("force", 0), "force": ("force", 0), "na": ("nextAvailable", 0), "nextAvailable": ("nextAvailable", 0)},
+    "disconnectAttr": {},
+}
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\(.)", lambda m: _ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def _statements(script: str) -> list[list]:
+    """
+    スクリプトを文ごとのトークンのリストに分ける
+    文字列リテラルは (値,) のタプル、それ以外は文字列とする
+    """
+    statements = []
+    tokens = []
+    for match in _TOKEN.finditer(script):
+        quoted, end, word = match.groups()
+        if end:
+            if tokens:
+                statements.append(tokens)
+
+            tokens = []
+
+        elif quoted is not None:
+            tokens.append((_unescape(quoted),))
+
+        else:
+            tokens.append(word)
+
+    if tokens:
+        statements.append(tokens)
+
+    return statements
+
+
+def _value(token):
+    """
+    引数のトークンをPythonの値にする
+    """
+    if isinstance(token, tuple):
+        return token[0]
+
+    if token in ("true", "on", "yes"):
+        return True
+
+    if token in ("false", "off", "no"):
+        return False
+
+    try:
+        return int(token)
+
+    except ValueError:
+        pass
+
+    try:
+        return float(token)
+
+    except ValueError:
+        return token
+
+
+def _run(tokens: list):
+    command = tokens[0]
+    flags = _FLAGS.get(command)
+    if flags is None:
+        raise RuntimeError(f"Cannot find procedure \"{command}\".")
+
+    kwargs = {}
+    args = []
+    i = 1
+    while i < len(tokens):
+        token = tokens[i]
+        if isinstance(token, str) and token.startswith("-") and not re.fullmatch(r"-[\d.]+(e[-+]?\d+)?", token):
+            name = token[1:]
+            if name not in flags:
+                raise RuntimeError(f"{command}: Invalid flag '{token}'")
+
+            long, count = flags[name]
+            if count:
+                kwargs[long] = _value(tokens[i + 1])
+                i += 2
+
+            else:
+                kwargs[long] = True
+                i += 1
+
+            continue
+
+        args.append(_value(token))
+        i += 1
+
+    return getattr(cmds, command)(*args, **kwargs)
+
+
+def eval(script: str):
+    """
+    MELスクリプトを実行する 最後の文の戻り値を返す
+    """
+    result = None
+    for tokens in _statements(script):
+        result = _run(tokens)
+
+    return result
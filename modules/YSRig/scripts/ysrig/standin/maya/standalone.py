@@ -0,0 +1,12 @@
+"""
+代替シーンで動くmaya.standalone
+代替シーンは読み込み時に作成されるため、初期化と終了では何もしない
+"""
+
+
+def initialize(name: str="python") -> None:
+    pass
+
+
+def uninitialize() -> None:
+    pass
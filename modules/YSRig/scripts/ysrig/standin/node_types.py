@@ -0,0 +1,890 @@
+"""
+代替シーンのノードタイプ
+YSRigが作成、参照するノードタイプのアトリビュートと、出力アトリビュートの計算を定義する
+
+計算は scene.read でアトリビュートを読み、出力アトリビュートの値を返す関数
+compound型は子の値のタプル、matrix型は16要素のタプルを返す
+"""
+import math
+import numpy as np
+from ysrig.standin import transform as tf
+from ysrig.standin.attributes import AttrSpec, num, flag, integer, enum, string, matrix, message, vector, compound
+
+TYPES = {}
+
+
+class NodeType:
+    """
+    ノードタイプ1つ分の定義 親のタイプのアトリビュートと計算を引き継ぐ
+    """
+    def __init__(self, name, parent=None, attrs=(), computes=None, dag=None, shape=False, transform=None):
+        self.name = name
+        self.parent = TYPES[parent] if parent else None
+        self.lineage = (self.parent.lineage if self.parent else ()) + (name,)
+        self.dag = self.parent.dag if dag is None and self.parent else bool(dag)
+        self.shape = shape or bool(self.parent and self.parent.shape)
+        self.transform = self.parent.transform if transform is None and self.parent else bool(transform)
+        self.attrs = list(self.parent.attrs) if self.parent else []   # トップレベルのAttrSpec
+        self.specs = dict(self.parent.specs) if self.parent else {}   # {ロングネーム, ショートネーム: AttrSpec}
+        self.computes = dict(self.parent.computes) if self.parent else {}
+        for spec in attrs:
+            self.add(spec)
+
+        self.computes.update(computes or {})
+        TYPES[name] = self
+
+    def add(self, spec: AttrSpec) -> None:
+        self.attrs.append(spec)
+        for s in spec.walk():
+            self.specs[s.long] = s
+            self.specs[s.short] = s
+
+    def is_a(self, type_name: str) -> bool:
+        return type_name in self.lineage
+
+
+def get(name: str) -> NodeType:
+    """
+    ノードタイプを返す 未定義のタイプは、アトリビュートを持たないdependNodeとして登録する
+    """
+    node_type = TYPES.get(name)
+    if node_type is None:
+        node_type = NodeType(name, "dependNode")
+
+    return node_type
+
+
+### 計算 ###
+
+def _matrix(scene, node, path) -> np.ndarray:
+    return tf.as_matrix(scene.read(node, path))
+
+
+def _local_matrix(scene, node) -> np.ndarray:
+    """
+    transform, jointのローカル行列
+    transform: [-sp] * S * Sh * [sp] * [spt] * [-rp] * RA * R * [rp] * [rpt] * T
+    joint: S * RA * R * JO * IS^-1 * T
+    """
+    read = scene.read
+    order = read(node, "rotateOrder")
+    s = read(node, "scale")
+    sh = read(node, "shear")
+    r = read(node, "rotate")
+    ra = read(node, "rotateAxis")
+    t = read(node, "translate")
+
+    if node.type.is_a("joint"):
+        jo = read(node, "jointOrient")
+        m = tf.scale_matrix(s) @ tf.rotation_matrix(ra) @ tf.rotation_matrix(r, order) @ tf.rotation_matrix(jo)
+        if read(node, "segmentScaleCompensate"):
+            inverse_scale = read(node, "inverseScale")
+            m = m @ tf.scale_matrix([1.0 / v if abs(v) > tf.EPSILON else 1.0 for v in inverse_scale])
+
+        return m @ tf.translation(t)
+
+    sp = np.array(read(node, "scalePivot"))
+    spt = read(node, "scalePivotTranslate")
+    rp = np.array(read(node, "rotatePivot"))
+    rpt = read(node, "rotatePivotTranslate")
+
+    m = tf.translation(-sp) @ tf.scale_matrix(s)
+    m[:3, :3] = m[:3, :3] @ tf.shear_matrix(sh)
+    return (m @ tf.translation(sp) @ tf.translation(spt) @ tf.translation(-rp) @ tf.rotation_matrix(ra)
+            @ tf.rotation_matrix(r, order) @ tf.translation(rp) @ tf.translation(rpt) @ tf.translation(t))
+
+
+def _parent_matrix(scene, node, index) -> np.ndarray:
+    """
+    index番目のインスタンスの親のワールド行列
+    """
+    if not node.type.is_a("dagNode") or node.type.shape:
+        return np.eye(4)
+
+    if node.type.transform and not scene.read(node, "inheritsTransform"):
+        return np.eye(4)
+
+    parents = node.parents
+    if not parents:
+        return np.eye(4)
+
+    # 親のワールド行列は計算結果のキャッシュを使う
+    parent = parents[min(index or 0, len(parents) - 1)]
+    return _matrix(scene, parent, "worldMatrix[0]")
+
+
+def _world_matrix(scene, node, index) -> np.ndarray:
+    if node.type.shape:
+        if not node.parents:
+            return np.eye(4)
+
+        parent = node.parents[min(index or 0, len(node.parents) - 1)]
+        return _world_matrix(scene, parent, 0)
+
+    return _matrix(scene, node, "matrix") @ _matrix(scene, node, "offsetParentMatrix") @ _parent_matrix(scene, node, index)
+
+
+def _transform_computes():
+    return {
+        "matrix": lambda scene, node, index: tf.to_tuple(_local_matrix(scene, node)),
+        "xformMatrix": lambda scene, node, index: tf.to_tuple(_local_matrix(scene, node)),
+        "inverseMatrix": lambda scene, node, index: tf.to_tuple(np.linalg.inv(_local_matrix(scene, node))),
+    }
+
+
+def _dag_computes():
+    return {
+        "worldMatrix": lambda scene, node, index: tf.to_tuple(_world_matrix(scene, node, index)),
+        "worldInverseMatrix": lambda scene, node, index: tf.to_tuple(np.linalg.inv(_world_matrix(scene, node, index))),
+        "parentMatrix": lambda scene, node, index: tf.to_tuple(_parent_matrix(scene, node, index)),
+        "parentInverseMatrix": lambda scene, node, index: tf.to_tuple(np.linalg.inv(_parent_matrix(scene, node, index))),
+    }
+
+
+def _mult_matrix(scene, node, index):
+    m = np.eye(4)
+    for i in scene.elements(node, "matrixIn"):
+        m = m @ _matrix(scene, node, f"matrixIn[{i}]")
+
+    return tf.to_tuple(m)
+
+
+def _wt_add_matrix(scene, node, index):
+    m = np.zeros((4, 4))
+    for i in scene.elements(node, "wtMatrix"):
+        m += _matrix(scene, node, f"wtMatrix[{i}].matrixIn") * scene.read(node, f"wtMatrix[{i}].weightIn")
+
+    return tf.to_tuple(m)
+
+
+def _decompose(scene, node):
+    return tf.decompose(scene.read(node, "inputMatrix"), scene.read(node, "inputRotateOrder"))
+
+
+def _decompose_quat(scene, node, index):
+    m = _matrix(scene, node, "inputMatrix")
+    s = np.linalg.norm(m[:3, :3], axis=1)
+    rotation = m[:3, :3] / np.where(s < tf.EPSILON, 1.0, s)[:, None]
+    return tuple(tf.quaternion_from_rotation(rotation))
+
+
+def _compose_matrix(scene, node, index):
+    read = scene.read
+    if read(node, "useEulerRotation"):
+        return tf.to_tuple(tf.compose(read(node, "inputTranslate"), read(node, "inputRotate"), read(node, "inputScale"),
+                                      read(node, "inputShear"), read(node, "inputRotateOrder")))
+
+    m = tf.compose(read(node, "inputTranslate"), (0, 0, 0), read(node, "inputScale"), read(node, "inputShear"))
+    m[:3, :3] = m[:3, :3] @ tf.rotation_from_quaternion(read(node, "inputQuat"))
+    return tf.to_tuple(m)
+
+
+def _blend_matrix(scene, node, index):
+    m = _matrix(scene, node, "inputMatrix")
+    envelope = scene.read(node, "envelope")
+    for i in scene.elements(node, "target"):
+        target = _matrix(scene, node, f"target[{i}].targetMatrix")
+        m = tf.blend(m, target, scene.read(node, f"target[{i}].weight") * envelope)
+
+    return tf.to_tuple(m)
+
+
+def _pick_matrix(scene, node, index):
+    read = scene.read
+    t, r, s, sh = tf.decompose(read(node, "inputMatrix"))
+    return tf.to_tuple(tf.compose(t if read(node, "useTranslate") else (0, 0, 0),
+                                  r if read(node, "useRotate") else (0, 0, 0),
+                                  s if read(node, "useScale") else (1, 1, 1),
+                                  sh if read(node, "useShear") else (0, 0, 0)))
+
+
+def _pair_blend_translate(scene, node, index):
+    w = scene.read(node, "weight")
+    t1 = scene.read(node, "inTranslate1")
+    t2 = scene.read(node, "inTranslate2")
+    return tuple(a * (1 - w) + b * w for a, b in zip(t1, t2))
+
+
+def _pair_blend_rotate(scene, node, index):
+    w = scene.read(node, "weight")
+    r1 = scene.read(node, "inRotate1")
+    r2 = scene.read(node, "inRotate2")
+    if scene.read(node, "rotInterpolation") == 0:
+        return tuple(a * (1 - w) + b * w for a, b in zip(r1, r2))
+
+    m = tf.blend(tf.rotation_matrix(r1), tf.rotation_matrix(r2), w)
+    return tuple(tf.rotation_to_euler(m[:3, :3]))
+
+
+def _plus_minus_average(dimension):
+    def compute(scene, node, index):
+        op = scene.read(node, "operation")
+        attr = {1: "input1D", 2: "input2D", 3: "input3D"}[dimension]
+        values = [scene.read(node, f"{attr}[{i}]") for i in scene.elements(node, attr)]
+        if dimension == 1:
+            values = [(v,) for v in values]
+
+        if not values:
+            result = [0.0] * dimension
+
+        elif op == 0:
+            result = list(values[0])
+
+        elif op == 1:
+            result = [sum(v[j] for v in values) for j in range(dimension)]
+
+        elif op == 2:
+            result = [values[0][j] - sum(v[j] for v in values[1:]) for j in range(dimension)]
+
+        else:
+            result = [sum(v[j] for v in values) / len(values) for j in range(dimension)]
+
+        return result[0] if dimension == 1 else tuple(result)
+
+    return compute
+
+
+def _multiply_divide(scene, node, index):
+    op = scene.read(node, "operation")
+    a = scene.read(node, "input1")
+    b = scene.read(node, "input2")
+    if op == 0:
+        return tuple(a)
+
+    if op == 1:
+        return tuple(x * y for x, y in zip(a, b))
+
+    if op == 2:
+        return tuple(x / y if y else 0.0 for x, y in zip(a, b))
+
+    return tuple(math.pow(x, y) if x >= 0 or float(y).is_integer() else 0.0 for x, y in zip(a, b))
+
+
+def _condition(scene, node, index):
+    a = scene.read(node, "firstTerm")
+    b = scene.read(node, "secondTerm")
+    result = [a == b, a != b, a > b, a >= b, a < b, a <= b][scene.read(node, "operation")]
+    return tuple(scene.read(node, "colorIfTrue" if result else "colorIfFalse"))
+
+
+def _float_math(scene, node, index):
+    a = scene.read(node, "floatA")
+    b = scene.read(node, "floatB")
+    op = scene.read(node, "operation")
+    ops = [
+        lambda: a + b, lambda: a - b, lambda: a * b, lambda: a / b if b else 0.0,
+        lambda: min(a, b), lambda: max(a, b), lambda: math.pow(a, b) if a >= 0 or float(b).is_integer() else 0.0,
+    ]
+    return ops[op]() if op < len(ops) else 0.0
+
+
+def _distance_between(scene, node, index):
+    p1 = np.array(list(scene.read(node, "point1")) + [1.0]) @ _matrix(scene, node, "inMatrix1")
+    p2 = np.array(list(scene.read(node, "point2")) + [1.0]) @ _matrix(scene, node, "inMatrix2")
+    return float(np.linalg.norm(p1[:3] - p2[:3]))
+
+
+def _reverse(scene, node, index):
+    return tuple(1.0 - v for v in scene.read(node, "input"))
+
+
+def _locator_world_position(scene, node, index):
+    p = np.array(list(scene.read(node, "localPosition")) + [1.0]) @ _world_matrix(scene, node, index)
+    return tuple(p[:3].tolist())
+
+
+### 定義 ###
+
+def _xyz(long, short, **kwargs):
+    return vector(long, short, **kwargs)
+
+
+def _angle(long, short, **kwargs):
+    return vector(long, short, child_type="doubleAngle", **kwargs)
+
+
+def _color(long, short, output=False, type="float3"):
+    return vector(long, short, suffixes="RGB", child_type="float", type=type, output=output)
+
+
+def _limits(prefix, short, channel):
+    specs = []
+    for bound in ("min", "max"):
+        for axis in "XYZ":
+            specs.append(num(f"{bound}{prefix}{axis}Limit", f"{bound[:2]}{short}{axis.lower()}l", dv=-1.0 if bound == "min" else 1.0))
+            specs.append(flag(f"{bound}{prefix}{axis}LimitEnable", f"{bound[:2]}{short}{axis.lower()}le"))
+
+    return specs
+
+
+NodeType("dependNode", attrs=[
+    message(),
+    flag("caching", "cch"),
+    flag("frozen", "fzn"),
+    integer("isHistoricallyInteresting", "ihi", dv=2, type="byte"),
+    enum("nodeState", "nds", names="Normal:HasNoEffect:Blocking:Waiting-Normal:Waiting-HasNoEffect:Waiting-Blocking"),
+    string("binMembership", "bnm"),
+])
+
+NodeType("dagNode", "dependNode", dag=True, attrs=[
+    flag("visibility", "v", dv=True, k=True),
+    flag("template", "tmp"),
+    flag("hiddenInOutliner", "hio"),
+    flag("useOutlinerColor", "uoc"),
+    _color("outlinerColor", "oclr"),
+    matrix("worldMatrix", "wm", multi=True, output=True),
+    matrix("worldInverseMatrix", "wim", multi=True, output=True),
+    matrix("parentMatrix", "pm", multi=True, output=True),
+    matrix("parentInverseMatrix", "pim", multi=True, output=True),
+    matrix("offsetParentMatrix", "opm"),
+    flag("overrideEnabled", "ove"),
+    enum("overrideDisplayType", "ovdt", names="Normal:Template:Reference"),
+    flag("overrideRGBColors", "ovrgbf"),
+    integer("overrideColor", "ovc", type="byte"),
+    _color("overrideColorRGB", "ovrgb"),
+    flag("overrideVisibility", "ovv", dv=True),
+    flag("overrideShading", "ovs", dv=True),
+    flag("overrideTexturing", "ovt", dv=True),
+    flag("overridePlayback", "ovp", dv=True),
+    compound("instObjGroups", "iog", multi=True, children=[compound("objectGroups", "og", multi=True)]),
+], computes=_dag_computes())
+
+NodeType("transform", "dagNode", transform=True, attrs=[
+    _xyz("translate", "t", k=True),
+    _angle("rotate", "r", k=True),
+    _xyz("scale", "s", child_type="double", dv=(1.0, 1.0, 1.0), k=True),
+    vector("shear", "sh", suffixes=("XY", "XZ", "YZ"), short_suffixes=("xy", "xz", "yz"), child_type="double"),
+    enum("rotateOrder", "ro", names="xyz:yzx:zxy:xzy:yxz:zyx"),
+    _angle("rotateAxis", "ra"),
+    _xyz("rotatePivot", "rp"),
+    _xyz("rotatePivotTranslate", "rpt"),
+    _xyz("scalePivot", "sp"),
+    _xyz("scalePivotTranslate", "spt"),
+    flag("inheritsTransform", "it", dv=True),
+    flag("displayHandle", "dh"),
+    flag("displayLocalAxis", "dla"),
+    flag("displayRotatePivot", "drp"),
+    flag("displayScalePivot", "dsp"),
+    _xyz("selectHandle", "hdl"),
+    matrix("matrix", "m", output=True),
+    matrix("inverseMatrix", "im", output=True),
+    matrix("xformMatrix", "xm", output=True),
+    *_limits("Trans", "t", "translate"),
+    *_limits("Rot", "r", "rotate"),
+    *_limits("Scale", "s", "scale"),
+], computes=_transform_computes())
+
+NodeType("joint", "transform", attrs=[
+    _angle("jointOrient", "jo"),
+    flag("segmentScaleCompensate", "ssc", dv=True),
+    vector("inverseScale", "is", child_type="double", dv=(1.0, 1.0, 1.0)),
+    num("radius", "radi", dv=1.0),
+    enum("drawStyle", "ds", names="Bone:Multi-child as Box:None:Joint"),
+    enum("side", "sd", names="Center:Left:Right:None"),
+    enum("type", "typ", names="None:Root:Hip:Knee:Foot:Toe:Spine:Neck:Head:Collar:Shoulder:Elbow:Hand:Finger:Thumb:PropA:PropB:PropC:Other"),
+    string("otherType", "otp"),
+    flag("drawLabel", "dl"),
+    _angle("preferredAngle", "pa"),
+    _angle("stiffness", "st"),
+    flag("jointTypeX", "jtx", dv=True),
+    flag("jointTypeY", "jty", dv=True),
+    flag("jointTypeZ", "jtz", dv=True),
+    matrix("bindPose", "bps"),
+])
+
+NodeType("ikHandle", "transform", attrs=[
+    message("startJoint", "hsj"),
+    message("endEffector", "hee"),
+    message("ikSolver", "hsv"),
+    message("inCurve", "ic"),
+    _xyz("poleVector", "pv", dv=(0.0, 1.0, 0.0)),
+    num("twist", "twi", type="doubleAngle"),
+    num("roll", "rol", type="doubleAngle"),
+    num("ikBlend", "ikb", dv=1.0),
+    flag("snapEnable", "snen", dv=True),
+    flag("stickiness", "sti"),
+    integer("dTwistControlEnable", "dtce", type="bool"),
+    enum("dWorldUpType", "dwut", names="Scene Up:Object Up:Object Up (Start/End):Object Rotation Up:Object Rotation Up (Start/End):Vector:Vector (Start/End):Relative"),
+    enum("dForwardAxis", "dfa", names="Positive X:Negative X:Positive Y:Negative Y:Positive Z:Negative Z"),
+    enum("dWorldUpAxis", "dwua", names="Positive Y:Negative Y:Closest Y:Positive Z:Negative Z:Closest Z:Positive X:Negative X:Closest X"),
+    matrix("dWorldUpMatrix", "dwum"),
+    matrix("dWorldUpMatrixEnd", "dwue"),
+    _xyz("dWorldUpVector", "dwu", dv=(0.0, 1.0, 0.0)),
+    _xyz("dWorldUpVectorEnd", "dwve", dv=(0.0, 1.0, 0.0)),
+])
+
+NodeType("ikEffector", "transform", attrs=[
+    message("handlePath", "hp", multi=True),
+])
+
+NodeType("shape", "dagNode", shape=True, attrs=[
+    flag("intermediateObject", "io"),
+])
+
+NodeType("locator", "shape", attrs=[
+    _xyz("localPosition", "lp"),
+    _xyz("localScale", "los", child_type="double", dv=(1.0, 1.0, 1.0)),
+    vector("worldPosition", "wp", multi=True, output=True),
+], computes={"worldPosition": _locator_world_position})
+
+NodeType("nurbsCurve", "shape", attrs=[
+    vector("controlPoints", "cp", suffixes=("xValue", "yValue", "zValue"), short_suffixes=("xv", "yv", "zv"), child_type="double", multi=True),
+    integer("degree", "d", dv=1),
+    integer("spans", "sps", dv=1),
+    enum("form", "f", names="Open:Closed:Periodic"),
+    num("lineWidth", "lw", dv=-1.0),
+    flag("dispCV", "dcv"),
+    AttrSpec("worldSpace", "ws", "nurbsCurve", None, multi=True, output=True),
+    AttrSpec("local", "l", "nurbsCurve", None, output=True),
+    AttrSpec("create", "cr", "nurbsCurve", None),
+    flag("alwaysDrawOnTop", "adot"),
+])
+
+NodeType("clusterHandle", "shape", attrs=[
+    _xyz("origin", "or"),
+])
+
+NodeType("network", "dependNode", attrs=[
+    message("affects", "affects", multi=True),
+])
+
+NodeType("time", "dependNode", attrs=[num("outTime", "o", type="time", output=True)])
+
+NodeType("multMatrix", "dependNode", attrs=[
+    matrix("matrixIn", "i", multi=True),
+    matrix("matrixSum", "o", output=True),
+], computes={"matrixSum": _mult_matrix})
+
+NodeType("wtAddMatrix", "dependNode", attrs=[
+    compound("wtMatrix", "wtm", multi=True, children=[matrix("matrixIn", "m"), num("weightIn", "w")]),
+    matrix("matrixSum", "o", output=True),
+], computes={"matrixSum": _wt_add_matrix})
+
+NodeType("decomposeMatrix", "dependNode", attrs=[
+    matrix("inputMatrix", "imat"),
+    enum("inputRotateOrder", "ro", names="xyz:yzx:zxy:xzy:yxz:zyx"),
+    _xyz("outputTranslate", "ot", output=True),
+    _angle("outputRotate", "or", output=True),
+    vector("outputScale", "os", child_type="double", output=True),
+    vector("outputShear", "osh", child_type="double", output=True),
+    vector("outputQuat", "oq", suffixes="XYZW", child_type="double", dv=(0.0, 0.0, 0.0, 1.0), type="double4", output=True),
+], computes={
+    "outputTranslate": lambda scene, node, index: tuple(_decompose(scene, node)[0]),
+    "outputRotate": lambda scene, node, index: tuple(_decompose(scene, node)[1]),
+    "outputScale": lambda scene, node, index: tuple(_decompose(scene, node)[2]),
+    "outputShear": lambda scene, node, index: tuple(_decompose(scene, node)[3]),
+    "outputQuat": _decompose_quat,
+})
+
+NodeType("composeMatrix", "dependNode", attrs=[
+    _xyz("inputTranslate", "it"),
+    _angle("inputRotate", "ir"),
+    vector("inputScale", "is", child_type="double", dv=(1.0, 1.0, 1.0)),
+    vector("inputShear", "ish", child_type="double"),
+    vector("inputQuat", "iq", suffixes="XYZW", child_type="double", dv=(0.0, 0.0, 0.0, 1.0), type="double4"),
+    enum("inputRotateOrder", "iro", names="xyz:yzx:zxy:xzy:yxz:zyx"),
+    flag("useEulerRotation", "uer", dv=True),
+    matrix("outputMatrix", "omat", output=True),
+], computes={"outputMatrix": _compose_matrix})
+
+NodeType("inverseMatrix", "dependNode", attrs=[
+    matrix("inputMatrix", "imat"),
+    matrix("outputMatrix", "omat", output=True),
+], computes={"outputMatrix": lambda scene, node, index: tf.to_tuple(np.linalg.inv(_matrix(scene, node, "inputMatrix")))})
+
+NodeType("blendMatrix", "dependNode", attrs=[
+    matrix("inputMatrix", "imat"),
+    num("envelope", "env", dv=1.0),
+    compound("target", "tgt", multi=True, children=[
+        matrix("targetMatrix", "tmat"), num("weight", "wgt", dv=1.0), flag("useMatrix", "umat"),
+        num("scaleWeight", "sw", dv=1.0), num("translateWeight", "tw", dv=1.0),
+        num("rotateWeight", "rw", dv=1.0), num("shearWeight", "shw", dv=1.0),
+    ]),
+    matrix("outputMatrix", "omat", output=True),
+], computes={"outputMatrix": _blend_matrix})
+
+NodeType("pickMatrix", "dependNode", attrs=[
+    matrix("inputMatrix", "imat"),
+    flag("useTranslate", "ut", dv=True),
+    flag("useRotate", "ur", dv=True),
+    flag("useScale", "us", dv=True),
+    flag("useShear", "ush", dv=True),
+    matrix("outputMatrix", "omat", output=True),
+], computes={"outputMatrix": _pick_matrix})
+
+NodeType("pairBlend", "dependNode", attrs=[
+    _xyz("inTranslate1", "it1"),
+    _angle("inRotate1", "ir1"),
+    _xyz("inTranslate2", "it2"),
+    _angle("inRotate2", "ir2"),
+    num("weight", "w", dv=1.0),
+    enum("rotInterpolation", "ri", names="Euler Angles:Quaternion Slerp"),
+    enum("rotateMode", "rm", names="Blend:Input1:Input2"),
+    enum("translateXMode", "txm", names="Blend:Input1:Input2"),
+    enum("translateYMode", "tym", names="Blend:Input1:Input2"),
+    enum("translateZMode", "tzm", names="Blend:Input1:Input2"),
+    enum("rotateOrder", "ro", names="xyz:yzx:zxy:xzy:yxz:zyx"),
+    _xyz("outTranslate", "ot", output=True),
+    _angle("outRotate", "or", output=True),
+], computes={"outTranslate": _pair_blend_translate, "outRotate": _pair_blend_rotate})
+
+NodeType("reverse", "dependNode", attrs=[
+    vector("input", "i", child_type="float", type="float3"),
+    vector("output", "o", child_type="float", type="float3", output=True),
+], computes={"output": _reverse})
+
+NodeType("plusMinusAverage", "dependNode", attrs=[
+    enum("operation", "op", names="No operation:Sum:Subtract:Average", dv=1),
+    num("input1D", "i1", type="float", multi=True),
+    vector("input2D", "i2", suffixes="xy", child_type="float", dv=(0.0, 0.0), type="float2", multi=True),
+    vector("input3D", "i3", suffixes="xyz", child_type="float", type="float3", multi=True),
+    num("output1D", "o1", type="float", output=True),
+    vector("output2D", "o2", suffixes="xy", child_type="float", dv=(0.0, 0.0), type="float2", output=True),
+    vector("output3D", "o3", suffixes="xyz", child_type="float", type="float3", output=True),
+], computes={"output1D": _plus_minus_average(1), "output2D": _plus_minus_average(2), "output3D": _plus_minus_average(3)})
+
+NodeType("multiplyDivide", "dependNode", attrs=[
+    enum("operation", "op", names="No operation:Multiply:Divide:Power", dv=1),
+    vector("input1", "i1", child_type="float", type="float3"),
+    vector("input2", "i2", child_type="float", dv=(1.0, 1.0, 1.0), type="float3"),
+    vector("output", "o", child_type="float", type="float3", output=True),
+], computes={"output": _multiply_divide})
+
+NodeType("condition", "dependNode", attrs=[
+    enum("operation", "op", names="Equal:Not Equal:Greater Than:Greater or Equal:Less Than:Less or Equal"),
+    num("firstTerm", "ft", type="float"),
+    num("secondTerm", "st", type="float"),
+    _color("colorIfTrue", "ct"),
+    _color("colorIfFalse", "cf"),
+    _color("outColor", "oc", output=True),
+], computes={"outColor": _condition})
+
+NodeType("floatMath", "dependNode", attrs=[
+    num("floatA", "_fa", type="float"),
+    num("floatB", "_fb", type="float"),
+    enum("operation", "_cnd", names="Add:Subtract:Multiply:Divide:Min:Max:Power"),
+    num("outFloat", "of", type="float", output=True),
+], computes={"outFloat": _float_math})
+
+NodeType("distanceBetween", "dependNode", attrs=[
+    _xyz("point1", "p1", child_type="double"),
+    matrix("inMatrix1", "im1"),
+    _xyz("point2", "p2", child_type="double"),
+    matrix("inMatrix2", "im2"),
+    num("distance", "d", type="doubleLinear", output=True),
+], computes={"distance": _distance_between})
+
+NodeType("unitConversion", "dependNode", attrs=[
+    num("input", "i"),
+    num("conversionFactor", "cf", dv=1.0),
+    num("output", "o", output=True),
+], computes={"output": lambda scene, node, index: scene.read(node, "input") * scene.read(node, "conversionFactor")})
+
+def _opt(scene, node, path, default):
+    """
+    ノードタイプによって存在しないアトリビュートはdefaultを返す
+    """
+    if node.spec(path.rsplit(".", 1)[-1]) is None:
+        return default
+
+    return scene.read(node, path)
+
+
+def _rotation_part(matrix) -> np.ndarray:
+    """
+    行列の回転成分 (3, 3) スケールを除く
+    """
+    m = np.array(tf.as_matrix(matrix)[:3, :3])
+    s = np.linalg.norm(m, axis=1)
+    m /= np.where(s < tf.EPSILON, 1.0, s)[:, None]
+    if np.linalg.det(m) < 0:
+        m[0] *= -1.0
+
+    return m
+
+
+def _target_world(scene, node, i) -> np.ndarray:
+    """
+    i番目のターゲットのワールド行列 位置は回転ピボット
+    """
+    p = f"target[{i}]."
+    m = np.eye(4)
+    m[:3, :3] = (np.diag(_opt(scene, node, p + "targetScale", (1, 1, 1)))
+                 @ tf.euler_to_rotation(_opt(scene, node, p + "targetRotate", (0, 0, 0)), _opt(scene, node, p + "targetRotateOrder", 0))
+                 @ tf.euler_to_rotation(_opt(scene, node, p + "targetJointOrient", (0, 0, 0))))
+    m[3, :3] = (np.array(_opt(scene, node, p + "targetTranslate", (0, 0, 0)))
+                + _opt(scene, node, p + "targetRotatePivot", (0, 0, 0)) + _opt(scene, node, p + "targetRotateTranslate", (0, 0, 0)))
+    return m @ _matrix(scene, node, p + "targetParentMatrix")
+
+
+def _targets(scene, node) -> list[tuple[int, float]]:
+    """
+    [(インデックス, 正規化した重み), ...]
+    """
+    targets = [(i, scene.read(node, f"target[{i}].targetWeight")) for i in scene.elements(node, "target")]
+    total = sum(w for _, w in targets)
+    if total <= tf.EPSILON:
+        return []
+
+    return [(i, w / total) for i, w in targets]
+
+
+def _average(matrices: list, weights: list) -> np.ndarray:
+    m = matrices[0]
+    accumulated = weights[0]
+    for matrix, weight in zip(matrices[1:], weights[1:]):
+        accumulated += weight
+        m = tf.blend(m, matrix, weight / accumulated)
+
+    return m
+
+
+def _constraint_rotate(scene, node, rotation) -> tuple:
+    """
+    拘束先のローカルの回転行列から、jointOrientを除いたrotateを求める
+    """
+    rotation = rotation @ np.linalg.inv(tf.euler_to_rotation(_opt(scene, node, "constraintJointOrient", (0, 0, 0))))
+    return tuple(tf.rotation_to_euler(rotation, _opt(scene, node, "constraintRotateOrder", 0)))
+
+
+def parent_constraint_local(scene, node, offset: bool=True) -> np.ndarray:
+    targets = _targets(scene, node)
+    if not targets:
+        return np.eye(4)
+
+    matrices = []
+    for i, _ in targets:
+        m = _target_world(scene, node, i)
+        if offset:
+            m = tf.compose(scene.read(node, f"target[{i}].targetOffsetTranslate"), scene.read(node, f"target[{i}].targetOffsetRotate")) @ m
+
+        matrices.append(m)
+
+    return _average(matrices, [w for _, w in targets]) @ _matrix(scene, node, "constraintParentInverseMatrix")
+
+
+def point_constraint_local(scene, node, offset: bool=True) -> np.ndarray:
+    position = np.zeros(3)
+    for i, w in _targets(scene, node):
+        position += _target_world(scene, node, i)[3, :3] * w
+
+    position = np.append(position, 1.0) @ _matrix(scene, node, "constraintParentInverseMatrix")
+    if offset:
+        position[:3] += scene.read(node, "offset")
+
+    return position[:3]
+
+
+def orient_constraint_local(scene, node, offset: bool=True) -> np.ndarray:
+    targets = _targets(scene, node)
+    if not targets:
+        return np.eye(3)
+
+    m = _average([_target_world(scene, node, i) for i, _ in targets], [w for _, w in targets])
+    rotation = _rotation_part(m) @ _rotation_part(_matrix(scene, node, "constraintParentInverseMatrix"))
+    if offset:
+        rotation = tf.euler_to_rotation(scene.read(node, "offset")) @ rotation
+
+    return rotation
+
+
+def scale_constraint_local(scene, node, offset: bool=True) -> np.ndarray:
+    scale = np.zeros(3)
+    for i, w in _targets(scene, node):
+        scale += np.linalg.norm(_target_world(scene, node, i)[:3, :3], axis=1) * w
+
+    scale *= np.linalg.norm(_matrix(scene, node, "constraintParentInverseMatrix")[:3, :3], axis=1)
+    if offset:
+        scale *= scene.read(node, "offset")
+
+    return scale
+
+
+def _shortest_arc(v1, v2) -> np.ndarray:
+    """
+    v1をv2に向ける最小の回転行列 (3, 3)
+    """
+    v1 = v1 / np.linalg.norm(v1)
+    v2 = v2 / np.linalg.norm(v2)
+    axis = np.cross(v1, v2)
+    s = np.linalg.norm(axis)
+    c = float(np.dot(v1, v2))
+    if s < tf.EPSILON:
+        if c > 0:
+            return np.eye(3)
+
+        other = np.array([0.0, 1.0, 0.0]) if abs(v1[1]) < 0.9 else np.array([0.0, 0.0, 1.0])
+        axis = np.cross(v1, other)
+        axis /= np.linalg.norm(axis)
+        return 2.0 * np.outer(axis, axis) - np.eye(3)
+
+    axis /= s
+    k = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]], [-axis[1], axis[0], 0]])
+    # 列ベクトル形式の回転行列を転置して行ベクトル形式にする
+    return (np.eye(3) + k * s + k @ k * (1 - c)).T
+
+
+def _frame(aim, up) -> np.ndarray:
+    aim = aim / np.linalg.norm(aim)
+    up = np.asarray(up, dtype=np.float64) - np.dot(up, aim) * aim
+    n = np.linalg.norm(up)
+    if n < tf.EPSILON:
+        return None
+
+    up /= n
+    return np.array([aim, up, np.cross(aim, up)])
+
+
+def aim_constraint_local(scene, node, offset: bool=True) -> np.ndarray:
+    targets = _targets(scene, node)
+    parent_inverse = _matrix(scene, node, "constraintParentInverseMatrix")
+    position = np.append(np.array(scene.read(node, "constraintTranslate")) + scene.read(node, "constraintRotatePivot")
+                         + scene.read(node, "constraintRotateTranslate"), 1.0) @ np.linalg.inv(parent_inverse)
+    target = np.zeros(3)
+    for i, w in targets:
+        target += _target_world(scene, node, i)[3, :3] * w
+
+    direction = target - position[:3]
+    if not targets or np.linalg.norm(direction) < tf.EPSILON:
+        return np.eye(3)
+
+    aim = np.array(scene.read(node, "aimVector"), dtype=np.float64)
+    up_type = scene.read(node, "worldUpType")
+    up = None
+    if up_type == 0:
+        up = np.array([0.0, 1.0, 0.0])
+
+    elif up_type == 1:
+        up = _matrix(scene, node, "worldUpMatrix")[3, :3] - position[:3]
+
+    elif up_type == 2:
+        up = np.array(scene.read(node, "worldUpVector")) @ _matrix(scene, node, "worldUpMatrix")[:3, :3]
+
+    elif up_type == 3:
+        up = np.array(scene.read(node, "worldUpVector"))
+
+    parent_rotation = _rotation_part(parent_inverse)
+    world = _frame(direction, up) if up is not None else None
+    local_frame = _frame(aim, scene.read(node, "upVector"))
+    if world is None or local_frame is None:
+        rotation = _shortest_arc(aim, direction @ parent_rotation)
+
+    else:
+        rotation = local_frame.T @ world @ parent_rotation
+
+    if offset:
+        rotation = tf.euler_to_rotation(scene.read(node, "offset")) @ rotation
+
+    return rotation
+
+
+def _pole_vector(scene, node, index):
+    position = point_constraint_local(scene, node, offset=False)
+    return tuple((position - scene.read(node, "pivotSpace")).tolist())
+
+
+NodeType("constraint", "transform", attrs=[
+    flag("enableRestPosition", "erp", dv=True),
+    flag("lockOutput", "lo"),
+])
+
+
+def _constraint_target(*children):
+    return compound("target", "tg", multi=True, children=[
+        num("targetWeight", "tw", dv=1.0),
+        matrix("targetParentMatrix", "tpm"),
+        *children,
+    ])
+
+
+NodeType("parentConstraint", "constraint", attrs=[
+    _constraint_target(
+        _xyz("targetTranslate", "tt"), _angle("targetRotate", "tr"), vector("targetScale", "ts", child_type="double", dv=(1.0, 1.0, 1.0)),
+        _xyz("targetRotatePivot", "trp"), _xyz("targetRotateTranslate", "trt"), enum("targetRotateOrder", "tro", names="xyz:yzx:zxy:xzy:yxz:zyx"),
+        _angle("targetJointOrient", "tjo"), vector("targetInverseScale", "tis", child_type="double", dv=(1.0, 1.0, 1.0)),
+        flag("targetScaleCompensate", "tsc"), _xyz("targetOffsetTranslate", "tot"), _angle("targetOffsetRotate", "tor"),
+    ),
+    matrix("constraintParentInverseMatrix", "cpim"),
+    _xyz("constraintRotatePivot", "crp"),
+    _xyz("constraintRotateTranslate", "crt"),
+    enum("constraintRotateOrder", "cro", names="xyz:yzx:zxy:xzy:yxz:zyx"),
+    _angle("constraintJointOrient", "cjo"),
+    _xyz("constraintTranslate", "ct", output=True),
+    _angle("constraintRotate", "cr", output=True),
+    _xyz("restTranslate", "rst"),
+    _angle("restRotate", "rsrr"),
+    enum("interpType", "int", names="No Flip:Average:Shortest:Longest:Cache", dv=1),
+], computes={
+    "constraintTranslate": lambda scene, node, index: tuple(parent_constraint_local(scene, node)[3, :3].tolist()),
+    "constraintRotate": lambda scene, node, index: _constraint_rotate(scene, node, _rotation_part(parent_constraint_local(scene, node))),
+})
+
+NodeType("pointConstraint", "constraint", attrs=[
+    _constraint_target(_xyz("targetTranslate", "tt"), _xyz("targetRotatePivot", "trp"), _xyz("targetRotateTranslate", "trt")),
+    matrix("constraintParentInverseMatrix", "cpim"),
+    _xyz("constraintRotatePivot", "crp"),
+    _xyz("constraintRotateTranslate", "crt"),
+    _xyz("offset", "o"),
+    _xyz("constraintTranslate", "ct", output=True),
+    _xyz("restTranslate", "rst"),
+], computes={
+    "constraintTranslate": lambda scene, node, index: tuple(point_constraint_local(scene, node).tolist()),
+})
+
+NodeType("orientConstraint", "constraint", attrs=[
+    _constraint_target(_angle("targetRotate", "tr"), enum("targetRotateOrder", "tro", names="xyz:yzx:zxy:xzy:yxz:zyx"), _angle("targetJointOrient", "tjo")),
+    matrix("constraintParentInverseMatrix", "cpim"),
+    enum("constraintRotateOrder", "cro", names="xyz:yzx:zxy:xzy:yxz:zyx"),
+    _angle("constraintJointOrient", "cjo"),
+    _angle("offset", "o"),
+    _angle("constraintRotate", "cr", output=True),
+    _angle("restRotate", "rsrr"),
+    enum("interpType", "int", names="No Flip:Average:Shortest:Longest:Cache", dv=1),
+], computes={
+    "constraintRotate": lambda scene, node, index: _constraint_rotate(scene, node, orient_constraint_local(scene, node)),
+})
+
+NodeType("scaleConstraint", "constraint", attrs=[
+    _constraint_target(vector("targetScale", "ts", child_type="double", dv=(1.0, 1.0, 1.0))),
+    matrix("constraintParentInverseMatrix", "cpim"),
+    vector("offset", "o", child_type="double", dv=(1.0, 1.0, 1.0)),
+    vector("constraintScale", "cs", child_type="double", dv=(1.0, 1.0, 1.0), output=True),
+    vector("restScale", "rssc", child_type="double", dv=(1.0, 1.0, 1.0)),
+], computes={
+    "constraintScale": lambda scene, node, index: tuple(scale_constraint_local(scene, node).tolist()),
+})
+
+NodeType("aimConstraint", "constraint", attrs=[
+    _constraint_target(_xyz("targetTranslate", "tt"), _xyz("targetRotatePivot", "trp"), _xyz("targetRotateTranslate", "trt")),
+    matrix("constraintParentInverseMatrix", "cpim"),
+    _xyz("constraintTranslate", "ct"),
+    _xyz("constraintRotatePivot", "crp"),
+    _xyz("constraintRotateTranslate", "crt"),
+    enum("constraintRotateOrder", "cro", names="xyz:yzx:zxy:xzy:yxz:zyx"),
+    _angle("constraintJointOrient", "cjo"),
+    _xyz("aimVector", "a", child_type="double", dv=(1.0, 0.0, 0.0)),
+    _xyz("upVector", "u", child_type="double", dv=(0.0, 1.0, 0.0)),
+    _xyz("worldUpVector", "wu", child_type="double", dv=(0.0, 1.0, 0.0)),
+    matrix("worldUpMatrix", "wum"),
+    enum("worldUpType", "wut", names="Scene Up:Object Up:Object Rotation Up:Vector:None"),
+    _angle("offset", "o"),
+    _angle("constraintRotate", "cr", output=True),
+    _angle("restRotate", "rsrr"),
+], computes={
+    "constraintRotate": lambda scene, node, index: _constraint_rotate(scene, node, aim_constraint_local(scene, node)),
+})
+
+NodeType("poleVectorConstraint", "pointConstraint", attrs=[
+    _xyz("pivotSpace", "ps"),
+], computes={"constraintTranslate": _pole_vector})
+
+NodeType("cluster", "dependNode", attrs=[
+    flag("relative", "rel"),
+    num("envelope", "en", dv=1.0),
+    matrix("matrix", "ma"),
+    matrix("bindPreMatrix", "pm"),
+    matrix("weightedMatrix", "wm"),
+])
+
+for _solver in ("ikRPsolver", "ikSCsolver", "ikSplineSolver"):
+    NodeType(_solver, "dependNode")
@@ -0,0 +1,754 @@
+"""
+代替シーンのDG/DAG
+ノード、アトリビュートの値、接続、親子関係を保持し、出力アトリビュートを読み込み時に計算する
+
+ノード名はシーン全体で一意とし、"a|b|c" のようなパスは最後の名前で解決する
+インスタンスに対応するため、DAGノードは複数の親を持てる
+"""
+import re
+import json
+import uuid
+import itertools
+from ysrig.standin import node_types
+from ysrig.standin.attributes import AttrSpec
+
+_SEGMENT = re.compile(r"([A-Za-z_][\w]*)(?:\[(\d+)\])?$")
+_TRAILING_DIGITS = re.compile(r"\d+$")
+
+_callback_ids = itertools.count(1)
+_node_ids = itertools.count(1)
+
+
+class Node:
+    """
+    シーン上のノード1つ分のデータ
+
+    values = {(アトリビュートのロングネーム, multiのインデックス): 値}
+    inputs = {キー: 接続元のPlug}
+    outputs = {キー: [接続先のPlug, ...]}
+    """
+    __slots__ = ("scene", "id", "name", "type", "dynamic", "dynamic_attrs", "values", "inputs", "outputs",
+                 "locked", "keyable", "channel_box", "elements", "parents", "children", "_uuid", "alive")
+
+    def __init__(self, scene, name, node_type):
+        self.scene = scene
+        self.id = next(_node_ids)
+        self.name = name
+        self.type = node_type
+        self.dynamic = {}          # {ロングネーム, ショートネーム: AttrSpec}
+        self.dynamic_attrs = []    # 追加したトップレベルのAttrSpec
+        self.values = {}
+        self.inputs = {}
+        self.outputs = {}
+        self.locked = set()
+        self.keyable = {}          # {ロングネーム: bool} 型の既定値から変更したもの
+        self.channel_box = {}      # {ロングネーム: bool}
+        self.elements = {}         # {(multiのロングネーム, 親のインデックス): {インデックス, ...}}
+        self.parents = []
+        self.children = []
+        self._uuid = None
+        self.alive = True
+
+    def __repr__(self):
+        return f"<Node {self.name} ({self.type.name})>"
+
+    @property
+    def uuid(self) -> str:
+        if self._uuid is None:
+            self._uuid = str(uuid.uuid4()).upper()
+            self.scene.uuids[self._uuid] = self
+
+        return self._uuid
+
+    @property
+    def is_dag(self) -> bool:
+        return self.type.dag
+
+    @property
+    def is_shape(self) -> bool:
+        return self.type.shape
+
+    def spec(self, name: str) -> AttrSpec:
+        return self.dynamic.get(name) or self.type.specs.get(name)
+
+    def has_attr(self, name: str) -> bool:
+        return self.spec(name) is not None
+
+    def attrs(self) -> list[AttrSpec]:
+        return self.type.attrs + self.dynamic_attrs
+
+    def all_specs(self):
+        for spec in self.attrs():
+            yield from spec.walk()
+
+    def add_attr(self, spec: AttrSpec, parent: AttrSpec=None) -> None:
+        if parent is None:
+            self.dynamic_attrs.append(spec)
+
+        else:
+            parent.add_child(spec)
+
+        for s in spec.walk():
+            self.dynamic[s.long] = s
+            self.dynamic[s.short] = s
+
+    def remove_attr(self, spec: AttrSpec) -> None:
+        for s in list(spec.walk()):
+            for name in (s.long, s.short):
+                if self.dynamic.get(name) is s:
+                    del self.dynamic[name]
+
+            for key in [k for k in self.values if k[0] == s.long]:
+                del self.values[key]
+
+        if spec in self.dynamic_attrs:
+            self.dynamic_attrs.remove(spec)
+
+        elif spec.parent is not None and spec in spec.parent.children:
+            spec.parent.children.remove(spec)
+
+    def path(self, index: int=0) -> str:
+        """
+        ルートからのフルパス インスタンスの場合はindex番目の親を辿る
+        """
+        if not self.is_dag:
+            return self.name
+
+        names = [self.name]
+        node = self
+        while node.parents:
+            node = node.parents[min(index, len(node.parents) - 1)]
+            index = 0
+            names.append(node.name)
+
+        return "|" + "|".join(reversed(names))
+
+    def ancestors(self) -> list:
+        result = []
+        node = self
+        while node.parents:
+            node = node.parents[0]
+            result.append(node)
+
+        return result
+
+    def descendants(self) -> list:
+        result = []
+        for child in self.children:
+            result.append(child)
+            result.extend(child.descendants())
+
+        return result
+
+
+class Plug:
+    """
+    ノードのアトリビュート1つ分の参照
+
+    indices = spec.multi_specs に対応するインデックス 省略されたものはNone
+    """
+    __slots__ = ("node", "spec", "indices")
+
+    def __init__(self, node, spec, indices=()):
+        self.node = node
+        self.spec = spec
+        self.indices = tuple(indices)
+
+    def __eq__(self, other):
+        return isinstance(other, Plug) and self.node is other.node and self.key == other.key
+
+    def __hash__(self):
+        return hash((self.node.id, self.key))
+
+    def __repr__(self):
+        return f"<Plug {self.name()}>"
+
+    @property
+    def key(self) -> tuple:
+        return (self.spec.long, tuple(0 if i is None else i for i in self.indices))
+
+    @property
+    def is_array(self) -> bool:
+        """
+        インデックスが省略されたmulti型のアトリビュート全体か
+        """
+        return bool(self.indices) and self.indices[-1] is None and self.spec.multi
+
+    def attr_name(self, long: bool=True, indices: bool=True) -> str:
+        """
+        "target[0].targetTranslateX" の形のアトリビュート名
+        multi型の親と、自身だけを含める
+        """
+        parts = []
+        multi_specs = self.spec.multi_specs
+        for spec in self.spec.chain:
+            if not spec.multi and spec is not self.spec:
+                continue
+
+            name = spec.long if long else spec.short
+            if spec.multi and indices:
+                index = self.indices[multi_specs.index(spec)]
+                if index is not None:
+                    name += f"[{index}]"
+
+            parts.append(name)
+
+        return ".".join(parts)
+
+    def name(self, long: bool=True) -> str:
+        return f"{self.node.name}.{self.attr_name(long)}"
+
+    def child(self, spec: AttrSpec) -> "Plug":
+        return Plug(self.node, spec, self.indices + ((None,) if spec.multi else ()))
+
+    def children(self) -> list:
+        return [self.child(s) for s in self.spec.children]
+
+    def element(self, index: int) -> "Plug":
+        return Plug(self.node, self.spec, self.indices[:-1] + (index,))
+
+    def ancestor(self, spec: AttrSpec) -> "Plug":
+        return Plug(self.node, spec, self.indices[:len(spec.multi_specs)])
+
+
+class Scene:
+    """
+    代替シーン本体
+    """
+    def __init__(self):
+        self.nodes = {}            # {ノード名: Node}
+        self.selection = []
+        self.file_name = ""
+        self.errors = []           # MGlobal.displayErrorで表示されたメッセージ
+        self.uuids = {}            # {UUID: Node} UUIDを参照したノードだけ
+        self._callbacks = {}       # {コールバックID: 種類}
+        self._by_kind = {}         # {種類: {コールバックID: (対象, 関数)}}
+        self._evaluating = set()
+        self._cache = {}           # {(ノードID, ロングネーム, インデックス): 計算結果} 変更があると破棄する
+
+    ### コールバック ###
+
+    def add_callback(self, kind: str, func, target=None) -> int:
+        """
+        コールバックを登録する
+
+        Args:
+            kind (str): "node_added", "node_removed", "pre_removal", "name_changed", "attr_changed",
+                        "plug_dirty", "dag_changed", "child_added", "child_removed", "connection", "before_new", "after_new" など
+            func (function): 呼び出す関数
+            target: 対象のNode ノードの種類に関わらない場合はNone
+                    node_addedとnode_removedではノードタイプ名
+
+        Returns:
+            int: コールバックID
+        """
+        callback_id = next(_callback_ids)
+        self._callbacks[callback_id] = kind
+        self._by_kind.setdefault(kind, {})[callback_id] = (target, func)
+        return callback_id
+
+    def remove_callback(self, callback_id: int) -> None:
+        kind = self._callbacks.pop(callback_id, None)
+        if kind is not None:
+            self._by_kind[kind].pop(callback_id, None)
+
+    def emit(self, kind: str, node=None, *args) -> None:
+        callbacks = self._by_kind.get(kind)
+        if not callbacks:
+            return
+
+        for target, func in list(callbacks.values()):
+            if target is not None:
+                if isinstance(target, str):
+                    if node is None or not node.type.is_a(target):
+                        continue
+
+                elif target is not node:
+                    continue
+
+            if node is None:
+                func(*args)
+
+            else:
+                func(node, *args)
+
+    def invalidate(self) -> None:
+        """
+        計算結果のキャッシュを破棄する 値、接続、親子関係を変更した際に呼ぶ
+        """
+        if self._cache:
+            self._cache = {}
+
+    ### ノード ###
+
+    def clear(self) -> None:
+        """
+        シーンを新規作成する 登録済みのコールバックは残す
+        """
+        self.emit("before_new")
+        for node in self.nodes.values():
+            node.alive = False
+
+        self.nodes = {}
+        self.selection = []
+        self.file_name = ""
+        self.errors = []
+        self.uuids = {}
+        self.invalidate()
+        self.emit("after_new")
+
+    def save(self, path: str) -> None:
+        """
+        ノード、親子関係、設定された値、接続をJSONで書き出す
+        Mayaのシーンファイルではなく、ビルド結果の比較に使うためのもの
+        """
+        data = []
+        for node in self.nodes.values():
+            data.append({
+                "name": node.name,
+                "type": node.type.name,
+                "parents": [p.name for p in node.parents],
+                "values": [[k[0], list(k[1]), v] for k, v in node.values.items()],
+                "inputs": [[k[0], list(k[1]), src.name()] for k, src in node.inputs.items()],
+            })
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1, default=str)
+
+    def unique_name(self, name: str) -> str:
+        """
+        重複しない名前を返す 重複する場合は末尾の数字を増やす "#" は数字に置き換える
+        """
+        if "#" in name:
+            base = name.replace("#", "")
+            for i in itertools.count(1):
+                candidate = name.replace("#", str(i))
+                if candidate not in self.nodes:
+                    return candidate
+
+        if name not in self.nodes:
+            return name
+
+        base = _TRAILING_DIGITS.sub("", name)
+        match = _TRAILING_DIGITS.search(name)
+        start = int(match.group()) + 1 if match else 1
+        for i in itertools.count(start):
+            candidate = f"{base}{i}"
+            if candidate not in self.nodes:
+                return candidate
+
+    def create(self, type_name: str, name: str=None, parent: Node=None) -> Node:
+        node_type = node_types.get(type_name)
+        name = self.unique_name(name or f"{type_name}1")
+        node = Node(self, name, node_type)
+        self.nodes[name] = node
+        if parent is not None:
+            self.set_parent(node, parent)
+
+        self.emit("node_added", node)
+        return node
+
+    def find(self, path: str) -> Node:
+        """
+        名前、もしくは "|" 区切りのパスからノードを探す 存在しない場合はNone
+        """
+        if "|" in path:
+            path = path.rsplit("|", 1)[-1]
+
+        return self.nodes.get(path)
+
+    def find_uuid(self, value: str) -> Node:
+        """
+        UUIDからノードを探す 存在しない場合はNone
+        """
+        node = self.uuids.get(value.upper())
+        return node if node is not None and node.alive else None
+
+    def rename(self, node: Node, name: str) -> str:
+        if name == node.name:
+            return name
+
+        old = node.name
+        del self.nodes[old]
+        node.name = self.unique_name(name)
+        self.nodes[node.name] = node
+        self.emit("name_changed", node, old)
+        return node.name
+
+    def delete(self, node: Node) -> None:
+        if not node.alive:
+            return
+
+        for child in list(node.children):
+            if len(child.parents) > 1:
+                self.unparent(child, node)
+
+            else:
+                self.delete(child)
+
+        self.emit("pre_removal", node)
+        for key, src in list(node.inputs.items()):
+            self.disconnect(src, Plug(node, node.spec(key[0]), key[1]), transfer=False)
+
+        for key, dests in list(node.outputs.items()):
+            for dest in list(dests):
+                self.disconnect(Plug(node, node.spec(key[0]), key[1]), dest)
+
+        for parent in list(node.parents):
+            self.unparent(node, parent)
+
+        del self.nodes[node.name]
+        if node in self.selection:
+            self.selection.remove(node)
+
+        node.alive = False
+        self.invalidate()
+        self.emit("node_removed", node)
+
+    ### 親子関係 ###
+
+    def set_parent(self, node: Node, parent: Node, replace: Node=None) -> None:
+        """
+        親を設定する parentがNoneの場合はワールドの直下にする
+        replaceを指定した場合は、その親だけを置き換える
+        """
+        old = list(node.parents)
+        if replace is not None and replace in node.parents:
+            self.unparent(node, replace, emit=False)
+
+        else:
+            for p in list(node.parents):
+                self.unparent(node, p, emit=False)
+
+        if parent is not None and parent not in node.parents:
+            node.parents.append(parent)
+            parent.children.append(node)
+
+        self.invalidate()
+        self.emit("dag_changed", node)
+        for p in old:
+            if p not in node.parents:
+                self.emit("child_removed", p, node)
+
+        if parent is not None and parent not in old:
+            self.emit("child_added", parent, node)
+
+    def unparent(self, node: Node, parent: Node, emit: bool=True) -> None:
+        removed = parent in node.parents
+        if removed:
+            node.parents.remove(parent)
+            parent.children.remove(node)
+
+        self.invalidate()
+        if emit:
+            self.emit("dag_changed", node)
+            if removed:
+                self.emit("child_removed", parent, node)
+
+    ### アトリビュート ###
+
+    def plug(self, path: str, node: Node=None) -> Plug:
+        """
+        "ノード名.アトリビュート" もしくはnodeとアトリビュート名からPlugを作成する
+        存在しない場合はValueError
+        """
+        if node is None:
+            node_name, sep, attr = path.partition(".")
+            node = self.find(node_name)
+            if node is None or not sep:
+                raise ValueError(f"No object matches name: {path}")
+
+        else:
+            attr = path
+
+        spec = None
+        given = {}
+        for segment in attr.split("."):
+            match = _SEGMENT.match(segment)
+            if not match:
+                raise ValueError(f"No object matches name: {node.name}.{attr}")
+
+            name, index = match.groups()
+            child = spec.child(name) if spec is not None else None
+            if child is None:
+                child = node.spec(name)
+                if child is None or (spec is not None and spec not in child.chain):
+                    raise ValueError(f"No object matches name: {node.name}.{attr}")
+
+            spec = child
+            if index is not None:
+                given[spec] = int(index)
+
+        return Plug(node, spec, tuple(given.get(s) for s in spec.multi_specs))
+
+    def is_locked(self, plug: Plug) -> bool:
+        locked = plug.node.locked
+        if not locked:
+            return False
+
+        for spec in plug.spec.chain:
+            if plug.ancestor(spec).key in locked:
+                return True
+
+        return False
+
+    def set_locked(self, plug: Plug, lock: bool) -> None:
+        if lock:
+            plug.node.locked.add(plug.key)
+
+        else:
+            for spec in plug.spec.walk():
+                plug.node.locked.discard((spec.long, plug.key[1][:len(spec.multi_specs)]))
+
+            for spec in plug.spec.chain:
+                plug.node.locked.discard(plug.ancestor(spec).key)
+
+    def source(self, plug: Plug) -> Plug:
+        """
+        接続元のPlugを返す 親のcompound型への接続は含めない
+        """
+        return plug.node.inputs.get(plug.key)
+
+    def destinations(self, plug: Plug) -> list:
+        return list(plug.node.outputs.get(plug.key, ()))
+
+    def _touch(self, plug: Plug) -> None:
+        """
+        multi型のインデックスを存在するものとして記録する
+        """
+        indices = plug.key[1]
+        for i, spec in enumerate(plug.spec.multi_specs):
+            plug.node.elements.setdefault((spec.long, indices[:i]), set()).add(indices[i])
+
+    def element_indices(self, plug: Plug) -> list[int]:
+        """
+        multi型のアトリビュートの、値もしくは接続がある要素のインデックス
+        """
+        spec = plug.spec if plug.spec.multi else (plug.spec.multi_specs or (None,))[-1]
+        if spec is None:
+            return []
+
+        position = len(spec.multi_specs) - 1
+        parent = tuple(0 if i is None else i for i in plug.indices[:position])
+        return sorted(plug.node.elements.get((spec.long, parent), ()))
+
+    def elements(self, node: Node, attr: str) -> list[int]:
+        return self.element_indices(self.plug(attr, node))
+
+    def remove_element(self, plug: Plug) -> None:
+        indices = plug.key[1]
+        position = len(plug.spec.multi_specs) - 1
+        existing = plug.node.elements.get((plug.spec.long, indices[:position]))
+        if existing:
+            existing.discard(indices[position])
+
+        for spec in plug.spec.walk():
+            key = (spec.long, indices + (0,) * (len(spec.multi_specs) - len(indices)))
+            plug.node.values.pop(key, None)
+
+        self.invalidate()
+
+    def set_value(self, plug: Plug, value, emit: bool=True) -> None:
+        """
+        値を設定する compound型は子に分けて設定する
+        """
+        spec = plug.spec
+        if spec.children:
+            for child, v in zip(spec.children, value):
+                self.set_value(plug.child(child), v, emit=False)
+
+        else:
+            plug.node.values[plug.key] = value
+            self.invalidate()
+
+        self._touch(plug)
+        if emit:
+            self.emit("attr_changed", plug.node, plug)
+            self.dirty(plug)
+
+    def value(self, plug: Plug):
+        """
+        接続と計算を反映した値を返す
+        """
+        node = plug.node
+        spec = plug.spec
+        key = plug.key
+        src = node.inputs.get(key)
+        if src is not None:
+            return self.value(src)
+
+        # 親のcompound型への接続
+        if node.inputs:
+            for i in range(len(spec.chain) - 2, -1, -1):
+                ancestor = spec.chain[i]
+                src = node.inputs.get(plug.ancestor(ancestor).key)
+                if src is not None:
+                    value = self.value(src)
+                    for s in spec.chain[i + 1:]:
+                        value = value[s.parent.children.index(s)] if isinstance(value, (list, tuple)) else value
+
+                    return value
+
+        if spec.output:
+            computed = self._compute(plug)
+            if computed is not None:
+                return computed
+
+        if spec.children:
+            return tuple(self.value(plug.child(c) if not c.multi else plug.child(c).element(0)) for c in spec.children)
+
+        return node.values.get(key, spec.default)
+
+    def read(self, node: Node, attr: str):
+        """
+        計算関数からアトリビュートを読むための関数
+        """
+        return self.value(self.plug(attr, node))
+
+    def _compute(self, plug: Plug):
+        node = plug.node
+        for i, spec in enumerate(plug.spec.chain):
+            func = node.type.computes.get(spec.long)
+            if func is None:
+                continue
+
+            guard = (node.id, spec.long, plug.key[1][:1])
+            value = self._cache.get(guard)
+            if value is None:
+                if guard in self._evaluating:
+                    return None
+
+                self._evaluating.add(guard)
+                try:
+                    index = plug.key[1][0] if plug.key[1] else None
+                    value = func(self, node, index)
+
+                finally:
+                    self._evaluating.discard(guard)
+
+                self._cache[guard] = value
+
+            for s in plug.spec.chain[i + 1:]:
+                value = value[s.parent.children.index(s)]
+
+            return value
+
+        return None
+
+    ### 接続 ###
+
+    def connect(self, src: Plug, dest: Plug) -> None:
+        old = dest.node.inputs.get(dest.key)
+        if old is not None:
+            self.disconnect(old, dest, transfer=False)
+
+        dest.node.inputs[dest.key] = src
+        src.node.outputs.setdefault(src.key, []).append(dest)
+        self.invalidate()
+        self._touch(src)
+        self._touch(dest)
+        self.emit("connection", None, src, dest, True)
+        self.emit("attr_changed", dest.node, dest)
+        self.dirty(dest)
+
+    def disconnect(self, src: Plug, dest: Plug, transfer: bool=True) -> None:
+        """
+        接続を切る transferがTrueの場合は、接続されていた値を接続先に残す
+        """
+        if dest.node.inputs.get(dest.key) != src:
+            return
+
+        value = self.value(src) if transfer and src.node.alive else None
+        del dest.node.inputs[dest.key]
+        dests = src.node.outputs.get(src.key, [])
+        if dest in dests:
+            dests.remove(dest)
+
+        if not dests:
+            src.node.outputs.pop(src.key, None)
+
+        self.invalidate()
+
+        if value is not None and dest.spec.type not in ("message",):
+            self.set_value(dest, value, emit=False)
+
+        self.emit("connection", None, src, dest, False)
+        self.emit("attr_changed", dest.node, dest)
+        self.dirty(dest)
+
+    def dirty(self, plug: Plug) -> None:
+        """
+        plugと、接続を通してその値を使う下流のアトリビュートにダーティを通知する
+        計算するアトリビュートを持つノードでは、追加したアトリビュート以外の変更を全ての計算結果の接続先に伝える
+        message型の接続は値を伝えないため辿らない
+        """
+        if not self._by_kind.get("plug_dirty"):
+            return
+
+        stack = [plug]
+        seen = set()
+        while stack:
+            plug = stack.pop()
+            node = plug.node
+            if (node.id, plug.key) in seen:
+                continue
+
+            seen.add((node.id, plug.key))
+            self.emit("plug_dirty", node, plug)
+            if not node.outputs:
+                continue
+
+            # 自身、compound型の親と子の接続先
+            related = {s.long for s in plug.spec.chain} | {s.long for s in plug.spec.walk()}
+            computes = node.type.computes if node.dynamic.get(plug.spec.long) is not plug.spec else None
+            for key, dests in node.outputs.items():
+                if key[0] not in related:
+                    spec = node.spec(key[0])
+                    if not computes or spec is None or not any(s.long in computes for s in spec.chain):
+                        continue
+
+                stack += [dest for dest in dests if dest.spec.type != "message"]
+
+    def connections(self, plug: Plug, source: bool=True, destination: bool=True) -> list[tuple]:
+        """
+        plugと、その要素の接続を返す Mayaと同じくcompound型の子の接続は含めない
+
+        Returns:
+            list: [(自身側のPlug, 相手側のPlug), ...]
+        """
+        node = plug.node
+        names = {plug.spec.long}
+        prefix = plug.key[1] if not plug.is_array else plug.key[1][:-1]
+        result = []
+        if source:
+            for key, src in node.inputs.items():
+                if key[0] in names and key[1][:len(prefix)] == prefix:
+                    result.append((Plug(node, node.spec(key[0]), key[1]), src))
+
+        if destination:
+            for key, dests in node.outputs.items():
+                if key[0] in names and key[1][:len(prefix)] == prefix:
+                    for dest in dests:
+                        result.append((Plug(node, node.spec(key[0]), key[1]), dest))
+
+        return result
+
+    def node_connections(self, node: Node, source: bool=True, destination: bool=True) -> list[tuple]:
+        result = []
+        if source:
+            for key, src in node.inputs.items():
+                result.append((Plug(node, node.spec(key[0]), key[1]), src))
+
+        if destination:
+            for key, dests in node.outputs.items():
+                for dest in dests:
+                    result.append((Plug(node, node.spec(key[0]), key[1]), dest))
+
+        return result
+
+
+_scene = Scene()
+
+
+def get() -> Scene:
+    return _scene
@@ -0,0 +1,214 @@
+"""
+代替シーンで使う行列計算
+行列はMayaと同じ行ベクトル形式 (p' = p * M) の4x4のnumpy配列で扱う
+"""
+import math
+import numpy as np
+from ysrig import mathlib
+
+# rotateOrderの値と回転順序
+ROTATE_ORDERS = ("xyz", "yzx", "zxy", "xzy", "yxz", "zyx")
+
+EPSILON = 1e-10
+IDENTITY = tuple(np.eye(4).reshape(16).tolist())
+
+
+def as_matrix(value) -> np.ndarray:
+    """
+    16要素のリスト、4x4のリストを (4, 4) の配列にする
+    """
+    return np.asarray(value, dtype=np.float64).reshape(4, 4)
+
+
+def to_tuple(matrix) -> tuple:
+    return tuple(np.asarray(matrix, dtype=np.float64).reshape(16).tolist())
+
+
+def axis_rotation(axis: int, angle: float) -> np.ndarray:
+    """
+    1軸の回転行列 (3, 3) を返す 角度はラジアン
+    """
+    c = math.cos(angle)
+    s = math.sin(angle)
+    m = np.eye(3)
+    i, j = [(1, 2), (2, 0), (0, 1)][axis]
+    m[i, i] = c
+    m[i, j] = s
+    m[j, i] = -s
+    m[j, j] = c
+    return m
+
+
+def euler_to_rotation(rotate, order: int=0, degrees: bool=True) -> np.ndarray:
+    """
+    オイラー角から回転行列 (3, 3) を作成する
+
+    Args:
+        rotate (list): [rx, ry, rz]
+        order (int): rotateOrderの値
+        degrees (bool): 度数法かどうか
+    """
+    if order == 0:
+        return mathlib.euler_to_rotation(rotate, degrees)[0]
+
+    r = [math.radians(v) for v in rotate] if degrees else list(rotate)
+    m = np.eye(3)
+    for axis in ROTATE_ORDERS[order]:
+        i = "xyz".index(axis)
+        m = m @ axis_rotation(i, r[i])
+
+    return m
+
+
+def rotation_to_euler(rotation, order: int=0, degrees: bool=True) -> list:
+    """
+    回転行列 (3, 3) からオイラー角を求める
+
+    行ベクトル形式の R = Ri * Rj * Rk は、列ベクトル形式では M = Rk * Rj * Ri となるため、
+    M = R^T に対して固定軸のオイラー角の分解を行う
+    """
+    if order == 0:
+        return mathlib.rotation_to_euler(rotation, degrees)[0].tolist()
+
+    m = np.asarray(rotation, dtype=np.float64).reshape(3, 3).T
+    i, j, k = ["xyz".index(a) for a in ROTATE_ORDERS[order]]
+    odd = (j - i) % 3 != 1
+
+    cy = math.hypot(m[i, i], m[j, i])
+    if cy > EPSILON:
+        a = math.atan2(m[k, j], m[k, k])
+        b = math.atan2(-m[k, i], cy)
+        c = math.atan2(m[j, i], m[i, i])
+
+    else:
+        a = math.atan2(-m[j, k], m[j, j])
+        b = math.atan2(-m[k, i], cy)
+        c = 0.0
+
+    if odd:
+        a, b, c = -a, -b, -c
+
+    result = [0.0, 0.0, 0.0]
+    result[i], result[j], result[k] = a, b, c
+    if degrees:
+        result = [math.degrees(v) for v in result]
+
+    return result
+
+
+def compose(translate=(0, 0, 0), rotate=(0, 0, 0), scale=(1, 1, 1), shear=(0, 0, 0), order: int=0) -> np.ndarray:
+    """
+    translate, rotate, scale, shearから行列を作成する M = S * Sh * R * T
+    """
+    m = np.eye(4)
+    m[:3, :3] = np.diag(scale) @ shear_matrix(shear) @ euler_to_rotation(rotate, order)
+    m[3, :3] = translate
+    return m
+
+
+def shear_matrix(shear) -> np.ndarray:
+    m = np.eye(3)
+    m[1, 0] = shear[0]
+    m[2, 0] = shear[1]
+    m[2, 1] = shear[2]
+    return m
+
+
+def decompose(matrix, order: int=0) -> tuple[list, list, list, list]:
+    """
+    行列をtranslate, rotate, scale, shearに分解する
+
+    Returns:
+        list: translate
+        list: rotate 度数法
+        list: scale
+        list: shear
+    """
+    t, r, s, sh = mathlib.decompose(matrix)
+    if order:
+        rotation = np.diag(1.0 / np.where(np.abs(s[0]) < EPSILON, 1.0, s[0])) @ np.linalg.inv(shear_matrix(sh[0])) @ as_matrix(matrix)[:3, :3]
+        rotate = rotation_to_euler(rotation, order)
+
+    else:
+        rotate = r[0].tolist()
+
+    return t[0].tolist(), rotate, s[0].tolist(), sh[0].tolist()
+
+
+def translation(value) -> np.ndarray:
+    m = np.eye(4)
+    m[3, :3] = value
+    return m
+
+
+def rotation_matrix(rotate, order: int=0) -> np.ndarray:
+    m = np.eye(4)
+    m[:3, :3] = euler_to_rotation(rotate, order)
+    return m
+
+
+def scale_matrix(scale) -> np.ndarray:
+    return np.diag([scale[0], scale[1], scale[2], 1.0])
+
+
+def quaternion_from_rotation(rotation) -> list:
+    """
+    回転行列 (3, 3) から [x, y, z, w] のクォータニオンを求める
+    """
+    m = np.asarray(rotation, dtype=np.float64).reshape(3, 3).T
+    trace = m[0, 0] + m[1, 1] + m[2, 2]
+    if trace > 0:
+        s = math.sqrt(trace + 1.0) * 2
+        return [(m[2, 1] - m[1, 2]) / s, (m[0, 2] - m[2, 0]) / s, (m[1, 0] - m[0, 1]) / s, 0.25 * s]
+
+    if m[0, 0] > m[1, 1] and m[0, 0] > m[2, 2]:
+        s = math.sqrt(1.0 + m[0, 0] - m[1, 1] - m[2, 2]) * 2
+        return [0.25 * s, (m[0, 1] + m[1, 0]) / s, (m[0, 2] + m[2, 0]) / s, (m[2, 1] - m[1, 2]) / s]
+
+    if m[1, 1] > m[2, 2]:
+        s = math.sqrt(1.0 + m[1, 1] - m[0, 0] - m[2, 2]) * 2
+        return [(m[0, 1] + m[1, 0]) / s, 0.25 * s, (m[1, 2] + m[2, 1]) / s, (m[0, 2] - m[2, 0]) / s]
+
+    s = math.sqrt(1.0 + m[2, 2] - m[0, 0] - m[1, 1]) * 2
+    return [(m[0, 2] + m[2, 0]) / s, (m[1, 2] + m[2, 1]) / s, 0.25 * s, (m[1, 0] - m[0, 1]) / s]
+
+
+def rotation_from_quaternion(quat) -> np.ndarray:
+    """
+    [x, y, z, w] のクォータニオンから回転行列 (3, 3) を作成する
+    """
+    x, y, z, w = quat
+    n = math.sqrt(x * x + y * y + z * z + w * w) or 1.0
+    x, y, z, w = x / n, y / n, z / n, w / n
+    m = np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ])
+    return m.T
+
+
+def blend(matrix1, matrix2, weight: float) -> np.ndarray:
+    """
+    2つの行列を、translateとscaleは線形に、回転は球面線形に補間する
+    """
+    if weight <= 0.0:
+        return as_matrix(matrix1)
+
+    if weight >= 1.0:
+        return as_matrix(matrix2)
+
+    t1, r1, s1, sh1 = mathlib.decompose(matrix1)
+    t2, r2, s2, sh2 = mathlib.decompose(matrix2)
+    q1 = np.array(quaternion_from_rotation(mathlib.euler_to_rotation(r1)[0]))
+    q2 = np.array(quaternion_from_rotation(mathlib.euler_to_rotation(r2)[0]))
+    if np.dot(q1, q2) < 0:
+        q2 = -q2
+
+    q = q1 * (1 - weight) + q2 * weight
+    m = np.eye(4)
+    s = s1[0] * (1 - weight) + s2[0] * weight
+    sh = sh1[0] * (1 - weight) + sh2[0] * weight
+    m[:3, :3] = np.diag(s) @ shear_matrix(sh) @ rotation_from_quaternion(q)
+    m[3, :3] = t1[0] * (1 - weight) + t2[0] * weight
+    return m
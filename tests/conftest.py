@@ -0,0 +1,82 @@
+"""
+テストはMayaを使わず、ysrig.standinの代替シーンで実行する
+PySide6が無い環境では、ビルドの途中で読み込まれるGUIのモジュールのためにQtの代わりを登録する
+"""
+import os
+import sys
+import types
+import importlib.util
+import pytest
+
+SCRIPTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "modules", "YSRig", "scripts")
+sys.path.insert(0, SCRIPTS_PATH)
+
+
+class _QtMeta(type):
+    def __getattr__(cls, name):
+        return _Qt
+
+    def __or__(cls, other):
+        return cls
+
+    __ror__ = __and__ = __rand__ = __or__
+
+
+class _Qt(metaclass=_QtMeta):
+    """
+    どのクラス、関数、定数の代わりにもなるQtの代わり 継承も呼び出しもできる
+    """
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return _Qt()
+
+    def __call__(self, *args, **kwargs):
+        return _Qt()
+
+    def __or__(self, other):
+        return self
+
+    __ror__ = __and__ = __rand__ = __or__
+
+    def __iter__(self):
+        return iter(())
+
+    def __bool__(self):
+        return False
+
+
+class _QtModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        return _Qt
+
+
+def _install_qt():
+    if importlib.util.find_spec("PySide6") is not None:
+        return
+
+    for name in ("PySide6", "PySide6.QtWidgets", "PySide6.QtCore", "PySide6.QtGui", "shiboken6"):
+        sys.modules[name] = _QtModule(name)
+
+    for name in ("QtWidgets", "QtCore", "QtGui"):
+        setattr(sys.modules["PySide6"], name, sys.modules[f"PySide6.{name}"])
+
+
+_install_qt()
+
+from ysrig import standin
+standin.install()
+
+
+@pytest.fixture
+def scene():
+    """
+    空のシーンから始める
+    """
+    from maya import cmds
+    cmds.file(new=True, force=True)
+    return standin.current_scene()
@@ -0,0 +1,26 @@
+from maya import cmds
+from ysrig import attr_writer
+
+
+def test_tuple_is_added_as_compound(scene):
+    node = cmds.createNode("network", name="Meta_Test")
+    attr_plan = attr_writer.plan(node, {"Pos": (0, 0)})
+
+    lines = attr_plan.to_mel().splitlines()
+    assert lines[:3] == [
+        'addAttr -ln "Pos" -at "double2" "Meta_Test";',
+        'addAttr -ln "PosX" -at "double" -p "Pos" "Meta_Test";',
+        'addAttr -ln "PosY" -at "double" -p "Pos" "Meta_Test";',
+    ]
+
+    attr_writer.execute(attr_plan)
+    assert cmds.attributeQuery("Pos", node=node, listChildren=True) == ["PosX", "PosY"]
+    assert cmds.getAttr(f"{node}.Pos") == [(0.0, 0.0)]
+
+
+def test_typed_data_stays_dt(scene):
+    node = cmds.createNode("network", name="Meta_Test")
+    mel = attr_writer.plan(node, {"Name": "L_Arm", "Offset": tuple(range(16))}).to_mel()
+
+    assert 'addAttr -ln "Name" -dt "string" "Meta_Test";' in mel
+    assert 'addAttr -ln "Offset" -dt "matrix" "Meta_Test";' in mel
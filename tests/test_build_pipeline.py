@@ -0,0 +1,47 @@
+from maya import cmds
+from ysrig import core, benchmark, build_pipeline, plan_cache
+
+
+def _build(case: str) -> build_pipeline.BuildResult:
+    cmds.file(new=True, force=True)
+    benchmark.CASES[case]()
+    return build_pipeline.build_all(progress=False, cache=True)
+
+
+def test_replayed_modules_are_reported_as_cached(scene, tmp_path, monkeypatch):
+    monkeypatch.setattr(plan_cache, "CACHE_DIR", str(tmp_path))
+
+    first = _build("shoulder_and_arm_ikfk")
+    second = _build("shoulder_and_arm_ikfk")
+
+    assert first.success and second.success
+    for m in first.modules:
+        assert m.status[build_pipeline.PHASE_RIG] == build_pipeline.STATUS_BUILT
+
+    for m in second.modules:
+        assert m.status[build_pipeline.PHASE_SKELETON] == build_pipeline.STATUS_BUILT
+        assert m.status[build_pipeline.PHASE_CONTROLLER] == build_pipeline.STATUS_CACHED
+        assert m.status[build_pipeline.PHASE_RIG] == build_pipeline.STATUS_CACHED
+
+    assert build_pipeline.STATUS_CACHED in second.summary()
+
+
+def test_cache_dir_is_outside_the_installed_tree():
+    assert not plan_cache.CACHE_DIR.startswith(core.prefs_path)
+
+
+def _rebuilt(result: build_pipeline.BuildResult) -> list:
+    return [m.group_name for m in result.modules if m.status.get(build_pipeline.PHASE_RIG) == build_pipeline.STATUS_BUILT]
+
+
+def test_rebuild_rig_follows_guide_changes(scene):
+    result = benchmark.measure_case("biped")
+    assert not [p.error for p in result.phases if p.error]
+
+    cmds.setAttr("Guide_L_Finger_Settings.TranslateEnabled", not cmds.getAttr("Guide_L_Finger_Settings.TranslateEnabled"))
+    assert _rebuilt(build_pipeline.rebuild_rig(progress=False)) == ["L_Finger"]
+
+    cmds.setAttr("Guide_L_Arm_Group.translateY", cmds.getAttr("Guide_L_Arm_Group.translateY") + 1.0)
+    assert _rebuilt(build_pipeline.rebuild_rig(progress=False)) == ["L_Arm", "L_Finger"]
+
+    assert _rebuilt(build_pipeline.rebuild_rig(progress=False)) == []
@@ -0,0 +1,105 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import maya.api.OpenMaya as om2
+from ysrig import core, mathlib
+
+RNG = np.random.default_rng(7)
+
+
+def _matrices(count: int=20, negative: bool=False) -> np.ndarray:
+    t = RNG.uniform(-10, 10, (count, 3))
+    r = RNG.uniform(-170, 170, (count, 3))
+    r[:, 1] = RNG.uniform(-80, 80, count)
+    s = RNG.uniform(0.5, 2.0, (count, 3))
+    if negative:
+        s[:, 0] *= -1
+
+    sh = RNG.uniform(-0.3, 0.3, (count, 3))
+    return mathlib.compose(t, r, s, sh)
+
+
+def _om2(matrix) -> np.ndarray:
+    return np.array(list(matrix)).reshape(4, 4)
+
+
+@pytest.mark.parametrize("negative", [False, True])
+def test_decompose_compose_round_trip(negative):
+    m = _matrices(negative=negative)
+    t, r, s, sh = mathlib.decompose(m)
+
+    assert np.allclose(mathlib.compose(t, r, s, sh), m)
+    assert (np.linalg.det(m[:, :3, :3]) < 0).all() == negative
+    assert (s[:, 0] < 0).all() == negative
+    assert (s[:, 1:] > 0).all()
+
+
+def test_inverse_and_offset():
+    parents = _matrices()
+    children = _matrices()
+
+    assert np.allclose(parents @ mathlib.inverse(parents), np.eye(4))
+    offsets = mathlib.offset(parents, children)
+    assert np.allclose(offsets @ parents, children)
+    for o, p, c in zip(offsets, parents, children):
+        assert np.allclose(o, _om2(om2.MMatrix(c.reshape(16).tolist()) * om2.MMatrix(p.reshape(16).tolist()).inverse()))
+
+
+@pytest.mark.parametrize("axis", ["X", "Y", "Z"])
+def test_mirror_negates_axes_and_keeps_determinant(axis):
+    m = _matrices()
+    mirrored = mathlib.mirror(m, axis)
+    index = "XYZ".index(axis)
+
+    assert (np.linalg.det(mirrored[:, :3, :3]) > 0).all()
+    assert np.allclose(mirrored[:, 3, index], -m[:, 3, index])
+    assert np.allclose(np.delete(mirrored[:, 3, :3], index, axis=1), np.delete(m[:, 3, :3], index, axis=1))
+
+    # mirrorJoint(mb=True)と同じく、反転した平面の成分以外の各軸が反転する
+    flipped = -m[:, :3, :3]
+    flipped[:, :, index] *= -1
+    assert np.allclose(mirrored[:, :3, :3], flipped)
+    assert np.allclose(mathlib.mirror(mirrored, axis), m)
+
+
+@pytest.mark.parametrize("order", range(len(mathlib.ROTATE_ORDERS)))
+def test_euler_conversion_for_all_rotate_orders(order):
+    j = "xyz".index(mathlib.ROTATE_ORDERS[order][1])
+    r = RNG.uniform(-170, 170, (50, 3))
+    r[:, j] = RNG.uniform(-89, 89, 50)
+
+    rotations = mathlib.euler_to_rotation(r, order=order)
+    assert np.allclose(mathlib.rotation_to_euler(rotations, order=order), r)
+    assert np.allclose(mathlib.euler_to_rotation(r, order=mathlib.ROTATE_ORDERS[order]), rotations)
+
+    for euler, rotation in zip(np.radians(r), rotations):
+        assert np.allclose(_om2(om2.MEulerRotation(*euler, order).asMatrix())[:3, :3], rotation)
+
+    # ジンバルロックの場合も同じ回転に戻る
+    r[:, j] = 90.0
+    rotations = mathlib.euler_to_rotation(r, order=order)
+    assert np.allclose(mathlib.euler_to_rotation(mathlib.rotation_to_euler(rotations, order=order), order=order), rotations)
+
+
+@pytest.fixture
+def without_mathlib(monkeypatch):
+    def call(func, *args, **kwargs):
+        with monkeypatch.context() as m:
+            m.setattr(core, "mathlib", None)
+            return func(*args, **kwargs)
+
+    return call
+
+
+@pytest.mark.parametrize("negative", [False, True])
+def test_core_decompose_matches_om2(without_mathlib, negative):
+    for m in _matrices(negative=negative):
+        matrix = m.reshape(16).tolist()
+        assert np.allclose(core.decompose_matrix(matrix), without_mathlib(core.decompose_matrix, matrix))
+
+
+@pytest.mark.parametrize("axis", ["X", "Y", "Z"])
+def test_core_mirror_matches_om2(without_mathlib, axis):
+    matrices = [m.reshape(16).tolist() for m in _matrices(negative=True)]
+    assert np.allclose(core.mirror_matrices(matrices, axis), without_mathlib(core.mirror_matrices, matrices, axis))
@@ -0,0 +1,36 @@
+from maya import cmds
+from ysrig import core, name_registry
+
+
+def _inputs(mm_node: str) -> list:
+    return [cmds.listConnections(f"{mm_node}.matrixIn[{i}]", s=True, d=False, p=True) for i in range(4)]
+
+
+def test_without_common_ancestor_connects_relative_to_world(scene):
+    cmds.createNode("transform", name="Guide_A")
+    cmds.createNode("transform", name="Guide_B", parent="Guide_A")
+    cmds.createNode("transform", name="Guide_C")
+    cmds.createNode("transform", name="Guide_D", parent="Guide_C")
+    mm_node = cmds.createNode("multMatrix")
+
+    with name_registry.session():
+        assert name_registry.get_common_ancestor("Guide_B", "Guide_D") == (None, ["Guide_A", "Guide_B"], ["Guide_C"])
+        index = core.connect_local_matrix_to_mm("Guide_B", "Guide_D", mm_node, start=0)
+
+    assert index == 3
+    assert _inputs(mm_node) == [["Guide_B.matrix"], ["Guide_A.matrix"], ["Guide_C.inverseMatrix"], None]
+
+
+def test_reparent_drops_only_the_moved_chains(scene):
+    cmds.createNode("transform", name="Guide_A")
+    cmds.createNode("transform", name="Guide_B", parent="Guide_A")
+    cmds.createNode("transform", name="Guide_C")
+    cmds.createNode("transform", name="Guide_D", parent="Guide_C")
+
+    with name_registry.session():
+        assert name_registry.get_common_ancestor("Guide_B", "Guide_D")[0] is None
+        cached = len(name_registry._chains)
+
+        cmds.parent("Guide_C", "Guide_A")
+        assert len(name_registry._chains) == cached - 2
+        assert name_registry.get_common_ancestor("Guide_B", "Guide_D") == ("Guide_A", ["Guide_B"], ["Guide_C"])
@@ -0,0 +1,36 @@
+import pytest
+from maya import cmds
+from ysrig import benchmark, build_pipeline, node_ledger, rig_base
+
+
+def _solvers() -> dict:
+    return {h: cmds.listConnections(f"{h}.ikSolver", s=True, d=False) for h in cmds.ls(type="ikHandle")}
+
+
+@pytest.fixture
+def biped(scene):
+    result = benchmark.measure_case("biped")
+    assert not [p.error for p in result.phases if p.error]
+    return scene
+
+
+def test_remove_module_keeps_other_ik_connected(biped):
+    nodes = node_ledger.get_nodes(cmds.ls(type="network"), node_ledger.PHASE_RIG)
+    assert not cmds.ls(nodes, type=node_ledger.SHARED_NODE_TYPES)
+
+    rig_base.remove_module("Meta_L_Arm")
+
+    solvers = _solvers()
+    assert "Ikhandle_L_Arm" not in solvers
+    assert solvers["Ikhandle_L_Leg"] == ["ikRPsolver"]
+    assert solvers["Ikhandle_R_Leg"] == ["ikRPsolver"]
+
+
+def test_rebuild_module_keeps_other_ik_connected(biped):
+    rig_base.remove_module("Meta_L_Arm")
+    result = build_pipeline.rebuild_rig(progress=False)
+
+    assert result.success
+    assert result.module("L_Leg").status[build_pipeline.PHASE_RIG] == build_pipeline.STATUS_SKIPPED
+    assert all(solvers for solvers in _solvers().values())
+    assert _solvers()["Ikhandle_L_Arm"] == ["ikRPsolver"]
@@ -0,0 +1,29 @@
+from maya import cmds
+from ysrig import build_plan, plan_cache
+
+
+def _plan() -> build_plan.BuildPlan:
+    plan = build_plan.BuildPlan()
+    plan.create_node("transform", "Foo")
+    plan.add_attr("Foo", ln="Offset", at="matrix")
+    plan.set_attr("Foo.Offset", [float(i == j) * 2.0 for i in range(4) for j in range(4)], "matrix")
+    return plan
+
+
+def test_modifier_plan_is_journaled_once(scene):
+    with plan_cache.Journal() as journal:
+        build_plan.apply(_plan(), modifier=True)
+
+    assert [op[0] for op in journal.ops] == [plan_cache.OP_PLAN]
+
+    cmds.file(new=True, force=True)
+    plan_cache.replay({"ops": journal.ops, "matrix_cache": [], "claimed": []})
+    assert cmds.getAttr("Foo.Offset")[0] == 2.0
+
+
+def test_cmds_plan_is_journaled_as_commands(scene):
+    with plan_cache.Journal() as journal:
+        build_plan.apply(_plan(), modifier=False)
+
+    assert plan_cache.OP_PLAN not in [op[0] for op in journal.ops]
+    assert [op[1] for op in journal.ops][:2] == ["createNode", "addAttr"]
@@ -0,0 +1,17 @@
+from ysrig import cmds_proxy, profiler
+
+
+class _Module:
+    def build(self):
+        cmds_proxy.cmds.createNode("transform", n="Foo")
+        cmds_proxy.mel.eval('addAttr -ln "Offset" -at "double" Foo;')
+
+
+def test_stage_counts_mel_calls(scene):
+    module = _Module()
+    with profiler.profile() as prof:
+        profiler.stage(module, module.build)
+
+    event = prof.events[0]
+    assert event.cmds_calls == {"createNode": 1, "mel.eval": 1}
+    assert prof not in cmds_proxy.mel._listeners
@@ -0,0 +1,92 @@
+import pytest
+from maya import cmds
+from ysrig import core, scene_index
+
+
+def _module(group_name: str, parent: str) -> str:
+    grp = cmds.createNode("transform", name=f"Guide_{group_name}_Group", parent=parent)
+    cmds.addAttr(grp, ln="YSNodeLabel", dt="string")
+    cmds.setAttr(f"{grp}.YSNodeLabel", core.GUIDE_MODULES_GROUP_NAME, type="string")
+    meta = core.create_labeled_node("network", "Meta_Node", name=f"Meta_{group_name}")
+    cmds.addAttr(meta, ln="GroupMatrix", at="matrix")
+    cmds.connectAttr(f"{grp}.matrix", f"{meta}.GroupMatrix")
+    return meta
+
+
+@pytest.fixture
+def guide(scene):
+    core.create_labeled_node("transform", core.GUIDE_GROUP_NAME, name=core.GUIDE_GROUP_NAME)
+    core.create_labeled_node("transform", core.GUIDE_MODULES_GROUP_NAME, name=core.GUIDE_MODULES_GROUP_NAME)
+    core.create_labeled_node("transform", core.GUIDE_FACIALS_GROUP_NAME, name=core.GUIDE_FACIALS_GROUP_NAME)
+    cmds.parent(core.GUIDE_MODULES_GROUP_NAME, core.GUIDE_GROUP_NAME)
+    cmds.parent(core.GUIDE_FACIALS_GROUP_NAME, core.GUIDE_MODULES_GROUP_NAME)
+    _module("Root", core.GUIDE_GROUP_NAME)
+    cmds.reorder("Guide_Root_Group", front=True)
+    _module("Spine", core.GUIDE_MODULES_GROUP_NAME)
+    _module("L_Arm", core.GUIDE_MODULES_GROUP_NAME)
+    _module("Jaw", core.GUIDE_FACIALS_GROUP_NAME)
+    return scene_index.get()
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError("メタノードを求め直した")
+
+
+def test_meta_nodes_are_cached_until_labels_change(guide, monkeypatch):
+    assert core.get_meta_nodes() == ["Meta_Root", "Meta_Spine", "Meta_L_Arm"]
+    assert core.get_facial_meta_nodes() == ["Meta_Jaw"]
+
+    with monkeypatch.context() as m:
+        m.setattr(guide, "_collect_meta_nodes", _fail)
+        assert core.get_meta_nodes() == ["Meta_Root", "Meta_Spine", "Meta_L_Arm"]
+        cmds.createNode("transform", name="Unlabeled")
+        assert core.get_facial_meta_nodes() == ["Meta_Jaw"]
+
+    _module("R_Arm", core.GUIDE_MODULES_GROUP_NAME)
+    assert core.get_meta_nodes() == ["Meta_Root", "Meta_Spine", "Meta_L_Arm", "Meta_R_Arm"]
+
+    cmds.delete("Meta_Spine", "Guide_Spine_Group")
+    assert core.get_meta_nodes() == ["Meta_Root", "Meta_L_Arm", "Meta_R_Arm"]
+
+
+def test_reorder_and_reparent_update_the_order(guide):
+    assert core.get_meta_nodes() == ["Meta_Root", "Meta_Spine", "Meta_L_Arm"]
+
+    cmds.reorder("Guide_L_Arm_Group", relative=-1)
+    assert core.get_meta_nodes() == ["Meta_Root", "Meta_L_Arm", "Meta_Spine"]
+
+    cmds.parent("Guide_Spine_Group", core.GUIDE_FACIALS_GROUP_NAME)
+    assert core.get_meta_nodes() == ["Meta_Root", "Meta_L_Arm"]
+    assert core.get_facial_meta_nodes() == ["Meta_Jaw", "Meta_Spine"]
+
+
+def test_incomplete_guide_is_not_cached(guide):
+    meta = core.create_labeled_node("network", "Meta_Node", name="Meta_R_Leg")
+    grp = cmds.createNode("transform", name="Guide_R_Leg_Group", parent=core.GUIDE_MODULES_GROUP_NAME)
+    assert core.get_meta_nodes() == ["Meta_Root", "Meta_Spine", "Meta_L_Arm", None]
+
+    cmds.addAttr(meta, ln="GroupMatrix", at="matrix")
+    cmds.connectAttr(f"{grp}.matrix", f"{meta}.GroupMatrix")
+    assert core.get_meta_nodes() == ["Meta_Root", "Meta_Spine", "Meta_L_Arm", "Meta_R_Leg"]
+
+
+def test_module_maps_group_name_to_nodes(guide):
+    core.create_labeled_node("transform", "Ctrl_Group", name="L_Arm_Ctrl_Group")
+    cmds.addAttr("Meta_L_Arm", ln="JointName", dt="string", multi=True)
+    cmds.setAttr("Meta_L_Arm.JointName[0]", "L_UpperArm", type="string")
+    cmds.setAttr("Meta_L_Arm.JointName[1]", "L_ForeArm", type="string")
+    cmds.createNode("joint", name="Proxy_L_UpperArm")
+
+    module = guide.module("L_Arm")
+    assert module["meta"] == "Meta_L_Arm"
+    assert module["guide_group"] == "Guide_L_Arm_Group"
+    assert module["ctrl_group"] == "L_Arm_Ctrl_Group"
+    assert module["controller_group"] is None
+    assert "Module" not in guide._modules
+
+    proxies = module["proxies"]
+    assert proxies[1] is None
+    assert guide.proxies("L_Arm")[0].hashCode() == proxies[0].hashCode()
+
+    cmds.createNode("joint", name="Proxy_L_ForeArm")
+    assert guide.proxies("L_Arm")[1] is not None
@@ -0,0 +1,7 @@
+from ysrig import skeleton_base
+
+
+def test_build_without_meta_nodes_does_nothing(scene):
+    calls = []
+    assert skeleton_base.build([], [], create=calls.append) == []
+    assert calls == []
@@ -0,0 +1,52 @@
+import maya.api.OpenMaya as om2
+from maya import cmds
+from ysrig import meta_snapshot
+
+
+def _watch(node: str) -> list:
+    sel = om2.MSelectionList()
+    sel.add(node)
+    dirty = []
+    callback = om2.MNodeMessage.addNodeDirtyPlugCallback(sel.getDependNode(0), lambda n, plug, *args: dirty.append(plug.partialName(useLongNames=True)))
+    return dirty, callback
+
+
+def test_dirty_propagates_downstream(scene):
+    grp = cmds.createNode("transform", name="Guide_A_Group")
+    cmds.addAttr(grp, ln="Mirror", at="bool")
+    meta = cmds.createNode("network", name="Meta_A")
+    cmds.addAttr(meta, ln="Mirror", at="bool")
+    cmds.addAttr(meta, ln="GroupMatrix", at="matrix")
+    cmds.addAttr(meta, ln="Settings", at="message")
+    cmds.connectAttr(f"{grp}.Mirror", f"{meta}.Mirror")
+    cmds.connectAttr(f"{grp}.matrix", f"{meta}.GroupMatrix")
+    cmds.connectAttr(f"{grp}.message", f"{meta}.Settings")
+
+    dirty, callback = _watch(meta)
+    try:
+        cmds.setAttr(f"{grp}.Mirror", True)
+        assert dirty == ["Mirror"]
+
+        dirty.clear()
+        cmds.setAttr(f"{grp}.translateX", 2.0)
+        assert dirty == ["GroupMatrix"]
+
+        dirty.clear()
+        cmds.setAttr(f"{grp}.visibility", False)
+        cmds.rename(grp, "Guide_B_Group")
+        assert "Settings" not in dirty
+
+    finally:
+        om2.MMessage.removeCallback(callback)
+
+
+def test_meta_snapshot_follows_upstream_changes(scene):
+    settings = cmds.createNode("transform", name="Guide_A_Settings")
+    cmds.addAttr(settings, ln="TranslateEnabled", at="bool")
+    meta = cmds.createNode("network", name="Meta_A")
+    cmds.addAttr(meta, ln="TranslateEnabled", at="bool")
+    cmds.connectAttr(f"{settings}.TranslateEnabled", f"{meta}.TranslateEnabled")
+
+    assert meta_snapshot.get(meta).get("TranslateEnabled") is False
+    cmds.setAttr(f"{settings}.TranslateEnabled", True)
+    assert meta_snapshot.get(meta).get("TranslateEnabled") is True